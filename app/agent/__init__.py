@@ -12,9 +12,26 @@ Implementation (What):
 Exports the StreamingAgent class from streaming.py for use in other parts of
 the application (e.g., main.py for the UI). The StreamingAgent provides
 real-time streaming responses as required by the project requirements.
+Also exports the shared ToolExecutor that runs tool calls for all requests
+and the shared ResponseCache that replays answers to repeated questions, and
+ConversationState, which callers keep per session to carry context across turns,
+and StreamEvent, the typed event yielded by StreamingAgent.stream_events().
 """
 
 from app.agent.streaming import StreamingAgent
+from app.agent.tool_executor import ToolExecutor, ToolQueueFullError, get_tool_executor
+from app.agent.response_cache import ResponseCache, get_response_cache
+from app.agent.conversation_state import ConversationState
+from app.agent.events import StreamEvent
 
-__all__ = ["StreamingAgent"]
+__all__ = [
+    "StreamingAgent",
+    "ToolExecutor",
+    "ToolQueueFullError",
+    "get_tool_executor",
+    "ResponseCache",
+    "get_response_cache",
+    "ConversationState",
+    "StreamEvent",
+]
 
@@ -0,0 +1,143 @@
+"""
+Per-session conversation state maintained incrementally across turns.
+
+Purpose (Why):
+On every turn the agent used to scan the whole conversation history with
+four regular expressions to find the medications and users already
+discussed, and walk it again to estimate its token count. Over a
+conversation's lifetime that is quadratic in its length.
+
+Implementation (What):
+ConversationState remembers how many history messages it has already
+processed and folds in only the new ones on each turn, keeping the
+medications and users seen (most recent last) and the token count of each
+message (counted once with the shared TokenCounter). If the history no
+longer extends what was processed (the chat was cleared or edited), the
+state rebuilds itself from scratch. The UI keeps one
+instance per session and passes it to StreamingAgent.stream_response().
+Each instance also carries a random session_id, which the UI uses as the
+rate limiting key of anonymous sessions.
+Instances are not thread-safe; a session handles one message at a time.
+"""
+
+import re
+import uuid
+import logging
+from typing import Any, Dict, List, Optional
+from app.agent.history_budget import get_token_counter
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Patterns to look for in messages
+_MEDICATION_ID_RE = re.compile(r'"medication_id"\s*:\s*"([^"]+)"')
+_MEDICATION_NAME_RE = re.compile(r'"name_he"\s*:\s*"([^"]+)"|"name_en"\s*:\s*"([^"]+)"')
+_USER_ID_RE = re.compile(r'"user_id"\s*:\s*"([^"]+)"')
+_USER_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]+)"')
+
+# Most medications / users remembered per conversation
+MAX_CONTEXT_ITEMS = 50
+
+
+class ConversationState:
+    """
+    Context extracted from a conversation, updated one message at a time.
+
+    Attributes:
+        session_id: Random identifier of the session (kept across reset())
+        message_count: Number of history messages processed so far
+        token_counts: Prompt tokens of each processed message, in order
+        token_total: Sum of token_counts
+    """
+
+    def __init__(self):
+        """Initialize an empty state with a new session_id."""
+        self.session_id = f"session_{uuid.uuid4().hex}"
+        self._clear()
+
+    def reset(self) -> None:
+        """Forget everything processed so far (the session_id is kept)."""
+        self._clear()
+
+    def _clear(self) -> None:
+        """Set the per-conversation fields to their empty values."""
+        self.message_count = 0
+        self.token_counts: List[int] = []
+        self.token_total = 0
+        self._medications: Dict[str, None] = {}
+        self._users: Dict[str, None] = {}
+        self._last_message: Optional[Dict[str, Any]] = None
+
+    def update(self, conversation_history: Optional[List[Dict[str, str]]]) -> None:
+        """
+        Bring the state up to date with the conversation history.
+
+        Implementation (What):
+        Processes history[message_count:] only. If the history is shorter than
+        what was processed, or its last processed message changed, resets and
+        processes the whole history.
+
+        Args:
+            conversation_history: Full history of the session (oldest first)
+        """
+        history = conversation_history or []
+        if self.message_count and (
+            len(history) < self.message_count
+            or not self._same_message(history[self.message_count - 1], self._last_message)
+        ):
+            logger.debug("Conversation history diverged from state, rebuilding")
+            self.reset()
+
+        for message in history[self.message_count:]:
+            self._add_message(message)
+        if history:
+            self._last_message = dict(history[-1])
+
+    @staticmethod
+    def _same_message(message: Dict[str, Any], other: Optional[Dict[str, Any]]) -> bool:
+        """Check whether two history messages have the same role and content."""
+        return other is not None and message.get("role") == other.get("role") and message.get("content") == other.get("content")
+
+    def _add_message(self, message: Dict[str, str]) -> None:
+        """
+        Fold one message into the state.
+
+        Args:
+            message: History message with "role" and "content"
+        """
+        content = message.get("content") or ""
+        tokens = get_token_counter().count_message(message)
+        self.token_counts.append(tokens)
+        self.token_total += tokens
+        self.message_count += 1
+        if not content:
+            return
+
+        self._remember(self._medications, _MEDICATION_ID_RE.findall(content))
+        for name_he, name_en in _MEDICATION_NAME_RE.findall(content):
+            self._remember(self._medications, [name for name in (name_he, name_en) if name])
+        self._remember(self._users, _USER_ID_RE.findall(content))
+        self._remember(self._users, _USER_NAME_RE.findall(content))
+
+    @staticmethod
+    def _remember(seen: Dict[str, None], values: List[str]) -> None:
+        """Move values to the most recent end of an ordered set, dropping the oldest beyond the limit."""
+        for value in values:
+            seen.pop(value, None)
+            seen[value] = None
+        while len(seen) > MAX_CONTEXT_ITEMS:
+            del seen[next(iter(seen))]
+
+    def context_info(self) -> Dict[str, List[str]]:
+        """
+        Get the medications and users discussed so far.
+
+        Returns:
+            Dictionary with keys:
+            - medications: Medication IDs/names, most recently mentioned first
+            - users: User IDs/names, most recently mentioned first
+        """
+        return {
+            "medications": list(reversed(self._medications)),
+            "users": list(reversed(self._users)),
+        }
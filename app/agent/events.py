@@ -0,0 +1,88 @@
+"""
+Typed events streamed by the agent.
+
+Purpose (Why):
+Tool call information used to travel inside the text stream as
+[TOOL_CALL_START]{...}[/TOOL_CALL_START] and [TOOL_CALL_RESULT]{...}[/TOOL_CALL_RESULT]
+markers, so the UI ran regular expressions and JSON parsing over every
+streamed chunk to find them again.
+
+Implementation (What):
+StreamingAgent.stream_events() / astream_events() yield StreamEvent tuples:
+text deltas, tool call starts, tool call results and a final done event. The
+tool information stays a Python dictionary from the agent to the UI.
+render_marker() turns a tool event back into the legacy marker string for
+stream_response(include_tool_calls=True).
+"""
+
+import json
+from typing import Any, Dict, NamedTuple, Optional
+
+# Event types
+TEXT = "text"
+TOOL_START = "tool_start"
+TOOL_RESULT = "tool_result"
+DONE = "done"
+
+# Legacy in-band marker of each tool event type: (marker type, tag)
+_MARKERS = {
+    TOOL_START: ("tool_call_start", "TOOL_CALL_START"),
+    TOOL_RESULT: ("tool_call_result", "TOOL_CALL_RESULT"),
+}
+
+
+class StreamEvent(NamedTuple):
+    """
+    One event of a streamed agent response.
+
+    Attributes:
+        type: TEXT, TOOL_START, TOOL_RESULT or DONE
+        text: Text delta (TEXT events only)
+        data: Event payload:
+            - TOOL_START: {"tool_name", "tool_id", "arguments"}
+            - TOOL_RESULT: {"tool_name", "tool_id", "result", "success"}
+            - DONE: {"correlation_id"}
+    """
+    type: str
+    text: str = ""
+    data: Optional[Dict[str, Any]] = None
+
+
+def text_event(text: str) -> StreamEvent:
+    """Build a TEXT event."""
+    return StreamEvent(TEXT, text)
+
+
+def tool_start_event(tool_name: str, tool_id: str, arguments: Dict[str, Any]) -> StreamEvent:
+    """Build a TOOL_START event."""
+    return StreamEvent(TOOL_START, data={"tool_name": tool_name, "tool_id": tool_id, "arguments": arguments})
+
+
+def tool_result_event(tool_name: str, tool_id: str, result: Dict[str, Any]) -> StreamEvent:
+    """Build a TOOL_RESULT event; success is read from the result (default True)."""
+    return StreamEvent(TOOL_RESULT, data={
+        "tool_name": tool_name,
+        "tool_id": tool_id,
+        "result": result,
+        "success": result.get("success", True) if isinstance(result, dict) else True
+    })
+
+
+def render_marker(event: StreamEvent) -> str:
+    """
+    Render a tool event as the legacy in-band marker string.
+
+    Args:
+        event: TOOL_START or TOOL_RESULT event
+
+    Returns:
+        "\\n\\n[TAG]{json}[/TAG]\\n\\n", as embedded by stream_response()
+
+    Raises:
+        ValueError: If the event is not a tool event
+    """
+    if event.type not in _MARKERS:
+        raise ValueError(f"No marker for event type: {event.type}")
+    marker_type, tag = _MARKERS[event.type]
+    payload = json.dumps({"type": marker_type, **event.data}, ensure_ascii=False)
+    return f"\n\n[{tag}]{payload}[/{tag}]\n\n"
@@ -0,0 +1,357 @@
+"""
+Deterministic fast path for simple single-medication lookups.
+
+Purpose (Why):
+A large share of messages are pure lookups such as "is Acamol in stock?" or
+"does Ibuprofen need a prescription?". Through the LLM each one costs at least
+two full model calls (one to pick the tool, one to phrase the answer), i.e.
+seconds, while the lookup itself takes microseconds.
+
+Implementation (What):
+FastPathRouter.match() accepts a message only when it is unambiguous:
+- exactly one medication is named, matched exactly (case-insensitive) against
+  a Hebrew name, English name or brand name via the medication search index,
+- exactly one intent (stock, prescription, info) is expressed, and
+- every other word belongs to a small vocabulary of question words and
+  fillers in English and Hebrew.
+Anything else (symptoms, "should I", several medications, personal
+questions, unknown words) returns None and the message goes to the LLM as
+before. The agent then executes the single tool through execute_tool() and
+render() turns the tool result into a templated answer in the user's
+language. A tool error also falls back to the LLM.
+"""
+
+import re
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from app.database import get_db_manager
+from app.models.medication import Medication
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+INTENT_STOCK = "stock"
+INTENT_PRESCRIPTION = "prescription"
+INTENT_INFO = "info"
+
+# Words that express an intent (English and Hebrew)
+INTENT_WORDS: Dict[str, Set[str]] = {
+    INTENT_STOCK: {
+        "stock", "available", "availability", "inventory", "units", "left",
+        "מלאי", "במלאי", "זמין", "זמינה", "זמינות", "נשאר", "נשארו", "יחידות",
+    },
+    INTENT_PRESCRIPTION: {
+        "prescription", "rx", "otc", "counter",
+        "מרשם", "במרשם",
+    },
+    INTENT_INFO: {
+        "about", "info", "information", "describe", "details",
+        "מידע", "פרטים",
+    },
+}
+
+# Words that suggest an intent only when no word from INTENT_WORDS is present
+# ("do you have X" asks about stock, "what is X" asks for information)
+WEAK_INTENT_WORDS: Dict[str, Set[str]] = {
+    INTENT_STOCK: {"have", "got", "carry", "sell", "יש", "מוכרים"},
+    INTENT_INFO: {"what", "what's", "whats", "tell", "explain", "מה", "ספר", "ספרי", "תספר", "תספרי", "הסבר"},
+}
+
+# Words allowed around the medication name that carry no meaning of their own
+FILLER_WORDS: Set[str] = {
+    # English
+    "is", "are", "does", "do", "the", "a", "an", "of", "for", "in", "it", "there",
+    "any", "need", "needs", "require", "requires", "required", "me", "can", "i",
+    "you", "please", "check", "how", "many", "much", "on", "hand", "currently",
+    "now", "give", "show", "get", "buy", "without", "over", "with", "hi", "hello",
+    "thanks", "still", "we", "your", "pharmacy",
+    # Hebrew
+    "האם", "לכם", "לך", "את", "של", "צריך", "צריכה", "צריכים", "דורש", "דורשת",
+    "נדרש", "זה", "לי", "על", "כמה", "בבקשה", "בלי", "ללא", "אפשר", "לקבל",
+    "לקנות", "הוא", "היא", "עדיין", "כרגע", "עכשיו", "שלום", "תודה", "אצלכם",
+}
+
+# Single-letter Hebrew prefixes that may be attached to a medication name
+HEBREW_PREFIXES = "הובלשמכ"
+
+# Longest medication name (in words) the router looks for
+MAX_NAME_WORDS = 3
+
+_TOKEN_RE = re.compile(r"[\w'’]+", re.UNICODE)
+_HEBREW_RE = re.compile(r"[֐-׿]")
+
+
+class FastPathMatch(NamedTuple):
+    """
+    A message recognized as a simple lookup.
+
+    Attributes:
+        intent: INTENT_STOCK, INTENT_PRESCRIPTION or INTENT_INFO
+        medication: The single medication named in the message
+        matched_text: The medication name as written by the user (lowercased)
+        quantity: Requested quantity for stock questions, if given
+        language: "he" or "en", the language of the answer
+    """
+    intent: str
+    medication: Medication
+    matched_text: str
+    quantity: Optional[int]
+    language: str
+
+
+def _tokenize(message: str) -> List[str]:
+    """
+    Split a message into lowercased words.
+
+    Args:
+        message: User message
+
+    Returns:
+        List of words (punctuation removed, apostrophes kept)
+    """
+    return [token.replace("’", "'") for token in _TOKEN_RE.findall(message.lower())]
+
+
+def _exact_names(medication: Medication) -> Set[str]:
+    """
+    Get the lowercased names a medication can be referred to by.
+
+    Args:
+        medication: Medication model
+
+    Returns:
+        Set of Hebrew name, English name and brand names
+    """
+    names = {medication.name_he.lower(), medication.name_en.lower()}
+    names.update(brand.lower() for brand in medication.brand_names)
+    return names
+
+
+class FastPathRouter:
+    """
+    Recognizes simple lookups and renders their answers from tool results.
+
+    Purpose (Why):
+    Lets the agent answer unambiguous stock, prescription and information
+    questions without an LLM round-trip, and only those.
+
+    Implementation (What):
+    Stateless; medication lookup goes through the shared DatabaseManager's
+    search index, so it follows database reloads automatically.
+    """
+
+    def match(self, message: str) -> Optional[FastPathMatch]:
+        """
+        Recognize a simple single-medication lookup.
+
+        Args:
+            message: Normalized user message
+
+        Returns:
+            FastPathMatch, or None if the message must go to the LLM
+        """
+        tokens = _tokenize(message)
+        if not tokens or len(tokens) > 15:
+            return None
+
+        found = self._find_medications(tokens)
+        if len(found) != 1:
+            return None
+        medication, matched_text, start, end = found[0]
+
+        intents: Set[str] = set()
+        weak_intents: Set[str] = set()
+        quantity = None
+        for token in tokens[:start] + tokens[end:]:
+            if token.isdigit():
+                if quantity is not None:
+                    return None
+                quantity = int(token)
+                continue
+            token_intents = {intent for intent, words in INTENT_WORDS.items() if token in words}
+            token_weak_intents = {intent for intent, words in WEAK_INTENT_WORDS.items() if token in words}
+            if not token_intents and not token_weak_intents and token not in FILLER_WORDS:
+                return None
+            intents |= token_intents
+            weak_intents |= token_weak_intents
+
+        # Stock and prescription words are more specific than info words
+        # ("what about the stock of X" is a stock question)
+        if len(intents) > 1:
+            intents.discard(INTENT_INFO)
+        if not intents:
+            intents = weak_intents
+        if len(intents) != 1:
+            return None
+        intent = intents.pop()
+        if quantity is not None and (intent != INTENT_STOCK or quantity <= 0):
+            return None
+
+        language = "he" if _HEBREW_RE.search(message) else "en"
+        return FastPathMatch(intent, medication, matched_text, quantity, language)
+
+    def medication_ids(self, message: str) -> List[str]:
+        """
+        Get the IDs of the medications named exactly in a message.
+
+        Args:
+            message: User message
+
+        Returns:
+            Sorted, distinct medication IDs (empty if none is named)
+        """
+        return sorted({medication.medication_id for medication, _, _, _ in self._find_medications(_tokenize(message))})
+
+    def _find_medications(self, tokens: List[str]) -> List[Tuple[Medication, str, int, int]]:
+        """
+        Find the medications named in the message.
+
+        Implementation (What):
+        Tries every window of up to MAX_NAME_WORDS words (longest first) as a
+        search query, also with a leading Hebrew prefix letter removed, and
+        keeps exact name matches that do not overlap a longer match.
+
+        Args:
+            tokens: Lowercased message words
+
+        Returns:
+            List of (medication, matched text, start index, end index), one per mention
+        """
+        db = get_db_manager()
+        matches = []
+        for size in range(min(MAX_NAME_WORDS, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                if any(s < start + size and start < e for _, _, s, e in matches):
+                    continue
+                phrase = " ".join(tokens[start:start + size])
+                candidates = [phrase]
+                if phrase[0] in HEBREW_PREFIXES and _HEBREW_RE.match(phrase) and len(phrase) > 2:
+                    candidates.append(phrase[1:])
+                for candidate in candidates:
+                    medication = self._lookup_exact(db, candidate)
+                    if medication is not None:
+                        matches.append((medication, candidate, start, start + size))
+                        break
+        return matches
+
+    @staticmethod
+    def _lookup_exact(db: Any, name: str) -> Optional[Medication]:
+        """
+        Look up the medication whose name is exactly the given text.
+
+        Args:
+            db: DatabaseManager
+            name: Lowercased candidate name
+
+        Returns:
+            The medication, or None if no (or more than one) medication has this name
+        """
+        if len(name) < 3:
+            return None
+        exact = [m for m in db.search_medications_by_name(name, ranked=True) if name in _exact_names(m)]
+        if len({m.medication_id for m in exact}) != 1:
+            return None
+        return exact[0]
+
+    @staticmethod
+    def tool_call(match: FastPathMatch) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the tool that answers a match.
+
+        Args:
+            match: Recognized lookup
+
+        Returns:
+            (tool name, arguments) for execute_tool()
+        """
+        medication_id = match.medication.medication_id
+        if match.intent == INTENT_STOCK:
+            arguments: Dict[str, Any] = {"medication_id": medication_id}
+            if match.quantity is not None:
+                arguments["quantity"] = match.quantity
+            return "check_stock_availability", arguments
+        if match.intent == INTENT_PRESCRIPTION:
+            return "check_prescription_requirement", {"medication_id": medication_id}
+        return "get_medication_by_name", {"name": match.matched_text}
+
+    def render(self, match: FastPathMatch, result: Dict[str, Any]) -> Optional[str]:
+        """
+        Phrase the answer to a match from its tool result.
+
+        Args:
+            match: Recognized lookup
+            result: Result of the tool returned by tool_call()
+
+        Returns:
+            Answer text, or None if the result is an error or does not belong
+            to the matched medication (the caller then falls back to the LLM)
+        """
+        if not isinstance(result, dict) or "error" in result or result.get("success") is False:
+            return None
+        if result.get("medication_id") != match.medication.medication_id:
+            return None
+
+        name = self._display_name(match)
+        if match.intent == INTENT_STOCK:
+            return self._render_stock(name, result, match.language)
+        if match.intent == INTENT_PRESCRIPTION:
+            return self._render_prescription(name, result, match.language)
+        return self._render_info(result, match.language)
+
+    @staticmethod
+    def _display_name(match: FastPathMatch) -> str:
+        """Name of the medication in the answer's language, with the brand the user used."""
+        medication = match.medication
+        name = medication.name_he if match.language == "he" else medication.name_en
+        if match.matched_text in (medication.name_he.lower(), medication.name_en.lower()):
+            return name
+        brand = next((b for b in medication.brand_names if b.lower() == match.matched_text), None)
+        return f"{brand} ({name})" if brand else name
+
+    @staticmethod
+    def _render_stock(name: str, result: Dict[str, Any], language: str) -> str:
+        """Render a check_stock_availability result."""
+        quantity = result.get("quantity_in_stock", 0)
+        requested = result.get("requested_quantity")
+        restocked = result.get("last_restocked")
+        if language == "he":
+            if not result.get("available"):
+                return f"{name} אזל מהמלאי כרגע."
+            if requested is not None and not result.get("sufficient_quantity"):
+                return f"{name} זמין במלאי, אך יש רק {quantity} יחידות, פחות מ-{requested} היחידות שביקשת."
+            answer = f"{name} זמין במלאי: {quantity} יחידות."
+            return answer + (f" חידוש מלאי אחרון: {restocked}." if restocked else "")
+        if not result.get("available"):
+            return f"{name} is currently out of stock."
+        if requested is not None and not result.get("sufficient_quantity"):
+            return f"{name} is in stock, but only {quantity} units are available, fewer than the {requested} you asked for."
+        answer = f"{name} is in stock: {quantity} units available."
+        return answer + (f" Last restocked: {restocked}." if restocked else "")
+
+    @staticmethod
+    def _render_prescription(name: str, result: Dict[str, Any], language: str) -> str:
+        """Render a check_prescription_requirement result."""
+        if language == "he":
+            if result.get("requires_prescription"):
+                return f"{name} דורש מרשם רופא."
+            return f"{name} אינו דורש מרשם וניתן לקבלו ללא מרשם."
+        if result.get("requires_prescription"):
+            return f"{name} requires a doctor's prescription."
+        return f"{name} does not require a prescription; it is available over the counter."
+
+    @staticmethod
+    def _render_info(result: Dict[str, Any], language: str) -> str:
+        """Render a get_medication_by_name result."""
+        ingredients = ", ".join(result.get("active_ingredients") or [])
+        forms = ", ".join(result.get("dosage_forms") or [])
+        if language == "he":
+            lines = [f"**{result.get('name_he')} ({result.get('name_en')})**"]
+            labels = ("תיאור", "חומרים פעילים", "צורות מינון", "מינון", "הוראות שימוש")
+            disclaimer = "זהו מידע כללי מהעלון ואינו ייעוץ רפואי. לשאלות על מצבך האישי יש לפנות לרופא או לרוקח."
+        else:
+            lines = [f"**{result.get('name_en')} ({result.get('name_he')})**"]
+            labels = ("Description", "Active ingredients", "Dosage forms", "Dosage", "Usage")
+            disclaimer = "This is general label information, not medical advice. Please consult a doctor or pharmacist about your specific situation."
+        values = (result.get("description"), ingredients, forms, result.get("dosage_instructions"), result.get("usage_instructions"))
+        lines.extend(f"- {label}: {value}" for label, value in zip(labels, values) if value)
+        return "\n".join(lines) + "\n\n" + disclaimer
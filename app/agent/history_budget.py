@@ -0,0 +1,241 @@
+"""
+Tokenizer-based token counting and history budgeting.
+
+Purpose (Why):
+History was trimmed with a len(text) // 4 estimate, which undercounts Hebrew
+several times over, so long Hebrew conversations were sent over budget while
+English ones were over-trimmed, and everything older than ten messages was
+replaced by a placeholder without content.
+
+Implementation (What):
+TokenCounter counts tokens with tiktoken (the encoding is configurable) and
+memoizes counts per message content, so each message is tokenized once even
+though the history is re-sent every turn. If tiktoken or its encoding file is
+unavailable (e.g. no network access to download it), it falls back to a
+script-aware estimate. budget_history() fills a token budget with the newest
+messages first and reports how many older messages did not fit.
+
+Configuration (environment variables):
+- TOKENIZER_ENCODING: tiktoken encoding name (default: "o200k_base")
+- HISTORY_TOKEN_BUDGET: Tokens of history sent to the model (default: 4000)
+- HISTORY_MAX_MESSAGES: Maximum history messages sent to the model (default: 20)
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Load environment variables
+load_dotenv()
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+DEFAULT_HISTORY_TOKEN_BUDGET = 4000
+DEFAULT_HISTORY_MAX_MESSAGES = 20
+
+# Tokens added by the chat format around every message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Distinct message contents whose token counts are remembered
+DEFAULT_CACHE_SIZE = 4096
+
+
+def estimate_tokens_fallback(text: str) -> int:
+    """
+    Estimate tokens without a tokenizer.
+
+    Implementation (What):
+    About 4 characters per token for ASCII text and 2 per token for other
+    scripts (Hebrew words split into many more tokens than English ones).
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated number of tokens
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    other_chars = len(text) - ascii_chars
+    return (ascii_chars + 3) // 4 + (other_chars + 1) // 2
+
+
+class TokenCounter:
+    """
+    Memoizing token counter backed by tiktoken.
+
+    Attributes:
+        encoding_name: Name of the tiktoken encoding
+        exact: Whether counts come from the tokenizer (False: fallback estimate)
+    """
+
+    def __init__(self, encoding_name: Optional[str] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the counter and load the encoding.
+
+        Args:
+            encoding_name: tiktoken encoding. If None, reads TOKENIZER_ENCODING or
+                defaults to "o200k_base".
+            cache_size: Number of distinct texts whose counts are remembered
+        """
+        self.encoding_name = encoding_name or os.getenv("TOKENIZER_ENCODING", DEFAULT_ENCODING)
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                logger.warning(f"Could not load tiktoken encoding {self.encoding_name}, using estimates: {e}")
+        else:
+            logger.warning("tiktoken not available, using token estimates")
+        self.exact = self._encoding is not None
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+        if self._encoding is not None:
+            tokens = len(self._encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = estimate_tokens_fallback(text)
+        with self._lock:
+            self._cache[text] = tokens
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        """
+        Count the tokens a chat message occupies in the prompt.
+
+        Args:
+            message: Message with "role" and "content"
+
+        Returns:
+            Content tokens plus the per-message overhead
+        """
+        return self.count(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Keep the beginning of a text that fits in max_tokens.
+
+        Args:
+            text: Text to truncate
+            max_tokens: Maximum number of tokens to keep
+
+        Returns:
+            The text, cut to at most max_tokens tokens
+        """
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self._encoding.decode(tokens[:max_tokens])
+        # Longest prefix within the estimate (binary search on its length)
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens_fallback(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+
+
+def budget_history(
+    history: Sequence[Dict[str, Any]],
+    max_tokens: int,
+    max_messages: int,
+    token_counts: Optional[Sequence[int]] = None,
+    counter: Optional[TokenCounter] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Select the newest history messages that fit in a token budget.
+
+    Implementation (What):
+    Walks the history newest-first, skipping a message identical to the one
+    after it, and keeps messages while they fit in max_tokens and
+    max_messages. If even the newest message does not fit, its content is
+    truncated to the budget so the model keeps the latest context.
+
+    Args:
+        history: Messages, oldest first
+        max_tokens: Token budget for the selected messages
+        max_messages: Maximum number of selected messages
+        token_counts: Optional precomputed count per message (same order as history)
+        counter: TokenCounter used when token_counts is not given
+
+    Returns:
+        Tuple of (selected messages oldest first, number of older messages dropped)
+    """
+    counter = counter or get_token_counter()
+    selected: List[Dict[str, Any]] = []
+    used = 0
+    index = len(history) - 1
+    while index >= 0 and len(selected) < max_messages:
+        message = history[index]
+        if selected and message.get("content") == selected[-1].get("content"):
+            index -= 1
+            continue
+        tokens = token_counts[index] if token_counts is not None else counter.count_message(message)
+        if used + tokens > max_tokens:
+            if not selected:
+                content = counter.truncate(message.get("content") or "", max_tokens - MESSAGE_OVERHEAD_TOKENS)
+                selected.append(dict(message, content=content))
+                index -= 1
+            break
+        selected.append(message)
+        used += tokens
+        index -= 1
+    selected.reverse()
+    return selected, index + 1
+
+
+# Process-wide shared TokenCounter instance
+_shared_token_counter: Optional[TokenCounter] = None
+_shared_token_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    Get or create the process-wide shared TokenCounter.
+
+    Returns:
+        TokenCounter: The shared counter, configured from environment variables
+    """
+    global _shared_token_counter
+    counter = _shared_token_counter
+    if counter is None:
+        with _shared_token_counter_lock:
+            if _shared_token_counter is None:
+                _shared_token_counter = TokenCounter()
+            counter = _shared_token_counter
+    return counter
@@ -0,0 +1,245 @@
+"""
+Process-wide cache of complete agent responses.
+
+Purpose (Why):
+Pharmacy traffic is highly repetitive: the same question about the same
+popular medication arrives hundreds of times a day, and every one of them
+runs the full model and tool loop again. For questions that do not depend on
+who is asking, the answer is the same until the catalog changes.
+
+Implementation (What):
+ResponseCache maps (normalized message, medication IDs named in the message,
+database data_version) to the list of events the agent yielded, so a hit can
+be replayed as a stream and the UI behaves exactly as for a live answer. The agent only consults the cache for first messages of
+unauthenticated sessions that name at least one medication, and only stores
+answers that completed normally using catalog tools without errors. Entries
+expire after a TTL and the least recently used entry is evicted when full;
+a new data_version (reload, save, stock change) makes all older entries
+unreachable and they are dropped on the next store.
+
+Configuration (environment variables):
+- RESPONSE_CACHE_ENABLED: "true" or "false" (default)
+- RESPONSE_CACHE_MAX_ENTRIES: Maximum cached responses (default: 512)
+- RESPONSE_CACHE_TTL_SECONDS: Lifetime of a cached response (default: 300)
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 300.0
+
+# Tools whose results are the same for every user; answers that used any
+# other tool are never cached
+CATALOG_TOOLS = frozenset({
+    "get_medication_by_name",
+    "check_stock_availability",
+    "check_prescription_requirement",
+})
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a message for use in a cache key.
+
+    Args:
+        message: User message
+
+    Returns:
+        Case-folded message with collapsed whitespace and without trailing
+        punctuation ("Is Acamol in stock?" == "is acamol  in stock")
+    """
+    return _WHITESPACE_RE.sub(" ", message.casefold()).strip().rstrip("?!.").strip()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of streamed responses, keyed by catalog version.
+
+    Purpose (Why):
+    Replays answers to repeated catalog questions without calling the model.
+
+    Implementation (What):
+    An OrderedDict in recency order holds key -> (expires_at, events). The key
+    carries the data_version, so entries of an older catalog never match again;
+    put() drops them eagerly. All state is protected by one lock.
+
+    Attributes:
+        enabled: Whether responses are cached at all
+        max_entries: Maximum number of cached responses
+        ttl_seconds: Lifetime of a cached response
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum cached responses. If None, reads
+                RESPONSE_CACHE_MAX_ENTRIES or defaults to 512.
+            ttl_seconds: Lifetime of a response. If None, reads
+                RESPONSE_CACHE_TTL_SECONDS or defaults to 300.
+            enabled: Whether caching is enabled. If None, reads
+                RESPONSE_CACHE_ENABLED (default: "false").
+
+        Raises:
+            ValueError: If a configured value is invalid
+        """
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+        )
+        self.enabled = (
+            enabled
+            if enabled is not None
+            else os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+        ) and self.max_entries > 0 and self.ttl_seconds > 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[Any, ...]]]" = OrderedDict()
+        self._data_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(
+            f"ResponseCache initialized: enabled={self.enabled}, "
+            f"max_entries={self.max_entries}, ttl_seconds={self.ttl_seconds}"
+        )
+
+    def make_key(
+        self,
+        message: str,
+        medication_ids: List[str],
+        data_version: int
+    ) -> Optional[Hashable]:
+        """
+        Build the cache key of a request, or None if it is not cacheable.
+
+        Args:
+            message: User message
+            medication_ids: IDs of the medications the message names
+            data_version: Current database data_version
+
+        Returns:
+            Key tuple, or None if caching is disabled or no medication is named
+        """
+        if not self.enabled or not medication_ids:
+            return None
+        normalized = normalize_message(message)
+        if not normalized:
+            return None
+        return (normalized, tuple(sorted(medication_ids)), data_version)
+
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The events of the cached response, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, key: Hashable, events: List[Any], data_version: int) -> None:
+        """
+        Store a completed response.
+
+        Args:
+            key: Key from make_key()
+            events: Events yielded for the response, in order
+            data_version: Current database data_version; the response is dropped
+                if it differs from the version in the key (the catalog changed
+                while the answer was generated)
+        """
+        if not events or key[-1] != data_version:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if data_version != self._data_version:
+                # Entries of older catalog versions can never match again
+                for stale_key in [k for k in self._entries if k[-1] != data_version]:
+                    del self._entries[stale_key]
+                self._data_version = data_version
+            self._entries[key] = (expires_at, tuple(events))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with entries, max_entries, hits and misses
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Process-wide shared ResponseCache instance
+_shared_response_cache: Optional[ResponseCache] = None
+_shared_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get or create the process-wide shared ResponseCache.
+
+    Returns:
+        ResponseCache: The shared cache, configured from environment variables
+    """
+    global _shared_response_cache
+    cache = _shared_response_cache
+    if cache is None:
+        with _shared_response_cache_lock:
+            if _shared_response_cache is None:
+                _shared_response_cache = ResponseCache()
+            cache = _shared_response_cache
+    return cache
@@ -20,17 +20,39 @@ only within a single session, ensuring stateless behavior between different sess
 import os
 import json
 import logging
+import asyncio
 import concurrent.futures
 import re
+import threading
 import time
-from typing import List, Dict, Any, Optional, Generator, Tuple
-from openai import OpenAI
+import weakref
+from typing import List, Dict, Any, Optional, Generator, AsyncGenerator, Tuple, Collection
+from openai import OpenAI, AsyncOpenAI
 import httpx
 from dotenv import load_dotenv
 from app.prompts.system_prompt import get_system_prompt
 from app.tools.registry import get_tools_for_openai, execute_tool
-from app.security.audit_logger import AuditLogger
+from app.security.audit_logger import get_audit_logger
 from app.security.correlation import generate_correlation_id
+from app.agent.tool_executor import get_tool_executor, ToolQueueFullError
+from app.agent.fast_path import FastPathRouter, FastPathMatch
+from app.agent.conversation_state import ConversationState
+from app.agent.history_budget import (
+    budget_history,
+    DEFAULT_HISTORY_TOKEN_BUDGET,
+    DEFAULT_HISTORY_MAX_MESSAGES,
+)
+from app.agent.response_cache import ResponseCache, get_response_cache, CATALOG_TOOLS
+from app.agent.events import (
+    StreamEvent,
+    TEXT,
+    DONE,
+    text_event,
+    tool_start_event,
+    tool_result_event,
+    render_marker,
+)
+from app.database import get_db_manager
 
 # #region agent log
 # Debug log path - only used if the directory exists (for local development)
@@ -63,8 +85,8 @@ load_dotenv()
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
-# Module-level audit logger instance
-_audit_logger = AuditLogger()
+# Module-level audit logger (the shared instance, so all modules use one writer)
+_audit_logger = get_audit_logger()
 
 # Shared HTTP client with optimized connection pooling for improved performance
 # Using HTTP/1.1 instead of HTTP/2 for better compatibility and faster initial connection
@@ -83,6 +105,51 @@ _http_client = httpx.Client(
     )
 )
 
+# Async HTTP clients for astream_response(), one per event loop
+# Async streams wait on the network without holding a thread, so the pool is sized
+# for many concurrent conversations (configurable via OPENAI_ASYNC_MAX_CONNECTIONS).
+# Pooled connections are bound to the event loop that opened them, so a client is
+# never shared across loops (e.g. between repeated asyncio.run() calls)
+_ASYNC_MAX_CONNECTIONS = int(os.getenv("OPENAI_ASYNC_MAX_CONNECTIONS", "200"))
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_http_clients_lock = threading.Lock()
+
+
+def _get_async_http_client(loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client of an event loop, creating it on first use.
+    
+    Args:
+        loop: Event loop the client's connections will belong to
+    
+    Returns:
+        httpx.AsyncClient shared by every agent running on that loop
+    """
+    with _async_http_clients_lock:
+        client = _async_http_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=False,
+                limits=httpx.Limits(
+                    max_keepalive_connections=_ASYNC_MAX_CONNECTIONS,
+                    max_connections=_ASYNC_MAX_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(
+                    connect=5.0,
+                    read=120.0,
+                    write=10.0,
+                    pool=10.0
+                )
+            )
+            _async_http_clients[loop] = client
+        return client
+
+# Maximum number of OpenAI calls per user message (prevents infinite tool loops)
+MAX_TOOL_ITERATIONS = 10
+
+# Reply used when the model produced no usable response
+NO_RESPONSE_MESSAGE = "I apologize, but I encountered an issue processing your request. Please try again or rephrase your question."
+
 
 class StreamingAgent:
     """
@@ -107,12 +174,24 @@ class StreamingAgent:
     
     Attributes:
         client: OpenAI API client instance
+        async_client: AsyncOpenAI client of the running event loop, used by astream_response()
         system_prompt: System prompt defining agent behavior and policies
         tools: List of tool definitions in OpenAI format
         model: OpenAI model name to use (default: "gpt-5")
+        speculative_tools: Whether tool calls are dispatched while still streaming
+        fast_path: Whether simple lookups are answered without calling the model
+        response_cache: Cache replaying answers to repeated catalog questions
+        history_token_budget: Tokens of conversation history sent to the model
+        history_max_messages: Maximum history messages sent to the model
     """
     
-    def __init__(self, model: str = "gpt-5"):
+    def __init__(
+        self,
+        model: str = "gpt-5",
+        speculative_tools: Optional[bool] = None,
+        fast_path: Optional[bool] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
         """
         Initialize the StreamingAgent.
         
@@ -129,6 +208,14 @@ class StreamingAgent:
         Args:
             model: OpenAI model name to use (default: "gpt-5")
                 This can be configured via environment variable or parameter.
+            speculative_tools: Dispatch each tool call as soon as its arguments are
+                complete JSON, while the model is still streaming the rest of the turn.
+                If None, reads SPECULATIVE_TOOL_PREFETCH (default: "false").
+            fast_path: Answer unambiguous single-medication stock, prescription and
+                information questions with one tool call and a template, without
+                calling the model. If None, reads FAST_PATH_ENABLED (default: "false").
+            response_cache: Cache of complete responses. If None, uses the shared
+                cache from get_response_cache() (enabled by RESPONSE_CACHE_ENABLED).
         
         Raises:
             ValueError: If OPENAI_API_KEY is not found in environment
@@ -159,6 +246,12 @@ class StreamingAgent:
             ),
             max_retries=1          # Reduced retries to fail faster and avoid long delays
         )
+        # Async clients for astream_response() are created per event loop on
+        # first use (see async_client)
+        self._api_key = api_key
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+        self._async_client_override: Optional[AsyncOpenAI] = None
+        self._async_clients_lock = threading.Lock()
         # #region agent log
         _debug_log("app/agent/streaming.py:__init__:client_created", "OpenAI client created", {"duration_ms": (time.time() - client_start) * 1000}, "H2")
         # #endregion
@@ -180,6 +273,20 @@ class StreamingAgent:
         # #endregion
         
         self.model = model
+        self.speculative_tools = (
+            speculative_tools
+            if speculative_tools is not None
+            else os.getenv("SPECULATIVE_TOOL_PREFETCH", "false").lower() == "true"
+        )
+        self.fast_path = (
+            fast_path
+            if fast_path is not None
+            else os.getenv("FAST_PATH_ENABLED", "false").lower() == "true"
+        )
+        self.fast_path_router = FastPathRouter()
+        self.history_token_budget = int(os.getenv("HISTORY_TOKEN_BUDGET", str(DEFAULT_HISTORY_TOKEN_BUDGET)))
+        self.history_max_messages = int(os.getenv("HISTORY_MAX_MESSAGES", str(DEFAULT_HISTORY_MAX_MESSAGES)))
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
         
         # #region agent log
         _debug_log("app/agent/streaming.py:__init__:complete", "StreamingAgent.__init__ complete", {"total_duration_ms": (time.time() - init_start) * 1000}, "H2")
@@ -187,6 +294,42 @@ class StreamingAgent:
         logger.info(f"StreamingAgent initialized with model: {model}")
         logger.debug(f"Loaded {len(self.tools)} tools for function calling")
     
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """
+        AsyncOpenAI client for the running event loop.
+        
+        Created on first use in each loop, on top of that loop's shared HTTP
+        client, so no pooled connection outlives the loop it was opened on.
+        Assigning a client (e.g. a mock) uses it on every loop instead.
+        
+        Returns:
+            AsyncOpenAI client instance
+        
+        Raises:
+            RuntimeError: If called outside a running event loop and no client
+                was assigned
+        """
+        if self._async_client_override is not None:
+            return self._async_client_override
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=self._api_key,
+                    http_client=_get_async_http_client(loop),
+                    timeout=httpx.Timeout(connect=5.0, read=120.0, write=10.0, pool=10.0),
+                    max_retries=1
+                )
+                self._async_clients[loop] = client
+            return client
+    
+    @async_client.setter
+    def async_client(self, client: AsyncOpenAI) -> None:
+        """Use the given client on every event loop."""
+        self._async_client_override = client
+    
     def _normalize_input(self, user_message: str) -> Tuple[str, bool]:
         """
         Normalize user input by detecting and cleaning repetitive content.
@@ -256,79 +399,60 @@ class StreamingAgent:
     def _optimize_history(
         self,
         conversation_history: Optional[List[Dict[str, str]]],
-        max_messages: int = 20,
-        max_tokens: int = 4000
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        conversation_state: Optional[ConversationState] = None
     ) -> List[Dict[str, str]]:
         """
-        Optimize conversation history by limiting length and summarizing old messages.
+        Optimize conversation history by fitting the newest messages into a token budget.
         
         Purpose (Why):
-        Reduces token usage by limiting history length and summarizing old messages
-        when history becomes too long. This prevents excessive token consumption
-        while maintaining essential context.
+        Reduces token usage by limiting history length while keeping as much
+        recent context as the budget allows. Counting with the model's tokenizer
+        keeps Hebrew conversations from being sent over budget and English ones
+        from being over-trimmed.
         
         Implementation (What):
-        Estimates tokens (4 chars = 1 token), keeps last 10 messages in full,
-        summarizes older messages into a single summary message if history exceeds
-        limits. Prevents duplicate consecutive messages.
+        Uses budget_history() to select messages newest-first until the token or
+        message budget is reached, counting each message with the shared
+        TokenCounter (or taking the counts kept by the session state). Prevents
+        duplicate consecutive messages. If older messages were dropped, a short
+        system note says how many; the medications and users they mentioned stay
+        available through the context message built from the session state.
         
         Args:
             conversation_history: Optional list of previous messages
-            max_messages: Maximum number of messages to keep (default: 20)
-            max_tokens: Maximum estimated tokens for history (default: 4000)
+            max_messages: Maximum number of messages to keep (default: history_max_messages)
+            max_tokens: Token budget for history (default: history_token_budget)
+            conversation_state: Optional session state already updated with this
+                history; its per-message token counts are reused
         
         Returns:
-            Optimized list of messages with summary if needed
+            Optimized list of messages with an omission note if needed
         """
         if not conversation_history:
             return []
         
-        # Estimate tokens (rough approximation: 4 characters = 1 token)
-        def estimate_tokens(text: str) -> int:
-            return len(text) // 4
-        
-        # Calculate total tokens
-        total_tokens = sum(estimate_tokens(msg.get("content", "")) for msg in conversation_history)
-        total_messages = len(conversation_history)
-        
-        # If within limits, return as-is (but check for duplicates)
-        if total_messages <= max_messages and total_tokens <= max_tokens:
-            # Remove duplicate consecutive messages
-            optimized = []
-            prev_content = None
-            for msg in conversation_history:
-                content = msg.get("content", "")
-                if content != prev_content:
-                    optimized.append(msg)
-                    prev_content = content
-            return optimized
-        
-        # Need to optimize - keep last 10 messages, summarize older ones
-        keep_count = 10
-        if total_messages <= keep_count:
-            return conversation_history[-keep_count:]
-        
-        # Keep last messages
-        recent_messages = conversation_history[-keep_count:]
-        old_messages = conversation_history[:-keep_count]
-        
-        # Create summary of old messages
-        old_content = " ".join(msg.get("content", "")[:200] for msg in old_messages[:5])  # Sample first 5
-        summary_message = {
-            "role": "system",
-            "content": f"[Previous conversation summary: {len(old_messages)} earlier messages discussing medications and prescriptions]"
-        }
-        
-        # Combine summary + recent messages
-        optimized = [summary_message] + recent_messages
+        max_messages = max_messages if max_messages is not None else self.history_max_messages
+        max_tokens = max_tokens if max_tokens is not None else self.history_token_budget
+        token_counts = None
+        if conversation_state is not None and conversation_state.message_count == len(conversation_history):
+            token_counts = conversation_state.token_counts
         
-        logger.info(f"History optimized: {total_messages} messages ({total_tokens} tokens) -> {len(optimized)} messages")
+        optimized, dropped = budget_history(conversation_history, max_tokens, max_messages, token_counts=token_counts)
+        if dropped:
+            optimized.insert(0, {
+                "role": "system",
+                "content": f"[{dropped} earlier messages of this conversation are omitted]"
+            })
+            logger.info(f"History optimized: {len(conversation_history)} messages -> {len(optimized) - 1} messages within {max_tokens} tokens")
         
         return optimized
     
     def _extract_context_info(
         self,
-        conversation_history: Optional[List[Dict[str, str]]]
+        conversation_history: Optional[List[Dict[str, str]]],
+        conversation_state: Optional[ConversationState] = None
     ) -> Dict[str, Any]:
         """
         Extract context information (medications, users) from conversation history.
@@ -339,59 +463,24 @@ class StreamingAgent:
         when information is already available.
         
         Implementation (What):
-        Scans history for medication IDs/names and user IDs/names mentioned in
-        tool call results or assistant messages. Returns structured context info.
+        Brings the session's ConversationState up to date, which scans only the
+        messages added since the previous turn for medication IDs/names and user
+        IDs/names. Without a session state, a temporary one scans the whole history.
         
         Args:
             conversation_history: Optional list of previous messages
+            conversation_state: Optional state carried across the session's turns
+                (updated in place)
         
         Returns:
             Dictionary with keys:
-            - medications: List of medication IDs/names found
-            - users: List of user IDs/names found
+            - medications: List of medication IDs/names found, most recent first
+            - users: List of user IDs/names found, most recent first
         """
-        context = {
-            "medications": [],
-            "users": []
-        }
-        
-        if not conversation_history:
-            return context
-        
-        # Patterns to look for in messages
-        medication_pattern = r'"medication_id"\s*:\s*"([^"]+)"'
-        medication_name_pattern = r'"name_he"\s*:\s*"([^"]+)"|"name_en"\s*:\s*"([^"]+)"'
-        user_id_pattern = r'"user_id"\s*:\s*"([^"]+)"'
-        user_name_pattern = r'"name"\s*:\s*"([^"]+)"'
-        
-        for msg in conversation_history:
-            content = msg.get("content", "")
-            if not content:
-                continue
-            
-            # Look for medication IDs
-            medication_ids = re.findall(medication_pattern, content)
-            context["medications"].extend(medication_ids)
-            
-            # Look for medication names
-            medication_names_he = re.findall(medication_name_pattern, content)
-            for match in medication_names_he:
-                if match[0]:  # Hebrew name
-                    context["medications"].append(match[0])
-                if match[1]:  # English name
-                    context["medications"].append(match[1])
-            
-            # Look for user IDs
-            user_ids = re.findall(user_id_pattern, content)
-            context["users"].extend(user_ids)
-            
-            # Look for user names
-            user_names = re.findall(user_name_pattern, content)
-            context["users"].extend(user_names)
-        
-        # Remove duplicates
-        context["medications"] = list(set(context["medications"]))
-        context["users"] = list(set(context["users"]))
+        if conversation_state is None:
+            conversation_state = ConversationState()
+        conversation_state.update(conversation_history)
+        context = conversation_state.context_info()
         
         if context["medications"] or context["users"]:
             logger.debug(f"Extracted context: {len(context['medications'])} medications, {len(context['users'])} users")
@@ -402,7 +491,8 @@ class StreamingAgent:
         self,
         user_message: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        context_info: Optional[Dict[str, Any]] = None
+        context_info: Optional[Dict[str, Any]] = None,
+        conversation_state: Optional[ConversationState] = None
     ) -> List[Dict[str, str]]:
         """
         Build message list for OpenAI API from user message and history.
@@ -426,6 +516,7 @@ class StreamingAgent:
                 {"role": "assistant", "content": "..."}, ...]
             context_info: Optional dictionary with context information (medications, users)
                 extracted from history to avoid redundant tool calls
+            conversation_state: Optional session state already updated with the history
         
         Returns:
             List of message dictionaries in OpenAI API format
@@ -446,7 +537,7 @@ class StreamingAgent:
         
         # Optimize and add conversation history
         if conversation_history:
-            optimized_history = self._optimize_history(conversation_history)
+            optimized_history = self._optimize_history(conversation_history, conversation_state=conversation_state)
             messages.extend(optimized_history)
         
         messages.append({"role": "user", "content": user_message})
@@ -577,13 +668,139 @@ class StreamingAgent:
                 "success": False
             }
     
+    def _tool_call_error_result(self, tool_call: Any, error: BaseException) -> Dict[str, Any]:
+        """
+        Build the result of a tool call whose execution raised unexpectedly.
+        
+        Args:
+            tool_call: Tool call object or dictionary that failed
+            error: The exception raised by the executor
+        
+        Returns:
+            Result dictionary in the format of _process_single_tool_call()
+        """
+        logger.error(f"Unexpected error in tool execution: {str(error)}", exc_info=error)
+        tool_id = tool_call.id if hasattr(tool_call, 'id') else tool_call.get("id", "unknown")
+        return {
+            "tool_call_id": tool_id,
+            "result": json.dumps({"error": str(error), "success": False}, ensure_ascii=False),
+            "success": False
+        }
+    
+    def _build_tool_messages(self, tool_calls: List[Any], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Turn tool execution results into tool messages in the original call order.
+        
+        Purpose (Why):
+        OpenAI expects one tool message per tool call, in the order of the calls,
+        while parallel execution completes in any order.
+        
+        Implementation (What):
+        Maps results by tool_call_id and walks the original tool calls. Calls
+        without a result (invalid or failed to process) get an error message.
+        
+        Args:
+            tool_calls: Tool calls as requested by the model
+            results: Results from _process_single_tool_call(), in any order
+        
+        Returns:
+            List of tool message dictionaries (role, content, tool_call_id)
+        """
+        tool_id_to_result = {r["tool_call_id"]: r for r in results}
+        tool_messages = []
+        
+        # Iterate through original tool_calls to preserve order
+        for tool_call in tool_calls:
+            tool_id = tool_call.id if hasattr(tool_call, 'id') else tool_call.get("id")
+            if tool_id and tool_id in tool_id_to_result:
+                result_data = tool_id_to_result[tool_id]
+                tool_message = {
+                    "role": "tool",
+                    "content": result_data["result"],
+                    "tool_call_id": tool_id
+                }
+                tool_messages.append(tool_message)
+            else:
+                # Handle case where tool call was invalid or failed to process
+                logger.warning(f"Tool call result not found for ID: {tool_id}")
+                error_result = {
+                    "error": "Tool execution failed or tool call was invalid",
+                    "success": False
+                }
+                tool_message = {
+                    "role": "tool",
+                    "content": json.dumps(error_result, ensure_ascii=False),
+                    "tool_call_id": tool_id or "unknown"
+                }
+                tool_messages.append(tool_message)
+        
+        logger.info(f"Completed processing {len(tool_messages)} tool call(s)")
+        return tool_messages
+    
+    def _submit_tool_calls(
+        self,
+        tool_calls: List[Any],
+        correlation_id: str,
+        agent_id: str,
+        context: Optional[Dict[str, Any]],
+        tool_call_cache: Optional[Dict[str, Any]],
+        prefetched: Optional[Dict[int, Tuple[concurrent.futures.Future, Dict[str, Any]]]] = None
+    ) -> Dict[concurrent.futures.Future, Any]:
+        """
+        Schedule tool calls on the shared tool executor.
+        
+        Args:
+            tool_calls: Tool calls to execute
+            correlation_id: Unique identifier for the request/conversation
+            agent_id: Identifier for the agent/session
+            context: Optional dictionary with additional context for audit logging
+            tool_call_cache: Optional per-request cache of tool results
+            prefetched: Optional tool calls already dispatched during streaming,
+                index -> (future, dispatched tool call). Reused when the final tool
+                call at that index is identical, otherwise the stale call is
+                cancelled (if it has not started yet) and the call is dispatched again.
+        
+        Returns:
+            Dictionary mapping each Future to its tool call, in tool call order
+        """
+        executor = get_tool_executor()
+        future_to_tool = {}
+        for index, tool_call in enumerate(tool_calls):
+            if prefetched and index in prefetched:
+                future, dispatched = prefetched[index]
+                if dispatched == tool_call:
+                    future_to_tool[future] = tool_call
+                    continue
+                # A queued stale call must not run (rate limits, audit) next to the final one
+                future.cancel()
+                logger.warning(f"Tool call {index} changed after speculative dispatch, executing again")
+            if hasattr(tool_call, 'function'):
+                tool_name = tool_call.function.name
+            else:
+                tool_name = tool_call.get("function", {}).get("name", "")
+            future = executor.submit(
+                tool_name,
+                self._process_single_tool_call,
+                tool_call,
+                correlation_id,
+                agent_id,
+                context,
+                tool_call_cache
+            )
+            future_to_tool[future] = tool_call
+        for index, (future, _) in (prefetched or {}).items():
+            if index >= len(tool_calls):
+                future.cancel()
+        return future_to_tool
+    
     def _process_tool_calls(
         self,
         tool_calls: List[Any],
         correlation_id: str,
         agent_id: str = "default",
         context: Optional[Dict[str, Any]] = None,
-        tool_call_cache: Optional[Dict[str, Any]] = None
+        tool_call_cache: Optional[Dict[str, Any]] = None,
+        prefetched: Optional[Dict[int, Tuple[concurrent.futures.Future, Dict[str, Any]]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Process tool calls from OpenAI API and execute them in parallel.
@@ -598,8 +815,10 @@ class StreamingAgent:
         execution time when multiple tools are requested simultaneously.
         
         Implementation (What):
-        Uses ThreadPoolExecutor to execute independent tool calls in parallel,
-        significantly reducing execution time when multiple tools are requested.
+        Submits independent tool calls to the process-wide ToolExecutor (a bounded,
+        long-lived thread pool with per-tool concurrency limits, see
+        get_tool_executor()), so they run in parallel without creating threads
+        per request.
         Each tool call is processed by _process_single_tool_call() helper function
         which handles execution, error handling, and result formatting. Results
         are collected and ordered by tool_call_id to preserve the original order
@@ -614,6 +833,9 @@ class StreamingAgent:
                 Used for audit logging to link all operations.
             agent_id: Identifier for the agent/session. Used for audit logging.
             context: Optional dictionary with additional context for audit logging.
+            tool_call_cache: Optional per-request cache of tool results.
+            prefetched: Optional tool calls already dispatched speculatively during
+                streaming (see _prefetch_tool_calls()); their results are joined.
         
         Returns:
             List of tool message dictionaries to send back to OpenAI API,
@@ -633,141 +855,146 @@ class StreamingAgent:
         
         logger.info(f"Processing {len(tool_calls)} tool call(s) in parallel")
         
-        # Execute tools in parallel using ThreadPoolExecutor
+        # Execute tools in parallel on the shared, bounded tool executor
         # This is safe because tools are independent and don't share mutable state
         # RateLimiter and AuditLogger are thread-safe with locks
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            # Submit all tool calls for parallel execution
-            future_to_tool = {
-                executor.submit(
-                    self._process_single_tool_call,
-                    tool_call,
-                    correlation_id,
-                    agent_id,
-                    context,
-                    tool_call_cache
-                ): tool_call
-                for tool_call in tool_calls
-            }
-            
-            # Collect results as they complete
-            results = []
-            for future in concurrent.futures.as_completed(future_to_tool):
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    # Handle unexpected exceptions from executor
-                    logger.error(f"Unexpected error in tool execution: {str(e)}", exc_info=True)
-                    # Try to get tool_id from the original tool_call for error message
-                    tool_call = future_to_tool[future]
-                    tool_id = tool_call.id if hasattr(tool_call, 'id') else tool_call.get("id", "unknown")
-                    error_result = {
-                        "tool_call_id": tool_id,
-                        "result": json.dumps({"error": str(e), "success": False}, ensure_ascii=False),
-                        "success": False
-                    }
-                    results.append(error_result)
-        
-        # Build tool messages preserving original order
-        # Map results by tool_call_id for efficient lookup
-        tool_id_to_result = {r["tool_call_id"]: r for r in results}
-        tool_messages = []
+        future_to_tool = self._submit_tool_calls(tool_calls, correlation_id, agent_id, context, tool_call_cache, prefetched)
         
-        # Iterate through original tool_calls to preserve order
-        for tool_call in tool_calls:
-            tool_id = tool_call.id if hasattr(tool_call, 'id') else tool_call.get("id")
-            if tool_id and tool_id in tool_id_to_result:
-                result_data = tool_id_to_result[tool_id]
-                tool_message = {
-                    "role": "tool",
-                    "content": result_data["result"],
-                    "tool_call_id": tool_id
-                }
-                tool_messages.append(tool_message)
-            else:
-                # Handle case where tool call was invalid or failed to process
-                logger.warning(f"Tool call result not found for ID: {tool_id}")
-                error_result = {
-                    "error": "Tool execution failed or tool call was invalid",
-                    "success": False
-                }
-                tool_message = {
-                    "role": "tool",
-                    "content": json.dumps(error_result, ensure_ascii=False),
-                    "tool_call_id": tool_id or "unknown"
-                }
-                tool_messages.append(tool_message)
+        # Collect results as they complete
+        results = []
+        for future in concurrent.futures.as_completed(future_to_tool):
+            try:
+                result = future.result()
+                if result:
+                    results.append(result)
+            except Exception as e:
+                # Handle unexpected exceptions from executor
+                results.append(self._tool_call_error_result(future_to_tool[future], e))
         
-        logger.info(f"Completed processing {len(tool_messages)} tool call(s)")
-        return tool_messages
+        return self._build_tool_messages(tool_calls, results)
     
-    def stream_response(
+    async def _aprocess_tool_calls(
         self,
-        user_message: str,
-        conversation_history: Optional[List[Dict[str, str]]] = None,
-        agent_id: Optional[str] = None,
-        include_tool_calls: bool = False,
-        context: Optional[Dict[str, Any]] = None
-    ) -> Generator[str, None, None]:
+        tool_calls: List[Any],
+        correlation_id: str,
+        agent_id: str = "default",
+        context: Optional[Dict[str, Any]] = None,
+        tool_call_cache: Optional[Dict[str, Any]] = None,
+        prefetched: Optional[Dict[int, Tuple[concurrent.futures.Future, Dict[str, Any]]]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Stream agent response in real-time as a generator.
+        Async counterpart of _process_tool_calls().
         
         Purpose (Why):
-        Provides real-time streaming of agent responses, improving user experience
-        by showing text as it is generated rather than waiting for complete responses.
-        Handles function calling seamlessly during streaming by pausing stream execution,
-        executing tools, and continuing streaming with tool results. All operations
-        are logged with correlation ID for complete audit trail.
+        Lets astream_response() run tools without blocking the event loop that
+        serves all other conversations.
         
         Implementation (What):
-        Generates a correlation ID for the request and logs message receipt. Sends user
-        message to OpenAI API with stream=True, yielding response chunks as they
-        arrive. When OpenAI requests tool calls during streaming, collects all tool
-        calls from the stream, pauses streaming, executes tools with correlation ID,
-        and continues streaming with tool results. Repeats this process until OpenAI
-        returns a final response without tool calls. Logs response generation completion.
-        Maintains stateless behavior - history is only used within the current session.
+        Runs _process_single_tool_call() for every tool call on the shared
+        ToolExecutor (the tools are synchronous, database-bound functions), wraps
+        the futures for the event loop and awaits them
+        together with asyncio.gather, so total time is that of the slowest
+        tool. Results are ordered like _process_tool_calls().
         
         Args:
-            user_message: The user's message to process
-            conversation_history: Optional list of previous messages in the
-                current conversation session. Format: [{"role": "user", "content": "..."},
-                {"role": "assistant", "content": "..."}, ...]
-                Note: This is session-level history only. The agent is stateless
-                between different sessions.
-            agent_id: Optional identifier for the agent/session. Used for audit logging.
-                Defaults to "default" for stateless agents.
-            include_tool_calls: If True, yields special JSON markers for tool calls
-                that can be captured by the UI layer. If False, only yields text chunks (default).
-                When True, tool call information is embedded in the stream as special markers
-                that can be extracted and displayed separately in the UI.
+            tool_calls: List of tool call objects or dictionaries
+            correlation_id: Unique identifier for the request/conversation
+            agent_id: Identifier for the agent/session
+            context: Optional dictionary with additional context for audit logging
+            tool_call_cache: Optional per-request cache of tool results
+            prefetched: Optional tool calls already dispatched during streaming
         
-        Yields:
-            String chunks containing parts of the agent's response. Each yield is a
-            piece of text that should be displayed to the user in real-time. When
-            include_tool_calls=True, may yield special JSON markers for tool calls
-            in the format [TOOL_CALL_START]{...}[/TOOL_CALL_START] and
-            [TOOL_CALL_RESULT]{...}[/TOOL_CALL_RESULT] that can be extracted and
-            displayed separately in the UI.
+        Returns:
+            List of tool message dictionaries in the original order of tool calls
+        """
+        if not tool_calls:
+            logger.debug("No tool calls to process")
+            return []
         
-        Raises:
-            Exception: If OpenAI API call fails or other errors occur
+        logger.info(f"Processing {len(tool_calls)} tool call(s) concurrently")
         
-        Example:
-            >>> agent = StreamingAgent()
-            >>> for chunk in agent.stream_response("Tell me about Acamol"):
-            ...     print(chunk, end="", flush=True)
+        future_to_tool = self._submit_tool_calls(tool_calls, correlation_id, agent_id, context, tool_call_cache, prefetched)
+        outcomes = await asyncio.gather(
+            *(asyncio.wrap_future(future) for future in future_to_tool),
+            return_exceptions=True
+        )
+        
+        results = []
+        for tool_call, outcome in zip(future_to_tool.values(), outcomes):
+            if isinstance(outcome, BaseException):
+                results.append(self._tool_call_error_result(tool_call, outcome))
+            elif outcome:
+                results.append(outcome)
+        
+        return self._build_tool_messages(tool_calls, results)
+    
+    def _prefetch_tool_calls(self, request: "_StreamRequest", turn: "_StreamTurn") -> None:
         """
-        # #region agent log
-        stream_start = time.time()
-        _debug_log("app/agent/streaming.py:stream_response:entry", "stream_response started", {"message_length": len(user_message), "history_length": len(conversation_history) if conversation_history else 0}, "H1")
-        # #endregion
+        Dispatch tool calls whose arguments are complete while the turn is still streaming.
+        
+        Purpose (Why):
+        The model streams a multi-tool turn one call at a time, so the first tool
+        calls are complete long before the stream ends. Starting them right away
+        overlaps tool latency with token generation.
+        
+        Implementation (What):
+        Submits every newly completed call of a CATALOG_TOOLS tool (read-only
+        catalog lookups, see _StreamTurn.ready_tool_calls()) to the shared
+        ToolExecutor and records the future in turn.prefetched; calls of other
+        tools wait for the end of the stream. The results are joined by
+        _process_tool_calls() once the stream has finished. Futures that end up
+        unused are cancelled by _submit_tool_calls() or turn.cancel_prefetched().
+        
+        Args:
+            request: Current request state
+            turn: The model turn being streamed
+        """
+        for index, tool_call in turn.ready_tool_calls(CATALOG_TOOLS):
+            logger.debug(f"Speculatively dispatching tool call {index}: {tool_call['function']['name']}")
+            future = next(iter(self._submit_tool_calls(
+                [tool_call],
+                request.correlation_id,
+                request.agent_id,
+                request.context,
+                request.tool_call_cache
+            )))
+            turn.prefetched[index] = (future, tool_call)
+    
+    def _start_request(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        agent_id: Optional[str],
+        context: Optional[Dict[str, Any]],
+        conversation_state: Optional[ConversationState] = None
+    ) -> "_StreamRequest":
+        """
+        Prepare the per-request state shared by stream_response() and astream_response().
+        
+        Purpose (Why):
+        Both streaming entry points must audit, normalize and build messages in
+        exactly the same way.
+        
+        Implementation (What):
+        Generates the correlation ID and logs message receipt. Empty messages get
+        an immediate reply (request.reply). Otherwise normalizes the input,
+        extracts context from history, builds the OpenAI messages and the tool
+        execution context.
+        
+        Args:
+            user_message: The user's message to process
+            conversation_history: Optional list of previous messages in this session
+            agent_id: Optional identifier for the agent/session
+            context: Optional context dictionary for tool execution (updated in place)
+            conversation_state: Optional session state carried across turns
         
+        Returns:
+            _StreamRequest holding the state of this request
+        """
         # Generate correlation ID for this request
         correlation_id = generate_correlation_id()
         effective_agent_id = agent_id if agent_id is not None else "default"
+        request = _StreamRequest(correlation_id, effective_agent_id)
         
         # Log message receipt
         _audit_logger.log_agent_action(
@@ -787,17 +1014,11 @@ class StreamingAgent:
                 details={},
                 status="success"
             )
-            yield "I'm here to help! Please ask me about medications, stock availability, or prescription requirements."
-            return
+            request.reply = "I'm here to help! Please ask me about medications, stock availability, or prescription requirements."
+            return request
         
         # Normalize input to handle repetitive content
-        # #region agent log
-        normalize_start = time.time()
-        # #endregion
         normalized_message, was_cleaned = self._normalize_input(user_message)
-        # #region agent log
-        _debug_log("app/agent/streaming.py:stream_response:normalize", "Input normalized", {"duration_ms": (time.time() - normalize_start) * 1000, "was_cleaned": was_cleaned}, "H5")
-        # #endregion
         if was_cleaned:
             logger.info("Input was normalized (repetitive content detected or length limited)")
             _audit_logger.log_agent_action(
@@ -809,25 +1030,10 @@ class StreamingAgent:
             )
             # Note: We don't yield a message to user about cleaning to avoid interrupting flow
         
-        # Extract context information from history
-        # #region agent log
-        context_start = time.time()
-        # #endregion
-        context_info = self._extract_context_info(conversation_history)
-        # #region agent log
-        _debug_log("app/agent/streaming.py:stream_response:context_extracted", "Context extracted", {"duration_ms": (time.time() - context_start) * 1000}, "H5")
-        # #endregion
-        
-        # Build messages with optimized history and context
-        # #region agent log
-        build_start = time.time()
-        # #endregion
-        messages = self._build_messages(normalized_message, conversation_history, context_info)
-        # #region agent log
-        _debug_log("app/agent/streaming.py:stream_response:messages_built", "Messages built", {"duration_ms": (time.time() - build_start) * 1000, "messages_count": len(messages)}, "H5")
-        # #endregion
-        max_iterations = 10  # Prevent infinite loops
-        iteration = 0
+        # Extract context information from history and build messages
+        context_info = self._extract_context_info(conversation_history, conversation_state)
+        request.user_message = normalized_message
+        request.messages = self._build_messages(normalized_message, conversation_history, context_info, conversation_state)
         
         logger.info(f"Processing user message with streaming (correlation_id: {correlation_id})")
         logger.debug(f"Message: {user_message[:100]}...")
@@ -839,313 +1045,997 @@ class StreamingAgent:
             "user_message": user_message[:500],  # Limit message length
             "conversation_history_length": len(conversation_history) if conversation_history else 0
         })
+        request.context = context
+        return request
+    
+    def _match_fast_path(self, request: "_StreamRequest") -> Optional[FastPathMatch]:
+        """
+        Check whether the request can be answered by the fast path.
         
-        # Track authentication errors to prevent retrying the same failed authentication
-        auth_errors = []  # List of authentication error messages seen in previous iterations
+        Args:
+            request: Current request state
         
-        # Cache tool call results within this request to prevent duplicate calls
-        tool_call_cache = {}  # Key: (tool_name, json.dumps(sorted arguments)), Value: result dict
+        Returns:
+            FastPathMatch, or None if the fast path is disabled or the message
+            needs the model
+        """
+        if not self.fast_path or request.reply is not None:
+            return None
+        try:
+            return self.fast_path_router.match(request.user_message)
+        except Exception as e:
+            logger.warning(f"Fast path matching failed, using the model: {e}")
+            return None
+    
+    def _answer_fast_path(self, request: "_StreamRequest", match: FastPathMatch) -> Optional[List[StreamEvent]]:
+        """
+        Answer a fast path match with one tool call and a templated reply.
         
-        while iteration < max_iterations:
-            iteration += 1
-            logger.debug(f"OpenAI API streaming call iteration: {iteration}")
-            
-            try:
-                # Call OpenAI API with streaming enabled
-                # #region agent log
-                api_call_start = time.time()
-                _debug_log("app/agent/streaming.py:stream_response:api_call_start", "OpenAI API call starting", {"iteration": iteration, "messages_count": len(messages)}, "H4")
-                # #endregion
-                stream = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=self.tools,
-                    tool_choice="auto",  # Let model decide when to use tools
-                    stream=True  # Enable streaming
-                )
-                # #region agent log
-                _debug_log("app/agent/streaming.py:stream_response:api_call_connected", "OpenAI API stream connected", {"duration_ms": (time.time() - api_call_start) * 1000}, "H4")
-                # #endregion
-                
-                # Collect response chunks and tool calls
-                accumulated_content = ""
-                tool_calls_collected = []
-                finish_reason = None
-                first_chunk_time = None
-                chunk_count = 0
-                
+        Purpose (Why):
+        Simple lookups otherwise cost two model round-trips (choose the tool,
+        phrase the answer) for a result that takes microseconds to compute.
+        
+        Implementation (What):
+        Executes the matched tool through execute_tool(), so rate limiting, audit
+        logging and the tool result cache apply as for model-requested calls,
+        and renders the answer. Emits the same tool events as the model path.
+        
+        Args:
+            request: Current request state
+            match: Match returned by _match_fast_path()
+        
+        Returns:
+            Events to yield, or None if the tool failed and the model must answer
+        """
+        tool_name, arguments = self.fast_path_router.tool_call(match)
+        try:
+            result = execute_tool(
+                tool_name=tool_name,
+                arguments=arguments,
+                agent_id=request.agent_id,
+                correlation_id=request.correlation_id,
+                context=request.context
+            )
+            answer = self.fast_path_router.render(match, result)
+        except Exception as e:
+            logger.warning(f"Fast path tool {tool_name} failed, using the model: {e}")
+            return None
+        if answer is None:
+            logger.info(f"Fast path result of {tool_name} not usable, using the model")
+            return None
+        
+        logger.info(f"Answered {match.intent} question about {match.medication.medication_id} on the fast path")
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="fast_path_answered",
+            details={"intent": match.intent, "medication_id": match.medication.medication_id, "tool_name": tool_name},
+            status="success"
+        )
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="response_generated",
+            details={"response_length": len(answer), "fast_path": True},
+            status="success"
+        )
+        request.completed = True
+        
+        tool_id = f"fastpath_{request.correlation_id}"
+        return [
+            tool_start_event(tool_name, tool_id, arguments),
+            tool_result_event(tool_name, tool_id, result),
+            text_event(answer),
+        ]
+    
+    def _response_cache_key(
+        self,
+        request: "_StreamRequest",
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> Optional[Any]:
+        """
+        Build the response cache key of a request, if its answer is reusable.
+        
+        Purpose (Why):
+        Only answers that do not depend on who is asking or on earlier turns
+        may be replayed to other sessions.
+        
+        Implementation (What):
+        Requires a first message (no history) from an unauthenticated session;
+        the key holds the normalized message, the medication IDs it names and
+        the current database data_version.
+        
+        Args:
+            request: Current request state
+            conversation_history: History passed to the streaming call
+        
+        Returns:
+            Cache key, or None if the response must not be cached
+        """
+        if not self.response_cache.enabled or request.reply is not None or conversation_history:
+            return None
+        if request.context.get("authenticated_user_id") or request.context.get("authenticated_username"):
+            return None
+        try:
+            medication_ids = self.fast_path_router.medication_ids(request.user_message)
+            return self.response_cache.make_key(
+                request.user_message, medication_ids, get_db_manager().data_version
+            )
+        except Exception as e:
+            logger.warning(f"Could not build response cache key: {e}")
+            return None
+    
+    def _cached_response(self, request: "_StreamRequest", cache_key: Optional[Any]) -> Optional[List[StreamEvent]]:
+        """
+        Look up a cached response and audit the hit.
+        
+        Args:
+            request: Current request state
+            cache_key: Key from _response_cache_key()
+        
+        Returns:
+            Events to replay, or None on a miss
+        """
+        if cache_key is None:
+            return None
+        events = self.response_cache.get(cache_key)
+        if events is None:
+            return None
+        logger.info(f"Replaying cached response (correlation_id: {request.correlation_id})")
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="response_cache_hit",
+            details={"medication_ids": list(cache_key[1])},
+            status="success"
+        )
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="response_generated",
+            details={"response_length": sum(len(event.text) for event in events), "cached": True},
+            status="success"
+        )
+        return events
+    
+    def _lookup_response(
+        self,
+        request: "_StreamRequest",
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> Tuple[Optional[Any], Optional[List[StreamEvent]]]:
+        """
+        Build the response cache key of a request and look it up.
+        
+        Args:
+            request: Current request state
+            conversation_history: History passed to the streaming call
+        
+        Returns:
+            Tuple of the cache key (None if the response must not be cached)
+            and the events to replay (None on a miss)
+        """
+        cache_key = self._response_cache_key(request, conversation_history)
+        return cache_key, self._cached_response(request, cache_key)
+    
+    def _store_response(self, request: "_StreamRequest", cache_key: Optional[Any], events: Optional[List[StreamEvent]]) -> None:
+        """
+        Store a completed, reusable response in the response cache.
+        
+        Args:
+            request: Current request state
+            cache_key: Key from _response_cache_key()
+            events: All events yielded for the response (before DONE)
+        """
+        if cache_key is None or not request.completed or not request.cacheable:
+            return
+        self.response_cache.put(cache_key, events, get_db_manager().data_version)
+    
+    def _completion_kwargs(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the arguments of a streaming chat completion call.
+        
+        Args:
+            messages: Messages to send
+        
+        Returns:
+            Keyword arguments for chat.completions.create()
+        """
+        return {
+            "model": self.model,
+            "messages": messages,
+            "tools": self.tools,
+            "tool_choice": "auto",  # Let model decide when to use tools
+            "stream": True  # Enable streaming
+        }
+    
+    def _start_tool_calls(self, request: "_StreamRequest", turn: "_StreamTurn") -> List[StreamEvent]:
+        """
+        Record the model's tool call request and build the tool start events.
+        
+        Args:
+            request: Current request state (messages are extended)
+            turn: The completed model turn that requested tool calls
+        
+        Returns:
+            One TOOL_START event per tool call
+        """
+        # Add accumulated content (if any) and tool_calls to assistant message
+        request.messages.append({
+            "role": "assistant",
+            "content": turn.content if turn.content else None,
+            "tool_calls": turn.tool_calls
+        })
+        
+        logger.info(f"Model requested {len(turn.tool_calls)} tool calls during streaming")
+        
+        # Tool call information is yielded before execution,
+        # so the UI can display tool calls as they happen
+        return [
+            tool_start_event(
+                tool_call.get("function", {}).get("name", ""),
+                tool_call.get("id", ""),
+                json.loads(tool_call.get("function", {}).get("arguments", "{}"))
+            )
+            for tool_call in turn.tool_calls
+        ]
+    
+    def _finish_tool_calls(
+        self,
+        request: "_StreamRequest",
+        turn: "_StreamTurn",
+        tool_messages: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], List[StreamEvent]]:
+        """
+        Handle executed tool calls: stop on authentication errors, else continue.
+        
+        Purpose (Why):
+        Retrying after authentication failures only repeats the same failing
+        calls, so the agent answers immediately on the first iteration and
+        stops when an error repeats.
+        
+        Implementation (What):
+        Scans tool results for authentication errors. Returns a final reply if
+        the request must stop; otherwise appends the tool messages to the
+        conversation and returns the tool result events.
+        
+        Args:
+            request: Current request state
+            turn: The completed model turn that requested tool calls
+            tool_messages: Tool messages produced for turn.tool_calls
+        
+        Returns:
+            Tuple of (final_reply, events): final_reply is the message to yield
+            before stopping (None to continue), events are the TOOL_RESULT events
+        """
+        # Answers built on user-specific tools are not reusable across users
+        if any(tool_call.get("function", {}).get("name") not in CATALOG_TOOLS for tool_call in turn.tool_calls):
+            request.cacheable = False
+        
+        # Check for authentication errors in tool results
+        current_auth_errors = []
+        events = []
+        for tool_call, tool_message in zip(turn.tool_calls, tool_messages):
+            try:
+                result_content = json.loads(tool_message.get("content", "{}"))
+                events.append(tool_result_event(
+                    tool_call.get("function", {}).get("name", ""),
+                    tool_call.get("id", ""),
+                    result_content
+                ))
+                error_msg = result_content.get("error", "")
+                success = result_content.get("success", True)
+                if error_msg or not success:
+                    request.cacheable = False
+                
+                # Check if this is an authentication error (improved detection)
+                if error_msg and not success:
+                    error_lower = error_msg.lower()
+                    # Detect various authentication error patterns
+                    if any(pattern in error_lower for pattern in [
+                        "authentication required",
+                        "authentication",
+                        "login required",
+                        "not authenticated",
+                        "unauthorized",
+                        "access denied"
+                    ]):
+                        current_auth_errors.append(error_msg)
+            except (json.JSONDecodeError, AttributeError):
+                pass
+        
+        # If we see authentication errors, handle them immediately
+        if current_auth_errors:
+            # Check if we've seen this error before (in any iteration)
+            for auth_error in current_auth_errors:
+                if auth_error in request.auth_errors:
+                    # Same authentication error seen before - stop retrying immediately
+                    logger.warning(f"Authentication error repeated: {auth_error}. Stopping retries.")
+                    _audit_logger.log_agent_action(
+                        correlation_id=request.correlation_id,
+                        agent_id=request.agent_id,
+                        action="authentication_error_repeated",
+                        details={"error": auth_error, "iteration": request.iteration},
+                        status="error"
+                    )
+                    return (
+                        "I apologize, but I'm unable to access your prescription information due to an authentication issue. "
+                        "Please ensure you are logged in and try again. If the problem persists, please contact support."
+                    ), []
+            
+            # First time seeing this error - add to list and respond immediately
+            request.auth_errors.extend(current_auth_errors)
+            # If this is the first iteration and we got auth error, respond immediately
+            if request.iteration == 1:
+                logger.info("Authentication error detected in first iteration, responding immediately")
+                _audit_logger.log_agent_action(
+                    correlation_id=request.correlation_id,
+                    agent_id=request.agent_id,
+                    action="authentication_error_detected",
+                    details={"error": current_auth_errors[0], "iteration": request.iteration},
+                    status="error"
+                )
+                return (
+                    "I'm unable to access your prescription information. Authentication is required. "
+                    "Please log in to your account and try again."
+                ), []
+        
+        request.messages.extend(tool_messages)
+        return None, events
+    
+    def _finish_turn(self, request: "_StreamRequest", turn: "_StreamTurn") -> Tuple[bool, Optional[str]]:
+        """
+        Decide how to continue after a model turn without tool calls.
+        
+        Args:
+            request: Current request state
+            turn: The completed model turn
+        
+        Returns:
+            Tuple of (done, reply): done is True when the response is complete,
+            reply is an extra message to yield (None if nothing to add)
+        """
+        # If we already yielded content, we're done
+        # If no content was yielded but finish_reason is "stop", yield an error message
+        if turn.finish_reason == "stop":
+            if turn.content or turn.tool_calls:
+                logger.info("Streaming completed with final response")
+                self._log_response_generated(request, turn)
+                return True, None
+            logger.warning("Stream completed with no content and no tool calls")
+            self._log_response_failed(request, "no_content_no_tool_calls")
+            return True, NO_RESPONSE_MESSAGE
+        
+        if not turn.tool_calls and turn.content:
+            # We have content and no tool calls - we're done
+            logger.info("Streaming completed with final response")
+            self._log_response_generated(request, turn)
+            return True, None
+        
+        # If we reach here and no content was yielded, something unexpected happened
+        if not turn.content and not turn.tool_calls:
+            logger.warning("Stream completed with no content and no tool calls")
+            self._log_response_failed(request, "unexpected_state")
+            return True, NO_RESPONSE_MESSAGE
+        
+        # Tool calls without finish_reason "tool_calls": ask the model again
+        return False, None
+    
+    def _log_response_generated(self, request: "_StreamRequest", turn: "_StreamTurn") -> None:
+        """Audit a successfully generated response."""
+        request.completed = True
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="response_generated",
+            details={"response_length": len(turn.content)},
+            status="success"
+        )
+    
+    def _log_response_failed(self, request: "_StreamRequest", reason: str) -> None:
+        """Audit a response that could not be generated."""
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="response_generation_failed",
+            details={"reason": reason},
+            status="error"
+        )
+    
+    def _handle_stream_error(self, request: "_StreamRequest", error: Exception) -> str:
+        """
+        Log a failed streaming call and build the reply shown to the user.
+        
+        Args:
+            request: Current request state
+            error: The exception raised during the iteration
+        
+        Returns:
+            Error message to yield
+        """
+        error_msg = f"Error in OpenAI API streaming call: {str(error)}"
+        logger.error(error_msg, exc_info=True)
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="error_handled",
+            details={"error": str(error), "error_type": type(error).__name__},
+            status="error"
+        )
+        return f"I apologize, but I encountered an error: {error_msg}. Please try again."
+    
+    def _handle_max_iterations(self, request: "_StreamRequest") -> str:
+        """
+        Log that the tool calling loop hit MAX_TOOL_ITERATIONS.
+        
+        Args:
+            request: Current request state
+        
+        Returns:
+            Error message to yield
+        """
+        logger.warning(f"Reached max iterations ({MAX_TOOL_ITERATIONS}) in streaming tool calling loop")
+        _audit_logger.log_agent_action(
+            correlation_id=request.correlation_id,
+            agent_id=request.agent_id,
+            action="max_iterations_reached",
+            details={"max_iterations": MAX_TOOL_ITERATIONS},
+            status="error"
+        )
+        return NO_RESPONSE_MESSAGE
+    
+    def stream_response(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        agent_id: Optional[str] = None,
+        include_tool_calls: bool = False,
+        context: Optional[Dict[str, Any]] = None,
+        conversation_state: Optional[ConversationState] = None
+    ) -> Generator[str, None, None]:
+        """
+        Stream agent response in real-time as a generator.
+        
+        Purpose (Why):
+        Provides real-time streaming of agent responses, improving user experience
+        by showing text as it is generated rather than waiting for complete responses.
+        Handles function calling seamlessly during streaming by pausing stream execution,
+        executing tools, and continuing streaming with tool results. All operations
+        are logged with correlation ID for complete audit trail.
+        
+        Implementation (What):
+        Generates a correlation ID for the request and logs message receipt. Sends user
+        message to OpenAI API with stream=True, yielding response chunks as they
+        arrive. When OpenAI requests tool calls during streaming, collects all tool
+        calls from the stream, pauses streaming, executes tools with correlation ID,
+        and continues streaming with tool results. Repeats this process until OpenAI
+        returns a final response without tool calls. Logs response generation completion.
+        Maintains stateless behavior - history is only used within the current session.
+        Uses the blocking OpenAI client; async servers should use astream_response().
+        Renders the events of stream_events() as strings; callers that display
+        tool calls should consume stream_events() directly.
+        
+        Args:
+            user_message: The user's message to process
+            conversation_history: Optional list of previous messages in the
+                current conversation session. Format: [{"role": "user", "content": "..."},
+                {"role": "assistant", "content": "..."}, ...]
+                Note: This is session-level history only. The agent is stateless
+                between different sessions.
+            agent_id: Optional identifier for the agent/session. Used for rate limiting and audit logging.
+                Defaults to "default" for stateless agents.
+            include_tool_calls: If True, yields special JSON markers for tool calls
+                that can be captured by the UI layer. If False, only yields text chunks (default).
+                When True, tool call information is embedded in the stream as special markers
+                that can be extracted and displayed separately in the UI.
+            context: Optional context dictionary for tool execution
+            conversation_state: Optional ConversationState kept by the caller for
+                this session; context extraction then only processes the messages
+                added since the previous turn.
+        
+        Yields:
+            String chunks containing parts of the agent's response. Each yield is a
+            piece of text that should be displayed to the user in real-time. When
+            include_tool_calls=True, may yield special JSON markers for tool calls
+            in the format [TOOL_CALL_START]{...}[/TOOL_CALL_START] and
+            [TOOL_CALL_RESULT]{...}[/TOOL_CALL_RESULT] that can be extracted and
+            displayed separately in the UI.
+        
+        Raises:
+            Exception: If OpenAI API call fails or other errors occur
+        
+        Example:
+            >>> agent = StreamingAgent()
+            >>> for chunk in agent.stream_response("Tell me about Acamol"):
+            ...     print(chunk, end="", flush=True)
+        """
+        for event in self.stream_events(user_message, conversation_history, agent_id, context, conversation_state):
+            chunk = self._render_event(event, include_tool_calls)
+            if chunk is not None:
+                yield chunk
+    
+    def stream_events(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        agent_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        conversation_state: Optional[ConversationState] = None
+    ) -> Generator[StreamEvent, None, None]:
+        """
+        Stream agent response as typed events.
+        
+        Purpose (Why):
+        Lets the UI show text and tool calls without searching the text stream
+        for embedded markers: tool information arrives as dictionaries, so the
+        work per streamed token is constant.
+        
+        Implementation (What):
+        Same request handling, tool loop, caches and audit logging as
+        stream_response(), which is built on top of this method.
+        
+        Args:
+            user_message: The user's message to process
+            conversation_history: Optional list of previous messages in the
+                current conversation session
+            agent_id: Optional identifier for the agent/session. Used for rate limiting and audit logging.
+            context: Optional context dictionary for tool execution
+            conversation_state: Optional ConversationState kept for this session
+        
+        Yields:
+            StreamEvent objects (see app.agent.events): TEXT deltas, TOOL_START
+            before and TOOL_RESULT after each tool call, and one final DONE event
+            carrying the correlation ID.
+        
+        Example:
+            >>> for event in agent.stream_events("Tell me about Acamol"):
+            ...     if event.type == TEXT:
+            ...         print(event.text, end="", flush=True)
+        """
+        # #region agent log
+        _debug_log("app/agent/streaming.py:stream_events:entry", "stream_events started", {"message_length": len(user_message), "history_length": len(conversation_history) if conversation_history else 0}, "H1")
+        # #endregion
+        request = self._start_request(user_message, conversation_history, agent_id, context, conversation_state)
+        if request.reply is not None:
+            yield text_event(request.reply)
+        else:
+            cache_key, cached = self._lookup_response(request, conversation_history)
+            if cached is not None:
+                for event in cached:
+                    yield event
+            else:
+                recorded: Optional[List[StreamEvent]] = [] if cache_key is not None else None
+                for event in self._generate_events(request):
+                    if recorded is not None:
+                        recorded.append(event)
+                    yield event
+                self._store_response(request, cache_key, recorded)
+        yield self._done_event(request)
+    
+    @staticmethod
+    def _render_event(event: StreamEvent, include_tool_calls: bool) -> Optional[str]:
+        """
+        Render an event as a stream_response() chunk.
+        
+        Args:
+            event: Event from stream_events() / astream_events()
+            include_tool_calls: Whether tool events are rendered as markers
+        
+        Returns:
+            Text of TEXT events, a marker for tool events if requested, else None
+        """
+        if event.type == TEXT:
+            return event.text
+        if event.type == DONE or not include_tool_calls:
+            return None
+        return render_marker(event)
+    
+    @staticmethod
+    def _done_event(request: "_StreamRequest") -> StreamEvent:
+        """Build the DONE event that ends a request's event stream."""
+        return StreamEvent(DONE, data={"correlation_id": request.correlation_id})
+    
+    def _generate_events(self, request: "_StreamRequest") -> Generator[StreamEvent, None, None]:
+        """
+        Produce the events of a response: fast path, else the model and tool loop.
+        
+        Args:
+            request: Request state from _start_request()
+        
+        Yields:
+            TEXT, TOOL_START and TOOL_RESULT events, as documented in stream_events()
+        """
+        match = self._match_fast_path(request)
+        if match is not None:
+            events = self._answer_fast_path(request, match)
+            if events is not None:
+                for event in events:
+                    yield event
+                return
+        
+        while request.iteration < MAX_TOOL_ITERATIONS:
+            request.iteration += 1
+            logger.debug(f"OpenAI API streaming call iteration: {request.iteration}")
+            turn = _StreamTurn()
+            
+            try:
+                # Call OpenAI API with streaming enabled
                 # #region agent log
-                stream_processing_start = time.time()
+                api_call_start = time.time()
+                _debug_log("app/agent/streaming.py:stream_response:api_call_start", "OpenAI API call starting", {"iteration": request.iteration, "messages_count": len(request.messages)}, "H4")
                 # #endregion
-                for chunk in stream:
-                    if first_chunk_time is None:
-                        first_chunk_time = time.time()
-                        # #region agent log
-                        _debug_log("app/agent/streaming.py:stream_response:first_chunk", "First chunk received", {"time_to_first_chunk_ms": (first_chunk_time - api_call_start) * 1000}, "H4")
-                        # #endregion
-                    chunk_count += 1
-                    delta = chunk.choices[0].delta
-                    
-                    # Check for finish reason
-                    if chunk.choices[0].finish_reason:
-                        finish_reason = chunk.choices[0].finish_reason
-                    
-                    # Handle text content
-                    if delta.content:
-                        accumulated_content += delta.content
-                        # Yield text chunk immediately for real-time display
-                        yield delta.content
-                    
-                    # Handle tool calls (collect them as they arrive)
-                    # Check if tool_calls exists and is iterable (not just truthy Mock)
-                    if delta.tool_calls:
-                        try:
-                            # Try to iterate to verify it's actually iterable
-                            # This will raise TypeError if tool_calls is not iterable (e.g., Mock object)
-                            iter(delta.tool_calls)
-                            for tool_call_delta in delta.tool_calls:
-                                # Initialize tool call structure if needed
-                                index = tool_call_delta.index
-                                while len(tool_calls_collected) <= index:
-                                    tool_calls_collected.append({
-                                        "id": "",
-                                        "type": "function",
-                                        "function": {
-                                            "name": "",
-                                            "arguments": ""
-                                        }
-                                    })
-                                
-                                # Update tool call with delta information
-                                if tool_call_delta.id:
-                                    tool_calls_collected[index]["id"] = tool_call_delta.id
-                                if tool_call_delta.function:
-                                    if tool_call_delta.function.name:
-                                        tool_calls_collected[index]["function"]["name"] = tool_call_delta.function.name
-                                    if tool_call_delta.function.arguments:
-                                        tool_calls_collected[index]["function"]["arguments"] += tool_call_delta.function.arguments
-                        except (TypeError, AttributeError):
-                            # tool_calls is not iterable (e.g., Mock object that's not configured as iterable)
-                            # Skip tool call processing for this chunk
-                            pass
+                stream = self.client.chat.completions.create(**self._completion_kwargs(request.messages))
                 
+                # Yield text chunks immediately and collect tool calls
+                for chunk in stream:
+                    text = turn.add_chunk(chunk)
+                    if self.speculative_tools:
+                        self._prefetch_tool_calls(request, turn)
+                    if text:
+                        yield text_event(text)
                 # #region agent log
-                _debug_log("app/agent/streaming.py:stream_response:stream_complete", "Stream processing complete", {"duration_ms": (time.time() - stream_processing_start) * 1000, "chunk_count": chunk_count, "content_length": len(accumulated_content)}, "H4")
+                _debug_log("app/agent/streaming.py:stream_response:stream_complete", "Stream processing complete", {"duration_ms": (time.time() - api_call_start) * 1000, "chunk_count": turn.chunk_count, "content_length": len(turn.content)}, "H4")
                 # #endregion
                 
                 # After stream completes, check if we need to handle tool calls
-                if finish_reason == "tool_calls" and tool_calls_collected:
-                    # #region agent log
-                    tool_exec_start = time.time()
-                    _debug_log("app/agent/streaming.py:stream_response:tool_exec_start", "Tool execution starting", {"tool_calls_count": len(tool_calls_collected)}, "H6")
-                    # #endregion
-                    # Add accumulated content to assistant message if any
-                    if accumulated_content:
-                        assistant_msg_dict = {
-                            "role": "assistant",
-                            "content": accumulated_content
-                        }
-                    else:
-                        assistant_msg_dict = {
-                            "role": "assistant",
-                            "content": None
-                        }
-                    
-                    # Add tool_calls to assistant message
-                    assistant_msg_dict["tool_calls"] = tool_calls_collected
-                    messages.append(assistant_msg_dict)
-                    
-                    logger.info(f"Model requested {len(tool_calls_collected)} tool calls during streaming")
-                    
-                    # If include_tool_calls is True, yield tool call information before execution
-                    # This allows the UI to display tool calls as they happen
-                    if include_tool_calls:
-                        for tool_call in tool_calls_collected:
-                            tool_call_info = {
-                                "type": "tool_call_start",
-                                "tool_name": tool_call.get("function", {}).get("name", ""),
-                                "tool_id": tool_call.get("id", ""),
-                                "arguments": json.loads(tool_call.get("function", {}).get("arguments", "{}"))
-                            }
-                            yield f"\n\n[TOOL_CALL_START]{json.dumps(tool_call_info, ensure_ascii=False)}[/TOOL_CALL_START]\n\n"
+                if turn.finish_reason == "tool_calls" and turn.tool_calls:
+                    for event in self._start_tool_calls(request, turn):
+                        yield event
                     
                     # Execute tools with correlation ID for audit logging
                     tool_messages = self._process_tool_calls(
-                        tool_calls_collected,
-                        correlation_id=correlation_id,
-                        agent_id=effective_agent_id,
-                        context=context,
-                        tool_call_cache=tool_call_cache
+                        turn.tool_calls,
+                        correlation_id=request.correlation_id,
+                        agent_id=request.agent_id,
+                        context=request.context,
+                        tool_call_cache=request.tool_call_cache,
+                        prefetched=turn.prefetched
                     )
-                    # #region agent log
-                    _debug_log("app/agent/streaming.py:stream_response:tool_exec_complete", "Tool execution complete", {"duration_ms": (time.time() - tool_exec_start) * 1000, "tool_messages_count": len(tool_messages)}, "H6")
-                    # #endregion
-                    
-                    # Check for authentication errors in tool results
-                    current_auth_errors = []
-                    for tool_message in tool_messages:
-                        try:
-                            result_content = json.loads(tool_message.get("content", "{}"))
-                            error_msg = result_content.get("error", "")
-                            success = result_content.get("success", True)
-                            
-                            # Check if this is an authentication error (improved detection)
-                            if error_msg and not success:
-                                error_lower = error_msg.lower()
-                                # Detect various authentication error patterns
-                                if any(pattern in error_lower for pattern in [
-                                    "authentication required",
-                                    "authentication",
-                                    "login required",
-                                    "not authenticated",
-                                    "unauthorized",
-                                    "access denied"
-                                ]):
-                                    current_auth_errors.append(error_msg)
-                        except (json.JSONDecodeError, AttributeError):
-                            pass
                     
-                    # If we see authentication errors, handle them immediately
-                    if current_auth_errors:
-                        # Check if we've seen this error before (in any iteration)
-                        for auth_error in current_auth_errors:
-                            if auth_error in auth_errors:
-                                # Same authentication error seen before - stop retrying immediately
-                                logger.warning(f"Authentication error repeated: {auth_error}. Stopping retries.")
-                                error_response = (
-                                    "I apologize, but I'm unable to access your prescription information due to an authentication issue. "
-                                    "Please ensure you are logged in and try again. If the problem persists, please contact support."
-                                )
-                                yield error_response
-                                _audit_logger.log_agent_action(
-                                    correlation_id=correlation_id,
-                                    agent_id=effective_agent_id,
-                                    action="authentication_error_repeated",
-                                    details={"error": auth_error, "iteration": iteration},
-                                    status="error"
-                                )
-                                return
-                        
-                        # First time seeing this error - add to list and respond immediately
-                        auth_errors.extend(current_auth_errors)
-                        # If this is the first iteration and we got auth error, respond immediately
-                        if iteration == 1:
-                            logger.info("Authentication error detected in first iteration, responding immediately")
-                            error_response = (
-                                "I'm unable to access your prescription information. Authentication is required. "
-                                "Please log in to your account and try again."
-                            )
-                            yield error_response
-                            _audit_logger.log_agent_action(
-                                correlation_id=correlation_id,
-                                agent_id=effective_agent_id,
-                                action="authentication_error_detected",
-                                details={"error": current_auth_errors[0], "iteration": iteration},
-                                status="error"
-                            )
-                            return
-                    
-                    # If include_tool_calls is True, yield tool call results after execution
-                    if include_tool_calls:
-                        for tool_call, tool_message in zip(tool_calls_collected, tool_messages):
-                            tool_result_info = {
-                                "type": "tool_call_result",
-                                "tool_name": tool_call.get("function", {}).get("name", ""),
-                                "tool_id": tool_call.get("id", ""),
-                                "result": json.loads(tool_message.get("content", "{}")),
-                                "success": json.loads(tool_message.get("content", "{}")).get("success", True)
-                            }
-                            yield f"\n\n[TOOL_CALL_RESULT]{json.dumps(tool_result_info, ensure_ascii=False)}[/TOOL_CALL_RESULT]\n\n"
-                    
-                    messages.extend(tool_messages)
+                    reply, events = self._finish_tool_calls(request, turn, tool_messages)
+                    if reply is not None:
+                        yield text_event(reply)
+                        return
+                    for event in events:
+                        yield event
                     
                     # Continue loop to get model's response to tool results (with streaming)
                     continue
                 
-                # No tool calls - we have final response
-                # If we already yielded content, we're done
-                # If no content was yielded but finish_reason is "stop", check if we need to yield error
-                if finish_reason == "stop":
-                    if accumulated_content:
-                        # We already yielded content, we're done
-                        logger.info("Streaming completed with final response")
-                        _audit_logger.log_agent_action(
-                            correlation_id=correlation_id,
-                            agent_id=effective_agent_id,
-                            action="response_generated",
-                            details={"response_length": len(accumulated_content)},
-                            status="success"
-                        )
-                        return
-                    elif not tool_calls_collected:
-                        # No content and no tool calls - yield error message
-                        logger.warning("Stream completed with no content and no tool calls")
-                        _audit_logger.log_agent_action(
-                            correlation_id=correlation_id,
-                            agent_id=effective_agent_id,
-                            action="response_generation_failed",
-                            details={"reason": "no_content_no_tool_calls"},
-                            status="error"
-                        )
-                        yield "I apologize, but I encountered an issue processing your request. Please try again or rephrase your question."
-                        return
-                    else:
-                        # Should not happen, but handle gracefully
-                        logger.info("Streaming completed with final response")
-                        _audit_logger.log_agent_action(
-                            correlation_id=correlation_id,
-                            agent_id=effective_agent_id,
-                            action="response_generated",
-                            details={"response_length": 0},
-                            status="success"
-                        )
-                        return
-                elif not tool_calls_collected and accumulated_content:
-                    # We have content and no tool calls - we're done
-                    logger.info("Streaming completed with final response")
-                    _audit_logger.log_agent_action(
-                        correlation_id=correlation_id,
-                        agent_id=effective_agent_id,
-                        action="response_generated",
-                        details={"response_length": len(accumulated_content)},
-                        status="success"
-                    )
+                done, reply = self._finish_turn(request, turn)
+                if reply is not None:
+                    yield text_event(reply)
+                if done:
                     return
                 
-                # If we reach here and no content was yielded, something unexpected happened
-                if not accumulated_content and not tool_calls_collected:
-                    logger.warning("Stream completed with no content and no tool calls")
-                    _audit_logger.log_agent_action(
-                        correlation_id=correlation_id,
-                        agent_id=effective_agent_id,
-                        action="response_generation_failed",
-                        details={"reason": "unexpected_state"},
-                        status="error"
+            except Exception as e:
+                yield text_event(self._handle_stream_error(request, e))
+                return
+            finally:
+                turn.cancel_prefetched()
+        
+        # If we exit loop, we hit max iterations
+        yield text_event(self._handle_max_iterations(request))
+    
+    async def astream_response(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        agent_id: Optional[str] = None,
+        include_tool_calls: bool = False,
+        context: Optional[Dict[str, Any]] = None,
+        conversation_state: Optional[ConversationState] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream agent response in real-time as an async generator.
+        
+        Purpose (Why):
+        stream_response() blocks a worker thread for the whole LLM round-trip,
+        including every tool iteration, so concurrent conversations are capped
+        by the thread pool. This variant awaits the network instead, so one
+        event loop can serve hundreds of concurrent conversations.
+        
+        Implementation (What):
+        Same protocol, audit logging and yields as stream_response(), but uses
+        the AsyncOpenAI client (the event loop's async HTTP connection pool) and runs
+        tool calls concurrently with asyncio.gather via _aprocess_tool_calls().
+        Renders the events of astream_events().
+        
+        Args:
+            user_message: The user's message to process
+            conversation_history: Optional list of previous messages in the
+                current conversation session
+            agent_id: Optional identifier for the agent/session. Used for rate limiting and audit logging.
+            include_tool_calls: If True, yields [TOOL_CALL_START] / [TOOL_CALL_RESULT]
+                markers like stream_response()
+            context: Optional context dictionary for tool execution
+            conversation_state: Optional ConversationState kept for this session
+        
+        Yields:
+            String chunks of the agent's response (and tool call markers if requested)
+        
+        Example:
+            >>> agent = StreamingAgent()
+            >>> async for chunk in agent.astream_response("Tell me about Acamol"):
+            ...     print(chunk, end="", flush=True)
+        """
+        async for event in self.astream_events(user_message, conversation_history, agent_id, context, conversation_state):
+            chunk = self._render_event(event, include_tool_calls)
+            if chunk is not None:
+                yield chunk
+    
+    async def astream_events(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        agent_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        conversation_state: Optional[ConversationState] = None
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Async counterpart of stream_events().
+        
+        Args:
+            user_message: The user's message to process
+            conversation_history: Optional list of previous messages in the
+                current conversation session
+            agent_id: Optional identifier for the agent/session. Used for rate limiting and audit logging.
+            context: Optional context dictionary for tool execution
+            conversation_state: Optional ConversationState kept for this session
+        
+        Yields:
+            StreamEvent objects, as documented in stream_events()
+        """
+        # Token counting, audit writes and the response cache (which reads the
+        # database's data_version and may load the database) block, so they run
+        # in worker threads instead of on the event loop
+        request = await asyncio.to_thread(
+            self._start_request, user_message, conversation_history, agent_id, context, conversation_state
+        )
+        if request.reply is not None:
+            yield text_event(request.reply)
+        else:
+            cache_key, cached = await asyncio.to_thread(self._lookup_response, request, conversation_history)
+            if cached is not None:
+                for event in cached:
+                    yield event
+            else:
+                recorded: Optional[List[StreamEvent]] = [] if cache_key is not None else None
+                async for event in self._agenerate_events(request):
+                    if recorded is not None:
+                        recorded.append(event)
+                    yield event
+                await asyncio.to_thread(self._store_response, request, cache_key, recorded)
+        yield self._done_event(request)
+    
+    async def _agenerate_events(self, request: "_StreamRequest") -> AsyncGenerator[StreamEvent, None]:
+        """
+        Async counterpart of _generate_events().
+        
+        Args:
+            request: Request state from _start_request()
+        
+        Yields:
+            TEXT, TOOL_START and TOOL_RESULT events, as documented in stream_events()
+        """
+        # Matching looks medication names up in the database
+        match = await asyncio.to_thread(self._match_fast_path, request)
+        if match is not None:
+            # The tool is blocking: run it on the shared tool executor
+            tool_name = self.fast_path_router.tool_call(match)[0]
+            try:
+                events = await asyncio.wrap_future(
+                    get_tool_executor().submit(tool_name, self._answer_fast_path, request, match)
+                )
+            except ToolQueueFullError as e:
+                yield text_event(self._handle_stream_error(request, e))
+                return
+            if events is not None:
+                for event in events:
+                    yield event
+                return
+        
+        while request.iteration < MAX_TOOL_ITERATIONS:
+            request.iteration += 1
+            logger.debug(f"OpenAI API async streaming call iteration: {request.iteration}")
+            turn = _StreamTurn()
+            
+            try:
+                stream = await self.async_client.chat.completions.create(**self._completion_kwargs(request.messages))
+                
+                async for chunk in stream:
+                    text = turn.add_chunk(chunk)
+                    if self.speculative_tools:
+                        self._prefetch_tool_calls(request, turn)
+                    if text:
+                        yield text_event(text)
+                
+                if turn.finish_reason == "tool_calls" and turn.tool_calls:
+                    for event in self._start_tool_calls(request, turn):
+                        yield event
+                    
+                    tool_messages = await self._aprocess_tool_calls(
+                        turn.tool_calls,
+                        correlation_id=request.correlation_id,
+                        agent_id=request.agent_id,
+                        context=request.context,
+                        tool_call_cache=request.tool_call_cache,
+                        prefetched=turn.prefetched
                     )
-                    yield "I apologize, but I encountered an issue processing your request. Please try again or rephrase your question."
+                    
+                    reply, events = self._finish_tool_calls(request, turn, tool_messages)
+                    if reply is not None:
+                        yield text_event(reply)
+                        return
+                    for event in events:
+                        yield event
+                    continue
+                
+                done, reply = self._finish_turn(request, turn)
+                if reply is not None:
+                    yield text_event(reply)
+                if done:
                     return
                 
             except Exception as e:
-                error_msg = f"Error in OpenAI API streaming call: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                _audit_logger.log_agent_action(
-                    correlation_id=correlation_id,
-                    agent_id=effective_agent_id,
-                    action="error_handled",
-                    details={"error": str(e), "error_type": type(e).__name__},
-                    status="error"
-                )
-                yield f"I apologize, but I encountered an error: {error_msg}. Please try again."
+                yield text_event(self._handle_stream_error(request, e))
                 return
+            finally:
+                turn.cancel_prefetched()
         
-        # If we exit loop, we hit max iterations
-        logger.warning(f"Reached max iterations ({max_iterations}) in streaming tool calling loop")
-        _audit_logger.log_agent_action(
-            correlation_id=correlation_id,
-            agent_id=effective_agent_id,
-            action="max_iterations_reached",
-            details={"max_iterations": max_iterations},
-            status="error"
-        )
-        yield "I apologize, but I encountered an issue processing your request. Please try again or rephrase your question."
+        yield text_event(self._handle_max_iterations(request))
 
+
+class _StreamRequest:
+    """
+    Mutable state of one streaming request.
+    
+    Attributes:
+        correlation_id: Correlation ID for audit logging
+        agent_id: Effective agent/session identifier
+        messages: Messages sent to OpenAI (grows with tool calls and results)
+        context: Context passed to tool execution and audit logging
+        user_message: Normalized user message
+        reply: Immediate reply that ends the request before calling OpenAI
+        iteration: Number of OpenAI calls made so far
+        auth_errors: Authentication error messages seen in previous iterations
+        tool_call_cache: (tool_name, arguments) -> result, to skip duplicate calls
+        completed: Whether a response was generated successfully
+        cacheable: Whether the response may be stored in the response cache
+            (False once a user-specific or failed tool call contributed to it)
+    """
+    
+    def __init__(self, correlation_id: str, agent_id: str):
+        self.correlation_id = correlation_id
+        self.agent_id = agent_id
+        self.messages: List[Dict[str, Any]] = []
+        self.context: Dict[str, Any] = {}
+        self.user_message = ""
+        self.reply: Optional[str] = None
+        self.iteration = 0
+        self.auth_errors: List[str] = []
+        self.tool_call_cache: Dict[Any, Any] = {}
+        self.completed = False
+        self.cacheable = True
+
+
+class _StreamTurn:
+    """
+    Accumulates one streamed model turn: text content, tool calls, finish reason.
+    
+    Attributes:
+        content: Text content received so far
+        tool_calls: Tool calls assembled from the deltas (OpenAI dictionary format)
+        finish_reason: Last finish reason reported by the stream
+        chunk_count: Number of chunks received
+        prefetched: Tool calls dispatched while streaming, index -> (future, tool call)
+    """
+    
+    def __init__(self):
+        self.content = ""
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.finish_reason: Optional[str] = None
+        self.chunk_count = 0
+        self.prefetched: Dict[int, Tuple[concurrent.futures.Future, Dict[str, Any]]] = {}
+    
+    def ready_tool_calls(self, tool_names: Optional[Collection[str]] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Get tool calls that are complete but not dispatched yet.
+        
+        Implementation (What):
+        A tool call is complete once it has an ID and a name and its arguments
+        parse as a JSON object; a complete JSON object cannot be extended into
+        another valid one, so later deltas cannot change it. Only strings ending
+        with "}" are parsed.
+        
+        Args:
+            tool_names: Only return calls of these tools (default: any tool)
+        
+        Returns:
+            List of (index, copy of the tool call) pairs
+        """
+        ready = []
+        for index, tool_call in enumerate(self.tool_calls):
+            if index in self.prefetched or not tool_call["id"] or not tool_call["function"]["name"]:
+                continue
+            if tool_names is not None and tool_call["function"]["name"] not in tool_names:
+                continue
+            arguments = tool_call["function"]["arguments"]
+            if not arguments.rstrip().endswith("}"):
+                continue
+            try:
+                if not isinstance(json.loads(arguments), dict):
+                    continue
+            except json.JSONDecodeError:
+                continue
+            ready.append((index, {
+                "id": tool_call["id"],
+                "type": tool_call["type"],
+                "function": {"name": tool_call["function"]["name"], "arguments": arguments}
+            }))
+        return ready
+    
+    def cancel_prefetched(self) -> None:
+        """
+        Cancel prefetched tool calls that have not started yet.
+        
+        Futures whose results were used are already done, so this only stops
+        calls orphaned by a stream error or a turn that ended without them.
+        """
+        for future, _ in self.prefetched.values():
+            future.cancel()
+    
+    def add_chunk(self, chunk: Any) -> Optional[str]:
+        """
+        Add one streamed chunk.
+        
+        Args:
+            chunk: ChatCompletionChunk from the OpenAI stream
+        
+        Returns:
+            Text content to display immediately, or None
+        """
+        self.chunk_count += 1
+        delta = chunk.choices[0].delta
+        
+        # Check for finish reason
+        if chunk.choices[0].finish_reason:
+            self.finish_reason = chunk.choices[0].finish_reason
+        
+        # Handle text content
+        text = None
+        if delta.content:
+            self.content += delta.content
+            text = delta.content
+        
+        # Handle tool calls (collect them as they arrive)
+        # Check if tool_calls exists and is iterable (not just truthy Mock)
+        if delta.tool_calls:
+            try:
+                # This will raise TypeError if tool_calls is not iterable (e.g., Mock object)
+                iter(delta.tool_calls)
+                for tool_call_delta in delta.tool_calls:
+                    # Initialize tool call structure if needed
+                    index = tool_call_delta.index
+                    while len(self.tool_calls) <= index:
+                        self.tool_calls.append({
+                            "id": "",
+                            "type": "function",
+                            "function": {
+                                "name": "",
+                                "arguments": ""
+                            }
+                        })
+                    
+                    # Update tool call with delta information
+                    if tool_call_delta.id:
+                        self.tool_calls[index]["id"] = tool_call_delta.id
+                    if tool_call_delta.function:
+                        if tool_call_delta.function.name:
+                            self.tool_calls[index]["function"]["name"] = tool_call_delta.function.name
+                        if tool_call_delta.function.arguments:
+                            self.tool_calls[index]["function"]["arguments"] += tool_call_delta.function.arguments
+            except (TypeError, AttributeError):
+                # tool_calls is not iterable (e.g., Mock object that's not configured as iterable)
+                pass
+        
+        return text
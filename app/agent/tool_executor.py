@@ -0,0 +1,399 @@
+"""
+Process-wide, bounded scheduler for tool execution.
+
+Purpose (Why):
+The agent used to create a ThreadPoolExecutor for every LLM iteration of every
+request and tear it down afterwards. Under load this meant constant thread
+creation and no global limit on the number of tool threads. A single shared
+pool absorbs spikes of parallel tool calls without thread churn, keeps the
+thread count bounded, and lets operators cap individual expensive tools.
+
+Implementation (What):
+ToolExecutor wraps one long-lived ThreadPoolExecutor. Every tool has its own
+concurrency limit: calls above the limit wait in a per-tool FIFO queue (not in
+a worker thread) and are handed to the pool when a call of the same tool
+finishes. Queue depth is bounded: once too many calls are waiting, new calls
+fail immediately instead of piling up. Only registered tools get their own
+queue; any other (e.g. model-invented) tool name shares one fallback queue.
+The executor records queue depth and the time each call waited before it
+started, exposed through get_metrics().
+
+Configuration (environment variables):
+- TOOL_EXECUTOR_MAX_WORKERS: Worker threads in the shared pool (default: 16)
+- TOOL_CONCURRENCY_DEFAULT: Concurrent calls per tool (default: 0 = no limit
+  beyond the pool size)
+- TOOL_CONCURRENCY_LIMITS: Per-tool overrides, e.g.
+  "get_user_prescriptions=2,get_medication_by_name=8"
+- TOOL_EXECUTOR_MAX_QUEUE_DEPTH: Calls that may wait to start before new calls
+  are rejected (default: 256, 0 = unbounded)
+"""
+
+import os
+import time
+import logging
+import threading
+import concurrent.futures
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+from app.tools.registry import get_registered_tool_names
+
+# Load environment variables
+load_dotenv()
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+
+DEFAULT_MAX_QUEUE_DEPTH = 256
+
+# Slot shared by all calls whose tool name is not registered
+UNREGISTERED_TOOL = "<unregistered>"
+
+
+class ToolQueueFullError(RuntimeError):
+    """Raised (through the call's Future) when the executor's queue is full."""
+
+
+def parse_concurrency_limits(value: Optional[str]) -> Dict[str, int]:
+    """
+    Parse per-tool concurrency limits from a configuration string.
+
+    Args:
+        value: Comma-separated "tool_name=limit" pairs (may be None or empty)
+
+    Returns:
+        Dictionary mapping tool name to its concurrency limit
+
+    Raises:
+        ValueError: If an entry is malformed or a limit is not a positive integer
+    """
+    limits: Dict[str, int] = {}
+    if not value:
+        return limits
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, separator, limit = entry.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid tool concurrency limit: {entry!r} (expected tool_name=limit)")
+        limits[name.strip()] = int(limit)
+        if limits[name.strip()] < 1:
+            raise ValueError(f"Tool concurrency limit must be positive: {entry!r}")
+    return limits
+
+
+class _ToolSlot:
+    """
+    Scheduling state of one tool.
+
+    Attributes:
+        limit: Maximum concurrent calls of this tool
+        active: Calls currently handed to the pool
+        waiting: Calls waiting for a free slot of this tool
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiting: Deque[Tuple[concurrent.futures.Future, Callable[..., Any], tuple, dict, float]] = deque()
+
+
+class ToolExecutor:
+    """
+    Shared tool execution pool with per-tool concurrency limits and metrics.
+
+    Purpose (Why):
+    Gives all requests one bounded set of tool threads, so the number of
+    threads does not grow with the number of concurrent requests, and allows
+    expensive tools to be capped independently.
+
+    Implementation (What):
+    submit() returns a Future immediately. If the tool is below its limit the
+    call goes to the pool, otherwise it is queued per tool; when a call
+    finishes, the next queued call of the same tool is dispatched. The time
+    between submit() and the start of the call is the wait time; it includes
+    waiting for a tool slot and for a pool thread. When max_queue_depth calls
+    are already waiting to start, submit() returns a Future failed with
+    ToolQueueFullError, which callers turn into an error result. All
+    scheduling state is protected by a single lock.
+
+    Attributes:
+        max_workers: Number of worker threads in the pool
+        default_limit: Concurrency limit for tools without an override
+        tool_limits: Per-tool concurrency limit overrides
+        max_queue_depth: Calls allowed to wait to start (0 = unbounded)
+        tool_names: Tools with their own slot (None = every tool name)
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        default_limit: Optional[int] = None,
+        tool_limits: Optional[Dict[str, int]] = None,
+        max_queue_depth: Optional[int] = None,
+        tool_names: Optional[Iterable[str]] = None
+    ):
+        """
+        Initialize the executor and its worker pool.
+
+        Args:
+            max_workers: Worker threads. If None, reads TOOL_EXECUTOR_MAX_WORKERS
+                or defaults to 16.
+            default_limit: Concurrent calls per tool. If None, reads
+                TOOL_CONCURRENCY_DEFAULT; 0 means limited only by the pool size.
+            tool_limits: Per-tool limits. If None, parsed from TOOL_CONCURRENCY_LIMITS.
+            max_queue_depth: Calls allowed to wait to start. If None, reads
+                TOOL_EXECUTOR_MAX_QUEUE_DEPTH or defaults to 256; 0 means unbounded.
+            tool_names: Tools that get their own slot; calls of any other tool
+                share the UNREGISTERED_TOOL slot. If None, every tool name gets
+                its own slot.
+
+        Raises:
+            ValueError: If a configured value is not a valid integer or is not positive
+        """
+        self.max_workers = (
+            max_workers
+            if max_workers is not None
+            else int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", str(DEFAULT_MAX_WORKERS)))
+        )
+        if self.max_workers < 1:
+            raise ValueError(f"max_workers must be positive, got {self.max_workers}")
+        default_limit = (
+            default_limit
+            if default_limit is not None
+            else int(os.getenv("TOOL_CONCURRENCY_DEFAULT", "0"))
+        )
+        self.default_limit = default_limit if default_limit > 0 else self.max_workers
+        self.tool_limits = (
+            dict(tool_limits)
+            if tool_limits is not None
+            else parse_concurrency_limits(os.getenv("TOOL_CONCURRENCY_LIMITS"))
+        )
+        self.max_queue_depth = (
+            max_queue_depth
+            if max_queue_depth is not None
+            else int(os.getenv("TOOL_EXECUTOR_MAX_QUEUE_DEPTH", str(DEFAULT_MAX_QUEUE_DEPTH)))
+        )
+        if self.max_queue_depth < 0:
+            raise ValueError(f"max_queue_depth must not be negative, got {self.max_queue_depth}")
+        self.tool_names = frozenset(tool_names) if tool_names is not None else None
+
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="tool-executor"
+        )
+        self._lock = threading.Lock()
+        self._slots: Dict[str, _ToolSlot] = {}
+
+        # Metrics (protected by _lock)
+        self._queued = 0
+        self._running = 0
+        self._peak_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+        logger.info(
+            f"ToolExecutor initialized: max_workers={self.max_workers}, "
+            f"default_limit={self.default_limit}, tool_limits={self.tool_limits}, "
+            f"max_queue_depth={self.max_queue_depth}"
+        )
+
+    def _slot_name(self, tool_name: str) -> str:
+        """Map a tool name to the slot it is scheduled in."""
+        if self.tool_names is None or tool_name in self.tool_names:
+            return tool_name
+        return UNREGISTERED_TOOL
+
+    def _slot(self, tool_name: str) -> _ToolSlot:
+        """Get or create the scheduling state of a slot (caller holds _lock)."""
+        slot = self._slots.get(tool_name)
+        if slot is None:
+            slot = _ToolSlot(self.tool_limits.get(tool_name, self.default_limit))
+            self._slots[tool_name] = slot
+        return slot
+
+    def submit(self, tool_name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """
+        Schedule a tool call.
+
+        Args:
+            tool_name: Tool whose concurrency limit applies
+            fn: Callable to run in a worker thread
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Future resolved with fn's return value or exception; failed with
+            ToolQueueFullError if max_queue_depth calls are already waiting,
+            or with RuntimeError if the executor has been shut down
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        task = (future, fn, args, kwargs, time.monotonic())
+        tool_name = self._slot_name(tool_name)
+        with self._lock:
+            queued = self._queued
+            if self.max_queue_depth and queued >= self.max_queue_depth:
+                self._rejected += 1
+                slot = None
+            else:
+                self._submitted += 1
+                self._queued += 1
+                self._peak_queued = max(self._peak_queued, self._queued)
+                slot = self._slot(tool_name)
+                if slot.active >= slot.limit:
+                    slot.waiting.append(task)
+                    return future
+                slot.active += 1
+        if slot is None:
+            # Fail fast: a spike gets error results instead of an unbounded queue
+            logger.warning(f"Tool call rejected, {queued} calls already waiting (tool: {tool_name})")
+            future.set_exception(ToolQueueFullError(
+                f"Tool executor is busy ({queued} calls waiting), please try again shortly"
+            ))
+            return future
+        self._dispatch(tool_name, task)
+        return future
+
+    def _dispatch(self, tool_name: str, task: tuple) -> None:
+        """
+        Hand a call that holds a tool slot to the pool.
+
+        Args:
+            tool_name: Tool the call belongs to
+            task: (future, fn, args, kwargs, submitted_at)
+        """
+        try:
+            self._pool.submit(self._run, tool_name, task)
+        except RuntimeError as e:
+            # Pool shut down: fail the call instead of leaving it pending
+            with self._lock:
+                self._queued -= 1
+            task[0].set_exception(e)
+            self._release(tool_name)
+
+    def _run(self, tool_name: str, task: tuple) -> None:
+        """
+        Run one call in a worker thread and release its tool slot.
+
+        Args:
+            tool_name: Tool the call belongs to
+            task: (future, fn, args, kwargs, submitted_at)
+        """
+        future, fn, args, kwargs, submitted_at = task
+        waited = time.monotonic() - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_last = waited
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+            self._release(tool_name)
+
+    def _release(self, tool_name: str) -> None:
+        """
+        Free a tool slot and dispatch the next waiting call of that tool.
+
+        Args:
+            tool_name: Tool whose call finished
+        """
+        with self._lock:
+            slot = self._slots[tool_name]
+            if not slot.waiting:
+                slot.active -= 1
+                return
+            task = slot.waiting.popleft()
+        self._dispatch(tool_name, task)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the executor's load and wait times.
+
+        Returns:
+            Dictionary with:
+            - max_workers, default_limit: Configuration
+            - queue_depth: Calls submitted but not started yet
+            - peak_queue_depth: Highest queue depth seen
+            - running: Calls currently executing
+            - max_queue_depth: Configuration
+            - submitted, completed: Call counters
+            - rejected: Calls rejected because the queue was full
+            - wait_time_avg_ms, wait_time_max_ms, wait_time_last_ms: Time from
+              submit() to start of execution
+            - tools: Per-tool {"limit", "active", "waiting"}
+        """
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "default_limit": self.default_limit,
+                "max_queue_depth": self.max_queue_depth,
+                "queue_depth": self._queued,
+                "peak_queue_depth": self._peak_queued,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_time_avg_ms": (self._wait_total / started * 1000) if started else 0.0,
+                "wait_time_max_ms": self._wait_max * 1000,
+                "wait_time_last_ms": self._wait_last * 1000,
+                "tools": {
+                    name: {"limit": slot.limit, "active": slot.active, "waiting": len(slot.waiting)}
+                    for name, slot in self._slots.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker pool.
+
+        Args:
+            wait: Whether to wait for running calls to finish
+        """
+        self._pool.shutdown(wait=wait)
+
+
+# Process-wide shared ToolExecutor instance
+_shared_tool_executor: Optional[ToolExecutor] = None
+_shared_tool_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """
+    Get or create the process-wide shared ToolExecutor.
+
+    Purpose (Why):
+    All requests, sync and async, share one bounded pool of tool threads.
+
+    Implementation (What):
+    Double-checked locking around a module-level instance, configured from
+    environment variables on first use. Only the tools in the registry get
+    their own slot.
+
+    Returns:
+        ToolExecutor: The shared executor
+    """
+    global _shared_tool_executor
+    executor = _shared_tool_executor
+    if executor is None:
+        with _shared_tool_executor_lock:
+            if _shared_tool_executor is None:
+                _shared_tool_executor = ToolExecutor(tool_names=get_registered_tool_names())
+            executor = _shared_tool_executor
+    return executor
@@ -1,4 +1,3 @@
-from app.database.db import DatabaseManager
-
-__all__ = ["DatabaseManager"]
+from app.database.db import DatabaseManager, get_db_manager
 
+__all__ = ["DatabaseManager", "get_db_manager"]
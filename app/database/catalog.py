@@ -0,0 +1,579 @@
+"""
+In-memory catalog indexes for the pharmacy database.
+
+Purpose (Why):
+The DatabaseManager used to answer every id lookup by walking the full JSON
+lists, which makes tool calls such as get_user_prescriptions cost
+O(prescriptions x medications). With realistic catalogs (tens of thousands of
+medications, millions of prescriptions) every tool call must instead be a
+constant-time dictionary lookup, and name search must not scan the catalog.
+
+Implementation (What):
+Implements the Catalog class, which is built once from the loaded database
+dictionary and holds hash indexes keyed by medication_id, user_id and
+user_id -> prescriptions, plus an n-gram MedicationSearchIndex for partial
+name search and a FuzzyMatcher for misspelled names. The indexes reference the
+same record dictionaries as the raw data, so no record is copied. Every indexed
+record is also validated once into a frozen Pydantic model, so reads return
+shared, pre-validated objects instead of validating on every call, and each
+user's prescriptions are materialized joined with their medications. A new
+Catalog is built whenever the underlying data is (re)loaded or saved.
+
+A Catalog can also be restored from a memory-mapped snapshot
+(Catalog.from_indexes): its record lists and indexes then read from the
+mapping, and models, prescription rows and the data dictionary itself are
+built on first access instead of at load time.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Set, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+from app.models.user import User
+from app.models.medication import Medication
+from app.models.prescription import Prescription
+from app.database.search_index import MedicationSearchIndex
+from app.database.fuzzy_matcher import FuzzyMatcher
+from app.database.prescription_view import build_prescription_row, medication_fields
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Top-level lists of the database dictionary that hold records
+RECORD_COLLECTIONS: Tuple[str, ...] = ("users", "medications", "prescriptions")
+
+# Marks a user whose prescription rows have not been built yet
+_NOT_BUILT = object()
+
+
+def _validate(model_cls: Type[ModelT], record: Dict[str, Any]) -> Optional[ModelT]:
+    """
+    Validate a record into a model, logging instead of raising on failure.
+
+    Invalid records get no cached model; DatabaseManager then validates them on
+    access, which raises the ValidationError exactly as before.
+
+    Args:
+        model_cls: Pydantic model class
+        record: Raw record dictionary
+
+    Returns:
+        Validated (frozen) model instance, or None if the record is invalid
+    """
+    try:
+        return model_cls(**record)
+    except ValidationError as e:
+        logger.warning(f"Invalid {model_cls.__name__} record skipped at load time: {e.error_count()} errors")
+        return None
+
+
+class Catalog:
+    """
+    Indexed view over the raw pharmacy database dictionary.
+
+    Purpose (Why):
+    Provides O(1) access to medications, users and per-user prescriptions so
+    that DatabaseManager lookups do not scale with the size of the database.
+
+    Implementation (What):
+    Walks the users, medications and prescriptions lists exactly once and
+    builds dictionaries pointing at the original record dictionaries. When an
+    id appears more than once, the first record wins, matching the behaviour
+    of the previous linear scans. Prescriptions for a user keep their original
+    file order. Indexed records are validated into frozen models in the same
+    pass; refresh_medication() / refresh_prescription() re-validate a single
+    record after it was changed in place and rebuild only the prescription
+    view rows that depend on it. Catalogs restored by from_indexes() fill the
+    model and row caches on first access instead, under the catalog lock, so
+    a lazy fill can never overwrite a refresh.
+
+    Attributes:
+        data: The raw database dictionary the indexes were built from
+        medications_by_id: medication_id -> medication record
+        users_by_id: user_id -> user record
+        prescriptions_by_user: user_id -> list of prescription records
+        prescriptions_by_id: prescription_id -> prescription record
+        medication_search: N-gram index for partial medication name search
+        medication_fuzzy: Edit-distance matcher for misspelled medication names
+        medication_models: medication_id -> validated Medication
+        user_models: user_id -> validated User
+        prescription_models_by_user: user_id -> validated Prescriptions (parallel
+                                     to prescriptions_by_user, None if invalid)
+        prescription_view_by_user: user_id -> prescription rows joined with their
+                                   medication (None if a record is invalid)
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Build all indexes from a database dictionary.
+
+        Args:
+            data: Dictionary containing 'users', 'medications' and 'prescriptions' lists
+        """
+        self._data: Optional[Dict[str, Any]] = data
+        self._records: Dict[str, Sequence[Dict[str, Any]]] = {
+            collection: data.get(collection, []) for collection in RECORD_COLLECTIONS
+        }
+        self._lazy = False
+        self._lock = threading.RLock()
+        self.medications_by_id: Dict[str, Dict[str, Any]] = {}
+        self.users_by_id: Dict[str, Dict[str, Any]] = {}
+        self.prescriptions_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        self.prescriptions_by_id: Dict[str, Dict[str, Any]] = {}
+
+        for med_data in data.get("medications", []):
+            medication_id = med_data.get("medication_id")
+            if medication_id is not None and medication_id not in self.medications_by_id:
+                self.medications_by_id[medication_id] = med_data
+
+        for user_data in data.get("users", []):
+            user_id = user_data.get("user_id")
+            if user_id is not None and user_id not in self.users_by_id:
+                self.users_by_id[user_id] = user_data
+
+        for presc_data in data.get("prescriptions", []):
+            user_id = presc_data.get("user_id")
+            if user_id is not None:
+                self.prescriptions_by_user.setdefault(user_id, []).append(presc_data)
+            prescription_id = presc_data.get("prescription_id")
+            if prescription_id is not None and prescription_id not in self.prescriptions_by_id:
+                self.prescriptions_by_id[prescription_id] = presc_data
+
+        self.medication_search = MedicationSearchIndex(data.get("medications", []))
+        self.medication_fuzzy = FuzzyMatcher(data.get("medications", []))
+
+        self.medication_models: Dict[str, Medication] = {}
+        for medication_id, med_data in self.medications_by_id.items():
+            model = _validate(Medication, med_data)
+            if model is not None:
+                self.medication_models[medication_id] = model
+
+        self.user_models: Dict[str, User] = {}
+        for user_id, user_data in self.users_by_id.items():
+            model = _validate(User, user_data)
+            if model is not None:
+                self.user_models[user_id] = model
+
+        self.prescription_models_by_user: Dict[str, List[Optional[Prescription]]] = {
+            user_id: [_validate(Prescription, presc_data) for presc_data in prescriptions]
+            for user_id, prescriptions in self.prescriptions_by_user.items()
+        }
+
+        self.prescription_view_by_user: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        # medication_id -> users whose view contains a row for that medication
+        self._view_users_by_medication: Dict[str, Set[str]] = {}
+        for user_id in self.prescriptions_by_user:
+            self._build_prescription_view(user_id)
+
+        logger.debug(
+            f"Catalog indexes built: {len(self.medications_by_id)} medications, "
+            f"{len(self.users_by_id)} users, {len(self.prescriptions_by_user)} users with prescriptions"
+        )
+
+    @classmethod
+    def from_indexes(
+        cls,
+        records: Dict[str, Sequence[Dict[str, Any]]],
+        keys: List[str],
+        extra: Dict[str, Any],
+        medications_by_id: Mapping[str, Dict[str, Any]],
+        users_by_id: Mapping[str, Dict[str, Any]],
+        prescriptions_by_id: Mapping[str, Dict[str, Any]],
+        prescriptions_by_user: Mapping[str, List[Dict[str, Any]]],
+        medication_search: MedicationSearchIndex,
+        medication_fuzzy: FuzzyMatcher
+    ) -> "Catalog":
+        """
+        Create a Catalog over prebuilt (e.g. memory-mapped) records and indexes.
+
+        Purpose (Why):
+        Restoring a snapshot must not cost O(N) object construction; only the
+        records and models a request actually touches are materialized.
+
+        Implementation (What):
+        Stores the given sequences and mappings as they are and starts with
+        empty model and row caches, which are filled on first access. The
+        data dictionary is assembled from the record sequences the first time
+        it is requested.
+
+        Args:
+            records: Collection name -> records in file order (same objects on every access)
+            keys: Top-level keys of the database dictionary in file order
+            extra: Top-level values that are not record collections
+            medications_by_id: medication_id -> medication record
+            users_by_id: user_id -> user record
+            prescriptions_by_id: prescription_id -> prescription record
+            prescriptions_by_user: user_id -> list of prescription records
+            medication_search: Search index over records["medications"]
+            medication_fuzzy: Fuzzy matcher over records["medications"]
+
+        Returns:
+            Catalog that validates models and builds prescription rows lazily
+        """
+        catalog = cls.__new__(cls)
+        catalog._data = None
+        catalog._records = records
+        catalog._keys = keys
+        catalog._extra = extra
+        catalog._lazy = True
+        catalog._lock = threading.RLock()
+        catalog.medications_by_id = medications_by_id
+        catalog.users_by_id = users_by_id
+        catalog.prescriptions_by_id = prescriptions_by_id
+        catalog.prescriptions_by_user = prescriptions_by_user
+        catalog.medication_search = medication_search
+        catalog.medication_fuzzy = medication_fuzzy
+        catalog.medication_models = {}
+        catalog.user_models = {}
+        catalog.prescription_models_by_user = {}
+        catalog.prescription_view_by_user = {}
+        catalog._view_users_by_medication = {}
+        return catalog
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        The raw database dictionary the indexes were built from.
+
+        For a lazily restored catalog, the dictionary is assembled on first
+        access from the (shared) record objects, so in-place changes made
+        through the indexes are part of it.
+
+        Returns:
+            Dictionary containing 'users', 'medications' and 'prescriptions' lists
+        """
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = {
+                        key: list(self._records[key]) if key in self._records else self._extra[key]
+                        for key in self._keys
+                    }
+                data = self._data
+        return data
+
+    def records(self, collection: str) -> Sequence[Dict[str, Any]]:
+        """
+        Get the records of one collection without materializing the others.
+
+        Args:
+            collection: One of RECORD_COLLECTIONS
+
+        Returns:
+            Records in file order (empty if the collection is missing)
+        """
+        return self._records.get(collection, [])
+
+    def get_medication(self, medication_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a raw medication record by ID.
+
+        Args:
+            medication_id: The medication ID to look up
+
+        Returns:
+            The medication record dictionary, or None if not found
+        """
+        return self.medications_by_id.get(medication_id)
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a raw user record by ID.
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            The user record dictionary, or None if not found
+        """
+        return self.users_by_id.get(user_id)
+
+    def get_prescription(self, prescription_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a raw prescription record by ID.
+
+        Args:
+            prescription_id: The prescription ID to look up
+
+        Returns:
+            The prescription record dictionary, or None if not found
+        """
+        return self.prescriptions_by_id.get(prescription_id)
+
+    def get_prescriptions_for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all raw prescription records for a user.
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            List of prescription record dictionaries (empty list if none)
+        """
+        return self.prescriptions_by_user.get(user_id, [])
+
+    def get_medication_model(self, medication_id: str) -> Optional[Medication]:
+        """
+        Get the validated Medication for an ID.
+
+        Args:
+            medication_id: The medication ID to look up
+
+        Returns:
+            Shared Medication instance, or None if not found
+
+        Raises:
+            ValidationError: If the stored record is invalid
+        """
+        model = self.medication_models.get(medication_id)
+        if model is not None:
+            return model
+        med_data = self.medications_by_id.get(medication_id)
+        if med_data is None:
+            return None
+        with self._lock:
+            model = Medication(**med_data)
+            self.medication_models[medication_id] = model
+        return model
+
+    def medication_model_for(self, med_data: Dict[str, Any]) -> Medication:
+        """
+        Get the validated Medication for a raw record (e.g. a search result).
+
+        Args:
+            med_data: Medication record dictionary from this catalog
+
+        Returns:
+            The shared Medication instance if the record is the indexed one for
+            its ID, otherwise a newly validated instance
+
+        Raises:
+            ValidationError: If the record is invalid
+        """
+        medication_id = med_data.get("medication_id")
+        if self.medications_by_id.get(medication_id) is med_data:
+            return self.get_medication_model(medication_id)
+        return Medication(**med_data)
+
+    def get_user_model(self, user_id: str) -> Optional[User]:
+        """
+        Get the validated User for an ID.
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            Shared User instance, or None if not found
+
+        Raises:
+            ValidationError: If the stored record is invalid
+        """
+        model = self.user_models.get(user_id)
+        if model is not None:
+            return model
+        user_data = self.users_by_id.get(user_id)
+        if user_data is None:
+            return None
+        with self._lock:
+            model = User(**user_data)
+            self.user_models[user_id] = model
+        return model
+
+    def user_model_for(self, user_data: Dict[str, Any]) -> User:
+        """
+        Get the validated User for a raw record (e.g. a search result).
+
+        Args:
+            user_data: User record dictionary from this catalog
+
+        Returns:
+            The shared User instance if the record is the indexed one for its
+            ID, otherwise a newly validated instance
+
+        Raises:
+            ValidationError: If the record is invalid
+        """
+        user_id = user_data.get("user_id")
+        if self.users_by_id.get(user_id) is user_data:
+            return self.get_user_model(user_id)
+        return User(**user_data)
+
+    def get_prescription_models_for_user(self, user_id: str) -> List[Prescription]:
+        """
+        Get the validated Prescriptions of a user, in file order.
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            New list of shared Prescription instances (empty list if none)
+
+        Raises:
+            ValidationError: If one of the stored records is invalid
+        """
+        models = self._prescription_models(user_id)
+        records = self.prescriptions_by_user.get(user_id, [])
+        return [
+            model if model is not None else Prescription(**presc_data)
+            for model, presc_data in zip(models, records)
+        ]
+
+    def prescription_model_for(self, presc_data: Dict[str, Any]) -> Prescription:
+        """
+        Get the validated Prescription for a raw record (e.g. after a refill).
+
+        Args:
+            presc_data: Prescription record dictionary from this catalog
+
+        Returns:
+            The shared Prescription instance cached for the record, or a newly
+            validated instance if it has none
+
+        Raises:
+            ValidationError: If the record is invalid
+        """
+        user_id = presc_data.get("user_id")
+        records = self.prescriptions_by_user.get(user_id, [])
+        for model, record in zip(self._prescription_models(user_id), records):
+            if record is presc_data and model is not None:
+                return model
+        return Prescription(**presc_data)
+
+    def refresh_medication(self, medication_id: str) -> None:
+        """
+        Re-validate a medication record after it was changed in place.
+
+        Args:
+            medication_id: The medication ID whose record changed
+        """
+        med_data = self.medications_by_id.get(medication_id)
+        if med_data is None:
+            return
+        with self._lock:
+            previous = self.medication_models.get(medication_id)
+            model = _validate(Medication, med_data)
+            if model is not None:
+                self.medication_models[medication_id] = model
+            else:
+                self.medication_models.pop(medication_id, None)
+
+            # Stock changes do not touch the joined fields, so most refreshes
+            # leave the prescription view alone
+            if model is not None and previous is not None and medication_fields(model) == medication_fields(previous):
+                return
+            for user_id in list(self._view_users_by_medication.get(medication_id, ())):
+                self._build_prescription_view(user_id)
+
+    def refresh_prescription(self, prescription_id: str) -> None:
+        """
+        Re-validate a prescription record after it was changed in place.
+
+        Args:
+            prescription_id: The prescription ID whose record changed
+        """
+        presc_data = self.prescriptions_by_id.get(prescription_id)
+        if presc_data is None:
+            return
+        user_id = presc_data.get("user_id")
+        records = self.prescriptions_by_user.get(user_id, [])
+        with self._lock:
+            # Not built yet (lazy catalog): the first read validates the changed record
+            models = self.prescription_models_by_user.get(user_id)
+            if models is None:
+                return
+            for position, record in enumerate(records):
+                if record is presc_data:
+                    models[position] = _validate(Prescription, presc_data)
+            self._build_prescription_view(user_id)
+
+    def get_prescription_view(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the materialized prescription rows of a user.
+
+        The returned rows are shared; callers must copy them before handing
+        them out (see prescription_view.copy_rows).
+
+        Args:
+            user_id: The user ID to look up
+
+        Returns:
+            List of rows in file order (empty list if none), or None if one of
+            the user's prescriptions or their medications is invalid
+        """
+        rows = self.prescription_view_by_user.get(user_id, _NOT_BUILT)
+        if rows is not _NOT_BUILT:
+            return rows
+        if user_id not in self.prescriptions_by_user:
+            return []
+        with self._lock:
+            if user_id not in self.prescription_view_by_user:
+                self._build_prescription_view(user_id)
+            return self.prescription_view_by_user[user_id]
+
+    def _prescription_models(self, user_id: str) -> List[Optional[Prescription]]:
+        """
+        Get the cached prescription models of a user, validating them on first use.
+
+        Args:
+            user_id: The user whose models are returned
+
+        Returns:
+            Models parallel to prescriptions_by_user[user_id] (None if invalid)
+        """
+        models = self.prescription_models_by_user.get(user_id)
+        if models is not None:
+            return models
+        records = self.prescriptions_by_user.get(user_id)
+        if records is None:
+            return []
+        with self._lock:
+            models = self.prescription_models_by_user.get(user_id)
+            if models is None:
+                models = [_validate(Prescription, presc_data) for presc_data in records]
+                self.prescription_models_by_user[user_id] = models
+            return models
+
+    def _cached_medication_model(self, medication_id: str) -> Optional[Medication]:
+        """
+        Get the cached Medication for an ID without raising.
+
+        Args:
+            medication_id: The medication ID to look up
+
+        Returns:
+            The validated model, or None if the medication is missing or invalid
+        """
+        model = self.medication_models.get(medication_id)
+        if model is None and self._lazy:
+            med_data = self.medications_by_id.get(medication_id)
+            if med_data is not None:
+                model = _validate(Medication, med_data)
+                if model is not None:
+                    self.medication_models[medication_id] = model
+        return model
+
+    def _build_prescription_view(self, user_id: str) -> None:
+        """
+        (Re)build the prescription rows of one user.
+
+        Args:
+            user_id: The user whose rows are built
+        """
+        rows: Optional[List[Dict[str, Any]]] = []
+        models = self._prescription_models(user_id)
+        records = self.prescriptions_by_user.get(user_id, [])
+        for model, presc_data in zip(models, records):
+            medication_id = presc_data.get("medication_id")
+            self._view_users_by_medication.setdefault(medication_id, set()).add(user_id)
+            if rows is None:
+                continue
+            medication = self._cached_medication_model(medication_id)
+            if model is None or (medication is None and medication_id in self.medications_by_id):
+                # Invalid record: readers fall back to per-call validation, which raises
+                rows = None
+                continue
+            rows.append(build_prescription_row(model, medication))
+        self.prescription_view_by_user[user_id] = rows
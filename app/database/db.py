@@ -1,15 +1,45 @@
 import json
 import logging
+import os
+import threading
 import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.models.user import User
 from app.models.medication import Medication
 from app.models.prescription import Prescription
+from app.database.catalog import Catalog
+from app.database.snapshot import encode_snapshot, load_snapshot, write_encoded_snapshot, write_snapshot
+from app.database.journal import ChangeJournal, atomic_write_text, journal_path_for
+from app.database.prescription_view import build_prescription_row, copy_rows
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
+# Number of journal entries after which the journal is compacted into the
+# main JSON file in the background
+DEFAULT_COMPACTION_THRESHOLD = 1000
+
+# Seconds between checks of database.json for external changes
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Get the (size, mtime_ns) signature of a file, used to detect changes.
+    
+    Args:
+        path: File path
+    
+    Returns:
+        Tuple of size and modification time, or None if the file doesn't exist
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
 # #region agent log
 # Debug log path - only used if the directory exists (for local development)
 # In Docker/production, this will silently fail (no logging to file)
@@ -48,24 +78,58 @@ class DatabaseManager:
     Implementation (What):
     Uses JSON file storage with Pydantic models for validation. Provides methods
     for loading/saving the database and querying by ID or name. Handles file I/O
-    operations and converts between JSON and Pydantic models.
+    operations and converts between JSON and Pydantic models. ID lookups are
+    served from a Catalog of hash indexes built once per load/save. The Catalog
+    is cached in a compiled snapshot next to the JSON file for fast cold start.
+    Small changes (stock decrements, prescription refills) are applied in memory
+    and appended to a change journal; the journal is compacted into the JSON
+    file in the background. Whole-file writes are atomic (temp file + rename).
+    External edits of the JSON file are picked up by reload_if_changed(), which
+    builds a new Catalog off to the side and swaps it in with a single reference
+    assignment, so readers never take a lock.
     
     Attributes:
         db_path: Path to the database JSON file
-        _data: Internal cache of loaded database data
+        use_snapshot: Whether to load from / write the compiled snapshot
+        compaction_threshold: Journal entries that trigger background compaction
+        _data: Loaded database data (the catalog's data dictionary)
+        _catalog: Hash indexes over _data (rebuilt on every load and save)
+        _journal: Append-only journal of changes not yet in the JSON file
+        _source_signature: (size, mtime_ns) of the JSON file the catalog reflects
+        _data_version: Incremented whenever the visible data changes
     """
     
-    def __init__(self, db_path: str = "data/database.json"):
+    def __init__(
+        self,
+        db_path: str = "data/database.json",
+        use_snapshot: bool = True,
+        compaction_threshold: int = DEFAULT_COMPACTION_THRESHOLD
+    ):
         """
         Initialize the DatabaseManager.
         
         Args:
             db_path: Path to the database JSON file (default: "data/database.json")
+            use_snapshot: Whether to use the compiled snapshot next to the JSON
+                         file (default: True)
+            compaction_threshold: Number of journal entries after which the
+                                  journal is compacted in the background
         """
         # Get the project root directory (parent of app/)
         project_root = Path(__file__).parent.parent.parent
         self.db_path = project_root / db_path
-        self._data: Optional[Dict[str, Any]] = None
+        self.use_snapshot = use_snapshot
+        self.compaction_threshold = compaction_threshold
+        self._catalog: Optional[Catalog] = None
+        self._journal = ChangeJournal(journal_path_for(self.db_path))
+        self._write_lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._source_signature: Optional[Tuple[int, int]] = None
+        self._data_version = 0
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._reload_stop: Optional[threading.Event] = None
     
     def load_db(self) -> Dict[str, Any]:
         """
@@ -78,11 +142,29 @@ class DatabaseManager:
         Implementation (What):
         Reads the JSON file from disk, parses it, and stores it in the internal cache.
         Uses UTF-8 encoding to support Hebrew characters. Validates file existence
-        before attempting to read.
+        before attempting to read. Builds the Catalog indexes used by all ID lookups.
+        If an up-to-date compiled snapshot exists, data and indexes are restored
+        from it instead; otherwise the snapshot is (re)compiled after parsing.
+        Changes recorded in the journal are then replayed on top.
         
         Returns:
             Dictionary containing 'users', 'medications', and 'prescriptions' lists
             
+        Raises:
+            FileNotFoundError: If the database file doesn't exist
+            json.JSONDecodeError: If the JSON file is invalid
+        """
+        self._load_catalog()
+        return self._data
+    
+    def _load_catalog(self) -> None:
+        """
+        Load the Catalog without materializing the data dictionary.
+        
+        A Catalog restored from the snapshot decodes records on first access;
+        only load_db() callers, which ask for the whole dictionary, pay for
+        building it.
+        
         Raises:
             FileNotFoundError: If the database file doesn't exist
             json.JSONDecodeError: If the JSON file is invalid
@@ -96,21 +178,213 @@ class DatabaseManager:
         _debug_log("app/database/db.py:load_db:start", "Database load started", {"db_path": str(self.db_path)}, "H1")
         # #endregion
         
-        logger.debug(f"Loading database from: {self.db_path}")
-        with open(self.db_path, 'r', encoding='utf-8') as f:
-            self._data = json.load(f)
+        catalog, signature = self._read_catalog()
+        with self._write_lock:
+            self._install_catalog(catalog, signature)
         
         # #region agent log
         load_duration = (time.time() - load_start) * 1000
         _debug_log("app/database/db.py:load_db:complete", "Database load complete", {"duration_ms": load_duration}, "H1")
         # #endregion
         
-        user_count = len(self._data.get("users", []))
-        med_count = len(self._data.get("medications", []))
-        presc_count = len(self._data.get("prescriptions", []))
+        user_count = len(self._catalog.records("users"))
+        med_count = len(self._catalog.records("medications"))
+        presc_count = len(self._catalog.records("prescriptions"))
         logger.info(f"Database loaded: {user_count} users, {med_count} medications, {presc_count} prescriptions")
+    
+    @property
+    def _data(self) -> Optional[Dict[str, Any]]:
+        """The loaded database dictionary, or None if nothing is loaded."""
+        catalog = self._catalog
+        return catalog.data if catalog is not None else None
+    
+    def _read_catalog(self) -> Tuple[Catalog, Optional[Tuple[int, int]]]:
+        """
+        Build a Catalog from the compiled snapshot or the JSON source.
         
-        return self._data
+        Takes no locks, so it can run in the background while readers keep
+        using the current catalog.
+        
+        Returns:
+            Tuple of the new Catalog (without journal changes) and the signature
+            of the JSON file it was built from
+        
+        Raises:
+            FileNotFoundError: If the database file doesn't exist
+            json.JSONDecodeError: If the JSON file is invalid
+        """
+        signature = _file_signature(self.db_path)
+        catalog = load_snapshot(self.db_path) if self.use_snapshot else None
+        if catalog is None:
+            logger.debug(f"Loading database from: {self.db_path}")
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            catalog = Catalog(data)
+            if self.use_snapshot:
+                write_snapshot(self.db_path, catalog)
+        else:
+            logger.debug(f"Loaded database snapshot for: {self.db_path}")
+        return catalog, signature
+    
+    def _install_catalog(
+        self,
+        catalog: Catalog,
+        signature: Optional[Tuple[int, int]],
+        discard_journal: bool = False
+    ) -> None:
+        """
+        Replay the journal onto a new Catalog and publish it.
+        
+        Must be called with the write lock held, so no journaled change can be
+        applied to the old catalog after the journal has been read.
+        
+        Args:
+            catalog: Newly built Catalog
+            signature: Signature of the JSON file the catalog was built from
+            discard_journal: Drop the journal instead of replaying it, because
+                             every entry was made against an older version of
+                             the file than the one the catalog was built from
+        """
+        journal_entries = self._journal.read_entries()
+        if discard_journal:
+            self._journal.clear()
+            if journal_entries:
+                logger.warning(
+                    f"{self.db_path} was changed externally; discarded {len(journal_entries)} "
+                    f"journal entries recorded against the previous version"
+                )
+        else:
+            for entry in journal_entries:
+                self._apply_change(catalog, entry)
+            if journal_entries:
+                logger.debug(f"Replayed {len(journal_entries)} journal entries")
+        
+        # Readers only ever dereference self._catalog once per call, so this
+        # assignment is the atomic swap; in-flight calls keep the old catalog
+        self._catalog = catalog
+        self._source_signature = signature
+        self._data_version += 1
+    
+    @property
+    def data_version(self) -> int:
+        """
+        Version number of the visible data.
+        
+        Incremented on every load, reload, save and change, so callers can
+        cache derived results and invalidate them when the version moves.
+        
+        Returns:
+            Current data version
+        """
+        return self._data_version
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the database if the JSON file was changed by someone else.
+        
+        Purpose (Why):
+        Inventory is edited while the service runs; stock answers must follow
+        without a restart and without stalling in-flight tool calls.
+        
+        Implementation (What):
+        Compares the file's (size, mtime_ns) with the signature of the current
+        catalog. On a change, builds a new Catalog without holding any lock
+        readers need, then takes the write lock only to swap the reference.
+        The edited file wins: journal entries not yet compacted were recorded
+        against the previous file and are discarded rather than replayed, so
+        they cannot override what the operator wrote. If the file is missing
+        or cannot be parsed (e.g. an editor is still writing it), the current
+        catalog is kept and the reload is retried on the next call.
+        
+        Returns:
+            True if a new catalog was installed, False otherwise
+        """
+        if self._catalog is None:
+            return False
+        signature = _file_signature(self.db_path)
+        if signature is None or signature == self._source_signature:
+            return False
+        
+        with self._reload_lock:
+            return self._reload_locked()
+    
+    def _reload_locked(self) -> bool:
+        """
+        Install a new catalog from the externally changed JSON file.
+        
+        Must be called with the reload lock held.
+        
+        Returns:
+            True if a new catalog was installed, False if the file is unchanged,
+            missing or unreadable
+        """
+        if _file_signature(self.db_path) in (None, self._source_signature):
+            return False
+        try:
+            catalog, signature = self._read_catalog()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Database reload skipped, keeping current data: {e}")
+            return False
+        with self._write_lock:
+            self._install_catalog(catalog, signature, discard_journal=True)
+        
+        logger.info(f"Database reloaded from {self.db_path} (version {self._data_version})")
+        return True
+    
+    def start_auto_reload(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> None:
+        """
+        Start a background thread that calls reload_if_changed() periodically.
+        
+        Args:
+            interval: Seconds between checks; 0 or less disables auto reload
+        """
+        if interval <= 0:
+            return
+        with self._write_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_stop = threading.Event()
+            self._reload_thread = threading.Thread(
+                target=self._auto_reload_loop,
+                args=(interval, self._reload_stop),
+                name="db-auto-reload",
+                daemon=True
+            )
+            self._reload_thread.start()
+        logger.debug(f"Database auto reload started (every {interval}s)")
+    
+    def stop_auto_reload(self) -> None:
+        """Stop the auto reload thread, if running."""
+        with self._write_lock:
+            thread, stop = self._reload_thread, self._reload_stop
+            self._reload_thread = None
+            self._reload_stop = None
+        if stop is not None:
+            stop.set()
+        if thread is not None:
+            thread.join()
+    
+    def _auto_reload_loop(self, interval: float, stop: threading.Event) -> None:
+        """Poll for changes until stopped; errors are logged, never raised."""
+        while not stop.wait(interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Database auto reload failed: {e}", exc_info=True)
+    
+    def ensure_loaded(self) -> None:
+        """
+        Load the database if it has not been loaded yet.
+        
+        Storage backends that do not keep the data in memory override this to
+        open their connections instead.
+        
+        Raises:
+            FileNotFoundError: If the database file doesn't exist
+            json.JSONDecodeError: If the JSON file is invalid
+        """
+        if self._catalog is None:
+            self._load_catalog()
     
     def save_db(self, data: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -122,8 +396,12 @@ class DatabaseManager:
         
         Implementation (What):
         Writes the database dictionary to JSON file with proper formatting.
-        Creates parent directories if they don't exist. Updates internal cache
-        after successful save. Uses UTF-8 encoding to support Hebrew characters.
+        Creates parent directories if they don't exist. The file is written to a
+        temporary file and renamed into place, so a crash never leaves a
+        truncated database. Updates internal cache, clears the change journal
+        (the file now contains every change) and rebuilds the Catalog indexes
+        (and the compiled snapshot) after successful save. Uses UTF-8 encoding
+        to support Hebrew characters.
         
         Args:
             data: Optional dictionary to save. If None, saves the cached _data.
@@ -139,15 +417,17 @@ class DatabaseManager:
             logger.error("Attempted to save database with no data available")
             raise ValueError("No data to save. Load database first or provide data parameter.")
         
-        # Ensure the directory exists
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
         logger.debug(f"Saving database to: {self.db_path}")
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        # Update cache
-        self._data = data
+        with self._compaction_lock, self._write_lock:
+            atomic_write_text(self.db_path, json.dumps(data, indent=2, ensure_ascii=False))
+            self._journal.clear()
+            
+            # Update cache and keep indexes consistent with the saved data
+            self._catalog = Catalog(data)
+            self._source_signature = _file_signature(self.db_path)
+            self._data_version += 1
+            if self.use_snapshot:
+                write_snapshot(self.db_path, self._catalog)
         logger.info("Database saved successfully")
     
     def get_medication_by_id(self, medication_id: str) -> Optional[Medication]:
@@ -160,9 +440,10 @@ class DatabaseManager:
         enabling efficient lookups for tool operations.
         
         Implementation (What):
-        Searches through the cached medications list for a matching ID. If data
-        is not loaded, automatically loads the database. Returns a validated
-        Pydantic Medication model instance if found.
+        Looks up the medication in the catalog's medication_id index (O(1)). If
+        data is not loaded, automatically loads the database. Returns the frozen
+        Medication model validated when the catalog was built (shared by all
+        callers) if found.
         
         Args:
             medication_id: The medication ID to search for
@@ -170,13 +451,13 @@ class DatabaseManager:
         Returns:
             Medication model instance if found, None otherwise
         """
-        if self._data is None:
-            self.load_db()
+        if self._catalog is None:
+            self._load_catalog()
         
-        for med_data in self._data.get("medications", []):
-            if med_data.get("medication_id") == medication_id:
-                logger.debug(f"Found medication: {medication_id}")
-                return Medication(**med_data)
+        medication = self._catalog.get_medication_model(medication_id)
+        if medication is not None:
+            logger.debug(f"Found medication: {medication_id}")
+            return medication
         
         logger.warning(f"Medication not found: {medication_id}")
         return None
@@ -191,9 +472,9 @@ class DatabaseManager:
         customer service operations.
         
         Implementation (What):
-        Searches through the cached users list for a matching ID. If data is
-        not loaded, automatically loads the database. Returns a validated
-        Pydantic User model instance if found.
+        Looks up the user in the catalog's user_id index (O(1)). If data is
+        not loaded, automatically loads the database. Returns the frozen User
+        model validated when the catalog was built if found.
         
         Args:
             user_id: The user ID to search for
@@ -201,13 +482,13 @@ class DatabaseManager:
         Returns:
             User model instance if found, None otherwise
         """
-        if self._data is None:
-            self.load_db()
+        if self._catalog is None:
+            self._load_catalog()
         
-        for user_data in self._data.get("users", []):
-            if user_data.get("user_id") == user_id:
-                logger.debug(f"Found user: {user_id}")
-                return User(**user_data)
+        user = self._catalog.get_user_model(user_id)
+        if user is not None:
+            logger.debug(f"Found user: {user_id}")
+            return user
         
         logger.warning(f"User not found: {user_id}")
         return None
@@ -222,9 +503,9 @@ class DatabaseManager:
         prescription validity for medication purchases.
         
         Implementation (What):
-        Filters the prescriptions list by user_id and returns all matching
-        records as validated Pydantic Prescription model instances. If data is
-        not loaded, automatically loads the database.
+        Reads the user's prescriptions from the catalog's user_id -> prescriptions
+        index and returns the frozen Prescription models validated when the
+        catalog was built. If data is not loaded, automatically loads the database.
         
         Args:
             user_id: The user ID to get prescriptions for
@@ -232,18 +513,57 @@ class DatabaseManager:
         Returns:
             List of Prescription model instances for the user (empty list if none found)
         """
-        if self._data is None:
-            self.load_db()
+        if self._catalog is None:
+            self._load_catalog()
         
-        prescriptions = []
-        for presc_data in self._data.get("prescriptions", []):
-            if presc_data.get("user_id") == user_id:
-                prescriptions.append(Prescription(**presc_data))
+        prescriptions = self._catalog.get_prescription_models_for_user(user_id)
         
         logger.debug(f"Found {len(prescriptions)} prescriptions for user: {user_id}")
         return prescriptions
     
-    def search_medications_by_name(self, name: str, language: Optional[str] = None) -> List[Medication]:
+    def get_prescription_view(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a user's prescriptions joined with their medication details.
+        
+        Purpose (Why):
+        Listing a user's prescriptions with medication names, ingredients and
+        instructions is the most common authenticated query. Joining on every
+        call costs one medication lookup and one result model per prescription.
+        
+        Implementation (What):
+        Returns copies of the rows the catalog materialized at load time and
+        keeps up to date as prescriptions and medications change, so the cost
+        is one dictionary lookup plus copying the user's rows. If one of the
+        records is invalid, falls back to joining the models on the fly, which
+        raises the ValidationError. If data is not loaded, automatically loads
+        the database.
+        
+        Args:
+            user_id: The user ID to get prescriptions for
+        
+        Returns:
+            List of prescription rows (see prescription_view.build_prescription_row)
+            in file order (empty list if none found)
+        """
+        if self._catalog is None:
+            self._load_catalog()
+        
+        rows = self._catalog.get_prescription_view(user_id)
+        if rows is None:
+            return [
+                build_prescription_row(prescription, self.get_medication_by_id(prescription.medication_id))
+                for prescription in self.get_prescriptions_by_user(user_id)
+            ]
+        
+        logger.debug(f"Found {len(rows)} prescription rows for user: {user_id}")
+        return copy_rows(rows)
+    
+    def search_medications_by_name(
+        self,
+        name: str,
+        language: Optional[str] = None,
+        ranked: bool = False
+    ) -> List[Medication]:
         """
         Search medications by name (supports Hebrew and English).
         
@@ -254,80 +574,75 @@ class DatabaseManager:
         
         Implementation (What):
         Performs case-insensitive partial matching against medication names in
-        the specified language(s). Searches both Hebrew and English names if
-        language is not specified. Prevents duplicate results by tracking
-        already-added medications. If data is not loaded, automatically loads
-        the database.
+        the specified language(s), brand names and active ingredients. Searches
+        both Hebrew and English names if language is not specified. Candidates
+        are narrowed with the catalog's n-gram MedicationSearchIndex and then
+        verified; matches are returned as the catalog's pre-validated models. If
+        data is not loaded, automatically loads the database.
         
         Args:
             name: The medication name to search for (case-insensitive, partial match)
             language: Optional language filter ('he' for Hebrew, 'en' for English).
                      If None, searches both languages.
+            ranked: If True, order results by match quality (exact name, then
+                    prefix, then substring) instead of catalog order.
         
         Returns:
             List of Medication model instances matching the search (empty list if none found)
         """
-        if self._data is None:
-            self.load_db()
+        if self._catalog is None:
+            self._load_catalog()
         
         if not name or not name.strip():
             logger.warning("Empty search name provided")
             return []
         
         name_lower = name.lower().strip()
-        results = []
-        
-        for med_data in self._data.get("medications", []):
-            medication_id = med_data.get("medication_id")
-            already_added = any(m.medication_id == medication_id for m in results)
-            
-            if already_added:
-                continue
-            
-            # Search in Hebrew name
-            if language is None or language == "he":
-                name_he = med_data.get("name_he", "").lower()
-                if name_lower in name_he:
-                    results.append(Medication(**med_data))
-                    continue
-            
-            # Search in English name
-            if language is None or language == "en":
-                name_en = med_data.get("name_en", "").lower()
-                if name_lower in name_en:
-                    results.append(Medication(**med_data))
-                    continue
-            
-            # Search in brand names (regardless of language filter)
-            # This allows finding medications by their brand names
-            # e.g., "Acamol" will find medications with "Acamol" in brand_names
-            brand_names = med_data.get("brand_names", [])
-            found_in_brands = False
-            for brand_name in brand_names:
-                if name_lower in brand_name.lower():
-                    results.append(Medication(**med_data))
-                    found_in_brands = True
-                    break
-            
-            if found_in_brands:
-                continue
-            
-            # Search in active ingredients (regardless of language filter)
-            # This allows finding medications by their active ingredient names
-            # e.g., "Paracetamol" will find medications with "Paracetamol" in active_ingredients
-            active_ingredients = med_data.get("active_ingredients", [])
-            for ingredient in active_ingredients:
-                ingredient_lower = ingredient.lower()
-                # Extract the base ingredient name (before dosage info like "500mg")
-                # e.g., "Paracetamol 500mg" -> "paracetamol"
-                ingredient_base = ingredient_lower.split()[0] if ingredient_lower.split() else ""
-                if name_lower in ingredient_lower or name_lower == ingredient_base:
-                    results.append(Medication(**med_data))
-                    break
+        catalog = self._catalog
+        results = [
+            catalog.medication_model_for(med_data)
+            for med_data in catalog.medication_search.search(name_lower, language, ranked)
+        ]
         
         logger.debug(f"Search for '{name}' (lang={language}) found {len(results)} results")
         return results
     
+    def suggest_medications(self, name: str, limit: int = 5) -> List[Medication]:
+        """
+        Suggest medications whose names are close to a (possibly misspelled) name.
+        
+        Purpose (Why):
+        When a search finds nothing, the agent should be able to offer "did you
+        mean" alternatives for typos such as "Acamoll" or "Ibuprofn".
+        
+        Implementation (What):
+        Probes the catalog's FuzzyMatcher once (bounded number of dictionary
+        lookups, independent of catalog size) and returns the closest
+        medications by edit distance over names, brand names and ingredient
+        base names. If data is not loaded, automatically loads the database.
+        
+        Args:
+            name: The medication name that was searched for
+            limit: Maximum number of medications to return
+        
+        Returns:
+            List of Medication model instances, best match first (empty list if none)
+        """
+        if self._catalog is None:
+            self._load_catalog()
+        
+        if not name or not name.strip():
+            return []
+        
+        catalog = self._catalog
+        results = [
+            catalog.medication_model_for(med_data)
+            for med_data, _ in catalog.medication_fuzzy.lookup(name, limit)
+        ]
+        
+        logger.debug(f"Suggestions for '{name}' found {len(results)} medications")
+        return results
+    
     def search_users_by_name_or_email(self, name_or_email: str) -> List[User]:
         """
         Search users by name or email address.
@@ -341,8 +656,9 @@ class DatabaseManager:
         Implementation (What):
         Performs case-insensitive partial matching against user names and email
         addresses. Searches both fields simultaneously and returns all matching
-        users. If data is not loaded, automatically loads the database. Returns
-        empty list if no matches found.
+        users as the catalog's shared User instances (no validation per
+        search), each user once. If data is not loaded, automatically loads
+        the database. Returns empty list if no matches found.
         
         Args:
             name_or_email: The name or email address to search for (case-insensitive, partial match)
@@ -350,35 +666,315 @@ class DatabaseManager:
         Returns:
             List of User model instances matching the search (empty list if none found)
         """
-        if self._data is None:
-            self.load_db()
+        if self._catalog is None:
+            self._load_catalog()
         
         if not name_or_email or not name_or_email.strip():
             logger.warning("Empty search name_or_email provided")
             return []
         
         search_term = name_or_email.lower().strip()
+        catalog = self._catalog
         results = []
+        seen = set()
         
-        for user_data in self._data.get("users", []):
+        for user_data in catalog.records("users"):
             user_id = user_data.get("user_id")
-            already_added = any(u.user_id == user_id for u in results)
-            
-            if already_added:
+            if user_id in seen:
                 continue
             
-            # Search in name
+            # Search in name, then in email
             name = user_data.get("name", "").lower()
-            if search_term in name:
-                results.append(User(**user_data))
-                continue
-            
-            # Search in email
             email = user_data.get("email", "").lower()
-            if search_term in email:
-                results.append(User(**user_data))
-                continue
+            if search_term in name or search_term in email:
+                results.append(catalog.user_model_for(user_data))
+                seen.add(user_id)
         
         logger.debug(f"Search for '{name_or_email}' found {len(results)} users")
         return results
+    
+    def decrement_stock(self, medication_id: str, quantity: int = 1) -> Optional[Medication]:
+        """
+        Decrease the stock of a medication.
+        
+        Purpose (Why):
+        Records a dispensed quantity without rewriting the whole database file,
+        so stock updates cost O(change) and can be issued at high rates.
+        
+        Implementation (What):
+        Updates the medication record in memory (the Catalog indexes share the
+        record, so no rebuild is needed), marks the medication unavailable when
+        the quantity reaches zero, and appends the new absolute stock values to
+        the change journal. Triggers background compaction when the journal
+        grows past compaction_threshold. If data is not loaded, automatically
+        loads the database.
+        
+        Args:
+            medication_id: The medication ID to update
+            quantity: Quantity to remove from stock (must be positive)
+        
+        Returns:
+            Updated Medication model instance, or None if the medication was not found
+        
+        Raises:
+            ValueError: If quantity is not positive or exceeds the stock on hand
+        """
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be positive, got {quantity}")
+        
+        with self._write_lock:
+            if self._catalog is None:
+                self._load_catalog()
+            
+            med_data = self._catalog.get_medication(medication_id)
+            if med_data is None:
+                logger.warning(f"Medication not found: {medication_id}")
+                return None
+            
+            stock = med_data.get("stock", {})
+            in_stock = stock.get("quantity_in_stock", 0)
+            if quantity > in_stock:
+                raise ValueError(
+                    f"Insufficient stock for {medication_id}: requested {quantity}, available {in_stock}"
+                )
+            
+            entry = {
+                "op": "stock",
+                "medication_id": medication_id,
+                "quantity_in_stock": in_stock - quantity,
+                "available": in_stock - quantity > 0
+            }
+            self._journal.append(entry)
+            self._apply_change(self._catalog, entry)
+            self._data_version += 1
+            medication = self._catalog.medication_model_for(med_data)
+        
+        logger.debug(f"Stock of {medication_id} decreased by {quantity} to {entry['quantity_in_stock']}")
+        self._maybe_schedule_compaction()
+        return medication
+    
+    def record_prescription_refill(self, prescription_id: str) -> Optional[Prescription]:
+        """
+        Record that a prescription has been refilled.
+        
+        Purpose (Why):
+        Uses up one refill of a prescription without rewriting the whole
+        database file.
+        
+        Implementation (What):
+        Decrements refills_remaining on the prescription record in memory and
+        appends the new absolute value to the change journal. Triggers
+        background compaction when the journal grows past compaction_threshold.
+        If data is not loaded, automatically loads the database.
+        
+        Args:
+            prescription_id: The prescription ID to refill
+        
+        Returns:
+            Updated Prescription model instance, or None if the prescription was not found
+        
+        Raises:
+            ValueError: If the prescription is not active or has no refills remaining
+        """
+        with self._write_lock:
+            if self._catalog is None:
+                self._load_catalog()
+            
+            presc_data = self._catalog.get_prescription(prescription_id)
+            if presc_data is None:
+                logger.warning(f"Prescription not found: {prescription_id}")
+                return None
+            
+            if presc_data.get("status") != "active":
+                raise ValueError(f"Prescription {prescription_id} is not active")
+            refills_remaining = presc_data.get("refills_remaining", 0)
+            if refills_remaining <= 0:
+                raise ValueError(f"Prescription {prescription_id} has no refills remaining")
+            
+            entry = {
+                "op": "refill",
+                "prescription_id": prescription_id,
+                "refills_remaining": refills_remaining - 1
+            }
+            self._journal.append(entry)
+            self._apply_change(self._catalog, entry)
+            self._data_version += 1
+            prescription = self._catalog.prescription_model_for(presc_data)
+        
+        logger.debug(f"Prescription {prescription_id} refilled, {entry['refills_remaining']} refills remaining")
+        self._maybe_schedule_compaction()
+        return prescription
+    
+    def compact(self) -> None:
+        """
+        Fold the change journal into the main JSON file.
+        
+        Purpose (Why):
+        Keeps the journal short so that loading stays fast, while the expensive
+        full-file write happens off the request path.
+        
+        Implementation (What):
+        Under the reload lock, first compares the file with the signature of
+        the loaded data; if it was edited externally since the last poll, the
+        edit is reloaded instead and nothing is written. Under the write lock,
+        serializes the current data and rotates the journal (new changes go to
+        a fresh journal file); with use_snapshot the same state is encoded as
+        a snapshot. The serialized data is then written atomically without
+        holding the write lock, followed by the snapshot (stamped with the
+        signature of the file just written, so the next load does not fall
+        back to parsing JSON), and the rotated journal is deleted. A crash at any point leaves either the old file plus both
+        journals or the new file plus journals whose absolute values are
+        already in it, so replay on load is always correct.
+        """
+        with self._compaction_lock, self._reload_lock:
+            if self._catalog is None:
+                return
+            if _file_signature(self.db_path) != self._source_signature:
+                # Writing now would overwrite an edit the poller has not seen yet
+                logger.info("Database file changed externally, reloading instead of compacting")
+                self._reload_locked()
+                return
+            with self._write_lock:
+                text = json.dumps(self._data, indent=2, ensure_ascii=False)
+                snapshot = encode_snapshot(self._catalog) if self.use_snapshot else None
+                self._journal.rotate()
+            
+            atomic_write_text(self.db_path, text)
+            if snapshot is not None:
+                # Same contents as the file just written, so it is current for its signature
+                write_encoded_snapshot(self.db_path, snapshot)
+            self._journal.finish_rotation()
+            with self._write_lock:
+                # Our own write must not look like an external change
+                self._source_signature = _file_signature(self.db_path)
+        logger.info("Database journal compacted")
+    
+    def _maybe_schedule_compaction(self) -> None:
+        """
+        Start a background compaction if the journal is large enough.
+        
+        Only one compaction thread runs at a time.
+        """
+        if self._journal.entry_count < self.compaction_threshold:
+            return
+        with self._write_lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self._compact_in_background,
+                name="db-journal-compaction",
+                daemon=True
+            )
+            self._compaction_thread.start()
+    
+    def _compact_in_background(self) -> None:
+        """Run compact() and log failures (the journal keeps all changes)."""
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Background journal compaction failed: {e}", exc_info=True)
+    
+    @staticmethod
+    def _apply_change(catalog: Catalog, entry: Dict[str, Any]) -> None:
+        """
+        Apply one journal entry to the records of a catalog.
+        
+        The changed record's cached model is re-validated so readers never see
+        a model that disagrees with its record.
+        
+        Args:
+            catalog: Catalog whose records are updated in place
+            entry: Journal entry written by decrement_stock or record_prescription_refill
+        """
+        op = entry.get("op")
+        if op == "stock":
+            med_data = catalog.get_medication(entry.get("medication_id"))
+            if med_data is not None:
+                stock = med_data.setdefault("stock", {})
+                stock["quantity_in_stock"] = entry["quantity_in_stock"]
+                stock["available"] = entry["available"]
+                catalog.refresh_medication(entry.get("medication_id"))
+        elif op == "refill":
+            presc_data = catalog.get_prescription(entry.get("prescription_id"))
+            if presc_data is not None:
+                presc_data["refills_remaining"] = entry["refills_remaining"]
+                catalog.refresh_prescription(entry.get("prescription_id"))
+        else:
+            logger.warning(f"Ignoring unknown journal entry: {op}")
+
+
+
+def create_db_manager() -> DatabaseManager:
+    """
+    Create a DatabaseManager for the configured storage backend.
+    
+    Purpose (Why):
+    Lets deployments switch from the JSON file to the SQLite backend without
+    code changes.
+    
+    Implementation (What):
+    Reads DATABASE_BACKEND ("json" by default, or "sqlite"). The SQLite backend
+    uses SQLITE_DB_PATH (default "data/database.sqlite3"), which can be created
+    from the JSON file with `python -m app.database.migrate_to_sqlite`.
+    
+    Returns:
+        DatabaseManager: A new, not yet loaded manager
+    
+    Raises:
+        ValueError: If DATABASE_BACKEND is not a known backend
+    """
+    backend = os.getenv("DATABASE_BACKEND", "json").lower()
+    if backend == "json":
+        return DatabaseManager()
+    if backend == "sqlite":
+        from app.database.sqlite_backend import SQLiteDatabaseManager
+        return SQLiteDatabaseManager(os.getenv("SQLITE_DB_PATH", "data/database.sqlite3"))
+    raise ValueError(f"Unknown DATABASE_BACKEND: {backend} (expected 'json' or 'sqlite')")
+
+
+# Process-wide shared DatabaseManager instance
+# All tools and the login path use this single instance so the database is
+# parsed once per process and only one in-memory copy exists
+_shared_db_manager: Optional[DatabaseManager] = None
+_shared_db_manager_lock = threading.Lock()
 
+
+def get_db_manager() -> DatabaseManager:
+    """
+    Get or create the process-wide shared DatabaseManager instance.
+    
+    Purpose (Why):
+    Each tool module used to keep its own DatabaseManager, and the login path
+    created a new one per login, so the database file was parsed several times
+    and held in memory several times. A single shared, lazily-loaded instance
+    keeps one copy per process and makes login latency independent of
+    database size.
+    
+    Implementation (What):
+    Uses double-checked locking: the fast path reads the module-level instance
+    without locking; only the first caller takes the lock, creates the
+    DatabaseManager for the configured backend (create_db_manager) and loads
+    the database before publishing it, so other threads never observe a
+    half-loaded instance. The shared instance polls the database file for
+    external changes every DATABASE_RELOAD_INTERVAL seconds (default 2, 0
+    disables) and hot-swaps the reloaded data.
+    
+    Returns:
+        DatabaseManager: The shared, already-loaded DatabaseManager instance
+    
+    Raises:
+        FileNotFoundError: If the database file doesn't exist on first load
+        json.JSONDecodeError: If the JSON file is invalid on first load
+    """
+    global _shared_db_manager
+    db_manager = _shared_db_manager
+    if db_manager is None:
+        with _shared_db_manager_lock:
+            if _shared_db_manager is None:
+                logger.debug("Creating shared DatabaseManager instance")
+                new_manager = create_db_manager()
+                new_manager.ensure_loaded()
+                new_manager.start_auto_reload(float(os.getenv("DATABASE_RELOAD_INTERVAL", DEFAULT_RELOAD_INTERVAL)))
+                _shared_db_manager = new_manager
+            db_manager = _shared_db_manager
+    return db_manager
@@ -0,0 +1,262 @@
+"""
+Edit-distance fuzzy matcher for medication suggestions.
+
+Purpose (Why):
+When a medication name is misspelled ("Acamoll", "Ibuprofn") the substring
+search finds nothing, and retrying with the first three characters produces
+suggestions that are often unrelated to what the user meant. A ranked fuzzy
+matcher finds the medications whose names are within a small edit distance of
+the query, and does so in bounded time regardless of catalog size.
+
+Implementation (What):
+Implements FuzzyMatcher, a SymSpell-style deletion dictionary built once per
+Catalog. Every medication term (Hebrew name, English name, brand names and
+active-ingredient base names, lowercased) is reduced to its first
+PREFIX_LENGTH characters, and all variants obtained by deleting up to
+MAX_EDIT_DISTANCE characters are mapped back to the terms that produced them.
+A query generates the same deletion variants, each of which is one dictionary
+lookup; the resulting terms are verified with the optimal string alignment
+(Damerau-Levenshtein) distance and ranked by distance.
+"""
+
+import logging
+from typing import Dict, Any, Collection, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Maximum edit distance considered a plausible typo
+MAX_EDIT_DISTANCE = 2
+
+# Only this many leading characters of each term are expanded into deletion
+# variants, which bounds index size and query cost for long names
+PREFIX_LENGTH = 7
+
+
+def _deletes(text: str, max_distance: int) -> Set[str]:
+    """
+    Generate all variants of text with up to max_distance characters deleted.
+
+    Args:
+        text: Text to generate deletion variants for
+        max_distance: Maximum number of deleted characters
+
+    Returns:
+        Set of variants, including text itself
+    """
+    variants = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for variant in frontier:
+            for i in range(len(variant)):
+                next_frontier.add(variant[:i] + variant[i + 1:])
+        next_frontier -= variants
+        variants |= next_frontier
+        frontier = next_frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Compute the optimal string alignment distance between two strings.
+
+    Purpose (Why):
+    Counts insertions, deletions, substitutions and adjacent transpositions,
+    which covers the common typing mistakes ("Ibuprofn", "Acamlo").
+
+    Implementation (What):
+    Classic dynamic programming over two rows plus the row before them (for
+    transpositions). Stops early once every value in a row exceeds
+    max_distance.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Distances above this value are not of interest
+
+    Returns:
+        The distance, or None if it is greater than max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+
+    distance = previous[len(b)]
+    return distance if distance <= max_distance else None
+
+
+def allowed_distance(query: str) -> int:
+    """
+    Get the maximum edit distance allowed for a query of this length.
+
+    Short queries get a smaller budget, otherwise almost every short term
+    would be within two edits.
+
+    Args:
+        query: Lowercased query
+
+    Returns:
+        Allowed edit distance (0 to MAX_EDIT_DISTANCE)
+    """
+    if len(query) < 3:
+        return 0
+    if len(query) < 6:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def _ingredient_base_names(ingredient: str) -> List[str]:
+    """
+    Get the base names of an active ingredient, without dosage information.
+
+    Args:
+        ingredient: Lowercased ingredient, e.g. "metformin hydrochloride 500mg"
+
+    Returns:
+        Base names, e.g. ["metformin hydrochloride", "metformin"]
+    """
+    words = [word for word in ingredient.split() if not any(ch.isdigit() for ch in word)]
+    if not words:
+        return []
+    names = [" ".join(words)]
+    if len(words) > 1:
+        names.append(words[0])
+    return names
+
+
+class FuzzyMatcher:
+    """
+    SymSpell-style deletion dictionary over medication terms.
+
+    Purpose (Why):
+    Provides ranked "did you mean" suggestions for misspelled medication
+    names with a bounded number of dictionary lookups per query.
+
+    Implementation (What):
+    Keeps term -> medication positions and deletion variant -> terms maps.
+    A lookup expands the query prefix into deletion variants, gathers the
+    terms they point to, verifies each with edit_distance() and returns the
+    medications ordered by (distance, length difference, catalog order).
+    Both maps can also be passed in prebuilt (e.g. from a memory-mapped
+    snapshot).
+
+    Attributes:
+        _records: Medication records in catalog order
+        _term_positions: term -> positions of the medications it belongs to
+        _deletes: deletion variant -> terms
+    """
+
+    def __init__(
+        self,
+        medications: Sequence[Dict[str, Any]],
+        term_positions: Optional[Mapping[str, Collection[int]]] = None,
+        deletes: Optional[Mapping[str, Collection[str]]] = None
+    ):
+        """
+        Build the deletion dictionary from a list of medication records.
+
+        Args:
+            medications: Raw medication record dictionaries in catalog order
+            term_positions: Prebuilt term -> positions mapping over the same records
+            deletes: Prebuilt deletion variant -> terms mapping; if both maps
+                     are given, nothing is built
+        """
+        self._records = medications
+        if term_positions is not None and deletes is not None:
+            self._term_positions = term_positions
+            self._deletes = deletes
+            return
+
+        self._term_positions: Dict[str, List[int]] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+
+        for position, med in enumerate(medications):
+            terms = [med.get("name_he", ""), med.get("name_en", "")]
+            terms.extend(med.get("brand_names", []))
+            terms = [term.lower().strip() for term in terms]
+            for ingredient in med.get("active_ingredients", []):
+                terms.extend(_ingredient_base_names(ingredient.lower()))
+
+            for term in terms:
+                if not term:
+                    continue
+                positions = self._term_positions.setdefault(term, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        for term in self._term_positions:
+            for variant in _deletes(term[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self._deletes.setdefault(variant, set()).add(term)
+
+        logger.debug(f"Fuzzy matcher built: {len(self._term_positions)} terms, {len(self._deletes)} variants")
+
+    @property
+    def term_positions(self) -> Mapping[str, Collection[int]]:
+        """term -> positions of the medications it belongs to."""
+        return self._term_positions
+
+    @property
+    def deletes(self) -> Mapping[str, Collection[str]]:
+        """deletion variant -> terms."""
+        return self._deletes
+
+    def lookup(self, query: str, limit: int = 5) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        Find the medications whose terms are closest to the query.
+
+        Args:
+            query: Search query (case-insensitive)
+            limit: Maximum number of medications to return
+
+        Returns:
+            List of (medication record, edit distance) tuples, best first,
+            one per medication_id
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
+        max_distance = allowed_distance(query)
+
+        prefix = query[:PREFIX_LENGTH]
+        terms: Set[str] = set()
+        for variant in _deletes(prefix, max_distance):
+            terms.update(self._deletes.get(variant, ()))
+
+        scored = []
+        for term in terms:
+            distance = edit_distance(query, term, max_distance)
+            if distance is None:
+                continue
+            for position in self._term_positions[term]:
+                scored.append((distance, abs(len(term) - len(query)), position))
+        scored.sort()
+
+        results = []
+        seen_ids = set()
+        for distance, _, position in scored:
+            record = self._records[position]
+            medication_id = record.get("medication_id")
+            if medication_id in seen_ids:
+                continue
+            seen_ids.add(medication_id)
+            results.append((record, distance))
+            if len(results) >= limit:
+                break
+        return results
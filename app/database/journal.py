@@ -0,0 +1,215 @@
+"""
+Append-only change journal and atomic file writes for the pharmacy database.
+
+Purpose (Why):
+save_db() rewrites the whole JSON file for every change, which costs
+O(database size) for a single stock decrement, and writing in place means a
+crash mid-write leaves a truncated, unreadable database. Small, frequent
+changes (stock decrements, prescription refills) must instead cost O(change)
+and the main file must only ever be replaced as a whole.
+
+Implementation (What):
+atomic_write_text() writes to a temporary file in the target directory,
+fsyncs it and renames it over the target with os.replace(), so readers see
+either the old or the new file. ChangeJournal appends one JSON line per change
+to a journal file next to the database (database.json -> database.journal).
+Entries record absolute post-change values, so replaying an entry twice is
+harmless. During compaction the active journal is rotated to a ".compacting"
+file; both files are replayed on load (older first) until compaction has
+rewritten the main file and removed the rotated journal. A torn last line
+(crash mid-append) is ignored on replay.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Atomically replace a file with the given text.
+
+    Args:
+        path: Target file path
+        text: Full new content (written as UTF-8)
+
+    Raises:
+        OSError: If the file cannot be written or renamed
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def journal_path_for(source_path: Path) -> Path:
+    """
+    Get the journal path for a JSON database file.
+
+    Args:
+        source_path: Path to the JSON database file
+
+    Returns:
+        Path of the journal file next to it
+    """
+    return source_path.with_suffix(".journal")
+
+
+def _read_journal_file(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read all complete entries of a journal file.
+
+    Args:
+        path: Journal file path
+
+    Returns:
+        List of entry dictionaries in append order (empty if the file is missing)
+    """
+    if not path.exists():
+        return []
+
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable journal entry {path}:{line_number}")
+    return entries
+
+
+class ChangeJournal:
+    """
+    Append-only JSONL journal of database changes.
+
+    Purpose (Why):
+    Makes each change durable by appending one short line instead of
+    rewriting the whole database file.
+
+    Implementation (What):
+    Keeps the journal file open in append mode behind a lock. append() writes
+    and flushes one line (and fsyncs it when fsync is True). rotate() moves the
+    active journal aside for compaction and starts a new one; finish_rotation()
+    deletes the rotated file once its changes are in the main database file.
+
+    Attributes:
+        path: Active journal file path
+        rotated_path: Journal file being compacted
+        fsync: Whether every append is fsynced to disk
+        entry_count: Number of entries in the active journal
+    """
+
+    def __init__(self, path: Path, fsync: bool = False):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Active journal file path
+            fsync: Whether to fsync after every append (default: False, flush only)
+        """
+        self.path = path
+        self.rotated_path = path.with_name(path.name + ".compacting")
+        self.fsync = fsync
+        self.entry_count = len(_read_journal_file(path))
+        self._file = None
+        self._lock = threading.Lock()
+
+    def read_entries(self) -> List[Dict[str, Any]]:
+        """
+        Read all entries that are not yet in the main database file.
+
+        Returns:
+            Entries of the rotated journal (if any) followed by the active journal
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            return _read_journal_file(self.rotated_path) + _read_journal_file(self.path)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        Append one change entry.
+
+        Args:
+            entry: JSON-serializable change description
+
+        Raises:
+            OSError: If the journal cannot be written
+        """
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.entry_count += 1
+
+    def rotate(self) -> None:
+        """
+        Move the active journal aside so compaction can start.
+
+        Entries appended after this call go to a new active journal. If an
+        earlier rotation was never finished, the active entries are appended
+        to the rotated file instead of overwriting it.
+        """
+        with self._lock:
+            self._close()
+            if not self.path.exists():
+                self.entry_count = 0
+                return
+            if self.rotated_path.exists():
+                with open(self.rotated_path, "a", encoding="utf-8") as rotated, \
+                        open(self.path, "r", encoding="utf-8") as active:
+                    rotated.write(active.read())
+                os.unlink(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+            self.entry_count = 0
+
+    def finish_rotation(self) -> None:
+        """Delete the rotated journal after its changes have been compacted."""
+        with self._lock:
+            try:
+                os.unlink(self.rotated_path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Delete all journal files (the main file already contains every change)."""
+        with self._lock:
+            self._close()
+            for path in (self.path, self.rotated_path):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            self.entry_count = 0
+
+    def _close(self) -> None:
+        """Close the active journal file handle (lock must be held)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
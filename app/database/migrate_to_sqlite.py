@@ -0,0 +1,78 @@
+"""
+Migration command: import the JSON pharmacy database into SQLite.
+
+Purpose (Why):
+Switching DATABASE_BACKEND to "sqlite" requires an SQLite database file with
+the same content as data/database.json.
+
+Implementation (What):
+Loads the JSON database (including any journaled changes) with the JSON
+DatabaseManager and imports it into an SQLiteDatabaseManager in a single
+transaction, replacing any previous content.
+
+Usage:
+    python -m app.database.migrate_to_sqlite [--source data/database.json] [--target data/database.sqlite3]
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+from app.database.db import DatabaseManager
+from app.database.sqlite_backend import SQLiteDatabaseManager
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+
+def migrate(source: str, target: str) -> SQLiteDatabaseManager:
+    """
+    Import a JSON database file into an SQLite database file.
+
+    Args:
+        source: Path to the JSON database (relative to the project root or absolute)
+        target: Path to the SQLite database to create or replace
+
+    Returns:
+        SQLiteDatabaseManager for the migrated database
+
+    Raises:
+        FileNotFoundError: If the JSON database doesn't exist
+        json.JSONDecodeError: If the JSON file is invalid
+    """
+    data = DatabaseManager(db_path=source, use_snapshot=False).load_db()
+    sqlite_manager = SQLiteDatabaseManager(db_path=target)
+    sqlite_manager.save_db(data)
+    logger.info(
+        f"Migrated {len(data.get('users', []))} users, {len(data.get('medications', []))} medications "
+        f"and {len(data.get('prescriptions', []))} prescriptions to {sqlite_manager.db_path}"
+    )
+    return sqlite_manager
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the migration command.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code (0 on success, 1 on failure)
+    """
+    parser = argparse.ArgumentParser(description="Import data/database.json into an SQLite database.")
+    parser.add_argument("--source", default="data/database.json", help="JSON database path")
+    parser.add_argument("--target", default="data/database.sqlite3", help="SQLite database path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    try:
+        migrate(args.source, args.target).close()
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
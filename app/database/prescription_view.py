@@ -0,0 +1,98 @@
+"""
+Denormalized prescription rows (prescription joined with its medication).
+
+Purpose (Why):
+Listing a user's prescriptions is the most common authenticated query. Each
+prescription is shown together with its medication's names, ingredients and
+instructions, so answering it from the normalized data means one medication
+lookup and one result model per prescription on every call.
+
+Implementation (What):
+build_prescription_row() produces the joined row as a plain dictionary with
+the same keys and order as the tools' PrescriptionInfo schema. The JSON
+Catalog materializes these rows per user at load time and rebuilds only the
+affected rows when a prescription or a medication changes; the SQLite backend
+builds them with a single JOIN. copy_rows() hands out copies so callers can
+never modify the materialized view.
+"""
+
+from typing import Any, Dict, List, Optional
+from app.models.medication import Medication
+from app.models.prescription import Prescription
+
+# Medication fields used for prescriptions whose medication does not exist
+UNKNOWN_MEDICATION_FIELDS: Dict[str, Any] = {
+    "medication_name_he": "Unknown",
+    "medication_name_en": "Unknown",
+    "active_ingredients": [],
+    "dosage_forms": [],
+    "dosage_instructions": None,
+    "usage_instructions": None,
+    "description": None,
+}
+
+
+def medication_fields(medication: Optional[Medication]) -> Dict[str, Any]:
+    """
+    Get the medication part of a prescription row.
+
+    Args:
+        medication: The prescribed medication, or None if it does not exist
+
+    Returns:
+        Dictionary with the medication_* and instruction fields of a row
+    """
+    if medication is None:
+        return dict(UNKNOWN_MEDICATION_FIELDS)
+    return {
+        "medication_name_he": medication.name_he,
+        "medication_name_en": medication.name_en,
+        "active_ingredients": list(medication.active_ingredients),
+        "dosage_forms": list(medication.dosage_forms),
+        "dosage_instructions": medication.dosage_instructions,
+        "usage_instructions": medication.usage_instructions,
+        "description": medication.description,
+    }
+
+
+def build_prescription_row(prescription: Prescription, medication: Optional[Medication]) -> Dict[str, Any]:
+    """
+    Join a prescription with its medication.
+
+    Args:
+        prescription: The prescription
+        medication: The prescribed medication, or None if it does not exist
+
+    Returns:
+        Dictionary equal to PrescriptionInfo(...).model_dump() for this pair
+    """
+    row = {
+        "prescription_id": prescription.prescription_id,
+        "medication_id": prescription.medication_id,
+    }
+    row.update(medication_fields(medication))
+    row.update({
+        "prescribed_by": prescription.prescribed_by,
+        "prescription_date": prescription.prescription_date,
+        "expiry_date": prescription.expiry_date,
+        "quantity": prescription.quantity,
+        "refills_remaining": prescription.refills_remaining,
+        "status": prescription.status,
+    })
+    return row
+
+
+def copy_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copy prescription rows, including their list values.
+
+    Args:
+        rows: Materialized prescription rows
+
+    Returns:
+        New list of new dictionaries that can be modified by the caller
+    """
+    return [
+        {key: list(value) if isinstance(value, list) else value for key, value in row.items()}
+        for row in rows
+    ]
@@ -0,0 +1,265 @@
+"""
+N-gram inverted index for medication name search.
+
+Purpose (Why):
+search_medications_by_name used to lowercase every name, brand name and active
+ingredient of every medication on every query and test each one with a
+substring check, which is O(N * L) per query. On catalogs of 50k+ medications
+that is far too slow for an interactive tool call. An inverted index narrows
+the search to the few medications that can possibly match before any string
+comparison is done.
+
+Implementation (What):
+Implements MedicationSearchIndex, built once per Catalog. Every searchable
+field (name_he, name_en, brand_names, active_ingredients) is lowercased once
+at build time and split into character n-grams (1 to 3 characters, so both
+Hebrew and English work without tokenization rules). Each n-gram maps to the
+set of medication positions containing it. A query is answered by
+intersecting the posting sets of its n-grams (smallest first) and then
+verifying the surviving candidates with the same substring rules as the
+original linear search, so results and ordering are unchanged. Results can
+optionally be ordered by match quality (exact, prefix, substring).
+"""
+
+import logging
+from typing import Dict, Any, Collection, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Maximum n-gram length stored in the index. Queries longer than this are
+# narrowed with all of their trigrams; shorter queries use a single n-gram.
+NGRAM_SIZE = 3
+
+# Match quality ranks (lower is better)
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SUBSTRING = 2
+
+
+def _ngrams(text: str, size: int) -> Set[str]:
+    """
+    Split text into the set of its character n-grams of the given size.
+
+    Args:
+        text: Lowercased text to split
+        size: N-gram length
+
+    Returns:
+        Set of n-grams (empty if text is shorter than size)
+    """
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class _SearchEntry:
+    """
+    Pre-lowercased searchable fields of a single medication.
+
+    Attributes:
+        record: The raw medication record dictionary
+        name_he: Lowercased Hebrew name
+        name_en: Lowercased English name
+        brand_names: Lowercased brand names
+        active_ingredients: Lowercased active ingredients
+    """
+
+    __slots__ = ("record", "name_he", "name_en", "brand_names", "active_ingredients")
+
+    def __init__(self, record: Dict[str, Any]):
+        self.record = record
+        self.name_he = record.get("name_he", "").lower()
+        self.name_en = record.get("name_en", "").lower()
+        self.brand_names = tuple(b.lower() for b in record.get("brand_names", []))
+        self.active_ingredients = tuple(i.lower() for i in record.get("active_ingredients", []))
+
+    def texts(self) -> Tuple[str, ...]:
+        """Return all searchable texts of this entry."""
+        return (self.name_he, self.name_en) + self.brand_names + self.active_ingredients
+
+    def match_rank(self, query: str, language: Optional[str]) -> Optional[int]:
+        """
+        Check whether the entry matches a lowercased query and how well.
+
+        Purpose (Why):
+        Candidates from the index are a superset of the real matches (their
+        n-grams may come from different fields), so each one is verified with
+        the exact rules of the original linear search. The rank lets callers
+        prefer "Acamol" over a medication that merely contains "acamol".
+
+        Implementation (What):
+        Hebrew and English names are only checked when allowed by the language
+        filter; brand names and active ingredients are always checked. An
+        ingredient matches on substring, which also covers the previous
+        "equals the base ingredient name" rule. The best field decides the
+        rank: exact match, then prefix match, then any substring match.
+
+        Args:
+            query: Lowercased, stripped search query
+            language: Optional language filter ('he' or 'en')
+
+        Returns:
+            RANK_EXACT, RANK_PREFIX or RANK_SUBSTRING, or None if the entry does not match
+        """
+        fields = list(self.brand_names + self.active_ingredients)
+        if language is None or language == "he":
+            fields.append(self.name_he)
+        if language is None or language == "en":
+            fields.append(self.name_en)
+
+        best = None
+        for field in fields:
+            if query not in field:
+                continue
+            if field == query:
+                return RANK_EXACT
+            rank = RANK_PREFIX if field.startswith(query) else RANK_SUBSTRING
+            if best is None or rank < best:
+                best = rank
+        return best
+
+
+def match_medication(record: Dict[str, Any], query: str, language: Optional[str] = None) -> Optional[int]:
+    """
+    Check whether a single medication record matches a query and how well.
+
+    Used by storage backends that narrow candidates themselves (e.g. SQLite
+    full-text search) but must apply the same matching and ranking rules.
+
+    Args:
+        record: Raw medication record dictionary
+        query: Lowercased, stripped search query
+        language: Optional language filter ('he' or 'en')
+
+    Returns:
+        RANK_EXACT, RANK_PREFIX or RANK_SUBSTRING, or None if the record does not match
+    """
+    return _SearchEntry(record).match_rank(query, language)
+
+
+class MedicationSearchIndex:
+    """
+    Inverted n-gram index over medication names, brands and ingredients.
+
+    Purpose (Why):
+    Provides sub-millisecond partial-name medication search by touching only
+    the medications whose text contains every n-gram of the query.
+
+    Implementation (What):
+    Stores one _SearchEntry per medication (in catalog order) and a postings
+    dictionary mapping each 1-, 2- and 3-gram to the set of entry positions
+    that contain it. Search intersects postings, sorts the candidate positions
+    to keep catalog order, verifies each candidate and skips duplicate
+    medication IDs. An index over prebuilt postings (e.g. from a memory-mapped
+    snapshot) creates the entries of its candidates per query instead.
+
+    Attributes:
+        _records: Medication records in catalog order
+        _entries: Searchable entries in catalog order (None with prebuilt postings)
+        _postings: n-gram -> entry positions
+    """
+
+    def __init__(
+        self,
+        medications: Sequence[Dict[str, Any]],
+        postings: Optional[Mapping[str, Collection[int]]] = None
+    ):
+        """
+        Build the index from a list of medication records.
+
+        Args:
+            medications: Raw medication record dictionaries in catalog order
+            postings: Prebuilt n-gram -> positions mapping over the same records;
+                      if given, nothing is built
+        """
+        self._records = medications
+        if postings is not None:
+            self._entries: Optional[List[_SearchEntry]] = None
+            self._postings = postings
+            return
+
+        self._entries = [_SearchEntry(med) for med in medications]
+        self._postings: Dict[str, Set[int]] = {}
+
+        for position, entry in enumerate(self._entries):
+            grams: Set[str] = set()
+            for text in entry.texts():
+                for size in range(1, NGRAM_SIZE + 1):
+                    grams |= _ngrams(text, size)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(position)
+
+        logger.debug(f"Medication search index built: {len(self._entries)} entries, {len(self._postings)} n-grams")
+
+    @property
+    def postings(self) -> Mapping[str, Collection[int]]:
+        """n-gram -> positions of the medications containing it."""
+        return self._postings
+
+    def _entry(self, position: int) -> _SearchEntry:
+        """Get the searchable entry of a medication position."""
+        if self._entries is not None:
+            return self._entries[position]
+        return _SearchEntry(self._records[position])
+
+    def _candidates(self, query: str) -> List[int]:
+        """
+        Get candidate entry positions for a lowercased query.
+
+        Args:
+            query: Lowercased, stripped search query
+
+        Returns:
+            Sorted list of entry positions that contain every n-gram of the query
+        """
+        if len(query) <= NGRAM_SIZE:
+            return sorted(self._postings.get(query, ()))
+
+        postings = []
+        for gram in _ngrams(query, NGRAM_SIZE):
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return sorted(candidates)
+
+    def search(
+        self,
+        query: str,
+        language: Optional[str] = None,
+        ranked: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Find medication records whose names, brands or ingredients contain the query.
+
+        Args:
+            query: Lowercased, stripped search query
+            language: Optional language filter for the Hebrew/English names
+            ranked: If True, order results by match quality (exact, prefix,
+                    substring), keeping catalog order within the same rank
+
+        Returns:
+            Matching medication record dictionaries, one per medication_id, in
+            catalog order (or rank order if ranked is True)
+        """
+        matches = []
+        seen_ids = set()
+        for position in self._candidates(query):
+            entry = self._entry(position)
+            medication_id = entry.record.get("medication_id")
+            if medication_id in seen_ids:
+                continue
+            rank = entry.match_rank(query, language)
+            if rank is not None:
+                seen_ids.add(medication_id)
+                matches.append((rank, entry.record))
+
+        if ranked:
+            matches.sort(key=lambda match: match[0])
+        return [record for _, record in matches]
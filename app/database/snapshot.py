@@ -0,0 +1,583 @@
+"""
+Memory-mapped snapshot of the pharmacy database.
+
+Purpose (Why):
+Every process used to json.load() data/database.json and then rebuild all
+Catalog indexes (hash, n-gram and fuzzy) from scratch, so cold start grows
+with the size of the catalog and is paid again by every worker. A compiled
+snapshot stores the records together with the prebuilt indexes in a layout
+that can be used straight from a memory mapping, so a process only has to map
+the file; records are decoded when a request first touches them.
+
+Implementation (What):
+The snapshot lives next to the JSON source (database.json -> database.snapshot)
+and holds data only: a fixed-size header, a JSON table of contents and
+8-byte aligned sections of raw bytes and native integer columns.
+
+- Records: each collection is stored as compact JSON records back to back,
+  with an offsets column marking where each record starts.
+- Key tables: UTF-8 keys in byte order (bytes plus offsets column) with a
+  postings column of record positions per key. They hold the id indexes,
+  prescriptions per user, the search n-grams, and the fuzzy terms and
+  deletion variants (whose postings point at fuzzy terms).
+
+load_snapshot() maps the file, checks the header against the current source
+and returns a Catalog (Catalog.from_indexes) whose record sequences and
+indexes read from the mapping: keys are found by binary search, and a record
+is decoded on first access and then shared. The header carries a fingerprint
+of the section layout, the index parameters and the model schemas, so any
+change to them invalidates existing snapshots without a hand-maintained
+version number. Any mismatch or error means "no snapshot" and the caller
+falls back to the JSON source and writes a fresh snapshot. Snapshots are
+written to a temporary file and atomically renamed into place.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.database import fuzzy_matcher, search_index
+from app.database.catalog import Catalog, RECORD_COLLECTIONS
+from app.database.fuzzy_matcher import FuzzyMatcher
+from app.database.search_index import MedicationSearchIndex
+from app.models.medication import Medication
+from app.models.prescription import Prescription
+from app.models.user import User
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Magic bytes identifying a snapshot file
+SNAPSHOT_MAGIC = b"PHARMSNAP"
+
+# Bump only when the encoding of an existing section changes; sections,
+# column types, index parameters and model schemas are part of the
+# fingerprint automatically
+SNAPSHOT_LAYOUT_VERSION = 1
+
+# Column types: offsets into byte sections and record / term positions
+_OFFSET_TYPE = "Q"
+_POSITION_TYPE = "I"
+
+# Sections start at multiples of this, so columns can be cast in place
+_ALIGNMENT = 8
+
+# Key tables stored in every snapshot
+_KEY_TABLES = (
+    "medications.id",
+    "users.id",
+    "prescriptions.id",
+    "prescriptions.user",
+    "search.grams",
+    "fuzzy.terms",
+    "fuzzy.deletes",
+)
+
+# Header: magic, layout fingerprint, table of contents size, then the source
+# signature (size, mtime in ns), which is filled in when the file is written
+_HEADER = struct.Struct(f"<{len(SNAPSHOT_MAGIC)}s16sIqq")
+_SIGNATURE = struct.Struct("<qq")
+
+
+@lru_cache(maxsize=None)
+def snapshot_fingerprint() -> bytes:
+    """
+    Get the fingerprint of everything the snapshot layout depends on.
+
+    Purpose (Why):
+    A snapshot written by other code must never be read as current. Deriving
+    the version from the layout, index parameters and model schemas means no
+    one has to remember to bump it.
+
+    Implementation (What):
+    Hashes the layout version, byte order, column types, collection and key
+    table names, the n-gram and fuzzy parameters and the JSON schemas of the
+    User, Medication and Prescription models.
+
+    Returns:
+        16-byte fingerprint stored in the snapshot header
+    """
+    schema = {
+        "layout": SNAPSHOT_LAYOUT_VERSION,
+        "byteorder": sys.byteorder,
+        "columns": [_OFFSET_TYPE, _POSITION_TYPE, _ALIGNMENT],
+        "collections": list(RECORD_COLLECTIONS),
+        "key_tables": list(_KEY_TABLES),
+        "search": {"ngram_size": search_index.NGRAM_SIZE},
+        "fuzzy": {
+            "max_edit_distance": fuzzy_matcher.MAX_EDIT_DISTANCE,
+            "prefix_length": fuzzy_matcher.PREFIX_LENGTH,
+        },
+        "models": {model.__name__: model.model_json_schema() for model in (User, Medication, Prescription)},
+    }
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).digest()[:16]
+
+
+def snapshot_path_for(source_path: Path) -> Path:
+    """
+    Get the snapshot path for a JSON database file.
+
+    Args:
+        source_path: Path to the JSON database file
+
+    Returns:
+        Path of the snapshot file next to it
+    """
+    return source_path.with_suffix(".snapshot")
+
+
+def _source_signature(source_path: Path) -> Tuple[int, int]:
+    """
+    Get the (size, mtime_ns) signature of the JSON source.
+
+    Args:
+        source_path: Path to the JSON database file
+
+    Returns:
+        Tuple of file size in bytes and modification time in nanoseconds
+    """
+    stat = source_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the section alignment."""
+    return offset + (-offset % _ALIGNMENT)
+
+
+class _SectionWriter:
+    """
+    Collects aligned sections and their table of contents entries.
+
+    Attributes:
+        sections: Section name -> [offset, length] relative to the body start
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self.sections: Dict[str, List[int]] = {}
+
+    def add(self, name: str, payload: bytes) -> None:
+        """Append one section, padded to the alignment."""
+        padding = _aligned(self._size) - self._size
+        if padding:
+            self._chunks.append(b"\0" * padding)
+            self._size += padding
+        self.sections[name] = [self._size, len(payload)]
+        self._chunks.append(payload)
+        self._size += len(payload)
+
+    def add_blobs(self, name: str, blobs: Iterable[bytes]) -> None:
+        """Append byte strings back to back plus their offsets column."""
+        offsets = array(_OFFSET_TYPE, [0])
+        chunks = []
+        for blob in blobs:
+            chunks.append(blob)
+            offsets.append(offsets[-1] + len(blob))
+        self.add(f"{name}.offsets", offsets.tobytes())
+        self.add(f"{name}.bytes", b"".join(chunks))
+
+    def add_key_table(self, name: str, entries: Iterable[Tuple[str, Iterable[int]]]) -> List[str]:
+        """
+        Append a key table (keys in UTF-8 byte order with their postings).
+
+        Args:
+            name: Table name
+            entries: (key, positions) pairs in any order
+
+        Returns:
+            The keys in stored order, so other tables can refer to them by index
+        """
+        encoded = sorted(((key.encode("utf-8"), positions) for key, positions in entries), key=lambda item: item[0])
+        offsets = array(_OFFSET_TYPE, [0])
+        values = array(_POSITION_TYPE)
+        for _, positions in encoded:
+            values.extend(positions)
+            offsets.append(len(values))
+        self.add_blobs(f"{name}.keys", (key for key, _ in encoded))
+        self.add(f"{name}.postings", offsets.tobytes())
+        self.add(f"{name}.values", values.tobytes())
+        return [key.decode("utf-8") for key, _ in encoded]
+
+    def getvalue(self) -> bytes:
+        """Get the concatenated body."""
+        return b"".join(self._chunks)
+
+
+def _first_positions(records: Sequence[Dict[str, Any]], field: str) -> Dict[str, List[int]]:
+    """Map each value of a field to the position of its first record (first wins)."""
+    positions: Dict[str, List[int]] = {}
+    for position, record in enumerate(records):
+        key = record.get(field)
+        if key is not None and key not in positions:
+            positions[key] = [position]
+    return positions
+
+
+def _all_positions(records: Sequence[Dict[str, Any]], field: str) -> Dict[str, List[int]]:
+    """Map each value of a field to the positions of all its records, in order."""
+    positions: Dict[str, List[int]] = {}
+    for position, record in enumerate(records):
+        key = record.get(field)
+        if key is not None:
+            positions.setdefault(key, []).append(position)
+    return positions
+
+
+def encode_snapshot(catalog: Catalog) -> Optional[bytes]:
+    """
+    Encode a Catalog into snapshot contents.
+
+    Purpose (Why):
+    Separates the consistent read of the catalog from the file write, so
+    callers can encode under their write lock and write without it.
+
+    Implementation (What):
+    Encodes every record as compact JSON, derives the id and per-user
+    position tables from the record order (first record wins, as in Catalog)
+    and copies the search and fuzzy postings of the catalog's indexes. The
+    table of contents records the top-level key order and non-record values
+    of the data dictionary, so the restored data equals the source.
+
+    Args:
+        catalog: Catalog to encode
+
+    Returns:
+        Header (without source signature), table of contents and sections,
+        or None if encoding failed
+    """
+    try:
+        data = catalog.data
+        writer = _SectionWriter()
+        records = {collection: data.get(collection, []) for collection in RECORD_COLLECTIONS}
+        for collection, collection_records in records.items():
+            writer.add_blobs(f"records.{collection}", (
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                for record in collection_records
+            ))
+
+        writer.add_key_table("medications.id", _first_positions(records["medications"], "medication_id").items())
+        writer.add_key_table("users.id", _first_positions(records["users"], "user_id").items())
+        writer.add_key_table("prescriptions.id", _first_positions(records["prescriptions"], "prescription_id").items())
+        writer.add_key_table("prescriptions.user", _all_positions(records["prescriptions"], "user_id").items())
+        writer.add_key_table("search.grams", ((gram, sorted(positions)) for gram, positions in catalog.medication_search.postings.items()))
+        terms = writer.add_key_table("fuzzy.terms", catalog.medication_fuzzy.term_positions.items())
+        term_index = {term: index for index, term in enumerate(terms)}
+        writer.add_key_table("fuzzy.deletes", (
+            (variant, sorted(term_index[term] for term in variant_terms))
+            for variant, variant_terms in catalog.medication_fuzzy.deletes.items()
+        ))
+
+        toc = json.dumps({
+            "keys": list(data),
+            "extra": {key: value for key, value in data.items() if key not in RECORD_COLLECTIONS},
+            "sections": writer.sections,
+        }, ensure_ascii=False).encode("utf-8")
+        padding = b"\0" * (_aligned(_HEADER.size + len(toc)) - _HEADER.size - len(toc))
+        header = _HEADER.pack(SNAPSHOT_MAGIC, snapshot_fingerprint(), len(toc), 0, 0)
+        return header + toc + padding + writer.getvalue()
+    except Exception as e:
+        logger.warning(f"Could not encode database snapshot: {e}")
+        return None
+
+
+def write_encoded_snapshot(source_path: Path, contents: bytes) -> bool:
+    """
+    Write snapshot contents from encode_snapshot() for the given JSON source.
+
+    Implementation (What):
+    Writes the contents with the current signature of the source in the
+    header to a temporary file in the same directory and renames it over the
+    snapshot path. Failures (read-only file system,
+    permissions) are logged and reported, never raised, because the snapshot
+    is only an optimization.
+
+    Args:
+        source_path: Path to the JSON database file the contents were encoded from
+        contents: Result of encode_snapshot()
+
+    Returns:
+        True if the snapshot was written, False otherwise
+    """
+    snapshot_path = snapshot_path_for(source_path)
+    tmp_path = None
+    try:
+        signature = _SIGNATURE.pack(*_source_signature(source_path))
+        fd, tmp_path = tempfile.mkstemp(dir=snapshot_path.parent, prefix=snapshot_path.name, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f, memoryview(contents) as view:
+            f.write(view[:_HEADER.size - _SIGNATURE.size])
+            f.write(signature)
+            f.write(view[_HEADER.size:])
+        os.replace(tmp_path, snapshot_path)
+        tmp_path = None
+        logger.debug(f"Database snapshot written: {snapshot_path}")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write database snapshot {snapshot_path}: {e}")
+        return False
+    finally:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def write_snapshot(source_path: Path, catalog: Catalog) -> bool:
+    """
+    Compile a Catalog into a snapshot file for the given JSON source.
+
+    Purpose (Why):
+    Lets the next process start from the prebuilt indexes instead of parsing
+    the JSON and rebuilding them.
+
+    Args:
+        source_path: Path to the JSON database file the catalog was built from
+        catalog: Catalog built from the current contents of source_path
+
+    Returns:
+        True if the snapshot was written, False otherwise
+    """
+    contents = encode_snapshot(catalog)
+    return contents is not None and write_encoded_snapshot(source_path, contents)
+
+
+class MappedRecords(Sequence):
+    """
+    Records of one collection, decoded from the mapping on first access.
+
+    Every access to a position returns the same dictionary, so records can be
+    changed in place exactly like the records of a JSON-built Catalog.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        """
+        Args:
+            offsets: Offsets column (one more entry than records)
+            data: JSON records back to back
+        """
+        self._offsets = offsets
+        self._data = data
+        self._decoded: List[Optional[Dict[str, Any]]] = [None] * (len(offsets) - 1)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._decoded)
+        record = self._decoded[index]
+        if record is None:
+            with self._lock:
+                record = self._decoded[index]
+                if record is None:
+                    record = json.loads(bytes(self._data[self._offsets[index]:self._offsets[index + 1]]))
+                    self._decoded[index] = record
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self._decoded)):
+            yield self[index]
+
+
+class _KeyTable(Mapping):
+    """
+    Key -> positions table read from the mapping.
+
+    Keys are stored in UTF-8 byte order, so a lookup is a binary search that
+    decodes only the keys it compares. Values are memoryview slices of the
+    postings column.
+    """
+
+    def __init__(self, key_offsets: memoryview, keys: memoryview, postings: memoryview, values: memoryview):
+        self._key_offsets = key_offsets
+        self._keys = keys
+        self._postings = postings
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._key_offsets) - 1
+
+    def _raw_key(self, index: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[index]:self._key_offsets[index + 1]])
+
+    def key(self, index: int) -> str:
+        """Get the key stored at an index."""
+        return self._raw_key(index).decode("utf-8")
+
+    def positions(self, index: int) -> memoryview:
+        """Get the postings stored at an index."""
+        return self._values[self._postings[index]:self._postings[index + 1]]
+
+    def __getitem__(self, key: str) -> memoryview:
+        if isinstance(key, str):
+            target = key.encode("utf-8")
+            index = bisect.bisect_left(range(len(self)), target, key=self._raw_key)
+            if index < len(self) and self._raw_key(index) == target:
+                return self.positions(index)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self.key(index)
+
+
+class _RecordIndex(Mapping):
+    """Key -> first record with that key (id indexes)."""
+
+    def __init__(self, table: _KeyTable, records: MappedRecords):
+        self._table = table
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        return self._records[self._table[key][0]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table)
+
+
+class _RecordGroups(_RecordIndex):
+    """Key -> all records with that key, in file order."""
+
+    def __getitem__(self, key: str) -> List[Dict[str, Any]]:
+        return [self._records[position] for position in self._table[key]]
+
+
+class _TermRefs(Mapping):
+    """Fuzzy deletion variant -> terms (postings point into the terms table)."""
+
+    def __init__(self, table: _KeyTable, terms: _KeyTable):
+        self._table = table
+        self._terms = terms
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, key: str) -> List[str]:
+        return [self._terms.key(index) for index in self._table[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table)
+
+
+def _catalog_from_sections(body: memoryview, toc: Dict[str, Any]) -> Catalog:
+    """
+    Build a lazily materialized Catalog over the sections of a mapped snapshot.
+
+    Args:
+        body: Mapping from the first section on
+        toc: Parsed table of contents
+
+    Returns:
+        Catalog reading records and indexes from body
+
+    Raises:
+        ValueError: If a section lies outside the file
+        KeyError: If a section is missing
+    """
+    sections = toc["sections"]
+
+    def section(name: str, column_type: Optional[str] = None) -> memoryview:
+        offset, length = sections[name]
+        if offset + length > len(body):
+            raise ValueError(f"Snapshot section {name} is truncated")
+        view = body[offset:offset + length]
+        return view.cast(column_type) if column_type else view
+
+    def key_table(name: str) -> _KeyTable:
+        return _KeyTable(
+            section(f"{name}.keys.offsets", _OFFSET_TYPE),
+            section(f"{name}.keys.bytes"),
+            section(f"{name}.postings", _OFFSET_TYPE),
+            section(f"{name}.values", _POSITION_TYPE),
+        )
+
+    records = {
+        collection: MappedRecords(section(f"records.{collection}.offsets", _OFFSET_TYPE), section(f"records.{collection}.bytes"))
+        for collection in RECORD_COLLECTIONS
+    }
+    tables = {name: key_table(name) for name in _KEY_TABLES}
+    medications = records["medications"]
+    return Catalog.from_indexes(
+        records=records,
+        keys=toc["keys"],
+        extra=toc["extra"],
+        medications_by_id=_RecordIndex(tables["medications.id"], medications),
+        users_by_id=_RecordIndex(tables["users.id"], records["users"]),
+        prescriptions_by_id=_RecordIndex(tables["prescriptions.id"], records["prescriptions"]),
+        prescriptions_by_user=_RecordGroups(tables["prescriptions.user"], records["prescriptions"]),
+        medication_search=MedicationSearchIndex(medications, postings=tables["search.grams"]),
+        medication_fuzzy=FuzzyMatcher(
+            medications,
+            term_positions=tables["fuzzy.terms"],
+            deletes=_TermRefs(tables["fuzzy.deletes"], tables["fuzzy.terms"])
+        ),
+    )
+
+
+def load_snapshot(source_path: Path) -> Optional[Catalog]:
+    """
+    Load the Catalog from the snapshot of a JSON source, if it is current.
+
+    Purpose (Why):
+    Restores data and prebuilt indexes without parsing JSON, rebuilding
+    indexes or constructing any record up front, keeping cold start flat as
+    the catalog grows.
+
+    Implementation (What):
+    Memory-maps the snapshot, validates magic, fingerprint and the source
+    signature recorded in the header, parses the table of contents and wraps
+    the sections in lazy sequences and mappings. The mapping stays open for
+    as long as the returned Catalog (or any record view of it) is alive.
+
+    Args:
+        source_path: Path to the JSON database file
+
+    Returns:
+        The restored Catalog, or None if there is no valid, up-to-date snapshot
+    """
+    snapshot_path = snapshot_path_for(source_path)
+    try:
+        if not snapshot_path.exists():
+            return None
+
+        with open(snapshot_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+        magic, fingerprint, toc_size, size, mtime_ns = _HEADER.unpack_from(mapped, 0)
+        if magic != SNAPSHOT_MAGIC or fingerprint != snapshot_fingerprint():
+            logger.info(f"Ignoring database snapshot with incompatible format: {snapshot_path}")
+            mapped.close()
+            return None
+        if (size, mtime_ns) != _source_signature(source_path):
+            logger.info(f"Database snapshot is stale, recompiling: {snapshot_path}")
+            mapped.close()
+            return None
+
+        toc = json.loads(mapped[_HEADER.size:_HEADER.size + toc_size])
+        catalog = _catalog_from_sections(memoryview(mapped)[_aligned(_HEADER.size + toc_size):], toc)
+        logger.debug(f"Database snapshot loaded: {snapshot_path}")
+        return catalog
+    except Exception as e:
+        logger.warning(f"Could not load database snapshot {snapshot_path}: {e}")
+        return None
@@ -0,0 +1,743 @@
+"""
+SQLite storage backend for the pharmacy database.
+
+Purpose (Why):
+A single JSON file has to be parsed and held in memory in full by every
+process, and every write rewrites it. SQLite (from the standard library)
+keeps the data on disk with indexed tables, so lookups touch only the rows
+they need, writes are transactional and O(change), and many processes can
+read concurrently.
+
+Implementation (What):
+Implements SQLiteDatabaseManager, a drop-in subclass of DatabaseManager that
+serves the same query methods from SQLite:
+- medications, users and prescriptions tables keyed by their IDs (first record
+  wins for duplicate IDs, like the in-memory Catalog), with the original
+  record stored as JSON and the original file order kept in `position`
+- an index on prescriptions(user_id, position) for per-user lookups, which
+  get_prescription_view() joins with medications in a single query
+- FTS5 trigram tables for substring search over medication names, brand names
+  and active ingredients, and over user names and emails; queries shorter than
+  three characters fall back to scanning a precomputed lowercase search column.
+  Candidates are verified with the same rules as the JSON backend.
+- a meta table whose data_version row is incremented by every write
+  transaction that changes data (and import_version by every full import), so
+  all processes sharing the file agree on when cached results go stale
+The database runs in WAL mode; one writer connection is serialized by a lock
+and readers borrow connections from a small pool, so reads never wait for
+writes. save_db() (and the migration command in
+app/database/migrate_to_sqlite.py) imports a full database dictionary in a
+single transaction.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from app.database.db import DatabaseManager
+from app.database.fuzzy_matcher import FuzzyMatcher
+from app.database.prescription_view import build_prescription_row
+from app.database.search_index import NGRAM_SIZE, match_medication
+from app.models.user import User
+from app.models.medication import Medication
+from app.models.prescription import Prescription
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Default number of pooled read connections
+DEFAULT_READ_POOL_SIZE = 4
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS medications (
+        position INTEGER PRIMARY KEY,
+        medication_id TEXT NOT NULL UNIQUE,
+        search_text TEXT NOT NULL,
+        record TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS users (
+        position INTEGER PRIMARY KEY,
+        user_id TEXT NOT NULL UNIQUE,
+        search_text TEXT NOT NULL,
+        record TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS prescriptions (
+        position INTEGER PRIMARY KEY,
+        prescription_id TEXT,
+        user_id TEXT,
+        record TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_prescriptions_user ON prescriptions(user_id, position)",
+    "CREATE INDEX IF NOT EXISTS idx_prescriptions_id ON prescriptions(prescription_id, position)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS medication_search USING fts5(
+        name_he, name_en, brand_names, active_ingredients, content='', tokenize='trigram'
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5(
+        name, email, content='', tokenize='trigram'
+    )""",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0), ('import_version', 0)",
+]
+
+_TABLES = ["medication_search", "user_search", "prescriptions", "users", "medications"]
+
+
+def _fts_phrase(query: str) -> str:
+    """
+    Quote a query as an FTS5 phrase.
+
+    Args:
+        query: Raw query text
+
+    Returns:
+        FTS5 phrase literal matching the text as a substring (trigram tokenizer)
+    """
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _bump_version(conn: sqlite3.Connection, key: str = "data_version") -> None:
+    """
+    Increment a version row of the meta table inside the current transaction.
+
+    Args:
+        conn: Connection with an open write transaction
+        key: 'data_version' (any data change) or 'import_version' (full import)
+    """
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = ?", (key,))
+
+
+def _read_version(conn: sqlite3.Connection, key: str = "data_version") -> int:
+    """
+    Read a version row of the meta table.
+
+    Args:
+        conn: Any connection to the database
+        key: 'data_version' or 'import_version'
+
+    Returns:
+        Current value (0 if the row does not exist)
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row is not None else 0
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """
+    Open a connection in autocommit mode with explicit transactions.
+
+    Args:
+        path: SQLite database file path
+
+    Returns:
+        Configured sqlite3 connection usable from any thread
+    """
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+class _ReadConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections.
+
+    Purpose (Why):
+    Opening a connection per query is expensive and a single shared connection
+    would serialize all readers; in WAL mode readers can run in parallel.
+
+    Implementation (What):
+    Connections are created lazily up to `size` and handed out through a LIFO
+    queue; when all are busy, callers wait for one to be returned.
+
+    Attributes:
+        path: SQLite database file path
+        size: Maximum number of connections
+    """
+
+    def __init__(self, path: Path, size: int):
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read connection for the duration of a with-block.
+
+        Yields:
+            sqlite3 connection opened in query-only mode
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if len(self._all) < self.size:
+                    conn = _connect(self.path)
+                    conn.execute("PRAGMA query_only = ON")
+                    self._all.append(conn)
+            if conn is None:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close all connections created by the pool."""
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._idle = queue.LifoQueue()
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager backed by an SQLite database file.
+
+    Purpose (Why):
+    Serves the same interface as the JSON-backed DatabaseManager from indexed
+    SQLite tables, so tools work unchanged while the data no longer has to fit
+    in (or be parsed into) memory.
+
+    Implementation (What):
+    Overrides the query and update methods with indexed SQL queries. Records
+    are stored as JSON and validated into the same Pydantic models. load_db()
+    exports the whole database as a dictionary and save_db() imports one.
+    data_version is read from the database file rather than counted in
+    memory, so writes by other processes invalidate this process's caches.
+
+    Attributes:
+        db_path: Path to the SQLite database file
+        pool_size: Number of pooled read connections
+    """
+
+    def __init__(self, db_path: str = "data/database.sqlite3", pool_size: int = DEFAULT_READ_POOL_SIZE):
+        """
+        Initialize the SQLiteDatabaseManager.
+
+        Args:
+            db_path: Path to the SQLite database file (default: "data/database.sqlite3")
+            pool_size: Number of pooled read connections (default: 4)
+        """
+        super().__init__(db_path=db_path, use_snapshot=False)
+        self.pool_size = pool_size
+        self._writer: Optional[sqlite3.Connection] = None
+        self._readers: Optional[_ReadConnectionPool] = None
+        # (import_version it was built at, matcher)
+        self._fuzzy: Optional[Tuple[int, FuzzyMatcher]] = None
+        self._open_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Connection management
+    # ------------------------------------------------------------------
+
+    def ensure_loaded(self) -> None:
+        """
+        Open the writer connection and read pool if not already open.
+
+        Raises:
+            FileNotFoundError: If the SQLite database file doesn't exist
+        """
+        if self._readers is not None:
+            return
+        with self._open_lock:
+            if self._readers is not None:
+                return
+            if not self.db_path.exists():
+                logger.error(f"Database file not found: {self.db_path}")
+                raise FileNotFoundError(f"Database file not found: {self.db_path}")
+            self._open(create=False)
+
+    def _open(self, create: bool) -> None:
+        """
+        Open connections, enable WAL mode and create the schema if needed.
+
+        Args:
+            create: Whether a missing database file may be created
+        """
+        if create:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        writer = _connect(self.db_path)
+        writer.execute("PRAGMA journal_mode = WAL")
+        writer.execute("PRAGMA synchronous = NORMAL")
+        for statement in _SCHEMA:
+            writer.execute(statement)
+        self._writer = writer
+        self._readers = _ReadConnectionPool(self.db_path, self.pool_size)
+        logger.debug(f"SQLite database opened: {self.db_path}")
+
+    def close(self) -> None:
+        """Close all connections (the manager reopens them on next use)."""
+        with self._open_lock, self._write_lock:
+            if self._readers is not None:
+                self._readers.close()
+                self._readers = None
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled read connection, opening the database on first use."""
+        self.ensure_loaded()
+        with self._readers.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction on the writer connection (serialized by a lock)."""
+        self.ensure_loaded()
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
+
+    # ------------------------------------------------------------------
+    # Import / export
+    # ------------------------------------------------------------------
+
+    def load_db(self) -> Dict[str, Any]:
+        """
+        Export the whole SQLite database as a dictionary.
+
+        Returns:
+            Dictionary containing 'users', 'medications', and 'prescriptions' lists
+
+        Raises:
+            FileNotFoundError: If the SQLite database file doesn't exist
+        """
+        data: Dict[str, Any] = {}
+        with self._read() as conn:
+            for table in ("users", "medications", "prescriptions"):
+                rows = conn.execute(f"SELECT record FROM {table} ORDER BY position").fetchall()
+                data[table] = [json.loads(row[0]) for row in rows]
+        logger.info(
+            f"Database loaded: {len(data['users'])} users, {len(data['medications'])} medications, "
+            f"{len(data['prescriptions'])} prescriptions"
+        )
+        return data
+
+    def save_db(self, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Replace the contents of the SQLite database with a database dictionary.
+
+        Purpose (Why):
+        Provides the same full-save contract as the JSON backend and is the
+        import path used by the migration command.
+
+        Implementation (What):
+        Drops and recreates all tables and inserts every record in a single
+        transaction, so readers see either the old or the new database.
+
+        Args:
+            data: Dictionary containing 'users', 'medications' and 'prescriptions' lists
+
+        Raises:
+            ValueError: If no data is provided
+        """
+        if data is None:
+            logger.error("Attempted to save database with no data available")
+            raise ValueError("No data to save. Provide data parameter.")
+
+        with self._open_lock:
+            if self._readers is None:
+                self._open(create=True)
+
+        with self._transaction() as conn:
+            for table in _TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+            for position, med in enumerate(data.get("medications", [])):
+                texts = [med.get("name_he", ""), med.get("name_en", "")]
+                texts += med.get("brand_names", []) + med.get("active_ingredients", [])
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO medications (position, medication_id, search_text, record) "
+                    "VALUES (?, ?, ?, ?)",
+                    (position, med.get("medication_id"), "\n".join(texts).lower(),
+                     json.dumps(med, ensure_ascii=False))
+                )
+                if cursor.rowcount:
+                    conn.execute(
+                        "INSERT INTO medication_search (rowid, name_he, name_en, brand_names, active_ingredients) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (position, med.get("name_he", ""), med.get("name_en", ""),
+                         "\n".join(med.get("brand_names", [])), "\n".join(med.get("active_ingredients", [])))
+                    )
+
+            for position, user in enumerate(data.get("users", [])):
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO users (position, user_id, search_text, record) VALUES (?, ?, ?, ?)",
+                    (position, user.get("user_id"),
+                     f"{user.get('name', '')}\n{user.get('email', '')}".lower(),
+                     json.dumps(user, ensure_ascii=False))
+                )
+                if cursor.rowcount:
+                    conn.execute(
+                        "INSERT INTO user_search (rowid, name, email) VALUES (?, ?, ?)",
+                        (position, user.get("name", ""), user.get("email", ""))
+                    )
+
+            conn.executemany(
+                "INSERT INTO prescriptions (position, prescription_id, user_id, record) VALUES (?, ?, ?, ?)",
+                [
+                    (position, presc.get("prescription_id"), presc.get("user_id"),
+                     json.dumps(presc, ensure_ascii=False))
+                    for position, presc in enumerate(data.get("prescriptions", []))
+                ]
+            )
+            _bump_version(conn)
+            _bump_version(conn, "import_version")
+
+        logger.info("Database saved successfully")
+
+    @property
+    def data_version(self) -> int:
+        """
+        Version number of the data in the SQLite file.
+
+        Purpose (Why):
+        Several processes (workers, the migration command) write the same
+        file; a counter kept in memory would only move for this process's own
+        writes, so caches keyed by it would keep serving data another process
+        has changed.
+
+        Implementation (What):
+        Reads the data_version row of the meta table, which every write
+        transaction that changes data increments before committing.
+
+        Returns:
+            Current data version shared by all processes using the file
+        """
+        with self._read() as conn:
+            return _read_version(conn)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get_medication_by_id(self, medication_id: str) -> Optional[Medication]:
+        """
+        Get a medication by its ID (primary key lookup).
+
+        Args:
+            medication_id: The medication ID to search for
+
+        Returns:
+            Medication model instance if found, None otherwise
+        """
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT record FROM medications WHERE medication_id = ?", (medication_id,)
+            ).fetchone()
+        if row is not None:
+            logger.debug(f"Found medication: {medication_id}")
+            return Medication(**json.loads(row[0]))
+
+        logger.warning(f"Medication not found: {medication_id}")
+        return None
+
+    def get_user_by_id(self, user_id: str) -> Optional[User]:
+        """
+        Get a user by their ID (primary key lookup).
+
+        Args:
+            user_id: The user ID to search for
+
+        Returns:
+            User model instance if found, None otherwise
+        """
+        with self._read() as conn:
+            row = conn.execute("SELECT record FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if row is not None:
+            logger.debug(f"Found user: {user_id}")
+            return User(**json.loads(row[0]))
+
+        logger.warning(f"User not found: {user_id}")
+        return None
+
+    def get_prescriptions_by_user(self, user_id: str) -> List[Prescription]:
+        """
+        Get all prescriptions for a user (index range scan on user_id).
+
+        Args:
+            user_id: The user ID to get prescriptions for
+
+        Returns:
+            List of Prescription model instances in original order (empty list if none found)
+        """
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT record FROM prescriptions WHERE user_id = ? ORDER BY position", (user_id,)
+            ).fetchall()
+        prescriptions = [Prescription(**json.loads(row[0])) for row in rows]
+
+        logger.debug(f"Found {len(prescriptions)} prescriptions for user: {user_id}")
+        return prescriptions
+
+    def get_prescription_view(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a user's prescriptions joined with their medications in one query.
+
+        Args:
+            user_id: The user ID to get prescriptions for
+
+        Returns:
+            List of prescription rows in original order (empty list if none found)
+        """
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT p.record, m.record FROM prescriptions p "
+                "LEFT JOIN medications m ON m.medication_id = json_extract(p.record, '$.medication_id') "
+                "WHERE p.user_id = ? ORDER BY p.position",
+                (user_id,)
+            ).fetchall()
+        view = [
+            build_prescription_row(
+                Prescription(**json.loads(presc_record)),
+                Medication(**json.loads(med_record)) if med_record is not None else None
+            )
+            for presc_record, med_record in rows
+        ]
+
+        logger.debug(f"Found {len(view)} prescription rows for user: {user_id}")
+        return view
+
+    def search_medications_by_name(
+        self,
+        name: str,
+        language: Optional[str] = None,
+        ranked: bool = False
+    ) -> List[Medication]:
+        """
+        Search medications by name using the FTS5 trigram index.
+
+        Args:
+            name: The medication name to search for (case-insensitive, partial match)
+            language: Optional language filter ('he' for Hebrew, 'en' for English)
+            ranked: If True, order results by match quality instead of original order
+
+        Returns:
+            List of Medication model instances matching the search (empty list if none found)
+        """
+        if not name or not name.strip():
+            logger.warning("Empty search name provided")
+            return []
+
+        name_lower = name.lower().strip()
+        with self._read() as conn:
+            if len(name_lower) >= NGRAM_SIZE:
+                rows = conn.execute(
+                    "SELECT record FROM medications WHERE position IN "
+                    "(SELECT rowid FROM medication_search WHERE medication_search MATCH ?) "
+                    "ORDER BY position",
+                    (_fts_phrase(name_lower),)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT record FROM medications WHERE instr(search_text, ?) > 0 ORDER BY position",
+                    (name_lower,)
+                ).fetchall()
+
+        matches = []
+        for row in rows:
+            med_data = json.loads(row[0])
+            rank = match_medication(med_data, name_lower, language)
+            if rank is not None:
+                matches.append((rank, med_data))
+        if ranked:
+            matches.sort(key=lambda match: match[0])
+        results = [Medication(**med_data) for _, med_data in matches]
+
+        logger.debug(f"Search for '{name}' (lang={language}) found {len(results)} results")
+        return results
+
+    def suggest_medications(self, name: str, limit: int = 5) -> List[Medication]:
+        """
+        Suggest medications whose names are close to a (possibly misspelled) name.
+
+        The fuzzy matcher is built from the medication table on first use and
+        rebuilt after any process imports new data with save_db().
+
+        Args:
+            name: The medication name that was searched for
+            limit: Maximum number of medications to return
+
+        Returns:
+            List of Medication model instances, best match first (empty list if none)
+        """
+        if not name or not name.strip():
+            return []
+
+        with self._read() as conn:
+            import_version = _read_version(conn, "import_version")
+            cached = self._fuzzy
+            if cached is not None and cached[0] == import_version:
+                fuzzy = cached[1]
+            else:
+                rows = conn.execute("SELECT record FROM medications ORDER BY position").fetchall()
+                fuzzy = FuzzyMatcher([json.loads(row[0]) for row in rows])
+                self._fuzzy = (import_version, fuzzy)
+
+        medication_ids = [med_data.get("medication_id") for med_data, _ in fuzzy.lookup(name, limit)]
+        results = [med for med in map(self.get_medication_by_id, medication_ids) if med is not None]
+
+        logger.debug(f"Suggestions for '{name}' found {len(results)} medications")
+        return results
+
+    def search_users_by_name_or_email(self, name_or_email: str) -> List[User]:
+        """
+        Search users by name or email using the FTS5 trigram index.
+
+        Args:
+            name_or_email: The name or email address to search for (case-insensitive, partial match)
+
+        Returns:
+            List of User model instances matching the search (empty list if none found)
+        """
+        if not name_or_email or not name_or_email.strip():
+            logger.warning("Empty search name_or_email provided")
+            return []
+
+        search_term = name_or_email.lower().strip()
+        with self._read() as conn:
+            if len(search_term) >= NGRAM_SIZE:
+                rows = conn.execute(
+                    "SELECT record FROM users WHERE position IN "
+                    "(SELECT rowid FROM user_search WHERE user_search MATCH ?) "
+                    "ORDER BY position",
+                    (_fts_phrase(search_term),)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT record FROM users WHERE instr(search_text, ?) > 0 ORDER BY position",
+                    (search_term,)
+                ).fetchall()
+
+        results = []
+        for row in rows:
+            user_data = json.loads(row[0])
+            if search_term in user_data.get("name", "").lower() or search_term in user_data.get("email", "").lower():
+                results.append(User(**user_data))
+
+        logger.debug(f"Search for '{name_or_email}' found {len(results)} users")
+        return results
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def decrement_stock(self, medication_id: str, quantity: int = 1) -> Optional[Medication]:
+        """
+        Decrease the stock of a medication in a single write transaction.
+
+        Args:
+            medication_id: The medication ID to update
+            quantity: Quantity to remove from stock (must be positive)
+
+        Returns:
+            Updated Medication model instance, or None if the medication was not found
+
+        Raises:
+            ValueError: If quantity is not positive or exceeds the stock on hand
+        """
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be positive, got {quantity}")
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT record FROM medications WHERE medication_id = ?", (medication_id,)
+            ).fetchone()
+            if row is None:
+                logger.warning(f"Medication not found: {medication_id}")
+                return None
+
+            med_data = json.loads(row[0])
+            stock = med_data.setdefault("stock", {})
+            in_stock = stock.get("quantity_in_stock", 0)
+            if quantity > in_stock:
+                raise ValueError(
+                    f"Insufficient stock for {medication_id}: requested {quantity}, available {in_stock}"
+                )
+            stock["quantity_in_stock"] = in_stock - quantity
+            stock["available"] = in_stock - quantity > 0
+            conn.execute(
+                "UPDATE medications SET record = ? WHERE medication_id = ?",
+                (json.dumps(med_data, ensure_ascii=False), medication_id)
+            )
+            _bump_version(conn)
+
+        logger.debug(f"Stock of {medication_id} decreased by {quantity} to {stock['quantity_in_stock']}")
+        return Medication(**med_data)
+
+    def record_prescription_refill(self, prescription_id: str) -> Optional[Prescription]:
+        """
+        Record that a prescription has been refilled in a single write transaction.
+
+        Args:
+            prescription_id: The prescription ID to refill
+
+        Returns:
+            Updated Prescription model instance, or None if the prescription was not found
+
+        Raises:
+            ValueError: If the prescription is not active or has no refills remaining
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT position, record FROM prescriptions WHERE prescription_id = ? ORDER BY position LIMIT 1",
+                (prescription_id,)
+            ).fetchone()
+            if row is None:
+                logger.warning(f"Prescription not found: {prescription_id}")
+                return None
+
+            position, record = row
+            presc_data = json.loads(record)
+            if presc_data.get("status") != "active":
+                raise ValueError(f"Prescription {prescription_id} is not active")
+            refills_remaining = presc_data.get("refills_remaining", 0)
+            if refills_remaining <= 0:
+                raise ValueError(f"Prescription {prescription_id} has no refills remaining")
+            presc_data["refills_remaining"] = refills_remaining - 1
+            conn.execute(
+                "UPDATE prescriptions SET record = ? WHERE position = ?",
+                (json.dumps(presc_data, ensure_ascii=False), position)
+            )
+            _bump_version(conn)
+
+        logger.debug(f"Prescription {prescription_id} refilled, {presc_data['refills_remaining']} refills remaining")
+        return Prescription(**presc_data)
+
+    def reload_if_changed(self) -> bool:
+        """
+        No-op: every query reads the SQLite database directly, so changes are
+        visible immediately.
+
+        Returns:
+            False (there is never a cached snapshot to replace)
+        """
+        return False
+
+    def start_auto_reload(self, interval: float = 0) -> None:
+        """No-op: the SQLite backend has no in-memory snapshot to reload."""
+        return None
+
+    def compact(self) -> None:
+        """Checkpoint the WAL into the main database file."""
+        self.ensure_loaded()
+        with self._write_lock:
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("SQLite WAL checkpointed")
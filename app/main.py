@@ -22,9 +22,11 @@ import json
 import re
 import os
 import hashlib
-from typing import Optional, List, Dict, Generator, Tuple, Any
+import time
+from typing import Optional, List, Dict, Generator, AsyncGenerator, Tuple, Any
 import gradio as gr
-from app.agent import StreamingAgent
+from app.agent import StreamingAgent, ConversationState
+from app.agent.events import TEXT, TOOL_START, TOOL_RESULT
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
@@ -260,13 +262,254 @@ def convert_gradio_history_to_agent_format(
     return agent_messages
 
 
+def _build_tool_context(
+    authenticated_user_id: Optional[str] = None,
+    authenticated_username: Optional[str] = None,
+    authenticated_password: Optional[str] = None,
+    authenticated_password_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the tool execution context for the authenticated user.
+    
+    Args:
+        authenticated_user_id: Authenticated user ID, if logged in
+        authenticated_username: Username used to log in
+        authenticated_password: Password used to log in
+        authenticated_password_hash: Hash of the password used to log in
+    
+    Returns:
+        Context dictionary passed to the agent (empty if not authenticated)
+    """
+    context = {}
+    if authenticated_user_id:
+        context["authenticated_user_id"] = authenticated_user_id
+        if authenticated_username:
+            context["authenticated_username"] = authenticated_username
+        if authenticated_password:
+            context["authenticated_password"] = authenticated_password
+        if authenticated_password_hash:
+            context["authenticated_password_hash"] = authenticated_password_hash
+        logger.debug(f"Passing authenticated_user_id to agent: {authenticated_user_id}")
+    return context
+
+
+def _rate_limit_key(
+    authenticated_user_id: Optional[str] = None,
+    conversation_state: Optional[ConversationState] = None
+) -> Optional[str]:
+    """
+    Get the agent ID that scopes rate limits (and audit entries) of a chat turn.
+    
+    Purpose (Why):
+    Without it every tool call used the agent ID "default", so all users
+    shared one rate limit bucket and one busy user throttled everyone.
+    
+    Implementation (What):
+    A logged-in user is limited per user ID (across their sessions and
+    browser tabs); an anonymous session by the session_id of its
+    ConversationState.
+    
+    Args:
+        authenticated_user_id: Authenticated user ID, if logged in
+        conversation_state: ConversationState of the session, if any
+    
+    Returns:
+        Agent ID to pass to the agent, or None (the agent's "default") if neither is known
+    """
+    if authenticated_user_id:
+        return authenticated_user_id
+    if conversation_state is not None:
+        return conversation_state.session_id
+    return None
+
+
+def _extract_tool_call_markers(chunk: str, tool_calls_list: List[Dict[str, Any]]) -> str:
+    """
+    Move tool call information from a streamed chunk into tool_calls_list.
+    
+    Purpose (Why):
+    The agent embeds tool calls in the text stream as [TOOL_CALL_START] and
+    [TOOL_CALL_RESULT] markers; the UI shows them separately from the text.
+    
+    Implementation (What):
+    Parses start markers into new tool call entries and result markers into
+    the result/success fields of the matching entry, then strips the markers.
+    
+    Args:
+        chunk: Text chunk from the agent stream
+        tool_calls_list: Tool calls collected so far (updated in place)
+    
+    Returns:
+        The chunk with all tool call markers removed
+    """
+    # Plain text chunks (nearly all of them) need no regular expression work
+    if "[TOOL_CALL_" not in chunk:
+        return chunk
+    
+    # Check if chunk contains tool call markers
+    tool_call_start_match = re.search(r'\[TOOL_CALL_START\](.*?)\[/TOOL_CALL_START\]', chunk, re.DOTALL)
+    tool_call_result_match = re.search(r'\[TOOL_CALL_RESULT\](.*?)\[/TOOL_CALL_RESULT\]', chunk, re.DOTALL)
+    
+    if tool_call_start_match:
+        # Extract tool call start information
+        try:
+            _record_tool_call_start(json.loads(tool_call_start_match.group(1)), tool_calls_list)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse tool call start info: {e}")
+        # Remove marker from text
+        chunk = re.sub(r'\[TOOL_CALL_START\].*?\[/TOOL_CALL_START\]', '', chunk, flags=re.DOTALL)
+    
+    if tool_call_result_match:
+        # Extract tool call result information
+        try:
+            _record_tool_call_result(json.loads(tool_call_result_match.group(1)), tool_calls_list)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse tool call result info: {e}")
+        # Remove marker from text
+        chunk = re.sub(r'\[TOOL_CALL_RESULT\].*?\[/TOOL_CALL_RESULT\]', '', chunk, flags=re.DOTALL)
+    
+    
+    return chunk
+
+
+def _record_tool_call_start(tool_call_info: Dict[str, Any], tool_calls_list: List[Dict[str, Any]]) -> None:
+    """
+    Add a started tool call to tool_calls_list.
+    
+    Args:
+        tool_call_info: {"type": "tool_call_start", "tool_name", "tool_id", "arguments"}
+        tool_calls_list: Tool calls collected so far (updated in place)
+    """
+    tool_calls_list.append(tool_call_info)
+    logger.debug(f"Tool call started: {tool_call_info.get('tool_name')}")
+
+
+def _record_tool_call_result(tool_result_info: Dict[str, Any], tool_calls_list: List[Dict[str, Any]]) -> None:
+    """
+    Store a tool result in the matching entry of tool_calls_list.
+    
+    Args:
+        tool_result_info: Dictionary with "tool_name", "tool_id", "result" and "success"
+        tool_calls_list: Tool calls collected so far (updated in place)
+    """
+    # Update the corresponding tool call with result
+    for tool_call in tool_calls_list:
+        if tool_call.get("tool_id") == tool_result_info.get("tool_id"):
+            tool_call["result"] = tool_result_info.get("result")
+            tool_call["success"] = tool_result_info.get("success", True)
+            break
+    logger.debug(f"Tool call completed: {tool_result_info.get('tool_name')}")
+
+
+def _serialize_tool_calls(tool_calls_list: List[Dict[str, Any]]) -> str:
+    """Serialize tool calls for display (empty string if there are none)."""
+    return json.dumps(tool_calls_list, ensure_ascii=False, indent=2) if tool_calls_list else ""
+
+
+# Default frame interval and buffered text size of streamed UI updates
+DEFAULT_UI_STREAM_INTERVAL_MS = 40
+DEFAULT_UI_STREAM_MAX_CHARS = 256
+
+
+class StreamCoalescer:
+    """
+    Decides which streamed deltas start a new UI frame.
+    
+    Purpose (Why):
+    Every yield from a Gradio handler re-renders the chatbot and sends the
+    history over the websocket. The model streams a few characters per chunk,
+    so yielding per chunk costs history size x number of tokens in CPU and
+    bandwidth while nobody can read faster than a few frames per second.
+    
+    Implementation (What):
+    The first delta is shown immediately (time to first token is unchanged).
+    After that, deltas are buffered until interval_ms has passed since the
+    previous frame or max_chars characters are pending; forced updates (tool
+    calls) start a frame at once. The caller shows whatever is still pending
+    when the stream ends. An interval of 0 makes every delta a frame.
+    
+    Configuration (environment variables):
+    - UI_STREAM_INTERVAL_MS: Minimum time between frames (default: 40)
+    - UI_STREAM_MAX_CHARS: Pending characters that start a frame early (default: 256)
+    
+    Attributes:
+        interval_ms: Minimum milliseconds between frames
+        max_chars: Pending characters that start a frame regardless of time
+        frames: Number of frames started so far
+    """
+    
+    def __init__(
+        self,
+        interval_ms: Optional[float] = None,
+        max_chars: Optional[int] = None,
+        clock: Any = time.monotonic
+    ):
+        """
+        Initialize the coalescer.
+        
+        Args:
+            interval_ms: Frame interval. If None, reads UI_STREAM_INTERVAL_MS or defaults to 40.
+            max_chars: Buffered text size. If None, reads UI_STREAM_MAX_CHARS or defaults to 256.
+            clock: Function returning the current time in seconds (for tests)
+        """
+        self.interval_ms = (
+            interval_ms
+            if interval_ms is not None
+            else float(os.getenv("UI_STREAM_INTERVAL_MS", str(DEFAULT_UI_STREAM_INTERVAL_MS)))
+        )
+        self.max_chars = (
+            max_chars
+            if max_chars is not None
+            else int(os.getenv("UI_STREAM_MAX_CHARS", str(DEFAULT_UI_STREAM_MAX_CHARS)))
+        )
+        self.frames = 0
+        self._clock = clock
+        self._pending_chars = 0
+        self._pending = False
+        self._last_frame: Optional[float] = None
+    
+    @property
+    def pending(self) -> bool:
+        """Whether deltas were added since the last frame."""
+        return self._pending
+    
+    def add(self, text: str, force: bool = False) -> bool:
+        """
+        Add a delta and decide whether to show a frame now.
+        
+        Args:
+            text: Text delta (may be empty)
+            force: Start a frame regardless of time and size (e.g. tool call update)
+        
+        Returns:
+            True if the caller should yield a frame now
+        """
+        self._pending_chars += len(text)
+        self._pending = True
+        now = self._clock()
+        if not (
+            force
+            or self._last_frame is None
+            or self.interval_ms <= 0
+            or self._pending_chars >= self.max_chars
+            or (now - self._last_frame) * 1000 >= self.interval_ms
+        ):
+            return False
+        self._last_frame = now
+        self._pending_chars = 0
+        self._pending = False
+        self.frames += 1
+        return True
+
+
 def chat_fn(
     message: str,
     history: List[Tuple[str, str]],
     authenticated_user_id: Optional[str] = None,
     authenticated_username: Optional[str] = None,
     authenticated_password: Optional[str] = None,
-    authenticated_password_hash: Optional[str] = None
+    authenticated_password_hash: Optional[str] = None,
+    conversation_state: Optional[ConversationState] = None
 ) -> Generator[Tuple[str, str], None, None]:
     """
     Handle chat messages with streaming support and tool call display.
@@ -285,7 +528,8 @@ def chat_fn(
     Implementation (What):
     Converts Gradio history format to agent message format, retrieves the
     agent instance, and calls stream_response() with include_tool_calls=True
-    to get a generator of response chunks. Extracts tool call information
+    to get a generator of response chunks. Tool calls are rate limited per
+    user or session (see _rate_limit_key()). Extracts tool call information
     from special markers in the stream and yields both text chunks and tool
     call information separately. Handles cases where agent is None (initialization
     failure) or when errors occur during streaming. All errors are logged and
@@ -296,6 +540,9 @@ def chat_fn(
         history: List of tuples from Gradio ChatInterface representing
             conversation history. Each tuple is (user_message, assistant_message).
             History is only maintained within the current session (stateless agent).
+        conversation_state: Optional ConversationState of this session, passed to the
+            agent so context extraction is incremental across turns; its session_id
+            keys the rate limits of anonymous sessions
     
     Yields:
         Tuples of (response_text, tool_calls_json) where:
@@ -346,65 +593,31 @@ def chat_fn(
         accumulated_text = ""
         
         # Build context with authenticated user ID and credentials for tool execution
-        context = {}
-        if authenticated_user_id:
-            context["authenticated_user_id"] = authenticated_user_id
-            if authenticated_username:
-                context["authenticated_username"] = authenticated_username
-            if authenticated_password:
-                context["authenticated_password"] = authenticated_password
-            if authenticated_password_hash:
-                context["authenticated_password_hash"] = authenticated_password_hash
-            logger.debug(f"Passing authenticated_user_id to agent: {authenticated_user_id}")
+        context = _build_tool_context(authenticated_user_id, authenticated_username, authenticated_password, authenticated_password_hash)
+        
+        tool_calls_json = ""
         
         # Stream response chunks from agent with tool call information
         for chunk in agent.stream_response(
             user_message=message,
             conversation_history=conversation_history if conversation_history else None,
+            agent_id=_rate_limit_key(authenticated_user_id, conversation_state),
             include_tool_calls=True,
-            context=context
+            context=context,
+            conversation_state=conversation_state
         ):
-            # Check if chunk contains tool call markers
-            tool_call_start_match = re.search(r'\[TOOL_CALL_START\](.*?)\[/TOOL_CALL_START\]', chunk, re.DOTALL)
-            tool_call_result_match = re.search(r'\[TOOL_CALL_RESULT\](.*?)\[/TOOL_CALL_RESULT\]', chunk, re.DOTALL)
-            
-            if tool_call_start_match:
-                # Extract tool call start information
-                try:
-                    tool_call_info = json.loads(tool_call_start_match.group(1))
-                    tool_calls_list.append(tool_call_info)
-                    logger.debug(f"Tool call started: {tool_call_info.get('tool_name')}")
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse tool call start info: {e}")
-                # Remove marker from text
-                chunk = re.sub(r'\[TOOL_CALL_START\].*?\[/TOOL_CALL_START\]', '', chunk, flags=re.DOTALL)
-            
-            if tool_call_result_match:
-                # Extract tool call result information
-                try:
-                    tool_result_info = json.loads(tool_call_result_match.group(1))
-                    # Update the corresponding tool call with result
-                    for tool_call in tool_calls_list:
-                        if tool_call.get("tool_id") == tool_result_info.get("tool_id"):
-                            tool_call["result"] = tool_result_info.get("result")
-                            tool_call["success"] = tool_result_info.get("success", True)
-                            break
-                    logger.debug(f"Tool call completed: {tool_result_info.get('tool_name')}")
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse tool call result info: {e}")
-                # Remove marker from text
-                chunk = re.sub(r'\[TOOL_CALL_RESULT\].*?\[/TOOL_CALL_RESULT\]', '', chunk, flags=re.DOTALL)
+            if "[TOOL_CALL_" in chunk:
+                chunk = _extract_tool_call_markers(chunk, tool_calls_list)
+                tool_calls_json = _serialize_tool_calls(tool_calls_list)
             
             # Yield text chunk and tool calls (even if chunk is empty, to ensure streaming works)
             # This ensures that every chunk from the agent is passed through for real-time display
             accumulated_text += chunk
-            tool_calls_json = json.dumps(tool_calls_list, ensure_ascii=False, indent=2) if tool_calls_list else ""
             yield (chunk, tool_calls_json)
         
         # Yield final tool calls update if any remain (even if no more text chunks)
         # This ensures tool calls are displayed even if they arrive after text streaming completes
         if tool_calls_list and not accumulated_text:
-            tool_calls_json = json.dumps(tool_calls_list, ensure_ascii=False, indent=2)
             yield ("", tool_calls_json)
         
         logger.info("Chat message processed successfully")
@@ -415,6 +628,91 @@ def chat_fn(
         yield (error_msg, "")
 
 
+async def achat_fn(
+    message: str,
+    history: List[Tuple[str, str]],
+    authenticated_user_id: Optional[str] = None,
+    authenticated_username: Optional[str] = None,
+    authenticated_password: Optional[str] = None,
+    authenticated_password_hash: Optional[str] = None,
+    conversation_state: Optional[ConversationState] = None
+) -> AsyncGenerator[Tuple[str, str], None]:
+    """
+    Async counterpart of chat_fn() used by the Gradio event handlers.
+    
+    Purpose (Why):
+    Gradio runs sync generator handlers in a bounded thread pool, so each open
+    conversation holds a worker thread for the whole LLM round-trip. Async
+    handlers run on the server's event loop instead, which lets one process
+    serve many concurrent conversations.
+    
+    Implementation (What):
+    Same inputs, yields and error handling as chat_fn(), but streams typed
+    events from StreamingAgent.astream_events(): tool information arrives as
+    dictionaries, so no chunk is searched for markers, and the tool calls are
+    serialized only when a tool event changes them. Text deltas are yielded
+    with the last serialized tool calls (the same string object until it changes).
+    
+    Args:
+        message: The user's message to process. Can be empty string.
+        history: Conversation history as list of (user_message, assistant_message) tuples
+        authenticated_user_id: Authenticated user ID, if logged in
+        authenticated_username: Username used to log in
+        authenticated_password: Password used to log in
+        authenticated_password_hash: Hash of the password used to log in
+        conversation_state: Optional ConversationState of this session
+    
+    Yields:
+        Tuples of (response_text, tool_calls_json), like chat_fn()
+    """
+    if not message or not message.strip():
+        logger.warning("Empty message received in achat_fn")
+        yield ("I'm here to help! Please ask me about medications, stock availability, or prescription requirements.", "")
+        return
+    
+    if agent is None:
+        error_msg = "Agent is not initialized. Please check your configuration and try again."
+        logger.error(error_msg)
+        yield (error_msg, "")
+        return
+    
+    try:
+        conversation_history = convert_gradio_history_to_agent_format(history)
+        logger.info(f"Processing chat message: {message[:100]}...")
+        
+        tool_calls_list = []
+        accumulated_text = ""
+        context = _build_tool_context(authenticated_user_id, authenticated_username, authenticated_password, authenticated_password_hash)
+        
+        tool_calls_json = ""
+        
+        async for event in agent.astream_events(
+            user_message=message,
+            conversation_history=conversation_history if conversation_history else None,
+            agent_id=_rate_limit_key(authenticated_user_id, conversation_state),
+            context=context,
+            conversation_state=conversation_state
+        ):
+            if event.type == TEXT:
+                accumulated_text += event.text
+                yield (event.text, tool_calls_json)
+            elif event.type == TOOL_START:
+                _record_tool_call_start({"type": "tool_call_start", **event.data}, tool_calls_list)
+                tool_calls_json = _serialize_tool_calls(tool_calls_list)
+                yield ("", tool_calls_json)
+            elif event.type == TOOL_RESULT:
+                _record_tool_call_result(event.data, tool_calls_list)
+                tool_calls_json = _serialize_tool_calls(tool_calls_list)
+                yield ("", tool_calls_json)
+        
+        logger.info("Chat message processed successfully")
+        
+    except Exception as e:
+        error_msg = f"I apologize, but I encountered an error processing your request. Please try again."
+        logger.error(f"Error in achat_fn: {str(e)}", exc_info=True)
+        yield (error_msg, "")
+
+
 # Module-level variables for theme and CSS (set by create_chat_interface)
 _custom_theme = None
 _custom_css = None
@@ -671,6 +969,8 @@ def create_chat_interface() -> gr.Blocks:
         authenticated_username = gr.State(value=None)  # Stores username when authenticated
         authenticated_password = gr.State(value=None)  # Stores password when authenticated (for tool calls)
         authenticated_password_hash = gr.State(value=None)  # Stores password_hash when authenticated
+        # Per-session context carried across turns (callable: one new instance per session)
+        conversation_state = gr.State(value=ConversationState)
         
         # Authentication section
         with gr.Row():
@@ -836,7 +1136,7 @@ def create_chat_interface() -> gr.Blocks:
             
             try:
                 from app.tools.user_tools import get_user_by_name_or_email
-                from app.database.db import DatabaseManager
+                from app.database.db import get_db_manager
                 
                 result = get_user_by_name_or_email(name_or_email.strip())
                 
@@ -847,8 +1147,8 @@ def create_chat_interface() -> gr.Blocks:
                 if not user_id:
                     return current_user, current_username, current_password, current_password_hash, "**Status:** Authentication failed | הזדהות נכשלה - User not found"
                 
-                # Verify password
-                db_manager = DatabaseManager()
+                # Verify password using the shared, already-loaded DatabaseManager
+                db_manager = get_db_manager()
                 user = db_manager.get_user_by_id(user_id)
                 if not user:
                     return current_user, current_username, current_password, current_password_hash, "**Status:** Authentication failed | הזדהות נכשלה - User not found"
@@ -886,12 +1186,12 @@ def create_chat_interface() -> gr.Blocks:
             logger.info(f"User logged out: {current_user}")
             return None, None, None, None, "**Status:** Not authenticated | לא מזוהה"
         
-        def respond(message: str, history: List[Dict[str, str]], authenticated_user_id: Optional[str] = None, authenticated_username: Optional[str] = None, authenticated_password: Optional[str] = None, authenticated_password_hash: Optional[str] = None) -> Generator[Tuple[List[Dict[str, str]], Any], None, None]:
+        async def respond(message: str, history: List[Dict[str, str]], authenticated_user_id: Optional[str] = None, authenticated_username: Optional[str] = None, authenticated_password: Optional[str] = None, authenticated_password_hash: Optional[str] = None, session_state: Optional[ConversationState] = None) -> AsyncGenerator[Tuple[List[Dict[str, str]], Any], None]:
             """
             Handle user message and update chat history with tool calls (streaming).
             
             Purpose (Why):
-            Processes user messages through chat_fn and updates the chat history
+            Processes user messages through achat_fn and updates the chat history
             with both the response text and tool call information in real-time.
             This enables the UI to display tool calls separately while maintaining
             the conversation flow in the chatbot component. Supports streaming for
@@ -900,18 +1200,21 @@ def create_chat_interface() -> gr.Blocks:
             user experience and perceived responsiveness of the application.
             
             Implementation (What):
-            This is a generator function that yields updates in real-time. Calls chat_fn
-            to get streaming response chunks and tool call information. Accumulates text
+            This is an async generator function that yields updates in real-time. Calls
+            achat_fn to get streaming response chunks and tool call information, so the
+            handler awaits the LLM on the event loop instead of holding a worker thread. Accumulates text
             chunks and tool call data, updating the chat history in real-time for streaming
-            effect. Each yield immediately updates the UI, providing true streaming behavior
-            where text appears incrementally as it is generated. Gradio automatically detects
-            generator functions and enables streaming support, displaying updates as they arrive.
+            effect. Deltas are coalesced into frames by StreamCoalescer (every UI_STREAM_INTERVAL_MS
+            or UI_STREAM_MAX_CHARS characters, tool call updates at once), and the earlier history is
+            built once per message and shared by all frames. Gradio automatically detects
+            async generator functions and enables streaming support, displaying updates as they arrive.
             
             Args:
                 message: The user's message to process. Can be empty string.
                 history: Current chat history as list of tuples. Each tuple is
                     (user_message, assistant_message). History is maintained within
                     the current session only (stateless agent).
+                session_state: ConversationState of this session (updated in place)
         
             Yields:
                 Tuples of (updated_history, tool_calls_data) where:
@@ -928,8 +1231,8 @@ def create_chat_interface() -> gr.Blocks:
             
             Example:
                 >>> # This function is called by Gradio when user submits a message
-                >>> # Gradio automatically detects it's a generator and enables streaming
-                >>> for history, tool_calls in respond("Tell me about Acamol", []):
+                >>> # Gradio automatically detects it's an async generator and enables streaming
+                >>> async for history, tool_calls in respond("Tell me about Acamol", []):
                 ...     # Each yield updates the UI immediately
                 ...     pass
             """
@@ -1015,7 +1318,7 @@ def create_chat_interface() -> gr.Blocks:
                 response_text = ""
                 tool_calls_data = {}  # Initialize as empty dict (gr.JSON requires dict or list, not None)
                 
-                # Convert original_history to tuple format for chat_fn (legacy format)
+                # Convert original_history to tuple format for achat_fn (legacy format)
                 # Group consecutive user/assistant messages into tuples
                 tuple_history = []
                 i = 0
@@ -1047,13 +1350,20 @@ def create_chat_interface() -> gr.Blocks:
                     logger.debug(f"Enhanced message with user context: {authenticated_user_id}")
                 
                 # Stream response chunks in real-time
-                # Each yield updates the UI immediately, providing true streaming experience
-                for chunk, tool_calls_json in chat_fn(enhanced_message, tuple_history, authenticated_user_id, authenticated_username, authenticated_password, authenticated_password_hash):
+                # Deltas are coalesced into frames (see StreamCoalescer) so a long answer does not
+                # send the whole history to the browser once per token. Earlier messages and the
+                # user message never change while streaming: they are built once and shared by all frames.
+                history_prefix = original_history + [{"role": "user", "content": message}]
+                coalescer = StreamCoalescer()
+                last_tool_calls_json = ""
+                async for chunk, tool_calls_json in achat_fn(enhanced_message, tuple_history, authenticated_user_id, authenticated_username, authenticated_password, authenticated_password_hash, session_state):
                     # Accumulate text chunks for complete response
                     response_text += chunk
                     
-                    # Parse tool calls JSON if present
-                    if tool_calls_json:
+                    # Parse tool calls JSON only when it changed (achat_fn re-sends the same string otherwise)
+                    tool_calls_changed = bool(tool_calls_json) and tool_calls_json is not last_tool_calls_json
+                    if tool_calls_changed:
+                        last_tool_calls_json = tool_calls_json
                         # #region agent log
                         _debug_log("app/main.py:respond:tool_calls_json", "Tool calls JSON received", {"tool_calls_json_length": len(tool_calls_json), "tool_calls_json_preview": tool_calls_json[:100]}, "H3")
                         # #endregion
@@ -1076,81 +1386,22 @@ def create_chat_interface() -> gr.Blocks:
                             # #endregion
                             tool_calls_data = {}
                     
-                    # Update history in real-time for streaming effect
-                    # This ensures the chatbot displays text as it arrives, chunk by chunk
-                    # Build history from original_history + current user message + streaming assistant response
-                    # IMPORTANT: Always use original_history, never use the history parameter that Gradio passes back
-                    updated_history = []
-                    # Add all previous messages from original history (make copies to avoid mutations)
-                    for msg in original_history:
-                        if isinstance(msg, dict) and "role" in msg and "content" in msg:
-                            updated_history.append({
-                                "role": str(msg["role"]),
-                                "content": str(msg.get("content", ""))
-                            })
-                    # Add current user message (only once)
-                    updated_history.append({"role": "user", "content": message})
-                    # Add/update assistant response (this will be updated on each yield)
-                    updated_history.append({"role": "assistant", "content": response_text if response_text else ""})
+                    # Tool call updates are shown at once; text waits for the next frame
+                    if not coalescer.add(chunk, force=tool_calls_changed):
+                        continue
+                    
+                    # IMPORTANT: Always build on original_history, never use the history parameter that Gradio passes back
+                    updated_history = history_prefix + [{"role": "assistant", "content": response_text}]
                     # #region agent log
                     _debug_log("app/main.py:respond:history_built", "History built for yield", {"original_history_length": len(original_history), "updated_history_length": len(updated_history), "response_text_length": len(response_text)}, "H4")
                     # #endregion
-                    # Ensure tool_calls_data is never None (gr.JSON requires dict or list, not None)
-                    if tool_calls_data is None:
-                        # #region agent log
-                        _debug_log("app/main.py:respond:tool_calls_none", "tool_calls_data is None, setting to empty dict", {}, "H5")
-                        # #endregion
-                        tool_calls_data = {}
-                    # Ensure tool_calls_data is dict or list (not other types)
-                    if not isinstance(tool_calls_data, (dict, list)):
-                        # #region agent log
-                        _debug_log("app/main.py:respond:invalid_tool_calls_before_yield", "Invalid tool_calls_data type before yield", {
-                            "tool_calls_data_type": str(type(tool_calls_data)),
-                            "tool_calls_data_value": str(tool_calls_data)[:200]
-                        }, "H5")
-                        # #endregion
-                        tool_calls_data = {}
-                    # #region agent log
-                    _debug_log("app/main.py:respond:before_yield", "Before yielding", {
-                        "history_length": len(updated_history), 
-                        "history_type": str(type(updated_history)), 
-                        "tool_calls_data_type": str(type(tool_calls_data)), 
-                        "tool_calls_data_is_none": tool_calls_data is None,
-                        "tool_calls_data_is_dict": isinstance(tool_calls_data, dict),
-                        "tool_calls_data_is_list": isinstance(tool_calls_data, list),
-                        "response_text_length": len(response_text),
-                        "updated_history_sample": json_module.dumps(updated_history[-2:]) if updated_history else "[]"
-                    }, "H3")
-                    # #endregion
                     yield updated_history, tool_calls_data
                 
-                # Final update to ensure complete response is displayed
-                # This handles edge cases where final chunks might not trigger UI update
-                if response_text:
-                    # Build final history from original_history + current user message + final assistant response
-                    final_history = []
-                    # Add all previous messages from original history
-                    for msg in original_history:
-                        if isinstance(msg, dict) and "role" in msg and "content" in msg:
-                            final_history.append({
-                                "role": str(msg["role"]),
-                                "content": str(msg.get("content", ""))
-                            })
-                    # Add current user message
-                    final_history.append({"role": "user", "content": message})
-                    # Add final assistant response
-                    final_history.append({"role": "assistant", "content": response_text})
-                    # Ensure tool_calls_data is never None (gr.JSON requires dict or list, not None)
-                    if tool_calls_data is None:
-                        tool_calls_data = {}
-                    # Ensure tool_calls_data is dict or list (not other types)
-                    if not isinstance(tool_calls_data, (dict, list)):
-                        # #region agent log
-                        _debug_log("app/main.py:respond:invalid_tool_calls_final", "Invalid tool_calls_data type in final yield", {"tool_calls_data_type": str(type(tool_calls_data))}, "H4")
-                        # #endregion
-                        tool_calls_data = {}
+                # Final update with the text received since the last frame
+                if response_text and coalescer.pending:
+                    final_history = history_prefix + [{"role": "assistant", "content": response_text}]
                     # #region agent log
-                    _debug_log("app/main.py:respond:final_yield", "Final yield", {"history_length": len(final_history), "tool_calls_data_type": str(type(tool_calls_data)), "tool_calls_data_is_none": tool_calls_data is None}, "H4")
+                    _debug_log("app/main.py:respond:final_yield", "Final yield", {"history_length": len(final_history), "tool_calls_data_type": str(type(tool_calls_data))}, "H4")
                     # #endregion
                     yield final_history, tool_calls_data
             except Exception as e:
@@ -1225,7 +1476,7 @@ def create_chat_interface() -> gr.Blocks:
         }, "H4")
         # #endregion
         
-        def submit_wrapper(message, history, auth_user, auth_username, auth_password, auth_password_hash):
+        async def submit_wrapper(message, history, auth_user, auth_username, auth_password, auth_password_hash, session_state):
             # #region agent log
             _debug_log("app/main.py:submit_wrapper", "submit_wrapper called", {
                 "message": message[:100] if message else "",
@@ -1235,7 +1486,7 @@ def create_chat_interface() -> gr.Blocks:
             }, "H4")
             # #endregion
             try:
-                for result in respond(message, history, auth_user, auth_username, auth_password, auth_password_hash):
+                async for result in respond(message, history, auth_user, auth_username, auth_password, auth_password_hash, session_state):
                     yield result
             except Exception as e:
                 # #region agent log
@@ -1255,7 +1506,7 @@ def create_chat_interface() -> gr.Blocks:
         
         msg.submit(
             submit_wrapper,
-            inputs=[msg, chatbot, authenticated_user, authenticated_username, authenticated_password, authenticated_password_hash],
+            inputs=[msg, chatbot, authenticated_user, authenticated_username, authenticated_password, authenticated_password_hash, conversation_state],
             outputs=[chatbot, tool_calls_display]
         ).then(
             lambda: "",  # Clear message box after submission
@@ -1264,7 +1515,7 @@ def create_chat_interface() -> gr.Blocks:
         
         submit_btn.click(
             submit_wrapper,
-            inputs=[msg, chatbot, authenticated_user, authenticated_username, authenticated_password, authenticated_password_hash],
+            inputs=[msg, chatbot, authenticated_user, authenticated_username, authenticated_password, authenticated_password_hash, conversation_state],
             outputs=[chatbot, tool_calls_display]
         ).then(
             lambda: "",  # Clear message box after submission
@@ -29,6 +29,8 @@ class Stock(BaseModel):
     last_restocked: str = Field(description="ISO format datetime string of when the medication was last restocked")
 
     class Config:
+        # Validated once at load time and shared by all readers
+        frozen = True
         json_schema_extra = {
             "example": {
                 "available": True,
@@ -85,6 +87,8 @@ class Medication(BaseModel):
     stock: Stock = Field(description="Current stock information for this medication")
 
     class Config:
+        # Validated once at load time and shared by all readers
+        frozen = True
         json_schema_extra = {
             "example": {
                 "medication_id": "med_001",
@@ -43,6 +43,8 @@ class Prescription(BaseModel):
     status: Literal["active", "expired", "cancelled", "completed"] = Field(description="Current status of the prescription")
 
     class Config:
+        # Validated once at load time and shared by all readers
+        frozen = True
         json_schema_extra = {
             "example": {
                 "prescription_id": "prescription_001",
@@ -34,6 +34,8 @@ class User(BaseModel):
     prescriptions: List[str] = Field(default=[], description="List of prescription IDs associated with this user")
 
     class Config:
+        # Validated once at load time and shared by all readers
+        frozen = True
         json_schema_extra = {
             "example": {
                 "user_id": "user_001",
@@ -10,16 +10,21 @@ Implementation (What):
 Contains security components including:
 - RateLimiter: Prevents uncontrolled loops and limits tool usage
 - AuditLogger: Comprehensive logging of all operations with full context
+  (flush_audit_logs() writes entries still queued by its background writer)
+- AuditQuery: Indexed lookups and request timelines over the audit files
 - Correlation: Unique ID generation for request tracking and audit trails
 """
 
 from app.security.rate_limiter import RateLimiter
-from app.security.audit_logger import AuditLogger
+from app.security.audit_logger import AuditLogger, flush_audit_logs
+from app.security.audit_query import AuditQuery
 from app.security.correlation import generate_correlation_id
 
 __all__ = [
     "RateLimiter",
     "AuditLogger",
+    "flush_audit_logs",
+    "AuditQuery",
     "generate_correlation_id"
 ]
 
@@ -16,14 +16,44 @@ files. Each log entry includes correlation ID, timestamp, agent ID, tool name
 to files in a dedicated audit log directory, organized by date for easy
 retrieval and analysis. Follows security governance best practices for
 comprehensive auditing without exposing sensitive data.
+
+By default entries are written by a background writer thread: callers only
+serialize the entry and put it on a bounded queue, and the writer keeps the
+file open and appends entries in batches. Pending entries are written at
+interpreter exit, or on demand with flush() / flush_audit_logs().
+
+Configuration (environment variables):
+- AUDIT_BUFFERED_WRITES: "true" (default) or "false" to write on the caller's thread
+- AUDIT_QUEUE_SIZE: Maximum entries waiting to be written (default: 10000)
+- AUDIT_BATCH_SIZE: Entries that trigger a write (default: 256)
+- AUDIT_FLUSH_INTERVAL_MS: Maximum time an entry waits for its batch (default: 200)
+- AUDIT_FSYNC: "true" to fsync after every batch (default: "false")
+- AUDIT_QUEUE_FULL_POLICY: "block" (default, wait up to 5 seconds for space,
+  then drop) or "drop" (drop the entry at once); dropped entries are counted
+
+A long-running process does not grow one file forever: the file of a run is
+rotated into a new segment when it reaches a size or age limit, rotated
+segments can be gzipped, and only the newest segments are kept. The
+application shares one AuditLogger through get_audit_logger(), so all
+modules write through one writer.
+
+- AUDIT_MAX_FILE_BYTES: Size that rotates the current file (default: 104857600, 0 disables)
+- AUDIT_ROTATE_INTERVAL_SECONDS: Age that rotates the current file (default: 86400, 0 disables)
+- AUDIT_COMPRESS_ROTATED: "true" to gzip rotated files (default: "false")
+- AUDIT_KEEP_FILES: Number of audit files (segments) kept (default: 5)
 """
 
 import os
+import gzip
 import json
+import time
+import queue
+import shutil
+import atexit
 import logging
 import threading
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple, IO
 from pathlib import Path
 from dotenv import load_dotenv
 import glob
@@ -37,6 +67,32 @@ logger = logging.getLogger(__name__)
 # Default audit log directory
 DEFAULT_AUDIT_LOG_DIR = "logs/audit"
 
+# Defaults of the buffered writer
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL_MS = 200
+QUEUE_FULL_POLICIES = ("block", "drop")
+
+# Longest time a caller waits for queue space under the "block" policy
+QUEUE_FULL_BLOCK_TIMEOUT_SECONDS = 5.0
+
+# Defaults of file rotation
+DEFAULT_MAX_FILE_BYTES = 100 * 1024 * 1024
+DEFAULT_ROTATE_INTERVAL_SECONDS = 24 * 60 * 60
+DEFAULT_KEEP_FILES = 5
+
+# Control items for the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+class _NewRun(NamedTuple):
+    """Writer control item: entries queued after it belong to the run in path."""
+    path: str
+
+# Loggers with a running writer thread, flushed at interpreter exit
+_buffered_loggers: "set[AuditLogger]" = set()
+
 
 class AuditLogger:
     """
@@ -57,13 +113,30 @@ class AuditLogger:
     for concurrent execution using threading.Lock to protect file write operations
     during parallel tool execution.
     
+    When buffered, entries are serialized on the caller's thread and written
+    by one writer thread per logger, so parallel tool threads never wait for
+    file I/O or for each other.
+    
     Attributes:
         log_dir: Directory path for audit logs
         enabled: Whether audit logging is enabled (from environment or default: True)
+        buffered: Whether entries are written by the background writer thread
+        queue_size: Maximum entries waiting to be written
+        batch_size: Entries that trigger a write
+        flush_interval: Maximum seconds an entry waits for its batch
+        fsync: Whether every batch is fsynced
+        queue_full_policy: "block" or "drop"
+        written_entries: Entries written so far
+        dropped_entries: Entries dropped because the queue was full
         _lock: Threading lock for thread-safe file write operations
     """
     
-    def __init__(self, log_dir: Optional[str] = None, enabled: Optional[bool] = None):
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        buffered: Optional[bool] = None
+    ):
         """
         Initialize AuditLogger with configuration.
         
@@ -76,7 +149,7 @@ class AuditLogger:
         Reads log directory from environment variable or uses default. Reads
         enabled flag from environment variable or defaults to True. Creates log
         directory if it doesn't exist. Creates a new log file for this run and
-        cleans up old files, keeping only the last 5. All configuration is optional
+        cleans up old files, keeping only the last keep_files (default 5). All configuration is optional
         to allow flexible setup.
         
         Args:
@@ -84,12 +157,16 @@ class AuditLogger:
                 If None, reads from AUDIT_LOG_DIR env var or uses DEFAULT_AUDIT_LOG_DIR.
             enabled: Whether audit logging is enabled.
                 If None, reads from AUDIT_LOGGING_ENABLED env var or defaults to True.
+            buffered: Whether entries are written by a background writer thread.
+                If None, reads from AUDIT_BUFFERED_WRITES env var or defaults to True.
+                The other writer settings are read from the environment (see module docstring).
         
         Returns:
             None. Initializes the AuditLogger instance with configured settings.
         
         Raises:
             OSError: If log directory cannot be created (permissions, disk space, etc.).
+            ValueError: If a writer setting is invalid.
         """
         self.log_dir = log_dir or os.getenv("AUDIT_LOG_DIR", DEFAULT_AUDIT_LOG_DIR)
         self.enabled = (
@@ -101,13 +178,54 @@ class AuditLogger:
         # Thread lock for thread-safe file write operations
         self._lock = threading.Lock()
         
+        # Background writer settings and state
+        self.buffered = (
+            buffered
+            if buffered is not None
+            else os.getenv("AUDIT_BUFFERED_WRITES", "true").lower() == "true"
+        )
+        self.queue_size = int(os.getenv("AUDIT_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE)))
+        self.batch_size = max(1, int(os.getenv("AUDIT_BATCH_SIZE", str(DEFAULT_BATCH_SIZE))))
+        self.flush_interval = float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", str(DEFAULT_FLUSH_INTERVAL_MS))) / 1000
+        self.fsync = os.getenv("AUDIT_FSYNC", "false").lower() == "true"
+        self.queue_full_policy = os.getenv("AUDIT_QUEUE_FULL_POLICY", "block").lower()
+        if self.queue_full_policy not in QUEUE_FULL_POLICIES:
+            raise ValueError(
+                f"Invalid AUDIT_QUEUE_FULL_POLICY: {self.queue_full_policy} "
+                f"(expected one of {', '.join(QUEUE_FULL_POLICIES)})"
+            )
+        self.written_entries = 0
+        self.dropped_entries = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        self._pending = 0
+        self._pending_changed = threading.Condition()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_start_lock = threading.Lock()
+        self._writer_run: Optional[str] = None
+        
+        # Rotation settings and state of the file being written (the segment)
+        self.max_file_bytes = int(os.getenv("AUDIT_MAX_FILE_BYTES", str(DEFAULT_MAX_FILE_BYTES)))
+        self.rotate_interval = float(os.getenv("AUDIT_ROTATE_INTERVAL_SECONDS", str(DEFAULT_ROTATE_INTERVAL_SECONDS)))
+        self.compress_rotated = os.getenv("AUDIT_COMPRESS_ROTATED", "false").lower() == "true"
+        self.keep_files = max(1, int(os.getenv("AUDIT_KEEP_FILES", str(DEFAULT_KEEP_FILES))))
+        self.rotations = 0
+        self._segment_run: Optional[str] = None
+        self._segment_path: Optional[str] = None
+        self._segment_size = 0
+        self._segment_started = 0.0
+        self._segments: List[str] = []
+        self._segments_lock = threading.Lock()
+        self._compressors: List[threading.Thread] = []
+        self.current_log_file: Optional[str] = None
+        
         # Create log directory if it doesn't exist
         if self.enabled:
             Path(self.log_dir).mkdir(parents=True, exist_ok=True)
+            # Existing files are listed once; later cleanups use this list
+            self._segments = self._list_log_files()
             # Create a new log file for this run
             self.current_log_file = self._create_new_log_file()
-            # Clean up old files, keeping only the last 5
-            self._cleanup_old_logs()
+            self._add_segment(self.current_log_file)
             logger.info(f"AuditLogger initialized with log directory: {self.log_dir}")
             logger.info(f"Current log file: {self.current_log_file}")
         else:
@@ -125,19 +243,49 @@ class AuditLogger:
         
         Implementation (What):
         Creates a file path based on current timestamp in format:
-        audit_YYYY-MM-DD_HH-MM-SS.json in the configured log directory.
+        audit_YYYY-MM-DD_HH-MM-SS.json in the configured log directory, adding
+        a _N suffix if that name (or its gzipped copy) is taken, as after several
+        rotations in one second.
         The file is not created here, only the path is generated.
         
         Returns:
             str: Full path to the new log file (file is created on first write).
         
         Raises:
-            None. This method only generates a path string and does not perform I/O.
+            None. This method only generates a path string and checks that it is unused.
         """
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        return os.path.join(self.log_dir, f"audit_{timestamp}.json")
+        path = os.path.join(self.log_dir, f"audit_{timestamp}.json")
+        suffix = 0
+        while self._log_file_taken(path):
+            suffix += 1
+            path = os.path.join(self.log_dir, f"audit_{timestamp}_{suffix}.json")
+        return path
+    
+    def _log_file_taken(self, path: str) -> bool:
+        """Check whether a log file path, or its gzipped copy, is already used."""
+        with self._segments_lock:
+            known = path in self._segments or path + ".gz" in self._segments
+        return known or path == self.current_log_file or os.path.exists(path) or os.path.exists(path + ".gz")
     
-    def _cleanup_old_logs(self, keep_count: int = 5) -> None:
+    def _list_log_files(self) -> List[str]:
+        """
+        List the audit files (plain and gzipped) in the log directory, oldest first.
+        
+        Returns:
+            Paths sorted by name (names start with their creation timestamp)
+        """
+        pattern = os.path.join(self.log_dir, "audit_*.json")
+        return sorted(glob.glob(pattern) + glob.glob(pattern + ".gz"))
+    
+    def _add_segment(self, path: str) -> None:
+        """Record a new audit file and delete the oldest beyond keep_files."""
+        with self._segments_lock:
+            if path not in self._segments:
+                self._segments.append(path)
+        self._cleanup_old_logs()
+    
+    def _cleanup_old_logs(self, keep_count: Optional[int] = None) -> None:
         """
         Clean up old audit log files, keeping only the most recent ones.
         
@@ -147,13 +295,12 @@ class AuditLogger:
         older files automatically.
         
         Implementation (What):
-        Finds all audit log files in the log directory, sorts them by modification
-        time (newest first), and deletes all but the most recent keep_count files.
-        Only processes files matching the audit_*.json pattern.
+        Deletes the oldest files of the in-memory list of audit files (built by
+        one directory scan at startup and extended on every new run or
+        rotation), so no cleanup globs or stats the directory again.
         
         Args:
-            keep_count: Number of recent log files to keep (default: 5).
-                Must be a positive integer.
+            keep_count: Number of recent log files to keep. If None, uses keep_files.
         
         Returns:
             None. Modifies log directory by deleting old files.
@@ -162,30 +309,19 @@ class AuditLogger:
             None. All exceptions during file operations are caught and logged,
             but do not propagate to prevent cleanup failures from breaking the application.
         """
-        try:
-            # Find all audit log files
-            pattern = os.path.join(self.log_dir, "audit_*.json")
-            log_files = glob.glob(pattern)
-            
-            if len(log_files) <= keep_count:
-                return
-            
-            # Sort by modification time (newest first)
-            log_files.sort(key=lambda f: os.path.getmtime(f), reverse=True)
-            
-            # Delete old files (keep only the most recent keep_count)
-            files_to_delete = log_files[keep_count:]
-            for file_path in files_to_delete:
-                try:
+        keep_count = keep_count or self.keep_files
+        with self._segments_lock:
+            files_to_delete = self._segments[:-keep_count]
+            del self._segments[:-keep_count]
+        for file_path in files_to_delete:
+            try:
+                if os.path.exists(file_path):
                     os.remove(file_path)
                     logger.debug(f"Deleted old audit log file: {file_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete old audit log file {file_path}: {str(e)}")
-            
-            if files_to_delete:
-                logger.info(f"Cleaned up {len(files_to_delete)} old audit log file(s)")
-        except Exception as e:
-            logger.warning(f"Failed to clean up old audit logs: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Failed to delete old audit log file {file_path}: {str(e)}")
+        if files_to_delete:
+            logger.info(f"Cleaned up {len(files_to_delete)} old audit log file(s)")
     
     def start_new_run(self) -> None:
         """
@@ -198,7 +334,7 @@ class AuditLogger:
         
         Implementation (What):
         Creates a new log file with a unique timestamp and cleans up old log
-        files, keeping only the 5 most recent ones. This should be called at
+        files, keeping only the keep_files most recent ones. This should be called at
         the start of each run to ensure proper log isolation.
         
         Returns:
@@ -212,8 +348,10 @@ class AuditLogger:
         
         # Create a new log file for this run
         self.current_log_file = self._create_new_log_file()
-        # Clean up old files, keeping only the last 5
-        self._cleanup_old_logs()
+        self._add_segment(self.current_log_file)
+        if self._writer_thread is not None:
+            # Entries already queued still belong to the previous run
+            self._queue.put(_NewRun(self.current_log_file))
         logger.info(f"Started new audit log run: {self.current_log_file}")
     
     def _write_log_entry(self, log_entry: Dict[str, Any]) -> None:
@@ -234,6 +372,11 @@ class AuditLogger:
         Handles errors gracefully to prevent audit logging failures from breaking
         the application.
         
+        When buffered, the entry is serialized here (so later changes to the
+        dictionaries it references are not logged) and queued for the writer
+        thread; see _enqueue(). Either way the file is rotated first if it
+        reached its size or age limit (see _prepare_segment()).
+        
         Args:
             log_entry: Dictionary containing log entry data. Must be JSON-serializable.
                 Expected keys include: timestamp, correlation_id, agent_id, event_type,
@@ -249,19 +392,279 @@ class AuditLogger:
         if not self.enabled or not self.current_log_file:
             return
         
+        if self.buffered:
+            try:
+                self._enqueue(json.dumps(log_entry, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                logger.error(f"Failed to queue audit log entry: {str(e)}", exc_info=True)
+            return
+        
         try:
+            line = json.dumps(log_entry, ensure_ascii=False, default=str) + "\n"
             # Thread-safe file write operation
             with self._lock:
                 # Append log entry as JSON line to the current run's file
-                with open(self.current_log_file, "a", encoding="utf-8") as f:
-                    json.dump(log_entry, f, ensure_ascii=False, default=str)
-                    f.write("\n")
+                path = self._prepare_segment(self.current_log_file, len(line))
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                self._segment_size += len(line)
             
             logger.debug(f"Audit log entry written: {log_entry.get('correlation_id')}")
         except Exception as e:
             # Don't let audit logging failures break the application
             logger.error(f"Failed to write audit log entry: {str(e)}", exc_info=True)
     
+    def _prepare_segment(self, run_path: str, incoming_size: int) -> str:
+        """
+        Get the file to append to, starting or rotating the segment as needed.
+        
+        Implementation (What):
+        A new run (start_new_run()) starts a segment in its own file. Within
+        a run, a segment that would exceed max_file_bytes, or is older than
+        rotate_interval, is closed: writing continues in a new timestamped file
+        (which becomes current_log_file), and the old one is gzipped in the
+        background if compress_rotated is set. Called only by the thread that
+        writes (the writer thread, or the caller under _lock when unbuffered).
+        
+        Args:
+            run_path: Log file of the run the entries belong to
+            incoming_size: Size of the data about to be written
+        
+        Returns:
+            Path of the segment to append to
+        """
+        if run_path != self._segment_run and run_path != self._segment_path:
+            self._start_segment(run_path)
+            self._segment_run = run_path
+        elif self._segment_size > 0 and (
+            (self.max_file_bytes > 0 and self._segment_size + incoming_size > self.max_file_bytes)
+            or (self.rotate_interval > 0 and time.monotonic() - self._segment_started >= self.rotate_interval)
+        ):
+            rotated = self._segment_path
+            self._start_segment(self._create_new_log_file())
+            self.rotations += 1
+            logger.info(f"Rotated audit log {rotated} -> {self._segment_path}")
+            self._add_segment(self._segment_path)
+            if self.compress_rotated:
+                self._compress_in_background(rotated)
+        return self._segment_path
+    
+    def _start_segment(self, path: str) -> None:
+        """Make path the segment being written and the current log file."""
+        self._segment_path = path
+        self._segment_size = os.path.getsize(path) if os.path.exists(path) else 0
+        self._segment_started = time.monotonic()
+        self.current_log_file = path
+    
+    def _compress_in_background(self, path: str) -> None:
+        """Start gzipping a rotated segment on a separate thread."""
+        thread = threading.Thread(target=self._compress_segment, args=(path,), name="audit-log-gzip", daemon=True)
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+        thread.start()
+    
+    def _compress_segment(self, path: str) -> None:
+        """
+        Replace a rotated segment with a gzipped copy (path + ".gz").
+        
+        The copy is written to a temporary name and renamed, so an interrupted
+        compression never leaves a truncated .gz file or loses the original.
+        
+        Args:
+            path: Rotated segment
+        """
+        compressed = path + ".gz"
+        try:
+            with open(path, "rb") as source, gzip.open(compressed + ".tmp", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(compressed + ".tmp", compressed)
+            os.remove(path)
+            with self._segments_lock:
+                if path in self._segments:
+                    self._segments[self._segments.index(path)] = compressed
+            logger.debug(f"Compressed audit log file: {compressed}")
+        except Exception as e:
+            logger.warning(f"Failed to compress audit log file {path}: {str(e)}")
+    
+    def _enqueue(self, line: str) -> None:
+        """
+        Queue a serialized entry for the writer thread, applying the queue-full policy.
+        
+        Args:
+            line: JSON line of the entry
+        """
+        self._ensure_writer()
+        with self._pending_changed:
+            self._pending += 1
+        try:
+            if self.queue_full_policy == "drop":
+                self._queue.put_nowait(line)
+            else:
+                self._queue.put(line, timeout=QUEUE_FULL_BLOCK_TIMEOUT_SECONDS)
+        except queue.Full:
+            with self._pending_changed:
+                self._pending -= 1
+                self.dropped_entries += 1
+                dropped = self.dropped_entries
+                self._pending_changed.notify_all()
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Audit log queue full, {dropped} entries dropped so far")
+    
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if it is not running."""
+        if self._writer_thread is not None:
+            return
+        with self._writer_start_lock:
+            if self._writer_thread is None:
+                self._writer_run = self.current_log_file
+                thread = threading.Thread(target=self._writer_loop, name="audit-log-writer", daemon=True)
+                thread.start()
+                self._writer_thread = thread
+                _buffered_loggers.add(self)
+    
+    def _writer_loop(self) -> None:
+        """
+        Write queued entries in batches until stopped.
+        
+        Implementation (What):
+        Waits for an entry, then collects more until batch_size entries are
+        collected, flush_interval has passed, or a flush or new run is
+        requested, and writes them with one write call to a file handle kept
+        open between batches (reopened when the segment changes).
+        """
+        handle: Optional[IO[str]] = None
+        handle_path: Optional[str] = None
+        running = True
+        while running:
+            item = self._queue.get()
+            batch: List[str] = []
+            new_run: Optional[str] = None
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    running = False
+                    break
+                if item is _FLUSH:
+                    break
+                if isinstance(item, _NewRun):
+                    new_run = item.path
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                handle, handle_path = self._write_batch(batch, handle, handle_path)
+            if new_run is not None:
+                self._writer_run = new_run
+        if handle is not None:
+            handle.close()
+    
+    def _write_batch(
+        self,
+        batch: List[str],
+        handle: Optional[IO[str]],
+        handle_path: Optional[str]
+    ) -> Tuple[Optional[IO[str]], Optional[str]]:
+        """
+        Append a batch of serialized entries to the current segment.
+        
+        Args:
+            batch: JSON lines in queue order
+            handle: File handle kept open by the writer, or None
+            handle_path: Path of handle
+        
+        Returns:
+            Tuple of (handle, handle_path) to keep open for the next batch
+        """
+        try:
+            data = "".join(batch)
+            path = self._prepare_segment(self._writer_run, len(data))
+            if path != handle_path:
+                if handle is not None:
+                    handle.close()
+                    handle = None
+                handle = open(path, "a", encoding="utf-8")
+                handle_path = path
+            handle.write(data)
+            self._segment_size += len(data)
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+            written = len(batch)
+        except Exception as e:
+            # Don't let audit logging failures stop the writer
+            logger.error(f"Failed to write {len(batch)} audit log entries: {str(e)}", exc_info=True)
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+            handle, handle_path, written = None, None, 0
+        with self._pending_changed:
+            self._pending -= len(batch)
+            self.written_entries += written
+            self._pending_changed.notify_all()
+        return handle, handle_path
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued entry has been written.
+        
+        Args:
+            timeout: Maximum seconds to wait (None: no limit)
+        
+        Returns:
+            True if all entries were written, False on timeout
+        """
+        if self._writer_thread is None:
+            return True
+        self._queue.put(_FLUSH)
+        with self._pending_changed:
+            return self._pending_changed.wait_for(lambda: self._pending <= 0, timeout=timeout)
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Write all queued entries, stop the writer thread and wait for compression.
+        
+        The logger stays usable: the next entry starts a new writer thread.
+        
+        Args:
+            timeout: Maximum seconds to wait for the writer
+        """
+        with self._writer_start_lock:
+            thread = self._writer_thread
+            if thread is not None:
+                self.flush(timeout)
+                self._queue.put(_STOP)
+                thread.join(timeout)
+                self._writer_thread = None
+                _buffered_loggers.discard(self)
+        # Rotated files still being gzipped
+        for compressor in list(self._compressors):
+            compressor.join(timeout)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get writer statistics.
+        
+        Returns:
+            Dictionary with buffered, pending, written_entries, dropped_entries,
+            rotations and current_log_file
+        """
+        with self._pending_changed:
+            return {
+                "buffered": self.buffered,
+                "pending": self._pending,
+                "written_entries": self.written_entries,
+                "dropped_entries": self.dropped_entries,
+                "rotations": self.rotations,
+                "current_log_file": self.current_log_file,
+            }
+    
     def log_tool_call(
         self,
         correlation_id: str,
@@ -405,6 +808,7 @@ class AuditLogger:
 # This can be imported and used across the application to ensure
 # all modules use the same logger instance and log file
 _shared_audit_logger = None
+_shared_audit_logger_lock = threading.Lock()
 
 
 def get_audit_logger() -> AuditLogger:
@@ -418,7 +822,9 @@ def get_audit_logger() -> AuditLogger:
     
     Implementation (What):
     Creates a shared AuditLogger instance on first call and returns the same
-    instance on subsequent calls. This ensures all modules share the same logger.
+    instance on subsequent calls. This ensures all modules share the same logger,
+    and with it one writer thread and one set of rotated files. Uses
+    double-checked locking so concurrent first calls create one instance.
     
     Returns:
         AuditLogger: The shared AuditLogger instance. Creates a new instance
@@ -429,6 +835,31 @@ def get_audit_logger() -> AuditLogger:
     """
     global _shared_audit_logger
     if _shared_audit_logger is None:
-        _shared_audit_logger = AuditLogger()
+        with _shared_audit_logger_lock:
+            if _shared_audit_logger is None:
+                _shared_audit_logger = AuditLogger()
     return _shared_audit_logger
 
+
+
+def flush_audit_logs(timeout: Optional[float] = None) -> None:
+    """
+    Write the queued entries of every buffered AuditLogger.
+    
+    Args:
+        timeout: Maximum seconds to wait per logger (None: no limit)
+    """
+    for audit_logger in list(_buffered_loggers):
+        audit_logger.flush(timeout)
+
+
+def _close_audit_loggers() -> None:
+    """Write queued entries and stop the writer threads at interpreter exit."""
+    for audit_logger in list(_buffered_loggers):
+        try:
+            audit_logger.close(timeout=10.0)
+        except Exception as e:
+            logger.error(f"Failed to flush audit log at exit: {str(e)}")
+
+
+atexit.register(_close_audit_loggers)
@@ -0,0 +1,509 @@
+"""
+Indexed queries over the audit log files.
+
+Purpose (Why):
+Investigating a slow or failed request meant grepping every JSONL audit file
+for its correlation ID. With rotated segments and long-running processes
+that reads (and decompresses) every byte of every file for each question.
+
+Implementation (What):
+Keeps a sidecar index next to each audit file (audit_....json.idx) mapping
+correlation_id, agent_id, tool_name and minute time bucket to the byte
+offsets of the matching lines. Indexes are updated incrementally: only
+bytes appended since the last update are scanned, and a gzipped segment
+continues the index of the plain file it was compressed from (offsets are
+positions in the uncompressed content). Queries intersect offset lists,
+skip files whose time span does not overlap the requested range, and read
+only the matching lines, yielding entries as they are read.
+
+Usage:
+    python -m app.security.audit_query [--log-dir logs/audit] index
+    python -m app.security.audit_query query [--correlation-id ID] [--agent-id ID] [--tool-name NAME]
+                                             [--since ISO] [--until ISO] [--limit N]
+    python -m app.security.audit_query timeline CORRELATION_ID
+"""
+
+import os
+import sys
+import gzip
+import json
+import glob
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Set, Union, IO
+from app.security.audit_logger import DEFAULT_AUDIT_LOG_DIR, flush_audit_logs
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Sidecar index file suffix and format version
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# Entry fields indexed by value
+INDEXED_FIELDS = ("correlation_id", "agent_id", "tool_name")
+
+# Time buckets are timestamp prefixes of this length ("YYYY-MM-DDTHH:MM", one minute)
+TIME_BUCKET_LENGTH = 16
+
+
+def _bucket(timestamp: str) -> str:
+    """Get the minute time bucket of an ISO timestamp."""
+    return timestamp[:TIME_BUCKET_LENGTH]
+
+
+def _normalize_time(value: Union[str, datetime, None]) -> Optional[str]:
+    """
+    Convert a range bound to an ISO string comparable with entry timestamps.
+
+    Raises:
+        ValueError: If a string bound is not an ISO timestamp
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return datetime.fromisoformat(value).isoformat()
+
+
+class AuditFileIndex:
+    """
+    Sidecar index of one audit file.
+
+    Attributes:
+        path: Audit file (plain .json or gzipped .json.gz)
+        index_path: Sidecar index file
+        indexed_bytes: Uncompressed bytes of the file covered by the index
+        complete: Whether the file is gzipped and fully indexed (no longer changes)
+        first_timestamp: Earliest indexed entry timestamp, or None
+        last_timestamp: Latest indexed entry timestamp, or None
+        offsets: Field name -> value -> byte offsets of the matching lines
+            (fields of INDEXED_FIELDS plus "time_bucket")
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize an empty index of an audit file (see load()).
+
+        Args:
+            path: Audit file path
+        """
+        self.path = path
+        self.index_path = (path[:-3] if path.endswith(".gz") else path) + INDEX_SUFFIX
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget everything indexed."""
+        self.indexed_bytes = 0
+        self.complete = False
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.offsets: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEXED_FIELDS + ("time_bucket",)}
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the audit file is gzipped."""
+        return self.path.endswith(".gz")
+
+    def _open(self) -> IO[bytes]:
+        """Open the audit file for binary reading (decompressing if gzipped)."""
+        return gzip.open(self.path, "rb") if self.compressed else open(self.path, "rb")
+
+    @classmethod
+    def load(cls, path: str) -> "AuditFileIndex":
+        """
+        Load the sidecar index of an audit file, brought up to date with the file.
+
+        Implementation (What):
+        Reads the saved index (a missing, unreadable or outdated-version index
+        starts empty), scans the bytes appended since it was saved, and saves
+        it again if anything changed. A plain file smaller than the indexed
+        size was replaced, so it is indexed from the start.
+
+        Args:
+            path: Audit file path
+
+        Returns:
+            AuditFileIndex covering every complete line of the file
+
+        Raises:
+            OSError: If the audit file cannot be read
+        """
+        index = cls(path)
+        try:
+            with open(index.index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") == INDEX_VERSION:
+                index.indexed_bytes = saved["indexed_bytes"]
+                index.complete = saved["complete"]
+                index.first_timestamp = saved["first_timestamp"]
+                index.last_timestamp = saved["last_timestamp"]
+                index.offsets.update(saved["offsets"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Rebuilding unreadable audit index {index.index_path}: {str(e)}")
+            index._reset()
+        if index.update():
+            index.save()
+        return index
+
+    def update(self) -> bool:
+        """
+        Index the lines appended since the last update.
+
+        A trailing line without a newline is still being written and is left
+        for the next update. Lines that are not valid JSON are skipped.
+
+        Returns:
+            True if the index changed
+        """
+        if self.complete and self.compressed:
+            return False
+        if not self.compressed and os.path.getsize(self.path) < self.indexed_bytes:
+            self._reset()
+        start = self.indexed_bytes
+        offset = start
+        with self._open() as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._add_line(line, offset)
+                offset += len(line)
+        self.indexed_bytes = offset
+        if self.compressed:
+            self.complete = True
+            return True
+        return offset != start
+
+    def _add_line(self, line: bytes, offset: int) -> None:
+        """Record the indexed values of one line at its offset."""
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(entry, dict):
+            return
+        for field in INDEXED_FIELDS:
+            value = entry.get(field)
+            if value is not None:
+                self.offsets[field].setdefault(str(value), []).append(offset)
+        timestamp = entry.get("timestamp")
+        if isinstance(timestamp, str):
+            self.offsets["time_bucket"].setdefault(_bucket(timestamp), []).append(offset)
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+
+    def save(self) -> None:
+        """Write the index atomically (temporary file, then rename)."""
+        data = {
+            "version": INDEX_VERSION,
+            "indexed_bytes": self.indexed_bytes,
+            "complete": self.complete,
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+            "offsets": self.offsets,
+        }
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            # The index is only a cache; queries still work from memory
+            logger.warning(f"Failed to save audit index {self.index_path}: {str(e)}")
+
+    def overlaps(self, start: Optional[str], end: Optional[str]) -> bool:
+        """Check whether indexed entries may fall within [start, end]."""
+        if self.first_timestamp is None:
+            return False
+        if start is not None and self.last_timestamp < start:
+            return False
+        if end is not None and self.first_timestamp > end:
+            return False
+        return True
+
+    def candidate_offsets(self, filters: Dict[str, str], start: Optional[str], end: Optional[str]) -> Set[int]:
+        """
+        Get the offsets of lines that may match the filters and time range.
+
+        Args:
+            filters: Field name (of INDEXED_FIELDS) -> required value
+            start: Earliest timestamp, or None
+            end: Latest timestamp, or None
+
+        Returns:
+            Candidate offsets (exact matching is done on the read entries)
+        """
+        candidates: Optional[Set[int]] = None
+        # Most selective list first, so the intersections stay small
+        lists = sorted((self.offsets[field].get(value, []) for field, value in filters.items()), key=len)
+        for offsets in lists:
+            candidates = set(offsets) if candidates is None else candidates.intersection(offsets)
+            if not candidates:
+                return set()
+        if start is not None or end is not None:
+            in_range: Set[int] = set()
+            for bucket, offsets in self.offsets["time_bucket"].items():
+                if (start is None or bucket >= _bucket(start)) and (end is None or bucket <= _bucket(end)):
+                    in_range.update(offsets)
+            candidates = in_range if candidates is None else candidates & in_range
+        return candidates if candidates is not None else set()
+
+    def read(self, offsets: Set[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Read the entries at the given offsets, in file order.
+
+        Args:
+            offsets: Line offsets from this index
+
+        Yields:
+            Parsed entries
+        """
+        with self._open() as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                try:
+                    yield json.loads(f.readline())
+                except ValueError:
+                    continue
+
+
+class AuditQuery:
+    """
+    Indexed queries over the audit files of a log directory.
+
+    Purpose (Why):
+    Answers "what happened in request X" (and by agent, tool or time range)
+    by reading only the matching lines instead of every audit file.
+
+    Implementation (What):
+    Loads (and updates) the sidecar index of every audit file on each query,
+    which scans only newly appended bytes, and streams matching entries from
+    the oldest file to the newest. Index files whose audit file was deleted
+    by log cleanup are removed.
+
+    Attributes:
+        log_dir: Directory of the audit files
+    """
+
+    def __init__(self, log_dir: Optional[str] = None):
+        """
+        Initialize AuditQuery.
+
+        Args:
+            log_dir: Audit log directory.
+                If None, reads from AUDIT_LOG_DIR env var or uses DEFAULT_AUDIT_LOG_DIR.
+        """
+        self.log_dir = log_dir or os.getenv("AUDIT_LOG_DIR", DEFAULT_AUDIT_LOG_DIR)
+
+    def _log_files(self) -> List[str]:
+        """
+        List the audit files, oldest first.
+
+        A file being gzipped briefly exists in both forms; the plain file is
+        used until compression completes.
+        """
+        pattern = os.path.join(self.log_dir, "audit_*.json")
+        plain = glob.glob(pattern)
+        plain_set = set(plain)
+        compressed = [path for path in glob.glob(pattern + ".gz") if path[:-3] not in plain_set]
+        return sorted(plain + compressed, key=lambda path: path[:-3] if path.endswith(".gz") else path)
+
+    def indexes(self) -> List[AuditFileIndex]:
+        """
+        Load the up-to-date index of every audit file, oldest first.
+
+        Entries still queued by a buffered AuditLogger of this process are
+        written first. Sidecar indexes of deleted audit files are removed.
+
+        Returns:
+            One AuditFileIndex per audit file
+        """
+        flush_audit_logs()
+        if not os.path.isdir(self.log_dir):
+            return []
+        indexes = []
+        for path in self._log_files():
+            try:
+                indexes.append(AuditFileIndex.load(path))
+            except OSError as e:
+                # Deleted by cleanup or unreadable; skip it
+                logger.warning(f"Skipping audit log {path}: {str(e)}")
+        indexed = {index.index_path for index in indexes}
+        for index_path in glob.glob(os.path.join(self.log_dir, "audit_*.json" + INDEX_SUFFIX)):
+            if index_path not in indexed and not os.path.exists(index_path[:-len(INDEX_SUFFIX)]):
+                try:
+                    os.remove(index_path)
+                except OSError:
+                    pass
+        return indexes
+
+    def query(
+        self,
+        correlation_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        start: Union[str, datetime, None] = None,
+        end: Union[str, datetime, None] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the audit entries matching all given filters.
+
+        Args:
+            correlation_id: Required correlation ID
+            agent_id: Required agent ID
+            tool_name: Required tool name (only tool_call entries have one)
+            start: Earliest timestamp (inclusive), ISO string or datetime
+            end: Latest timestamp (inclusive), ISO string or datetime
+            limit: Maximum entries to yield
+
+        Yields:
+            Matching entries, oldest file first and in write order within a file
+
+        Raises:
+            ValueError: If start or end is not an ISO timestamp
+        """
+        start_time = _normalize_time(start)
+        end_time = _normalize_time(end)
+        filters = {
+            field: value
+            for field, value in zip(INDEXED_FIELDS, (correlation_id, agent_id, tool_name))
+            if value is not None
+        }
+        count = 0
+        for index in self.indexes():
+            if not index.overlaps(start_time, end_time):
+                continue
+            if filters or start_time is not None or end_time is not None:
+                offsets = index.candidate_offsets(filters, start_time, end_time)
+            else:
+                offsets = {offset for bucket in index.offsets["time_bucket"].values() for offset in bucket}
+            if not offsets:
+                continue
+            for entry in index.read(offsets):
+                if any(str(entry.get(field)) != value for field, value in filters.items()):
+                    continue
+                timestamp = entry.get("timestamp", "")
+                if (start_time is not None and timestamp < start_time) or (end_time is not None and timestamp > end_time):
+                    continue
+                yield entry
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def timeline(self, correlation_id: str) -> Dict[str, Any]:
+        """
+        Reconstruct the timeline of one request.
+
+        Args:
+            correlation_id: Correlation ID of the request
+
+        Returns:
+            Dictionary with:
+            - correlation_id: The requested ID
+            - start / end: First and last entry timestamps (None if no entries)
+            - duration_ms: Time from the first to the last entry
+            - tool_calls: Number of tool_call entries
+            - errors: Number of entries with status "error"
+            - events: Entries in time order, each as {elapsed_ms, event_type,
+              name (action or tool name), status, entry}
+        """
+        entries = sorted(self.query(correlation_id=correlation_id), key=lambda entry: entry.get("timestamp", ""))
+        events = []
+        started = None
+        for entry in entries:
+            moment = datetime.fromisoformat(entry["timestamp"])
+            started = started or moment
+            events.append({
+                "elapsed_ms": round((moment - started).total_seconds() * 1000, 3),
+                "event_type": entry.get("event_type"),
+                "name": entry.get("tool_name") or entry.get("action"),
+                "status": entry.get("status"),
+                "entry": entry,
+            })
+        return {
+            "correlation_id": correlation_id,
+            "start": entries[0]["timestamp"] if entries else None,
+            "end": entries[-1]["timestamp"] if entries else None,
+            "duration_ms": events[-1]["elapsed_ms"] if events else 0.0,
+            "tool_calls": sum(1 for entry in entries if entry.get("event_type") == "tool_call"),
+            "errors": sum(1 for entry in entries if entry.get("status") == "error"),
+            "events": events,
+        }
+
+
+def _format_timeline(timeline: Dict[str, Any]) -> str:
+    """Format a timeline as one line per event."""
+    lines = [
+        f"{timeline['correlation_id']}: {len(timeline['events'])} events, "
+        f"{timeline['tool_calls']} tool calls, {timeline['errors']} errors, {timeline['duration_ms']:.1f} ms"
+    ]
+    for event in timeline["events"]:
+        lines.append(
+            f"  +{event['elapsed_ms']:>10.1f} ms  {event['event_type']:<12} {event['name'] or '-':<32} {event['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the audit query command.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code (0 on success, 1 on failure or no matching entries)
+    """
+    parser = argparse.ArgumentParser(description="Query the audit logs through their sidecar indexes.")
+    parser.add_argument("--log-dir", default=None, help="Audit log directory (default: AUDIT_LOG_DIR or logs/audit)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("index", help="Build or update the index of every audit file")
+    query_parser = commands.add_parser("query", help="Print matching entries as JSON lines")
+    query_parser.add_argument("--correlation-id")
+    query_parser.add_argument("--agent-id")
+    query_parser.add_argument("--tool-name")
+    query_parser.add_argument("--since", help="Earliest timestamp (ISO format)")
+    query_parser.add_argument("--until", help="Latest timestamp (ISO format)")
+    query_parser.add_argument("--limit", type=int)
+    timeline_parser = commands.add_parser("timeline", help="Print the timeline of one request")
+    timeline_parser.add_argument("correlation_id")
+    timeline_parser.add_argument("--json", action="store_true", help="Print the timeline as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    audit_query = AuditQuery(log_dir=args.log_dir)
+    try:
+        if args.command == "index":
+            indexes = audit_query.indexes()
+            print(f"Indexed {len(indexes)} audit file(s) in {audit_query.log_dir}")
+            return 0
+        if args.command == "query":
+            found = False
+            for entry in audit_query.query(
+                correlation_id=args.correlation_id,
+                agent_id=args.agent_id,
+                tool_name=args.tool_name,
+                start=args.since,
+                end=args.until,
+                limit=args.limit,
+            ):
+                print(json.dumps(entry, ensure_ascii=False, default=str))
+                found = True
+            return 0 if found else 1
+        timeline = audit_query.timeline(args.correlation_id)
+        print(json.dumps(timeline, ensure_ascii=False, indent=2, default=str) if args.json else _format_timeline(timeline))
+        return 0 if timeline["events"] else 1
+    except Exception as e:
+        logger.error(f"Audit query failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
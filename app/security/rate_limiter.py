@@ -9,22 +9,29 @@ per day, and consecutive calls to detect and prevent infinite loops or excessive
 
 Implementation (What):
 Implements a RateLimiter class that tracks tool calls using time-based windows
-and counters. Uses collections.defaultdict and time.time() for efficient tracking.
-Maintains separate counters for:
+and counters. Windows are counted by SlidingWindowCounter, a fixed ring of
+time buckets, so checking and recording cost O(1) time and memory per key no
+matter how many calls were made. State is guarded by a fixed set of striped
+locks instead of one global lock. Maintains separate counters for:
 - Per-minute limits: Maximum calls per tool per minute
 - Per-day limits: Maximum calls per tool per day
 - Consecutive limits: Maximum consecutive calls to the same tool (prevents loops)
 
+Keys of callers that went idle are evicted by a background thread, so memory
+is bounded by the callers active in the last day (a window key is dropped once
+its day window is empty, which loses nothing) and by the requests of the last
+RATE_LIMIT_IDLE_SECONDS (consecutive-call state, kept per correlation ID).
+
 Configuration is loaded from environment variables with sensible defaults.
 All limits are configurable via environment variables for flexibility.
 """
 
 import os
 import time
+import weakref
 import logging
 import threading
-from typing import Dict, Tuple, Optional
-from collections import defaultdict
+from typing import Dict, Hashable, List, Tuple, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -33,6 +40,107 @@ load_dotenv()
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
+# Window lengths and their bucket counts (1-second buckets per minute, 15-minute buckets per day)
+MINUTE_WINDOW_SECONDS = 60
+MINUTE_WINDOW_BUCKETS = 60
+DAY_WINDOW_SECONDS = 86400
+DAY_WINDOW_BUCKETS = 96
+
+# Number of locks the limiter state is striped over
+LOCK_STRIPES = 64
+
+# Defaults of idle-key eviction
+DEFAULT_IDLE_SECONDS = 3600
+DEFAULT_EVICTION_INTERVAL_SECONDS = 300
+
+
+class SlidingWindowCounter:
+    """
+    Count of calls in a sliding time window, in fixed memory.
+    
+    Purpose (Why):
+    Storing one timestamp per call makes memory and the cost of every check
+    grow with the limit (up to 1000 timestamps per key for the day window).
+    A bucketed counter answers "how many calls in the last N seconds" with a
+    fixed number of integers.
+    
+    Implementation (What):
+    Splits the window into bucket_count buckets kept in a ring (plus one for
+    the current, partial bucket) with a running total. Moving to a later
+    bucket clears the buckets that left the window, at most the ring size
+    however many calls were made, so add() and count() are O(1) in the
+    number of calls. A call leaves the window between window_seconds and
+    one bucket later, never earlier, so a limit is never exceeded.
+    Not thread-safe; RateLimiter guards each counter with its key's lock.
+    
+    Attributes:
+        bucket_seconds: Length of one bucket
+        total: Calls in the window as of the last update
+        last_bucket: Number of the newest bucket (time // bucket_seconds), or None
+    """
+    
+    __slots__ = ("bucket_seconds", "total", "last_bucket", "_counts")
+    
+    def __init__(self, window_seconds: float, bucket_count: int):
+        """
+        Initialize an empty counter.
+        
+        Args:
+            window_seconds: Window length
+            bucket_count: Buckets the window is split into (its resolution)
+        """
+        self.bucket_seconds = window_seconds / bucket_count
+        self.total = 0
+        self.last_bucket: Optional[int] = None
+        self._counts: List[int] = [0] * (bucket_count + 1)
+    
+    def _advance(self, now: float) -> int:
+        """Move to the bucket of now, clearing the buckets that left the window."""
+        bucket = int(now // self.bucket_seconds)
+        if self.last_bucket is None:
+            self.last_bucket = bucket
+        elif bucket > self.last_bucket:
+            size = len(self._counts)
+            if bucket - self.last_bucket >= size:
+                self._counts = [0] * size
+                self.total = 0
+            else:
+                for expired in range(self.last_bucket + 1, bucket + 1):
+                    slot = expired % size
+                    self.total -= self._counts[slot]
+                    self._counts[slot] = 0
+            self.last_bucket = bucket
+        return self.last_bucket
+    
+    def count(self, now: float) -> int:
+        """
+        Get the calls in the window ending at now.
+        
+        Args:
+            now: Current time (time.time())
+        
+        Returns:
+            Number of calls
+        """
+        self._advance(now)
+        return self.total
+    
+    def add(self, now: float, calls: int = 1) -> None:
+        """
+        Record calls at now.
+        
+        Args:
+            now: Current time (time.time())
+            calls: Number of calls to record
+        """
+        bucket = self._advance(now)
+        self._counts[bucket % len(self._counts)] += calls
+        self.total += calls
+    
+    def __len__(self) -> int:
+        """Calls in the window as of the last update."""
+        return self.total
+
 
 class RateLimiter:
     """
@@ -46,32 +154,39 @@ class RateLimiter:
     of service scenarios.
     
     Implementation (What):
-    Maintains time-based tracking structures using defaultdict for efficient
-    storage. Tracks:
-    - Per-minute calls: List of timestamps for calls in the last minute
-    - Per-day calls: List of timestamps for calls in the last 24 hours
+    Maintains time-based tracking structures per (tool_name, agent_id) key:
+    - Per-minute calls: SlidingWindowCounter over the last minute
+    - Per-day calls: SlidingWindowCounter over the last 24 hours
     - Consecutive calls: Counter for consecutive calls to the same tool
     
-    Uses sliding window approach - removes old timestamps outside the window
-    before checking limits. Thread-safe for concurrent execution using
-    threading.Lock to protect shared state during parallel tool execution.
+    Uses sliding window approach with bucketed counters, so each check and
+    record is O(1) and each key uses fixed memory. Thread-safe for concurrent
+    execution: every key is guarded by one of LOCK_STRIPES locks (chosen by
+    hash), so calls for different keys rarely wait for each other.
     
     Attributes:
         per_minute_limit: Maximum calls per tool per minute (default: 60)
         per_day_limit: Maximum calls per tool per day (default: 1000)
         consecutive_limit: Maximum consecutive calls to same tool (default: 10)
-        _lock: Threading lock for thread-safe state access
-        _minute_calls: Dict tracking calls per minute per tool per agent
-        _day_calls: Dict tracking calls per day per tool per agent
+        _locks: Striped threading locks for thread-safe state access
+        _minute_calls: Dict of per-minute SlidingWindowCounter per tool per agent
+        _day_calls: Dict of per-day SlidingWindowCounter per tool per agent
+        idle_seconds: Inactivity after which consecutive-call state of a
+            correlation ID is evicted (default: 3600)
+        eviction_interval: Seconds between background eviction sweeps (default: 300, 0 disables)
+        evicted_keys: Keys evicted so far
         _consecutive_calls: Dict tracking consecutive calls per tool per agent
         _last_tool: Dict tracking last tool called per agent
+        _last_seen: Dict of last check time per correlation ID
     """
     
     def __init__(
         self,
         per_minute_limit: Optional[int] = None,
         per_day_limit: Optional[int] = None,
-        consecutive_limit: Optional[int] = None
+        consecutive_limit: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        eviction_interval: Optional[float] = None
     ):
         """
         Initialize RateLimiter with configuration limits.
@@ -83,8 +198,7 @@ class RateLimiter:
         
         Implementation (What):
         Reads environment variables for limits, falling back to defaults if
-        not provided. Initializes tracking dictionaries using defaultdict for
-        efficient storage. All limits are configurable to allow tuning based
+        not provided. Initializes the tracking dictionaries. All limits are configurable to allow tuning based
         on system requirements.
         
         Args:
@@ -94,6 +208,11 @@ class RateLimiter:
                 If None, reads from RATE_LIMIT_PER_DAY env var or defaults to 1000.
             consecutive_limit: Maximum consecutive calls to same tool.
                 If None, reads from RATE_LIMIT_CONSECUTIVE env var or defaults to 10.
+            idle_seconds: Inactivity before consecutive-call state is evicted.
+                If None, reads from RATE_LIMIT_IDLE_SECONDS env var or defaults to 3600.
+            eviction_interval: Seconds between eviction sweeps of the background thread
+                (started with the first recorded call; 0 disables it).
+                If None, reads from RATE_LIMIT_EVICTION_INTERVAL_SECONDS env var or defaults to 300.
         
         Returns:
             None. Initializes the RateLimiter instance with configured limits.
@@ -118,9 +237,9 @@ class RateLimiter:
             else int(os.getenv("RATE_LIMIT_CONSECUTIVE", "10"))
         )
         
-        # Tracking structures: (tool_name, agent_id) -> list of timestamps
-        self._minute_calls: Dict[Tuple[str, str], list] = defaultdict(list)
-        self._day_calls: Dict[Tuple[str, str], list] = defaultdict(list)
+        # Tracking structures: (tool_name, agent_id) -> sliding window counter
+        self._minute_calls: Dict[Tuple[str, str], SlidingWindowCounter] = {}
+        self._day_calls: Dict[Tuple[str, str], SlidingWindowCounter] = {}
         
         # Tracking consecutive calls: (correlation_id, tool_name) -> count
         # Uses correlation_id instead of agent_id to prevent cross-request blocking
@@ -129,8 +248,27 @@ class RateLimiter:
         # Track last tool called per correlation_id
         self._last_tool: Dict[str, str] = {}
         
-        # Thread lock for thread-safe concurrent access
-        self._lock = threading.Lock()
+        # Last check time per correlation_id, for idle eviction
+        self._last_seen: Dict[str, float] = {}
+        
+        # Striped thread locks for thread-safe concurrent access
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        
+        # Idle-key eviction settings and background thread state
+        self.idle_seconds = (
+            idle_seconds
+            if idle_seconds is not None
+            else float(os.getenv("RATE_LIMIT_IDLE_SECONDS", str(DEFAULT_IDLE_SECONDS)))
+        )
+        self.eviction_interval = (
+            eviction_interval
+            if eviction_interval is not None
+            else float(os.getenv("RATE_LIMIT_EVICTION_INTERVAL_SECONDS", str(DEFAULT_EVICTION_INTERVAL_SECONDS)))
+        )
+        self.evicted_keys = 0
+        self._evictor: Optional[threading.Thread] = None
+        self._evictor_stop = threading.Event()
+        self._evictor_lock = threading.Lock()
         
         logger.info(
             f"RateLimiter initialized: "
@@ -139,35 +277,28 @@ class RateLimiter:
             f"consecutive={self.consecutive_limit}"
         )
     
-    def _cleanup_old_entries(self, key: Tuple[str, str], window_seconds: int, calls_list: list) -> None:
+    def _lock_for(self, key: Hashable) -> threading.Lock:
+        """Get the striped lock guarding the state of key."""
+        return self._locks[hash(key) % LOCK_STRIPES]
+    
+    def _counters(self, key: Tuple[str, str]) -> Tuple[SlidingWindowCounter, SlidingWindowCounter]:
         """
-        Remove timestamps outside the time window.
+        Get (creating on first use) the minute and day counters of a key.
         
-        Purpose (Why):
-        Maintains sliding window by removing old entries that are outside
-        the time window. This prevents memory growth and ensures accurate
-        rate limit checking.
-        
-        Implementation (What):
-        Filters the calls list to only include timestamps within the window.
-        Uses current time minus window_seconds as the cutoff point.
+        Must be called with the key's lock held.
         
         Args:
-            key: Tuple of (tool_name, agent_id) for the tracking entry
-            window_seconds: Time window in seconds (60 for minute, 86400 for day)
-            calls_list: List of timestamps to clean
+            key: Tuple of (tool_name, agent_id)
         
         Returns:
-            None. Modifies self._minute_calls in place by filtering old entries.
-        
-        Raises:
-            None. This method does not raise exceptions.
+            Tuple of (minute counter, day counter)
         """
-        current_time = time.time()
-        cutoff_time = current_time - window_seconds
-        
-        # Filter out old entries
-        self._minute_calls[key] = [ts for ts in calls_list if ts > cutoff_time]
+        minute_counter = self._minute_calls.get(key)
+        if minute_counter is None:
+            minute_counter = SlidingWindowCounter(MINUTE_WINDOW_SECONDS, MINUTE_WINDOW_BUCKETS)
+            self._minute_calls[key] = minute_counter
+            self._day_calls[key] = SlidingWindowCounter(DAY_WINDOW_SECONDS, DAY_WINDOW_BUCKETS)
+        return minute_counter, self._day_calls[key]
     
     def check_rate_limit(
         self, 
@@ -191,16 +322,17 @@ class RateLimiter:
         2. Per-day limit: Counts calls in the last 24 hours (by agent_id)
         3. Consecutive limit: Tracks consecutive calls to the same tool (by correlation_id)
         
-        Uses sliding window approach - cleans old entries before checking.
-        All state access is protected by threading.Lock to ensure thread-safety
-        during parallel tool execution. Returns tuple of (allowed, error_message)
+        Uses sliding window counters - expired buckets are cleared before
+        checking, in O(1). Window state is read under the lock of the
+        (tool_name, agent_id) key and consecutive state under the lock of the
+        correlation ID, to ensure thread-safety during parallel tool execution. Returns tuple of (allowed, error_message)
         where error_message is None if allowed, or a descriptive message if limit exceeded.
         
         Args:
             tool_name: Name of the tool to check
             agent_id: Identifier for the agent/session making the call.
                 Used for per-minute and per-day limits. Defaults to "default" for stateless agents.
-                Can be session ID or user ID in future implementations.
+                The chat UI passes the user ID or session ID.
             correlation_id: Optional correlation ID for the request/conversation.
                 Used for consecutive limit tracking. If None, uses agent_id as fallback.
                 This prevents cross-request blocking when multiple requests use same agent_id.
@@ -216,44 +348,42 @@ class RateLimiter:
             >>> if not allowed:
             ...     print(f"Rate limit exceeded: {error}")
         """
-        with self._lock:
-            current_time = time.time()
-            key = (tool_name, agent_id)
-            
-            # Clean up old entries before checking
-            if key in self._minute_calls:
-                self._cleanup_old_entries(key, 60, self._minute_calls[key])
-            
-            if key in self._day_calls:
-                self._cleanup_old_entries(key, 86400, self._day_calls[key])
-            
-            # Check per-minute limit
-            minute_calls = self._minute_calls[key]
-            if len(minute_calls) >= self.per_minute_limit:
-                error_msg = (
-                    f"Rate limit exceeded: {len(minute_calls)} calls to '{tool_name}' "
-                    f"in the last minute (limit: {self.per_minute_limit}). "
-                    f"Please wait before trying again."
-                )
-                logger.warning(f"Rate limit exceeded for {tool_name} by {agent_id}: per-minute limit")
-                return False, error_msg
-            
-            # Check per-day limit
-            day_calls = self._day_calls[key]
-            if len(day_calls) >= self.per_day_limit:
-                error_msg = (
-                    f"Rate limit exceeded: {len(day_calls)} calls to '{tool_name}' "
-                    f"in the last 24 hours (limit: {self.per_day_limit}). "
-                    f"Daily limit reached. Please try again tomorrow."
-                )
-                logger.warning(f"Rate limit exceeded for {tool_name} by {agent_id}: per-day limit")
-                return False, error_msg
-            
-            # Check consecutive limit using correlation_id (or agent_id as fallback)
-            # This prevents cross-request blocking when multiple requests share same agent_id
-            effective_correlation_id = correlation_id if correlation_id is not None else agent_id
-            consecutive_key = (effective_correlation_id, tool_name)
-            
+        current_time = time.time()
+        key = (tool_name, agent_id)
+        with self._lock_for(key):
+            # Checking alone creates no state; keys are created by record_call()
+            minute_counter = self._minute_calls.get(key)
+            day_counter = self._day_calls.get(key)
+            minute_calls = minute_counter.count(current_time) if minute_counter is not None else 0
+            day_calls = day_counter.count(current_time) if day_counter is not None else 0
+        
+        # Check per-minute limit
+        if minute_calls >= self.per_minute_limit:
+            error_msg = (
+                f"Rate limit exceeded: {minute_calls} calls to '{tool_name}' "
+                f"in the last minute (limit: {self.per_minute_limit}). "
+                f"Please wait before trying again."
+            )
+            logger.warning(f"Rate limit exceeded for {tool_name} by {agent_id}: per-minute limit")
+            return False, error_msg
+        
+        # Check per-day limit
+        if day_calls >= self.per_day_limit:
+            error_msg = (
+                f"Rate limit exceeded: {day_calls} calls to '{tool_name}' "
+                f"in the last 24 hours (limit: {self.per_day_limit}). "
+                f"Daily limit reached. Please try again tomorrow."
+            )
+            logger.warning(f"Rate limit exceeded for {tool_name} by {agent_id}: per-day limit")
+            return False, error_msg
+        
+        # Check consecutive limit using correlation_id (or agent_id as fallback)
+        # This prevents cross-request blocking when multiple requests share same agent_id
+        effective_correlation_id = correlation_id if correlation_id is not None else agent_id
+        consecutive_key = (effective_correlation_id, tool_name)
+        
+        with self._lock_for(effective_correlation_id):
+            self._last_seen[effective_correlation_id] = current_time
             last_tool = self._last_tool.get(effective_correlation_id)
             if last_tool == tool_name:
                 # Same tool as last call - increment consecutive counter
@@ -276,9 +406,9 @@ class RateLimiter:
             
             # Update last tool for this correlation_id
             self._last_tool[effective_correlation_id] = tool_name
-            
-            # All checks passed
-            return True, None
+        
+        # All checks passed
+        return True, None
     
     def record_call(
         self, 
@@ -296,10 +426,10 @@ class RateLimiter:
         for concurrent execution when multiple tools are executed in parallel.
         
         Implementation (What):
-        Adds current timestamp to both minute and day tracking lists for the
-        given tool and agent. This updates the sliding window tracking used
-        by check_rate_limit(). All state updates are protected by threading.Lock
-        to ensure thread-safety during parallel tool execution.
+        Counts the call at the current time in both the minute and day window
+        counters of the given tool and agent. This updates the sliding window
+        tracking used by check_rate_limit(). Counter updates are protected by
+        the key's striped lock to ensure thread-safety during parallel tool execution.
         
         Args:
             tool_name: Name of the tool that was called
@@ -321,14 +451,136 @@ class RateLimiter:
             ...     limiter.record_call("get_medication_by_name", "session_123", "corr_456")
             ...     # Execute tool...
         """
-        with self._lock:
-            current_time = time.time()
-            key = (tool_name, agent_id)
-            
-            # Add timestamp to tracking lists
-            self._minute_calls[key].append(current_time)
-            self._day_calls[key].append(current_time)
-            
-            effective_correlation_id = correlation_id if correlation_id is not None else agent_id
-            logger.debug(f"Recorded tool call: {tool_name} by {agent_id} (correlation_id: {effective_correlation_id}) at {current_time}")
+        self._ensure_evictor()
+        current_time = time.time()
+        key = (tool_name, agent_id)
+        with self._lock_for(key):
+            # Count the call in both windows
+            minute_counter, day_counter = self._counters(key)
+            minute_counter.add(current_time)
+            day_counter.add(current_time)
+        
+        effective_correlation_id = correlation_id if correlation_id is not None else agent_id
+        logger.debug(f"Recorded tool call: {tool_name} by {agent_id} (correlation_id: {effective_correlation_id}) at {current_time}")
+    
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Drop the state of keys that went idle.
+        
+        Purpose (Why):
+        Every session, user and request adds keys; without eviction the
+        limiter grows for as long as the process runs.
+        
+        Implementation (What):
+        Drops a (tool_name, agent_id) key once its day window is empty (no
+        call in the last day, so nothing is lost), and the consecutive-call
+        state of correlation IDs not checked for idle_seconds. Each key is
+        re-checked under its lock, so a key used concurrently is kept.
+        
+        Args:
+            now: Current time (defaults to time.time())
+        
+        Returns:
+            Number of keys evicted
+        """
+        now = time.time() if now is None else now
+        evicted = 0
+        for key in list(self._day_calls):
+            with self._lock_for(key):
+                day_counter = self._day_calls.get(key)
+                if day_counter is not None and day_counter.count(now) == 0:
+                    del self._day_calls[key]
+                    self._minute_calls.pop(key, None)
+                    evicted += 1
+        
+        cutoff = now - self.idle_seconds
+        idle = set()
+        for correlation_id, last_seen in list(self._last_seen.items()):
+            if last_seen < cutoff:
+                with self._lock_for(correlation_id):
+                    if self._last_seen.get(correlation_id, now) < cutoff:
+                        del self._last_seen[correlation_id]
+                        self._last_tool.pop(correlation_id, None)
+                        idle.add(correlation_id)
+        if idle:
+            for consecutive_key in list(self._consecutive_calls):
+                correlation_id = consecutive_key[0]
+                if correlation_id in idle:
+                    with self._lock_for(correlation_id):
+                        # Skip keys used again since they were found idle
+                        if correlation_id not in self._last_seen:
+                            self._consecutive_calls.pop(consecutive_key, None)
+            evicted += len(idle)
+        
+        if evicted:
+            self.evicted_keys += evicted
+            logger.debug(f"Evicted {evicted} idle rate limit keys")
+        return evicted
+    
+    def _ensure_evictor(self) -> None:
+        """Start the background eviction thread if enabled and not running."""
+        if self._evictor is not None or self.eviction_interval <= 0:
+            return
+        with self._evictor_lock:
+            if self._evictor is None:
+                self._evictor_stop.clear()
+                thread = threading.Thread(
+                    target=_eviction_loop,
+                    args=(weakref.ref(self), self._evictor_stop, self.eviction_interval),
+                    name="rate-limit-evictor",
+                    daemon=True
+                )
+                thread.start()
+                self._evictor = thread
+    
+    def stop_eviction(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background eviction thread (restarted by the next recorded call).
+        
+        Args:
+            timeout: Maximum seconds to wait for the thread
+        """
+        with self._evictor_lock:
+            thread = self._evictor
+            if thread is None:
+                return
+            self._evictor_stop.set()
+            thread.join(timeout)
+            self._evictor = None
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get limiter memory statistics.
+        
+        Returns:
+            Dictionary with window_keys ((tool, agent) keys), correlation_keys
+            (correlation IDs with consecutive-call state) and evicted_keys
+        """
+        return {
+            "window_keys": len(self._day_calls),
+            "correlation_keys": len(self._last_seen),
+            "evicted_keys": self.evicted_keys,
+        }
+
 
+def _eviction_loop(limiter_ref: "weakref.ref[RateLimiter]", stop: threading.Event, interval: float) -> None:
+    """
+    Run evict_idle() every interval seconds until stopped.
+    
+    Holds the limiter only through a weak reference between sweeps, so a
+    limiter that is no longer used is garbage collected and the thread ends.
+    
+    Args:
+        limiter_ref: Weak reference to the RateLimiter
+        stop: Event that ends the loop
+        interval: Seconds between sweeps
+    """
+    while not stop.wait(interval):
+        limiter = limiter_ref()
+        if limiter is None:
+            return
+        try:
+            limiter.evict_idle()
+        except Exception as e:
+            logger.error(f"Rate limit key eviction failed: {str(e)}", exc_info=True)
+        del limiter
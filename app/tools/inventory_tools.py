@@ -9,94 +9,22 @@ This is essential for helping customers know if medications are available and in
 
 Implementation (What):
 Implements plain Python functions that can be registered with OpenAI API as tools.
-Uses module-level caching for the DatabaseManager to improve performance and reduce
-token usage. Provides comprehensive error handling with safe fallback values when
+Uses the process-wide shared DatabaseManager (get_db_manager) so the database is
+loaded once per process. Provides comprehensive error handling with safe fallback values when
 medications are not found or errors occur. Validates quantity requirements against
 available stock.
 """
 
 import logging
-import os
-import json
-import time
-from pathlib import Path
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
-from app.database.db import DatabaseManager
+from app.database.db import DatabaseManager, get_db_manager
 from app.models.medication import Medication
+from app.tools.precomputed import PrecomputedResults
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
-# Module-level cache for DatabaseManager (reduces token usage and improves performance)
-_db_manager: Optional[DatabaseManager] = None
-
-
-def _get_db_manager() -> DatabaseManager:
-    """
-    Get or create the module-level DatabaseManager instance.
-    
-    Purpose (Why):
-    Provides a singleton DatabaseManager instance to avoid repeated instantiation
-    and maintain database state across tool calls. This reduces memory usage and
-    improves performance by reusing the loaded database cache.
-    
-    Implementation (What):
-    Uses module-level variable to cache the DatabaseManager instance. Creates a
-    new instance only if one doesn't exist. This ensures the database is loaded
-    once and reused for all tool calls.
-    
-    Returns:
-        DatabaseManager instance (cached or newly created)
-    """
-    global _db_manager
-    # #region agent log
-    # Debug log path - only used if the directory exists (for local development)
-    # In Docker/production, this will silently fail (no logging to file)
-    DEBUG_LOG_PATH = Path(__file__).parent.parent.parent / ".cursor" / "debug.log"
-    db_get_start = time.time()
-    try:
-        log_dir = DEBUG_LOG_PATH.parent
-        if log_dir.exists():
-            with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                f.write(json.dumps({"sessionId": "debug-session", "runId": "initial", "hypothesisId": "H1", "location": "app/tools/inventory_tools.py:_get_db_manager:entry", "message": "_get_db_manager called", "data": {"_db_manager_is_none": _db_manager is None}, "timestamp": int(time.time() * 1000)}) + "\n")
-    except Exception:
-        pass
-    # #endregion
-    if _db_manager is None:
-        # #region agent log
-        db_create_start = time.time()
-        try:
-            log_dir = DEBUG_LOG_PATH.parent
-            if log_dir.exists():
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    f.write(json.dumps({"sessionId": "debug-session", "runId": "initial", "hypothesisId": "H1", "location": "app/tools/inventory_tools.py:_get_db_manager:creating", "message": "Creating DatabaseManager", "data": {}, "timestamp": int(time.time() * 1000)}) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        logger.debug("Creating new DatabaseManager instance")
-        _db_manager = DatabaseManager()
-        _db_manager.load_db()
-        # #region agent log
-        try:
-            log_dir = DEBUG_LOG_PATH.parent
-            if log_dir.exists():
-                with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                    f.write(json.dumps({"sessionId": "debug-session", "runId": "initial", "hypothesisId": "H1", "location": "app/tools/inventory_tools.py:_get_db_manager:created", "message": "DatabaseManager created and loaded", "data": {"duration_ms": (time.time() - db_create_start) * 1000}, "timestamp": int(time.time() * 1000)}) + "\n")
-        except Exception:
-            pass
-        # #endregion
-    # #region agent log
-    try:
-        log_dir = DEBUG_LOG_PATH.parent
-        if log_dir.exists():
-            with open(DEBUG_LOG_PATH, "a", encoding="utf-8") as f:
-                f.write(json.dumps({"sessionId": "debug-session", "runId": "initial", "hypothesisId": "H1", "location": "app/tools/inventory_tools.py:_get_db_manager:return", "message": "_get_db_manager returning", "data": {"total_duration_ms": (time.time() - db_get_start) * 1000}, "timestamp": int(time.time() * 1000)}) + "\n")
-    except Exception:
-        pass
-    # #endregion
-    return _db_manager
-
 
 class StockCheckInput(BaseModel):
     """
@@ -251,6 +179,49 @@ def _build_success_result(medication: Medication, requested_quantity: Optional[i
     )
 
 
+def _build_base_result(medication: Medication) -> Dict[str, Any]:
+    """
+    Build the quantity-independent part of a stock check result.
+    
+    Args:
+        medication: The Medication model instance to convert
+    
+    Returns:
+        StockCheckResult dictionary without a requested quantity
+    """
+    return _build_success_result(medication, None).model_dump()
+
+
+# Stock results per medication, rebuilt only when the medication changes
+_stock_results = PrecomputedResults(_build_base_result)
+
+
+def _stock_result_for(medication: Medication, requested_quantity: Optional[int]) -> Dict[str, Any]:
+    """
+    Get the stock check result dictionary for a medication and quantity.
+    
+    Purpose (Why):
+    Stock checks are the most frequent tool call; building and dumping a
+    StockCheckResult per call dominates their cost.
+    
+    Implementation (What):
+    Takes the precomputed result for the medication and fills in the two
+    quantity-dependent fields, matching _build_success_result().
+    
+    Args:
+        medication: The Medication model instance
+        requested_quantity: Optional quantity that was requested
+    
+    Returns:
+        Dictionary with the same content as StockCheckResult.model_dump()
+    """
+    result = _stock_results.get(medication)
+    if requested_quantity is not None:
+        result["sufficient_quantity"] = result["quantity_in_stock"] >= requested_quantity
+        result["requested_quantity"] = requested_quantity
+    return result
+
+
 def _build_error_result(error_msg: str, medication_id: str) -> StockCheckError:
     """
     Build error result with message and fallback values.
@@ -371,8 +342,8 @@ def check_stock_availability(medication_id: str, quantity: Optional[int] = None)
     Uses DatabaseManager to retrieve medication by ID from the database. Extracts stock
     information including availability, quantity, and last restocked date. If a quantity
     is provided, verifies if there is sufficient stock. Returns complete stock information
-    if medication is found, or error with fallback values if not found. Uses module-level
-    caching for DatabaseManager to improve performance. Implements safe fallback (available=False)
+    if medication is found, or error with fallback values if not found. Uses the shared DatabaseManager
+    from get_db_manager() so the database is loaded once per process. Implements safe fallback (available=False)
     when errors occur.
     
     Args:
@@ -417,8 +388,8 @@ def check_stock_availability(medication_id: str, quantity: Optional[int] = None)
         normalized_id, validated_quantity = _validate_stock_input(medication_id, quantity)
         logger.info(f"Checking stock for medication: id='{normalized_id}', quantity={validated_quantity}")
         
-        # Get cached DatabaseManager instance
-        db_manager = _get_db_manager()
+        # Get the shared DatabaseManager instance
+        db_manager = get_db_manager()
         
         # Retrieve medication by ID
         medication = db_manager.get_medication_by_id(normalized_id)
@@ -429,10 +400,10 @@ def check_stock_availability(medication_id: str, quantity: Optional[int] = None)
         
         logger.info(f"Found medication: {medication.medication_id} ({medication.name_he} / {medication.name_en})")
         
-        # Build and return success result
-        result = _build_success_result(medication, validated_quantity)
-        logger.debug(f"Successfully checked stock for medication: {medication.medication_id}, available={result.available}, quantity={result.quantity_in_stock}")
-        return result.model_dump()
+        # Build and return success result (precomputed per medication)
+        result = _stock_result_for(medication, validated_quantity)
+        logger.debug(f"Successfully checked stock for medication: {medication.medication_id}, available={result['available']}, quantity={result['quantity_in_stock']}")
+        return result
         
     except ValueError as e:
         return _handle_stock_validation_error(e, medication_id)
@@ -9,55 +9,30 @@ are designed to support both Hebrew and English queries with fuzzy matching capa
 
 Implementation (What):
 Implements plain Python functions that can be registered with OpenAI API as tools.
-Uses module-level caching for the DatabaseManager to improve performance and reduce
-token usage. Provides comprehensive error handling with suggestions when medications
+Uses the process-wide shared DatabaseManager (get_db_manager) so the database is
+loaded once per process. Provides comprehensive error handling with suggestions when medications
 are not found. Fuzzy matching is implemented via partial string matching in the
-DatabaseManager.search_medications_by_name method.
+DatabaseManager.search_medications_by_name method, and misspelled names get
+edit-distance suggestions from DatabaseManager.suggest_medications.
 
 Fuzzy Matching Explanation:
 Fuzzy matching allows finding medications even with partial or slightly incorrect names.
 For example, searching "Acam" will find "Acamol", and searching "paracet" will find
 "Paracetamol". This is implemented using case-insensitive partial string matching
-(in operator) in the database search method.
+(in operator) in the database search method. Typos such as "Acamoll" do not match,
+but return "Acamol" as a suggestion (edit distance up to 2).
 """
 
 import logging
 from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
-from app.database.db import DatabaseManager
+from app.database.db import DatabaseManager, get_db_manager
 from app.models.medication import Medication
+from app.tools.precomputed import PrecomputedResults
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
-# Module-level cache for DatabaseManager (reduces token usage and improves performance)
-_db_manager: Optional[DatabaseManager] = None
-
-
-def _get_db_manager() -> DatabaseManager:
-    """
-    Get or create the module-level DatabaseManager instance.
-    
-    Purpose (Why):
-    Provides a singleton DatabaseManager instance to avoid repeated instantiation
-    and maintain database state across tool calls. This reduces memory usage and
-    improves performance by reusing the loaded database cache.
-    
-    Implementation (What):
-    Uses module-level variable to cache the DatabaseManager instance. Creates a
-    new instance only if one doesn't exist. This ensures the database is loaded
-    once and reused for all tool calls.
-    
-    Returns:
-        DatabaseManager instance (cached or newly created)
-    """
-    global _db_manager
-    if _db_manager is None:
-        logger.debug("Creating new DatabaseManager instance")
-        _db_manager = DatabaseManager()
-        _db_manager.load_db()
-    return _db_manager
-
 
 class MedicationSearchInput(BaseModel):
     """
@@ -190,9 +165,10 @@ def _generate_suggestions(db_manager: DatabaseManager, name: str) -> List[str]:
     medication name.
     
     Implementation (What):
-    Searches the database without language filter, and if still no results,
-    tries with first 3 characters for partial matching. Extracts unique medication
-    names (both Hebrew and English) and limits to 5 suggestions.
+    Probes the catalog's fuzzy matcher once via DatabaseManager.suggest_medications,
+    which ranks medications by edit distance to the query over names, brand names
+    and ingredient base names. Extracts unique medication names (both Hebrew and
+    English) and limits to 5 suggestions.
     
     Args:
         db_manager: DatabaseManager instance for searching
@@ -201,12 +177,7 @@ def _generate_suggestions(db_manager: DatabaseManager, name: str) -> List[str]:
     Returns:
         List of suggested medication names (up to 5)
     """
-    all_medications = db_manager.search_medications_by_name(name, None)
-    
-    # If still no results, try with first few characters
-    if not all_medications and len(name) > 2:
-        partial_name = name[:3]
-        all_medications = db_manager.search_medications_by_name(partial_name, None)
+    all_medications = db_manager.suggest_medications(name, limit=5)
     
     # Extract unique medication names for suggestions
     suggestions = []
@@ -296,6 +267,10 @@ def _build_success_result(medication: Medication) -> MedicationSearchResult:
     )
 
 
+# Search results per medication, rebuilt only when the medication changes
+_medication_results = PrecomputedResults(lambda medication: _build_success_result(medication).model_dump())
+
+
 def _build_error_result(error_msg: str, name: str, suggestions: List[str]) -> MedicationSearchError:
     """
     Build error result with message and suggestions.
@@ -368,7 +343,8 @@ def _handle_medication_found(
     fields are present before returning medication information.
     
     Implementation (What):
-    Validates required fields, builds success result, and returns it.
+    Validates required fields and returns the success result, which is built
+    once per medication and reused until the medication changes.
     
     Args:
         medication: The Medication instance that was found
@@ -384,10 +360,10 @@ def _handle_medication_found(
     if validation_error:
         return validation_error.model_dump()
     
-    # Build and return success result
-    result = _build_success_result(medication)
+    # Return the precomputed success result
+    result = _medication_results.get(medication)
     logger.debug(f"Successfully retrieved medication: {medication.medication_id}")
-    return result.model_dump()
+    return result
 
 
 def _handle_search_validation_error(error: ValueError, name: str) -> Dict[str, Any]:
@@ -461,8 +437,8 @@ def get_medication_by_name(name: str, language: Optional[str] = None) -> Dict[st
     information including required fields (active_ingredients, dosage_instructions).
     Does NOT return stock or prescription information - use check_stock_availability
     and check_prescription_requirement for those. If no exact match is found, returns
-    error with suggestions based on similar names. Uses module-level caching for
-    DatabaseManager to improve performance.
+    error with suggestions based on similar names. Uses the shared DatabaseManager from get_db_manager()
+    so the database is loaded once per process.
     
     Args:
         name: The medication name to search for (string, case-insensitive, supports partial matches)
@@ -508,18 +484,18 @@ def get_medication_by_name(name: str, language: Optional[str] = None) -> Dict[st
         normalized_name, validated_language = _validate_search_input(name, language)
         logger.info(f"Searching for medication: name='{normalized_name}', language={validated_language}")
         
-        # Get cached DatabaseManager instance
-        db_manager = _get_db_manager()
+        # Get the shared DatabaseManager instance
+        db_manager = get_db_manager()
         
         # Search for medications
-        medications = db_manager.search_medications_by_name(normalized_name, validated_language)
+        medications = db_manager.search_medications_by_name(normalized_name, validated_language, ranked=True)
         
         # Handle no results
         if not medications:
             return _handle_no_medications_found(db_manager, normalized_name, validated_language)
         
-        # Handle multiple results - return the first match
-        # In a production system, you might want to return all matches and let the agent choose
+        # Handle multiple results - return the best-ranked match
+        # (exact name before prefix match before substring match)
         medication = medications[0]
         return _handle_medication_found(medication, normalized_name)
         
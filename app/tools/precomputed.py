@@ -0,0 +1,83 @@
+"""
+Precomputed tool result dictionaries.
+
+Purpose (Why):
+The lookup tools answer the same few questions about the same medications over
+and over. Building a Pydantic result model and dumping it on every call costs
+more than the database lookup itself, although the answer only changes when
+the medication record changes.
+
+Implementation (What):
+PrecomputedResults stores one result dictionary per medication_id together
+with the Medication instance it was built from. The database hands out frozen,
+shared Medication models that are replaced (never mutated) when a record
+changes or the database is reloaded, so an entry is valid exactly as long as
+the caller passes the same instance. Callers receive a copy, so they can add
+per-call fields without affecting other callers.
+"""
+
+from typing import Any, Callable, Dict, Tuple
+from app.models.medication import Medication
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a result dictionary, including its list values.
+
+    Args:
+        result: Cached result dictionary
+
+    Returns:
+        New dictionary that can be modified by the caller
+    """
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
+
+class PrecomputedResults:
+    """
+    Cache of tool result dictionaries keyed by medication.
+
+    Purpose (Why):
+    Lets a tool skip model construction and serialization for medications it
+    has already answered for.
+
+    Implementation (What):
+    Maps medication_id -> (Medication, result dict). A lookup hits only if the
+    cached Medication is the very instance passed in. Only Medication instances
+    are cached (they are frozen); anything else, such as test doubles, is built
+    on every call. Reads and writes are single dict operations, so no lock is
+    needed; concurrent misses simply build the same result twice.
+    """
+
+    def __init__(self, build: Callable[[Medication], Dict[str, Any]]):
+        """
+        Initialize an empty cache.
+
+        Args:
+            build: Function that builds the result dictionary for a medication
+        """
+        self._build = build
+        self._entries: Dict[str, Tuple[Medication, Dict[str, Any]]] = {}
+
+    def get(self, medication: Medication) -> Dict[str, Any]:
+        """
+        Get the result dictionary for a medication.
+
+        Args:
+            medication: Medication returned by the DatabaseManager
+
+        Returns:
+            Copy of the (possibly cached) result dictionary
+        """
+        if not isinstance(medication, Medication):
+            return self._build(medication)
+
+        entry = self._entries.get(medication.medication_id)
+        if entry is None or entry[0] is not medication:
+            entry = (medication, self._build(medication))
+            self._entries[medication.medication_id] = entry
+        return _copy_result(entry[1])
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
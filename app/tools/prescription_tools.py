@@ -10,8 +10,8 @@ to purchase medications.
 
 Implementation (What):
 Implements plain Python functions that can be registered with OpenAI API as tools.
-Uses module-level caching for the DatabaseManager to improve performance and reduce
-token usage. Provides comprehensive error handling with safe fallback values
+Uses the process-wide shared DatabaseManager (get_db_manager) so the database is
+loaded once per process. Provides comprehensive error handling with safe fallback values
 (requires_prescription=true) when medications are not found or errors occur. This
 ensures safety by defaulting to requiring a prescription when information is uncertain.
 """
@@ -19,40 +19,13 @@ ensures safety by defaulting to requiring a prescription when information is unc
 import logging
 from typing import Optional, Dict, Any, Literal
 from pydantic import BaseModel, Field
-from app.database.db import DatabaseManager
+from app.database.db import DatabaseManager, get_db_manager
 from app.models.medication import Medication
+from app.tools.precomputed import PrecomputedResults
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
-# Module-level cache for DatabaseManager (reduces token usage and improves performance)
-_db_manager: Optional[DatabaseManager] = None
-
-
-def _get_db_manager() -> DatabaseManager:
-    """
-    Get or create the module-level DatabaseManager instance.
-    
-    Purpose (Why):
-    Provides a singleton DatabaseManager instance to avoid repeated instantiation
-    and maintain database state across tool calls. This reduces memory usage and
-    improves performance by reusing the loaded database cache.
-    
-    Implementation (What):
-    Uses module-level variable to cache the DatabaseManager instance. Creates a
-    new instance only if one doesn't exist. This ensures the database is loaded
-    once and reused for all tool calls.
-    
-    Returns:
-        DatabaseManager instance (cached or newly created)
-    """
-    global _db_manager
-    if _db_manager is None:
-        logger.debug("Creating new DatabaseManager instance")
-        _db_manager = DatabaseManager()
-        _db_manager.load_db()
-    return _db_manager
-
 
 class PrescriptionCheckInput(BaseModel):
     """
@@ -212,6 +185,10 @@ def _build_success_result(medication: Medication) -> PrescriptionCheckResult:
     )
 
 
+# Prescription results per medication, rebuilt only when the medication changes
+_prescription_results = PrecomputedResults(lambda medication: _build_success_result(medication).model_dump())
+
+
 def _build_error_result(error_msg: str, medication_id: str) -> PrescriptionCheckError:
     """
     Build error result with message and safe fallback values.
@@ -330,7 +307,8 @@ def _handle_prescription_found(medication: Medication) -> Dict[str, Any]:
     result formatting for prescription requirement information.
     
     Implementation (What):
-    Logs medication found, builds success result, and returns it.
+    Logs medication found and returns the success result, which is built once
+    per medication and reused until the medication changes.
     
     Args:
         medication: The Medication instance that was found
@@ -339,12 +317,12 @@ def _handle_prescription_found(medication: Medication) -> Dict[str, Any]:
         Dictionary containing PrescriptionCheckResult
     """
     logger.info(f"Found medication: {medication.medication_id} ({medication.name_he} / {medication.name_en})")
-    result = _build_success_result(medication)
+    result = _prescription_results.get(medication)
     logger.debug(
         f"Successfully checked prescription requirement for medication: {medication.medication_id}, "
-        f"requires_prescription={result.requires_prescription}, prescription_type={result.prescription_type}"
+        f"requires_prescription={result['requires_prescription']}, prescription_type={result['prescription_type']}"
     )
-    return result.model_dump()
+    return result
 
 
 def check_prescription_requirement(medication_id: str) -> Dict[str, Any]:
@@ -363,8 +341,8 @@ def check_prescription_requirement(medication_id: str) -> Dict[str, Any]:
     prescription requirement information including requires_prescription status and
     determines prescription_type. Returns complete prescription requirement information
     if medication is found, or error with safe fallback values (requires_prescription=True,
-    prescription_type="prescription_required") if not found. Uses module-level caching
-    for DatabaseManager to improve performance. Implements safe fallback when errors
+    prescription_type="prescription_required") if not found. Uses the shared DatabaseManager from
+    get_db_manager() so the database is loaded once per process. Implements safe fallback when errors
     occur to ensure safety by defaulting to requiring a prescription when information
     is uncertain.
     
@@ -414,8 +392,8 @@ def check_prescription_requirement(medication_id: str) -> Dict[str, Any]:
         normalized_id = _validate_prescription_input(medication_id)
         logger.info(f"Checking prescription requirement for medication: id='{normalized_id}'")
         
-        # Get cached DatabaseManager instance
-        db_manager = _get_db_manager()
+        # Get the shared DatabaseManager instance
+        db_manager = get_db_manager()
         
         # Retrieve medication by ID
         medication = db_manager.get_medication_by_id(normalized_id)
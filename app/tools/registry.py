@@ -21,8 +21,10 @@ from app.tools.inventory_tools import check_stock_availability
 from app.tools.prescription_tools import check_prescription_requirement
 from app.tools.user_tools import get_user_by_name_or_email, get_user_prescriptions, check_user_prescription_for_medication, get_authenticated_user_info
 from app.security.rate_limiter import RateLimiter
-from app.security.audit_logger import AuditLogger
+from app.security.audit_logger import get_audit_logger
 from app.security.correlation import generate_correlation_id
+from app.tools.result_cache import get_tool_result_cache
+from app.database import get_db_manager
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
@@ -30,8 +32,8 @@ logger = logging.getLogger(__name__)
 # Module-level rate limiter instance
 _rate_limiter = RateLimiter()
 
-# Module-level audit logger instance
-_audit_logger = AuditLogger()
+# Module-level audit logger (the shared instance, so all modules use one writer)
+_audit_logger = get_audit_logger()
 
 # Registry mapping tool names to their Python functions
 _TOOL_FUNCTIONS: Dict[str, Callable] = {
@@ -45,6 +47,16 @@ _TOOL_FUNCTIONS: Dict[str, Callable] = {
 }
 
 
+def get_registered_tool_names() -> List[str]:
+    """
+    Get the names of all tools that execute_tool() can run.
+    
+    Returns:
+        List of registered tool names
+    """
+    return list(_TOOL_FUNCTIONS)
+
+
 def get_tools_for_openai() -> List[Dict[str, Any]]:
     """
     Get tool definitions in OpenAI API format.
@@ -333,14 +345,18 @@ def execute_tool(
     looks up the tool function in the registry, calls it with the provided arguments,
     records the call for rate limit tracking, logs tool call completion, and returns
     the result. Handles errors gracefully and provides clear error messages for rate
-    limit violations. All operations are logged for audit trail.
+    limit violations. All operations are logged for audit trail. Results of
+    read-only tools are served from the process-wide ToolResultCache when an
+    identical call was answered recently and the database has not changed;
+    rate limiting and audit logging still apply to cached answers.
     
     Args:
         tool_name: Name of the tool to execute (must match a key in _TOOL_FUNCTIONS)
         arguments: Dictionary of arguments to pass to the tool function
         agent_id: Optional identifier for the agent/session making the call.
             Used for rate limit tracking and audit logging. Defaults to "default" for
-            stateless agents. Can be session ID or user ID in future implementations.
+            stateless agents. The chat UI passes the user ID or session ID, so each
+            user or session has its own rate limits.
         correlation_id: Optional correlation ID for request tracking. If not provided,
             generates a new one. Used to link all operations in a single request/conversation.
         context: Optional dictionary with additional context information for audit logging.
@@ -436,8 +452,22 @@ def execute_tool(
             filtered_out = set(arguments.keys()) - set(filtered_arguments.keys())
             logger.warning(f"Filtered out unexpected arguments for {tool_name}: {filtered_out}")
         
-        # Execute the tool
-        result = tool_function(**filtered_arguments)
+        # Serve read-only results from the cross-request cache when possible
+        # (keyed on the final arguments, including the injected authenticated user)
+        result_cache = get_tool_result_cache()
+        cache_key = result_cache.make_key(tool_name, filtered_arguments, context)
+        result = None
+        if cache_key is not None:
+            data_version = get_db_manager().data_version
+            result = result_cache.get(cache_key, data_version)
+            if result is not None:
+                logger.debug(f"Tool result cache hit for {tool_name}")
+        
+        if result is None:
+            # Execute the tool
+            result = tool_function(**filtered_arguments)
+            if cache_key is not None:
+                result_cache.put(cache_key, data_version, result)
         
         # Record the call for rate limit tracking (after successful execution)
         _rate_limiter.record_call(tool_name, effective_agent_id, effective_correlation_id)
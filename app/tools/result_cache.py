@@ -0,0 +1,293 @@
+"""
+Process-wide cache of read-only tool results.
+
+Purpose (Why):
+The per-request tool_call_cache only deduplicates calls within one user
+message. Across messages and conversations the model keeps asking the same
+catalog questions (get_medication_by_name, check_prescription_requirement)
+with identical arguments, and every one of them re-executes the tool.
+
+Implementation (What):
+ToolResultCache maps (tool name, user scope, canonical JSON arguments) to a
+successful result. Entries expire after a per-tool TTL (short for stock,
+long for prescription requirements) and the least recently used entry is
+evicted when the cache is full. Every entry records the database data_version
+it was computed from; when the version moves (reload, save, stock or refill
+change) the whole cache is dropped. User-scoped tools are cached only per
+authenticated user, and tools that check credentials are never cached.
+
+Configuration (environment variables):
+- TOOL_CACHE_ENABLED: "true" (default) or "false"
+- TOOL_CACHE_MAX_ENTRIES: Maximum cached results (default: 1024)
+- TOOL_CACHE_TTLS: Per-tool TTL overrides in seconds, e.g.
+  "check_stock_availability=2,get_medication_by_name=600" (0 disables a tool)
+"""
+
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+# Default TTL in seconds per tool; tools not listed are not cached
+DEFAULT_TOOL_TTLS: Dict[str, float] = {
+    "get_medication_by_name": 300.0,
+    "check_stock_availability": 5.0,
+    "check_prescription_requirement": 3600.0,
+    "get_user_by_name_or_email": 60.0,
+    "get_user_prescriptions": 30.0,
+    "check_user_prescription_for_medication": 30.0,
+}
+
+# Tools whose results depend on the authenticated user
+USER_SCOPED_TOOLS = frozenset({
+    "get_user_by_name_or_email",
+    "get_user_prescriptions",
+    "check_user_prescription_for_medication",
+})
+
+# Tools that verify credentials on every call and must never be cached
+UNCACHEABLE_TOOLS = frozenset({"get_authenticated_user_info"})
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def parse_ttls(value: Optional[str]) -> Dict[str, float]:
+    """
+    Parse per-tool TTLs from a configuration string.
+
+    Args:
+        value: Comma-separated "tool_name=seconds" pairs (may be None or empty)
+
+    Returns:
+        Dictionary mapping tool name to TTL in seconds
+
+    Raises:
+        ValueError: If an entry is malformed or a TTL is negative
+    """
+    ttls: Dict[str, float] = {}
+    if not value:
+        return ttls
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, separator, seconds = entry.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid tool cache TTL: {entry!r} (expected tool_name=seconds)")
+        ttl = float(seconds)
+        if ttl < 0:
+            raise ValueError(f"Tool cache TTL must not be negative: {entry!r}")
+        ttls[name.strip()] = ttl
+    return ttls
+
+
+class ToolResultCache:
+    """
+    LRU + TTL cache of tool results, invalidated by database version.
+
+    Purpose (Why):
+    Serves repeated read-only tool calls from memory across requests while
+    guaranteeing that no result outlives its TTL or the data it was built from.
+
+    Implementation (What):
+    An OrderedDict in recency order holds key -> (expires_at, result). Lookups
+    move hits to the end; inserts evict from the front beyond max_entries.
+    Expired entries are dropped when they are looked up. A stored data_version
+    different from the caller's clears the cache. Results are deep-copied in
+    and out so callers cannot modify cached data. All state is protected by
+    one lock.
+
+    Attributes:
+        enabled: Whether results are cached at all
+        max_entries: Maximum number of cached results
+        ttls: TTL in seconds per tool (tools without a positive TTL are not cached)
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum cached results. If None, reads TOOL_CACHE_MAX_ENTRIES
+                or defaults to 1024.
+            ttls: TTL per tool. If None, DEFAULT_TOOL_TTLS updated with TOOL_CACHE_TTLS.
+            enabled: Whether caching is enabled. If None, reads TOOL_CACHE_ENABLED
+                (default: "true").
+
+        Raises:
+            ValueError: If a configured value is invalid
+        """
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else int(os.getenv("TOOL_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+        )
+        if ttls is None:
+            ttls = dict(DEFAULT_TOOL_TTLS)
+            ttls.update(parse_ttls(os.getenv("TOOL_CACHE_TTLS")))
+        self.ttls = {name: ttl for name, ttl in ttls.items() if name not in UNCACHEABLE_TOOLS}
+        self.enabled = (
+            enabled
+            if enabled is not None
+            else os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+        ) and self.max_entries > 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._data_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(
+            f"ToolResultCache initialized: enabled={self.enabled}, "
+            f"max_entries={self.max_entries}, ttls={self.ttls}"
+        )
+
+    def make_key(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> Optional[Hashable]:
+        """
+        Build the cache key of a tool call, or None if the call is not cacheable.
+
+        Args:
+            tool_name: Name of the tool
+            arguments: Arguments the tool is called with
+            context: Tool execution context (provides authenticated_user_id)
+
+        Returns:
+            (tool_name, user scope, canonical JSON arguments), or None if caching is
+            disabled, the tool has no TTL, or a user-scoped tool is called without
+            an authenticated user
+        """
+        if not self.enabled or self.ttls.get(tool_name, 0) <= 0:
+            return None
+        user_scope = None
+        if tool_name in USER_SCOPED_TOOLS:
+            user_scope = (context or {}).get("authenticated_user_id")
+            if not user_scope:
+                return None
+        try:
+            canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        return (tool_name, user_scope, canonical)
+
+    def _sync_version(self, data_version: int) -> None:
+        """Drop all entries if the data version moved (caller holds _lock)."""
+        if data_version != self._data_version:
+            if self._entries:
+                logger.debug(f"Tool result cache cleared (data version {self._data_version} -> {data_version})")
+            self._entries.clear()
+            self._data_version = data_version
+
+    def get(self, key: Hashable, data_version: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from make_key()
+            data_version: Current database data_version
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(data_version)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+        return copy.deepcopy(result)
+
+    def put(self, key: Hashable, data_version: int, result: Dict[str, Any]) -> None:
+        """
+        Store a successful result.
+
+        Call after get() with the data_version read before executing the tool;
+        the result is dropped if the data version moved in the meantime.
+
+        Args:
+            key: Key from make_key()
+            data_version: Database data_version the result was computed from
+            result: Tool result (not stored if it reports an error)
+        """
+        if not isinstance(result, dict) or "error" in result or result.get("success") is False:
+            return
+        expires_at = time.monotonic() + self.ttls[key[0]]
+        stored = copy.deepcopy(result)
+        with self._lock:
+            # The data changed while the tool ran: the result may already be stale
+            if data_version != self._data_version:
+                return
+            self._entries[key] = (expires_at, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with entries, max_entries, hits, misses and data_version
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "data_version": self._data_version,
+            }
+
+
+# Process-wide shared ToolResultCache instance
+_shared_result_cache: Optional[ToolResultCache] = None
+_shared_result_cache_lock = threading.Lock()
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """
+    Get or create the process-wide shared ToolResultCache.
+
+    Returns:
+        ToolResultCache: The shared cache, configured from environment variables
+    """
+    global _shared_result_cache
+    cache = _shared_result_cache
+    if cache is None:
+        with _shared_result_cache_lock:
+            if _shared_result_cache is None:
+                _shared_result_cache = ToolResultCache()
+            cache = _shared_result_cache
+    return cache
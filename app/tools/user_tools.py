@@ -10,15 +10,15 @@ identify themselves by name or email instead of technical IDs.
 
 Implementation (What):
 Implements plain Python functions that can be registered with OpenAI API as tools.
-Uses module-level caching for the DatabaseManager to improve performance and reduce
-token usage. Provides comprehensive error handling with suggestions when users are
+Uses the process-wide shared DatabaseManager (get_db_manager) so the database is
+loaded once per process. Provides comprehensive error handling with suggestions when users are
 not found. Supports case-insensitive partial matching for flexible user search.
 """
 
 import logging
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
-from app.database.db import DatabaseManager
+from app.database.db import DatabaseManager, get_db_manager
 from app.models.user import User
 from app.models.prescription import Prescription
 from app.models.medication import Medication
@@ -26,34 +26,6 @@ from app.models.medication import Medication
 # Configure module-level logger
 logger = logging.getLogger(__name__)
 
-# Module-level cache for DatabaseManager (reduces token usage and improves performance)
-_db_manager: Optional[DatabaseManager] = None
-
-
-def _get_db_manager() -> DatabaseManager:
-    """
-    Get or create the module-level DatabaseManager instance.
-    
-    Purpose (Why):
-    Provides a singleton DatabaseManager instance to avoid repeated instantiation
-    and maintain database state across tool calls. This reduces memory usage and
-    improves performance by reusing the loaded database cache.
-    
-    Implementation (What):
-    Uses module-level variable to cache the DatabaseManager instance. Creates a
-    new instance only if one doesn't exist. This ensures the database is loaded
-    once and reused for all tool calls.
-    
-    Returns:
-        DatabaseManager instance (cached or newly created)
-    """
-    global _db_manager
-    if _db_manager is None:
-        logger.debug("Creating new DatabaseManager instance")
-        _db_manager = DatabaseManager()
-        _db_manager.load_db()
-    return _db_manager
-
 
 class UserSearchInput(BaseModel):
     """
@@ -392,7 +364,7 @@ def get_user_by_name_or_email(name_or_email: str, authenticated_user_id: Optiona
     If authenticated_user_id is provided, returns only that user's information (security).
     Otherwise, validates input, searches database using DatabaseManager.search_users_by_name_or_email,
     handles multiple results (returns first match), and provides suggestions if no
-    user is found. Uses module-level caching for DatabaseManager to improve performance.
+    user is found. Uses the shared DatabaseManager from get_db_manager() so the database is loaded once per process.
     Returns UserSearchResult if user is found, UserSearchError if not found.
     
     Args:
@@ -417,7 +389,7 @@ def get_user_by_name_or_email(name_or_email: str, authenticated_user_id: Optiona
         # Security: If user is authenticated, check if the request is about the authenticated user
         if authenticated_user_id:
             logger.info(f"User is authenticated: {authenticated_user_id}, checking if request is about authenticated user")
-            db_manager = _get_db_manager()
+            db_manager = get_db_manager()
             authenticated_user = db_manager.get_user_by_id(authenticated_user_id)
             if not authenticated_user:
                 logger.warning(f"Authenticated user not found: {authenticated_user_id}")
@@ -464,7 +436,7 @@ def get_user_by_name_or_email(name_or_email: str, authenticated_user_id: Optiona
         normalized_input = _validate_user_search_input(name_or_email)
         logger.info(f"Searching for user: name_or_email='{normalized_input}' (not authenticated)")
         
-        db_manager = _get_db_manager()
+        db_manager = get_db_manager()
         users = db_manager.search_users_by_name_or_email(normalized_input)
         
         if not users:
@@ -520,10 +492,10 @@ def get_user_prescriptions(user_id: str, authenticated_user_id: Optional[str] =
     
     Implementation (What):
     Validates user_id, checks authentication (authenticated_user_id must match user_id),
-    retrieves prescriptions using DatabaseManager.get_prescriptions_by_user,
-    enriches prescription data with medication names, and returns formatted result.
-    Returns empty list if user has no prescriptions (not an error). Uses module-level
-    caching for DatabaseManager to improve performance.
+    retrieves prescriptions already joined with their medication details using
+    DatabaseManager.get_prescription_view, and returns formatted result.
+    Returns empty list if user has no prescriptions (not an error). Uses the shared DatabaseManager
+    from get_db_manager() so the database is loaded once per process.
     
     Args:
         user_id: The unique identifier of the user to get prescriptions for
@@ -577,7 +549,7 @@ def get_user_prescriptions(user_id: str, authenticated_user_id: Optional[str] =
         normalized_user_id = normalized_authenticated_user_id
         logger.info(f"Getting prescriptions for authenticated user: user_id='{normalized_user_id}'")
         
-        db_manager = _get_db_manager()
+        db_manager = get_db_manager()
         
         # First verify user exists
         user = db_manager.get_user_by_id(normalized_user_id)
@@ -588,65 +560,22 @@ def get_user_prescriptions(user_id: str, authenticated_user_id: Optional[str] =
                 "success": False
             }
         
-        # Get prescriptions
-        prescriptions = db_manager.get_prescriptions_by_user(normalized_user_id)
-        logger.info(f"Found {len(prescriptions)} prescriptions for user: {normalized_user_id}")
-        
-        # Enrich prescriptions with complete medication information to avoid redundant tool calls
+        # Get prescriptions enriched with complete medication information to avoid redundant tool calls
         # This includes all medication details (active ingredients, dosage, etc.) so the AI
-        # doesn't need to call get_medication_by_name separately, reducing latency
-        prescription_info_list = []
-        for prescription in prescriptions:
-            medication = db_manager.get_medication_by_id(prescription.medication_id)
-            if medication:
-                prescription_info = PrescriptionInfo(
-                    prescription_id=prescription.prescription_id,
-                    medication_id=prescription.medication_id,
-                    medication_name_he=medication.name_he,
-                    medication_name_en=medication.name_en,
-                    active_ingredients=medication.active_ingredients,
-                    dosage_forms=medication.dosage_forms,
-                    dosage_instructions=medication.dosage_instructions,
-                    usage_instructions=medication.usage_instructions,
-                    description=medication.description,
-                    prescribed_by=prescription.prescribed_by,
-                    prescription_date=prescription.prescription_date,
-                    expiry_date=prescription.expiry_date,
-                    quantity=prescription.quantity,
-                    refills_remaining=prescription.refills_remaining,
-                    status=prescription.status
-                )
-                prescription_info_list.append(prescription_info)
-            else:
-                logger.warning(f"Medication {prescription.medication_id} not found for prescription {prescription.prescription_id}")
-                # Still include prescription even if medication not found
-                prescription_info = PrescriptionInfo(
-                    prescription_id=prescription.prescription_id,
-                    medication_id=prescription.medication_id,
-                    medication_name_he="Unknown",
-                    medication_name_en="Unknown",
-                    active_ingredients=[],
-                    dosage_forms=[],
-                    dosage_instructions=None,
-                    usage_instructions=None,
-                    description=None,
-                    prescribed_by=prescription.prescribed_by,
-                    prescription_date=prescription.prescription_date,
-                    expiry_date=prescription.expiry_date,
-                    quantity=prescription.quantity,
-                    refills_remaining=prescription.refills_remaining,
-                    status=prescription.status
-                )
-                prescription_info_list.append(prescription_info)
-        
-        result = UserPrescriptionsResult(
-            user_id=user.user_id,
-            user_name=user.name,
-            prescriptions=prescription_info_list
-        )
+        # doesn't need to call get_medication_by_name separately, reducing latency.
+        # The rows are materialized by the database, so no per-prescription lookups happen here.
+        prescription_info_list = db_manager.get_prescription_view(normalized_user_id)
+        logger.info(f"Found {len(prescription_info_list)} prescriptions for user: {normalized_user_id}")
+        
+        # Same content as UserPrescriptionsResult(...).model_dump()
+        result = {
+            "user_id": user.user_id,
+            "user_name": user.name,
+            "prescriptions": prescription_info_list
+        }
         
         logger.debug(f"Successfully retrieved {len(prescription_info_list)} prescriptions for user: {normalized_user_id}")
-        return result.model_dump()
+        return result
         
     except ValueError as e:
         logger.error(f"Invalid input for get_user_prescriptions: {str(e)}", exc_info=True)
@@ -675,10 +604,10 @@ def check_user_prescription_for_medication(user_id: str, medication_id: str, aut
     
     Implementation (What):
     Validates inputs, checks authentication (authenticated_user_id must match user_id),
-    retrieves user prescriptions, filters for active prescriptions matching the
-    medication_id, and returns result. Returns has_active_prescription=false if no
-    active prescription found (not an error). Uses module-level caching for
-    DatabaseManager to improve performance.
+    retrieves the user's prescription rows (joined with medication details),
+    filters for active prescriptions matching the medication_id, and returns result. Returns has_active_prescription=false if no
+    active prescription found (not an error). Uses the shared DatabaseManager from get_db_manager()
+    so the database is loaded once per process.
     
     Args:
         user_id: The unique identifier of the user to check prescription for
@@ -741,7 +670,7 @@ def check_user_prescription_for_medication(user_id: str, medication_id: str, aut
         normalized_user_id = normalized_authenticated_user_id
         logger.info(f"Checking prescription for authenticated user: user_id='{normalized_user_id}', medication_id='{normalized_medication_id}'")
         
-        db_manager = _get_db_manager()
+        db_manager = get_db_manager()
         
         # Verify user exists
         user = db_manager.get_user_by_id(normalized_user_id)
@@ -761,48 +690,25 @@ def check_user_prescription_for_medication(user_id: str, medication_id: str, aut
                 "success": False
             }
         
-        # Get prescriptions and filter for active ones matching medication
-        prescriptions = db_manager.get_prescriptions_by_user(normalized_user_id)
+        # Get the user's prescription rows and find an active one matching the medication
         active_prescription = None
-        
-        for prescription in prescriptions:
-            if prescription.medication_id == normalized_medication_id and prescription.status == "active":
-                active_prescription = prescription
+        for prescription_info in db_manager.get_prescription_view(normalized_user_id):
+            if prescription_info["medication_id"] == normalized_medication_id and prescription_info["status"] == "active":
+                active_prescription = prescription_info
                 break
         
+        # Same content as PrescriptionCheckResult(...).model_dump()
         if active_prescription:
             logger.info(f"Found active prescription for user: {normalized_user_id}, medication: {normalized_medication_id}")
-            prescription_info = PrescriptionInfo(
-                prescription_id=active_prescription.prescription_id,
-                medication_id=active_prescription.medication_id,
-                medication_name_he=medication.name_he,
-                medication_name_en=medication.name_en,
-                active_ingredients=medication.active_ingredients,
-                dosage_forms=medication.dosage_forms,
-                dosage_instructions=medication.dosage_instructions,
-                usage_instructions=medication.usage_instructions,
-                description=medication.description,
-                prescribed_by=active_prescription.prescribed_by,
-                prescription_date=active_prescription.prescription_date,
-                expiry_date=active_prescription.expiry_date,
-                quantity=active_prescription.quantity,
-                refills_remaining=active_prescription.refills_remaining,
-                status=active_prescription.status
-            )
-            
-            result = PrescriptionCheckResult(
-                has_active_prescription=True,
-                prescription_details=prescription_info
-            )
         else:
             logger.info(f"No active prescription found for user: {normalized_user_id}, medication: {normalized_medication_id}")
-            result = PrescriptionCheckResult(
-                has_active_prescription=False,
-                prescription_details=None
-            )
+        result = {
+            "has_active_prescription": active_prescription is not None,
+            "prescription_details": active_prescription
+        }
         
         logger.debug(f"Successfully checked prescription for user: {normalized_user_id}, medication: {normalized_medication_id}")
-        return result.model_dump()
+        return result
         
     except ValueError as e:
         logger.error(f"Invalid input for check_user_prescription_for_medication: {str(e)}", exc_info=True)
@@ -878,7 +784,7 @@ def get_authenticated_user_info(username: str, password: str, authenticated_user
     If authenticated_username and authenticated_password_hash are provided from context,
     verifies that the provided username and password match. Then authenticates the user
     and retrieves their complete information including prescriptions from the database.
-    Uses module-level caching for DatabaseManager to improve performance.
+    Uses the shared DatabaseManager from get_db_manager() so the database is loaded once per process.
     
     Args:
         username: The username (name or email) to authenticate
@@ -947,7 +853,7 @@ def get_authenticated_user_info(username: str, password: str, authenticated_user
                 }
         
         # Find user by username/email
-        db_manager = _get_db_manager()
+        db_manager = get_db_manager()
         users = db_manager.search_users_by_name_or_email(normalized_username)
         
         if not users:
@@ -973,66 +879,21 @@ def get_authenticated_user_info(username: str, password: str, authenticated_user
             # In production, this should require password setup
             logger.info(f"User {user.user_id} has no password hash, allowing access (backward compatibility)")
         
-        # Get prescriptions for the user
-        prescriptions = db_manager.get_prescriptions_by_user(user.user_id)
-        logger.info(f"Found {len(prescriptions)} prescriptions for authenticated user: {user.user_id}")
-        
-        # Enrich prescriptions with complete medication information to avoid redundant tool calls
-        # This includes all medication details (active ingredients, dosage, etc.) so the AI
-        # doesn't need to call get_medication_by_name separately, reducing latency
-        prescription_info_list = []
-        for prescription in prescriptions:
-            medication = db_manager.get_medication_by_id(prescription.medication_id)
-            if medication:
-                prescription_info = PrescriptionInfo(
-                    prescription_id=prescription.prescription_id,
-                    medication_id=prescription.medication_id,
-                    medication_name_he=medication.name_he,
-                    medication_name_en=medication.name_en,
-                    active_ingredients=medication.active_ingredients,
-                    dosage_forms=medication.dosage_forms,
-                    dosage_instructions=medication.dosage_instructions,
-                    usage_instructions=medication.usage_instructions,
-                    description=medication.description,
-                    prescribed_by=prescription.prescribed_by,
-                    prescription_date=prescription.prescription_date,
-                    expiry_date=prescription.expiry_date,
-                    quantity=prescription.quantity,
-                    refills_remaining=prescription.refills_remaining,
-                    status=prescription.status
-                )
-                prescription_info_list.append(prescription_info)
-            else:
-                logger.warning(f"Medication {prescription.medication_id} not found for prescription {prescription.prescription_id}")
-                # Still include prescription even if medication not found
-                prescription_info = PrescriptionInfo(
-                    prescription_id=prescription.prescription_id,
-                    medication_id=prescription.medication_id,
-                    medication_name_he="Unknown",
-                    medication_name_en="Unknown",
-                    active_ingredients=[],
-                    dosage_forms=[],
-                    dosage_instructions=None,
-                    usage_instructions=None,
-                    description=None,
-                    prescribed_by=prescription.prescribed_by,
-                    prescription_date=prescription.prescription_date,
-                    expiry_date=prescription.expiry_date,
-                    quantity=prescription.quantity,
-                    refills_remaining=prescription.refills_remaining,
-                    status=prescription.status
-                )
-                prescription_info_list.append(prescription_info)
-        
-        result = AuthenticatedUserInfoResult(
-            user_id=user.user_id,
-            name=user.name,
-            email=user.email,
-            prescriptions=prescription_info_list
-        )
+        # Get prescriptions for the user, enriched with complete medication information
+        # to avoid redundant tool calls (materialized by the database)
+        prescription_info_list = db_manager.get_prescription_view(user.user_id)
+        logger.info(f"Found {len(prescription_info_list)} prescriptions for authenticated user: {user.user_id}")
+        
+        # Same content as AuthenticatedUserInfoResult(...).model_dump()
+        result = {
+            "user_id": user.user_id,
+            "name": user.name,
+            "email": user.email,
+            "prescriptions": prescription_info_list
+        }
         
         logger.info(f"Successfully retrieved authenticated user info: {user.user_id} ({user.name})")
-        return result.model_dump()
+        return result
         
     except ValueError as e:
         logger.error(f"Invalid input for get_authenticated_user_info: {str(e)}", exc_info=True)
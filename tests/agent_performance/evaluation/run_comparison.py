@@ -15,6 +15,7 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
+from app.security.audit_query import AuditQuery
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
@@ -259,7 +260,8 @@ def compare_with_audit_logs(
     complete traceability and data integrity.
     
     Implementation (What):
-    Loads audit log file, finds entries matching correlation_id, and compares
+    Looks up the entries of correlation_id through the sidecar indexes of the
+    audit files (AuditQuery), reading only the matching lines, and compares
     tool calls between test results and audit logs.
     
     Args:
@@ -283,23 +285,8 @@ def compare_with_audit_logs(
             "discrepancies": []
         }
     
-    # Find audit log file (try to find by date pattern or scan all)
-    audit_entries = []
-    
-    # Try to find log file with correlation_id
-    for log_file in audit_path.glob("*.json"):
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            entry = json.loads(line)
-                            if entry.get("correlation_id") == correlation_id:
-                                audit_entries.append(entry)
-                        except json.JSONDecodeError:
-                            continue
-        except Exception as e:
-            logger.warning(f"Error reading audit log {log_file}: {e}")
+    # Indexed lookup (also writes entries still queued by the buffered audit writer)
+    audit_entries = list(AuditQuery(log_dir=str(audit_path)).query(correlation_id=correlation_id))
     
     if not audit_entries:
         return {
@@ -9,6 +9,7 @@ Implementation (What):
 Defines pytest fixtures for common test data and utilities.
 """
 
+import shutil
 import pytest
 from pathlib import Path
 
@@ -51,3 +52,23 @@ def database_json_path(data_dir: Path) -> Path:
     """
     return data_dir / "database.json"
 
+
+
+@pytest.fixture
+def db_copy(database_json_path: Path, tmp_path: Path) -> Path:
+    """
+    Fixture providing a copy of the project database in a temporary directory.
+    
+    Tests that write, journal, snapshot or reload the database use the copy so
+    data/database.json is never modified.
+    
+    Args:
+        database_json_path: database.json fixture
+        tmp_path: Pytest temporary directory
+        
+    Returns:
+        Path to the copied database.json
+    """
+    target = tmp_path / "database.json"
+    shutil.copy(database_json_path, target)
+    return target
@@ -0,0 +1,32 @@
+"""
+Shared builders for mocked OpenAI streaming responses.
+
+Purpose (Why):
+The streaming, event, speculative tool and response cache tests all feed the
+agent fake ChatCompletionChunk objects. Keeping one builder here means every
+suite mocks the same chunk shape, and a change to what the agent reads from a
+chunk only has to be mirrored in one place.
+
+Implementation (What):
+Builds SimpleNamespace objects carrying just the attributes the streaming
+agent reads: choices[0].delta.content, choices[0].delta.tool_calls and
+choices[0].finish_reason.
+"""
+
+from types import SimpleNamespace
+
+
+def make_chunk(content=None, tool_calls=None, finish_reason=None):
+    """
+    Build a streamed chunk.
+
+    Args:
+        content: Text content of the delta
+        tool_calls: Tool call deltas
+        finish_reason: Finish reason of the choice
+
+    Returns:
+        Object shaped like a ChatCompletionChunk
+    """
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
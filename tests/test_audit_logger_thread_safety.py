@@ -99,6 +99,8 @@ class TestAuditLoggerThreadSafety:
         # Wait for all threads to complete
         for thread in threads:
             thread.join()
+        # Entries are written by the background writer thread
+        audit_logger.flush()
         
         # Assert
         assert len(errors) == 0, f"Expected no errors, got {len(errors)}: {errors}"
@@ -170,6 +172,8 @@ class TestAuditLoggerThreadSafety:
         # Wait for all threads to complete
         for thread in threads:
             thread.join()
+        # Entries are written by the background writer thread
+        audit_logger.flush()
         
         # Assert
         assert len(errors) == 0, f"Expected no errors, got {len(errors)}: {errors}"
@@ -229,6 +233,8 @@ class TestAuditLoggerThreadSafety:
         # Wait for all threads to complete
         for thread in threads:
             thread.join()
+        # Entries are written by the background writer thread
+        audit_logger.flush()
         
         # Assert
         assert len(errors) == 0, f"Expected no errors, got {len(errors)}: {errors}"
@@ -289,6 +295,8 @@ class TestAuditLoggerThreadSafety:
         # Wait for all threads to complete
         for thread in threads:
             thread.join()
+        # Entries are written by the background writer thread
+        audit_logger.flush()
         
         # Assert
         assert len(errors) == 0, f"Expected no errors, got {len(errors)}: {errors}"
@@ -353,6 +361,8 @@ class TestAuditLoggerThreadSafety:
         # Wait for all threads to complete
         for thread in threads:
             thread.join()
+        # Entries are written by the background writer thread
+        audit_logger.flush()
         
         # Assert
         assert len(errors) == 0, f"Expected no errors, got {len(errors)}: {errors}"
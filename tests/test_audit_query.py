@@ -0,0 +1,226 @@
+"""
+Tests for indexed audit log queries.
+
+Purpose (Why):
+Validates that AuditQuery finds entries by correlation ID, agent, tool and
+time range through the sidecar indexes, updates them incrementally as files
+grow, follows rotated files into gzip, and reconstructs request timelines;
+and that the command line and compare_with_audit_logs use it.
+
+Implementation (What):
+Writes audit files with AuditLogger instances (or by hand, for
+fixed timestamps) in temporary directories.
+"""
+
+import os
+import gzip
+import json
+import shutil
+from unittest.mock import patch
+from app.security import audit_query as query_module
+from app.security.audit_logger import AuditLogger
+from app.security.audit_query import AuditFileIndex, AuditQuery, main
+from tests.agent_performance.evaluation.run_comparison import compare_with_audit_logs
+
+
+def _entry(timestamp, correlation_id, agent_id="agent", tool_name=None, status="success"):
+    """Build an audit entry with a fixed timestamp."""
+    entry = {"timestamp": timestamp, "correlation_id": correlation_id, "agent_id": agent_id, "status": status}
+    if tool_name:
+        entry.update({"event_type": "tool_call", "tool_name": tool_name})
+    else:
+        entry.update({"event_type": "agent_action", "action": "message_received"})
+    return entry
+
+
+def _write(path, entries):
+    """Append entries to an audit file as JSON lines."""
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+class TestAuditQuery:
+    """Test suite for AuditQuery lookups."""
+
+    def test_filters_combine_and_read_only_matches(self, tmp_path):
+        """
+        Test lookups by correlation ID, agent and tool, alone and combined.
+
+        Arrange: Two files with entries of several requests
+        Act: query() with different filters
+        Assert: Matching entries in write order; only matching lines read
+        """
+        first = str(tmp_path / "audit_2026-01-01_10-00-00.json")
+        second = str(tmp_path / "audit_2026-01-01_11-00-00.json")
+        _write(first, [_entry("2026-01-01T10:00:00", "c1"), _entry("2026-01-01T10:00:01", "c1", tool_name="check_stock_availability"),
+                       _entry("2026-01-01T10:00:02", "c2", agent_id="other")])
+        _write(second, [_entry("2026-01-01T11:00:00", "c1", tool_name="get_medication_by_name"), _entry("2026-01-01T11:00:01", "c3")])
+        audit_query = AuditQuery(log_dir=str(tmp_path))
+
+        assert [entry["timestamp"] for entry in audit_query.query(correlation_id="c1")] == [
+            "2026-01-01T10:00:00", "2026-01-01T10:00:01", "2026-01-01T11:00:00"]
+        assert [entry["correlation_id"] for entry in audit_query.query(agent_id="other")] == ["c2"]
+        assert len(list(audit_query.query(correlation_id="c1", tool_name="get_medication_by_name"))) == 1
+        assert list(audit_query.query(correlation_id="c2", agent_id="agent")) == []
+
+        with patch.object(AuditFileIndex, "read", autospec=True, side_effect=AuditFileIndex.read) as read:
+            list(audit_query.query(correlation_id="c3"))
+        assert read.call_count == 1 and len(read.call_args.args[1]) == 1
+
+    def test_time_range_skips_files(self, tmp_path):
+        """
+        Test that range queries use time buckets and skip non-overlapping files.
+
+        Arrange: Files for two hours
+        Act: query() with start and end inside the second hour
+        Assert: Exact range matches; first file never read
+        """
+        first = str(tmp_path / "audit_2026-01-01_10-00-00.json")
+        second = str(tmp_path / "audit_2026-01-01_11-00-00.json")
+        _write(first, [_entry(f"2026-01-01T10:0{minute}:00", f"a{minute}") for minute in range(5)])
+        _write(second, [_entry(f"2026-01-01T11:0{minute}:30", f"b{minute}") for minute in range(5)])
+        audit_query = AuditQuery(log_dir=str(tmp_path))
+
+        with patch.object(AuditFileIndex, "read", autospec=True, side_effect=AuditFileIndex.read) as read:
+            found = list(audit_query.query(start="2026-01-01T11:01:00", end="2026-01-01T11:03:00"))
+
+        assert [entry["correlation_id"] for entry in found] == ["b1", "b2"]
+        assert [call.args[0].path for call in read.call_args_list] == [second]
+        assert len(list(audit_query.query(start="2026-01-01T11:00:00", limit=3))) == 3
+
+    def test_index_updated_incrementally(self, tmp_path):
+        """
+        Test that a grown file is indexed from where the last update stopped.
+
+        Arrange: Indexed file, then more entries and a partial line appended
+        Act: query() again
+        Assert: New complete entries found; only the appended bytes parsed
+        """
+        path = str(tmp_path / "audit_2026-01-01_10-00-00.json")
+        _write(path, [_entry("2026-01-01T10:00:00", "c1")])
+        audit_query = AuditQuery(log_dir=str(tmp_path))
+        assert len(list(audit_query.query(correlation_id="c1"))) == 1
+        assert os.path.exists(path + ".idx")
+
+        _write(path, [_entry("2026-01-01T10:00:05", "c1"), _entry("2026-01-01T10:00:06", "c2")])
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "2026-01-01T10:00:07", "correlation_id": "c1"')
+
+        with patch.object(AuditFileIndex, "_add_line", autospec=True, side_effect=AuditFileIndex._add_line) as add_line:
+            found = list(audit_query.query(correlation_id="c1"))
+
+        assert len(found) == 2
+        assert add_line.call_count == 2
+
+    def test_gzipped_segment_continues_index(self, tmp_path):
+        """
+        Test that a file replaced by its gzipped copy keeps its index.
+
+        Arrange: Indexed plain file, then gzipped and removed (as rotation does)
+        Act: query()
+        Assert: Entries read from the .gz file; index marked complete
+        """
+        path = str(tmp_path / "audit_2026-01-01_10-00-00.json")
+        _write(path, [_entry("2026-01-01T10:00:00", "c1"), _entry("2026-01-01T10:00:01", "c2")])
+        audit_query = AuditQuery(log_dir=str(tmp_path))
+        list(audit_query.query(correlation_id="c1"))
+        with open(path, "rb") as source, gzip.open(path + ".gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(path)
+
+        assert [entry["correlation_id"] for entry in audit_query.query(correlation_id="c2")] == ["c2"]
+        with open(path + ".idx", encoding="utf-8") as f:
+            assert json.load(f)["complete"] is True
+
+    def test_index_of_deleted_file_removed(self, tmp_path):
+        """
+        Test that sidecar indexes of files deleted by cleanup are removed.
+
+        Arrange: Indexed file, then deleted
+        Act: indexes()
+        Assert: No index files left
+        """
+        path = str(tmp_path / "audit_2026-01-01_10-00-00.json")
+        _write(path, [_entry("2026-01-01T10:00:00", "c1")])
+        audit_query = AuditQuery(log_dir=str(tmp_path))
+        audit_query.indexes()
+        os.remove(path)
+
+        assert audit_query.indexes() == []
+        assert not list(tmp_path.glob("*.idx"))
+
+    def test_timeline(self, tmp_path):
+        """
+        Test timeline reconstruction of one request.
+
+        Arrange: Entries of a request across two files, one failed tool call
+        Act: timeline()
+        Assert: Events in time order with elapsed times and counts
+        """
+        _write(str(tmp_path / "audit_2026-01-01_10-00-00.json"), [
+            _entry("2026-01-01T10:00:00", "c1"),
+            _entry("2026-01-01T10:00:00.250000", "c1", tool_name="check_stock_availability", status="error"),
+        ])
+        _write(str(tmp_path / "audit_2026-01-01_10-00-01.json"), [_entry("2026-01-01T10:00:01.500000", "c1")])
+
+        timeline = AuditQuery(log_dir=str(tmp_path)).timeline("c1")
+
+        assert [event["elapsed_ms"] for event in timeline["events"]] == [0.0, 250.0, 1500.0]
+        assert [event["name"] for event in timeline["events"]] == ["message_received", "check_stock_availability", "message_received"]
+        assert (timeline["duration_ms"], timeline["tool_calls"], timeline["errors"]) == (1500.0, 1, 1)
+        assert AuditQuery(log_dir=str(tmp_path)).timeline("missing")["events"] == []
+
+    def test_finds_entries_written_by_audit_logger(self, tmp_path):
+        """
+        Test lookups over files written by a buffered AuditLogger.
+
+        Arrange: Buffered logger with queued entries
+        Act: query() without flushing first
+        Assert: Entries found (queued entries are flushed by the query)
+        """
+        audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+        audit_logger.log_tool_call(correlation_id="c1", tool_name="check_stock_availability", agent_id="agent",
+                                   arguments={"medication_id": "med_001"}, result={"available": True})
+
+        found = list(AuditQuery(log_dir=str(tmp_path)).query(tool_name="check_stock_availability"))
+
+        assert found[0]["arguments"] == {"medication_id": "med_001"}
+        audit_logger.close()
+
+
+class TestAuditQueryCommand:
+    """Test suite for the audit query command and its users."""
+
+    def test_query_and_timeline_commands(self, tmp_path, capsys):
+        """
+        Test the query and timeline subcommands.
+
+        Arrange: One audit file
+        Act: main() with query, then timeline, then an unknown ID
+        Assert: JSON lines and timeline printed; exit code 1 when nothing matches
+        """
+        _write(str(tmp_path / "audit_2026-01-01_10-00-00.json"), [
+            _entry("2026-01-01T10:00:00", "c1"), _entry("2026-01-01T10:00:01", "c1", tool_name="check_stock_availability")])
+
+        assert main(["--log-dir", str(tmp_path), "query", "--correlation-id", "c1"]) == 0
+        assert len(capsys.readouterr().out.splitlines()) == 2
+        assert main(["--log-dir", str(tmp_path), "timeline", "c1"]) == 0
+        assert "check_stock_availability" in capsys.readouterr().out
+        assert main(["--log-dir", str(tmp_path), "timeline", "missing"]) == 1
+
+    def test_compare_with_audit_logs_uses_index(self, tmp_path):
+        """
+        Test that compare_with_audit_logs() looks entries up through AuditQuery.
+
+        Arrange: Audit file with two entries of one request
+        Act: compare_with_audit_logs()
+        Assert: Entries and tool calls counted; index file created
+        """
+        path = tmp_path / "audit_2026-01-01_10-00-00.json"
+        _write(str(path), [_entry("2026-01-01T10:00:00", "c1"), _entry("2026-01-01T10:00:01", "c1", tool_name="check_stock_availability")])
+
+        comparison = compare_with_audit_logs("c1", audit_logs_dir=str(tmp_path))
+
+        assert comparison["audit_entries_found"] == 2 and comparison["tool_call_matches"] == 1
+        assert os.path.exists(str(path) + query_module.INDEX_SUFFIX)
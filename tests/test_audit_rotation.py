@@ -0,0 +1,147 @@
+"""
+Tests for audit file rotation and the shared AuditLogger.
+
+Purpose (Why):
+Validates that a long-running process does not append to one audit file
+forever: the current file is rotated by size and by age, rotated files can
+be gzipped, only the newest files are kept without rescanning the directory,
+and every module writes through the same logger.
+
+Implementation (What):
+Uses AuditLogger instances in temporary directories configured through
+environment variables; time.monotonic is patched to age a segment.
+"""
+
+import os
+import gzip
+import json
+from unittest.mock import patch
+from app.security import audit_logger as audit_module
+from app.security.audit_logger import AuditLogger, get_audit_logger
+
+
+def _log(audit_logger, index):
+    """Log one agent action numbered index."""
+    audit_logger.log_agent_action(correlation_id=f"corr_{index}", agent_id="agent", action="test", details={"index": index})
+
+
+def _indexes(paths):
+    """Read the entry indexes of plain or gzipped audit files, in file order."""
+    indexes = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            indexes.extend(json.loads(line)["details"]["index"] for line in f)
+    return indexes
+
+
+class TestAuditRotation:
+    """Test suite for size and age rotation of audit files."""
+
+    def test_rotates_by_size_without_losing_entries(self, tmp_path):
+        """
+        Test that the current file is rotated when it reaches AUDIT_MAX_FILE_BYTES.
+
+        Arrange: Buffered logger, 2000-byte limit, batches of one entry
+        Act: Log 40 entries, flush()
+        Assert: Several files, none far above the limit, all entries in order
+        """
+        env = {"AUDIT_MAX_FILE_BYTES": "2000", "AUDIT_BATCH_SIZE": "1", "AUDIT_KEEP_FILES": "100"}
+        with patch.dict(os.environ, env):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+        first_file = audit_logger.current_log_file
+
+        for index in range(40):
+            _log(audit_logger, index)
+        audit_logger.flush(timeout=10)
+        audit_logger.close()
+
+        files = sorted(str(path) for path in tmp_path.glob("audit_*.json"))
+        assert audit_logger.get_stats()["rotations"] == len(files) - 1 > 0
+        assert files[0] == first_file and audit_logger.current_log_file == files[-1]
+        assert all(os.path.getsize(path) <= 2000 for path in files)
+        assert _indexes(files) == list(range(40))
+
+    def test_rotates_by_age(self, tmp_path):
+        """
+        Test that a segment older than AUDIT_ROTATE_INTERVAL_SECONDS is rotated.
+
+        Arrange: Unbuffered logger with a 60-second interval
+        Act: Log, advance the monotonic clock by 61 seconds, log again
+        Assert: Second entry in a new file
+        """
+        with patch.dict(os.environ, {"AUDIT_ROTATE_INTERVAL_SECONDS": "60"}):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=False)
+        with patch.object(audit_module.time, "monotonic", return_value=1000.0):
+            _log(audit_logger, 1)
+        first_file = audit_logger.current_log_file
+
+        with patch.object(audit_module.time, "monotonic", return_value=1061.0):
+            _log(audit_logger, 2)
+
+        assert audit_logger.current_log_file != first_file
+        assert _indexes([first_file]) == [1]
+        assert _indexes([audit_logger.current_log_file]) == [2]
+
+    def test_rotated_files_are_gzipped(self, tmp_path):
+        """
+        Test that AUDIT_COMPRESS_ROTATED=true replaces rotated files with .gz copies.
+
+        Arrange: Unbuffered logger, 500-byte limit, compression enabled
+        Act: Log 10 entries, close() to wait for compression
+        Assert: Only the current file is plain; all entries readable in order
+        """
+        env = {"AUDIT_MAX_FILE_BYTES": "500", "AUDIT_COMPRESS_ROTATED": "true", "AUDIT_KEEP_FILES": "100"}
+        with patch.dict(os.environ, env):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=False)
+
+        for index in range(10):
+            _log(audit_logger, index)
+        audit_logger.close(timeout=10)
+
+        plain = [str(path) for path in tmp_path.glob("audit_*.json")]
+        compressed = sorted(str(path) for path in tmp_path.glob("audit_*.json.gz"))
+        assert plain == [audit_logger.current_log_file]
+        assert len(compressed) == audit_logger.rotations > 0
+        assert not list(tmp_path.glob("*.tmp"))
+        assert _indexes(compressed + plain) == list(range(10))
+
+    def test_keeps_newest_files_without_rescanning(self, tmp_path):
+        """
+        Test that only AUDIT_KEEP_FILES files are kept, tracked in memory.
+
+        Arrange: Five old audit files, keep limit of 3
+        Act: Create the logger, start two new runs with glob patched
+        Assert: Three newest files kept, directory scanned only at startup
+        """
+        for day in range(1, 6):
+            (tmp_path / f"audit_2020-01-0{day}_00-00-00.json").write_text("{}\n")
+        with patch.dict(os.environ, {"AUDIT_KEEP_FILES": "3"}):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=False)
+
+        with patch.object(audit_module.glob, "glob") as scan:
+            audit_logger.start_new_run()
+            _log(audit_logger, 1)
+
+        scan.assert_not_called()
+        remaining = sorted(path.name for path in tmp_path.glob("audit_*.json"))
+        assert len(remaining) == 2
+        assert os.path.basename(audit_logger.current_log_file) in remaining
+        assert "audit_2020-01-05_00-00-00.json" in remaining
+
+
+class TestSharedAuditLogger:
+    """Test suite for the shared AuditLogger instance."""
+
+    def test_modules_share_one_logger(self):
+        """
+        Test that the agent and the tool registry log through get_audit_logger().
+
+        Arrange: Imported modules
+        Act: Compare their loggers
+        Assert: Same instance
+        """
+        from app.agent import streaming
+        from app.tools import registry
+
+        assert streaming._audit_logger is registry._audit_logger is get_audit_logger()
@@ -0,0 +1,195 @@
+"""
+Tests for the buffered background writer of AuditLogger.
+
+Purpose (Why):
+Validates that audit entries are written off the caller's thread in batches
+through a file handle kept open, that nothing is lost on flush or close, and
+that the fsync and queue-full policies behave as configured.
+
+Implementation (What):
+Uses AuditLogger instances in temporary directories; counts open() calls in
+the module and blocks the writer with an Event to fill the queue.
+"""
+
+import os
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.security import audit_logger as audit_module
+from app.security.audit_logger import AuditLogger, flush_audit_logs
+
+
+def _read_entries(audit_logger):
+    """Read the JSON entries of the logger's current file."""
+    with open(audit_logger.current_log_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _log(audit_logger, index):
+    """Log one agent action numbered index."""
+    audit_logger.log_agent_action(correlation_id=f"corr_{index}", agent_id="agent", action="test", details={"index": index})
+
+
+class TestBufferedWriter:
+    """Test suite for buffered audit writes."""
+
+    def test_entries_written_in_order_after_flush(self, tmp_path):
+        """
+        Test that flush() waits for every queued entry.
+
+        Arrange: Buffered logger
+        Act: Log 500 entries, flush()
+        Assert: All entries in order, counted as written
+        """
+        audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+
+        for index in range(500):
+            _log(audit_logger, index)
+        assert audit_logger.flush(timeout=10) is True
+
+        assert [entry["details"]["index"] for entry in _read_entries(audit_logger)] == list(range(500))
+        assert audit_logger.get_stats()["written_entries"] == 500
+        audit_logger.close()
+
+    def test_file_opened_once_for_many_entries(self, tmp_path):
+        """
+        Test that the writer keeps the file open between batches.
+
+        Arrange: Buffered logger, open() in the module counted
+        Act: Log entries in several flushed rounds
+        Assert: One open() call
+        """
+        audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+
+        with patch.object(audit_module, "open", create=True, side_effect=open) as counted_open:
+            for round_index in range(3):
+                for index in range(50):
+                    _log(audit_logger, round_index * 50 + index)
+                audit_logger.flush(timeout=10)
+
+        assert counted_open.call_count == 1
+        assert len(_read_entries(audit_logger)) == 150
+        audit_logger.close()
+
+    def test_new_run_switches_file(self, tmp_path):
+        """
+        Test that entries queued before start_new_run() stay in the old file.
+
+        Arrange: Buffered logger with entries queued
+        Act: start_new_run(), log more, flush()
+        Assert: Each file holds its own entries
+        """
+        audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+        _log(audit_logger, 1)
+        first_file = audit_logger.current_log_file
+        with patch.object(audit_logger, "_create_new_log_file", return_value=str(tmp_path / "audit_next.json")):
+            audit_logger.start_new_run()
+        _log(audit_logger, 2)
+        audit_logger.flush(timeout=10)
+
+        with open(first_file, encoding="utf-8") as f:
+            assert [json.loads(line)["details"]["index"] for line in f] == [1]
+        assert [entry["details"]["index"] for entry in _read_entries(audit_logger)] == [2]
+        audit_logger.close()
+
+    def test_close_writes_pending_and_stops_thread(self, tmp_path):
+        """
+        Test that close() and flush_audit_logs() write everything.
+
+        Arrange: Buffered logger with a long flush interval
+        Act: flush_audit_logs(), then close()
+        Assert: Entries written, writer thread stopped, logger still usable
+        """
+        with patch.dict(os.environ, {"AUDIT_FLUSH_INTERVAL_MS": "60000", "AUDIT_BATCH_SIZE": "1000"}):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+        _log(audit_logger, 1)
+        flush_audit_logs(timeout=10)
+        assert len(_read_entries(audit_logger)) == 1
+
+        _log(audit_logger, 2)
+        thread = audit_logger._writer_thread
+        audit_logger.close(timeout=10)
+
+        assert not thread.is_alive()
+        assert len(_read_entries(audit_logger)) == 2
+        _log(audit_logger, 3)
+        audit_logger.close(timeout=10)
+        assert len(_read_entries(audit_logger)) == 3
+
+    def test_fsync_policy(self, tmp_path):
+        """
+        Test that AUDIT_FSYNC=true fsyncs each batch.
+
+        Arrange: Logger with fsync enabled, os.fsync patched
+        Act: Log, flush()
+        Assert: fsync called
+        """
+        with patch.dict(os.environ, {"AUDIT_FSYNC": "true"}):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+
+        with patch.object(audit_module.os, "fsync") as fsync:
+            _log(audit_logger, 1)
+            audit_logger.flush(timeout=10)
+
+        fsync.assert_called()
+        audit_logger.close()
+
+    def test_drop_policy_never_blocks_caller(self, tmp_path):
+        """
+        Test that a full queue drops entries instead of blocking under "drop".
+
+        Arrange: Queue of 2, writer blocked on its first batch
+        Act: Log 20 entries
+        Assert: Returns quickly, drops counted, queued entries written later
+        """
+        with patch.dict(os.environ, {"AUDIT_QUEUE_SIZE": "2", "AUDIT_QUEUE_FULL_POLICY": "drop", "AUDIT_BATCH_SIZE": "1"}):
+            audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=True)
+        release = threading.Event()
+        write_batch = audit_logger._write_batch
+
+        def slow_write_batch(*args):
+            release.wait(10)
+            return write_batch(*args)
+
+        with patch.object(audit_logger, "_write_batch", side_effect=slow_write_batch):
+            started = time.monotonic()
+            for index in range(20):
+                _log(audit_logger, index)
+            elapsed = time.monotonic() - started
+            release.set()
+            audit_logger.flush(timeout=10)
+
+        stats = audit_logger.get_stats()
+        assert elapsed < 1.0
+        assert stats["dropped_entries"] > 0
+        assert stats["written_entries"] + stats["dropped_entries"] == 20
+        audit_logger.close()
+
+    def test_unbuffered_writes_immediately(self, tmp_path):
+        """
+        Test that buffered=False keeps writing on the caller's thread.
+
+        Arrange: Unbuffered logger
+        Act: Log one entry
+        Assert: Entry readable without flush, no writer thread
+        """
+        audit_logger = AuditLogger(log_dir=str(tmp_path), enabled=True, buffered=False)
+
+        _log(audit_logger, 1)
+
+        assert len(_read_entries(audit_logger)) == 1
+        assert audit_logger._writer_thread is None
+
+    def test_invalid_queue_full_policy(self, tmp_path):
+        """
+        Test that an unknown queue-full policy is rejected.
+
+        Arrange: AUDIT_QUEUE_FULL_POLICY=discard
+        Act: AuditLogger()
+        Assert: ValueError
+        """
+        with patch.dict(os.environ, {"AUDIT_QUEUE_FULL_POLICY": "discard"}):
+            with pytest.raises(ValueError):
+                AuditLogger(log_dir=str(tmp_path), enabled=True)
@@ -0,0 +1,151 @@
+"""
+Tests for incremental per-session conversation state.
+
+Purpose (Why):
+Validates that context extraction processes each history message once per
+session instead of re-scanning the full history every turn, that the result
+matches a full scan, and that the state recovers when the history is cleared.
+
+Implementation (What):
+Drives ConversationState directly and through StreamingAgent helpers,
+counting processed messages by wrapping _add_message.
+"""
+
+import os
+from unittest.mock import Mock, patch
+from app.agent.conversation_state import ConversationState, MAX_CONTEXT_ITEMS
+from app.agent.streaming import StreamingAgent
+from app.agent.history_budget import get_token_counter
+from app import main
+
+
+def _turn(index):
+    """Build one user/assistant exchange mentioning a medication and a user."""
+    return [
+        {"role": "user", "content": f"Question {index}"},
+        {"role": "assistant", "content": f'{{"medication_id": "med_{index:03d}", "user_id": "user_{index:03d}"}}'},
+    ]
+
+
+class TestConversationState:
+    """Test suite for ConversationState."""
+
+    def test_only_new_messages_are_processed(self):
+        """
+        Test that each message is processed once across turns.
+
+        Arrange: State, history growing by one exchange per turn
+        Act: update() with the full history on each of 10 turns
+        Assert: 20 messages processed in total (not 2 + 4 + ... + 20)
+        """
+        state = ConversationState()
+        history = []
+        with patch.object(state, "_add_message", wraps=state._add_message) as add_message:
+            for index in range(10):
+                history = history + _turn(index)
+                state.update(history)
+
+        assert add_message.call_count == 20
+        assert state.message_count == 20
+
+    def test_matches_full_scan(self):
+        """
+        Test that incremental results equal those of a fresh state.
+
+        Arrange: History updated turn by turn
+        Act: Compare with a state built from the whole history at once
+        Assert: Same context and token total
+        """
+        incremental = ConversationState()
+        history = []
+        for index in range(5):
+            history = history + _turn(index)
+            incremental.update(history)
+        full = ConversationState()
+        full.update(history)
+
+        assert incremental.context_info() == full.context_info()
+        assert incremental.token_total == full.token_total == sum(get_token_counter().count_message(m) for m in history)
+
+    def test_most_recent_first(self):
+        """
+        Test that re-mentioned items move to the front.
+
+        Arrange: med_000 mentioned again after med_001
+        Act: context_info()
+        Assert: med_000 first
+        """
+        state = ConversationState()
+        state.update(_turn(0) + _turn(1) + _turn(0))
+
+        assert state.context_info()["medications"][:2] == ["med_000", "med_001"]
+
+    def test_memory_is_bounded(self):
+        """
+        Test that only the most recent items are remembered.
+
+        Arrange: More distinct medications than MAX_CONTEXT_ITEMS
+        Act: update()
+        Assert: MAX_CONTEXT_ITEMS medications kept
+        """
+        state = ConversationState()
+        state.update([m for index in range(MAX_CONTEXT_ITEMS + 10) for m in _turn(index)])
+
+        assert len(state.context_info()["medications"]) == MAX_CONTEXT_ITEMS
+
+    def test_cleared_history_rebuilds(self):
+        """
+        Test that a history that no longer extends the state resets it.
+
+        Arrange: State with two exchanges
+        Act: update() with a different, shorter history
+        Assert: Only the new history's context remains
+        """
+        state = ConversationState()
+        state.update(_turn(1) + _turn(2))
+
+        state.update(_turn(7))
+
+        assert state.context_info()["medications"] == ["med_007"]
+        assert state.message_count == 2
+
+
+class TestAgentConversationState:
+    """Test suite for ConversationState use in StreamingAgent and the UI."""
+
+    def test_agent_uses_state_for_context_and_tokens(self):
+        """
+        Test that the agent reads context and token totals from the session state.
+
+        Arrange: Agent, session state
+        Act: _extract_context_info() and _optimize_history() with the state
+        Assert: Context from the state; history tokens not counted again
+        """
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+            agent = StreamingAgent()
+        state = ConversationState()
+        history = _turn(3)
+
+        context = agent._extract_context_info(history, state)
+        with patch.object(get_token_counter(), "count_message") as count_message:
+            agent._optimize_history(history, conversation_state=state)
+
+        assert context["medications"] == ["med_003"]
+        count_message.assert_not_called()
+
+    def test_chat_fn_passes_session_state(self):
+        """
+        Test that chat_fn forwards the session state to the agent.
+
+        Arrange: Mock agent, session state
+        Act: chat_fn() with the state
+        Assert: stream_response called with the same state
+        """
+        mock_agent = Mock()
+        mock_agent.stream_response.return_value = iter(["Hi"])
+        state = ConversationState()
+
+        with patch.object(main, "agent", mock_agent):
+            list(main.chat_fn("Hello", [], conversation_state=state))
+
+        assert mock_agent.stream_response.call_args.kwargs["conversation_state"] is state
@@ -0,0 +1,173 @@
+"""
+Tests for the DatabaseManager catalog indexes.
+
+Purpose (Why):
+Validates that id lookups are served from hash indexes built at load time and
+that the indexes stay consistent with the data after save_db().
+
+Implementation (What):
+Tests the Catalog class directly and through DatabaseManager, using a temporary
+database file for save_db() scenarios.
+"""
+
+import json
+import pytest
+from pydantic import ValidationError
+from app.database.db import DatabaseManager
+from app.database.catalog import Catalog
+
+
+@pytest.fixture
+def sample_data(database_json_path):
+    """
+    Fixture providing a copy of the project database as a dictionary.
+
+    Returns:
+        Dictionary loaded from data/database.json
+    """
+    with open(database_json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestCatalogIndexes:
+    """Test suite for Catalog hash indexes."""
+
+    def test_indexes_cover_all_records(self, sample_data):
+        """
+        Test that the catalog indexes every medication, user and prescription.
+
+        Arrange: Database dictionary
+        Act: Build Catalog
+        Assert: Index sizes match the raw lists
+        """
+        catalog = Catalog(sample_data)
+
+        assert len(catalog.medications_by_id) == len(sample_data["medications"])
+        assert len(catalog.users_by_id) == len(sample_data["users"])
+        indexed_prescriptions = sum(len(p) for p in catalog.prescriptions_by_user.values())
+        assert indexed_prescriptions == len(sample_data["prescriptions"])
+
+    def test_indexes_reference_original_records(self, sample_data):
+        """
+        Test that indexes point at the original record dictionaries (no copies).
+
+        Arrange: Database dictionary
+        Act: Build Catalog and look up med_001
+        Assert: Returned record is the same object as in the raw list
+        """
+        catalog = Catalog(sample_data)
+        raw = next(m for m in sample_data["medications"] if m["medication_id"] == "med_001")
+
+        assert catalog.get_medication("med_001") is raw
+
+    def test_missing_keys_return_empty_results(self, sample_data):
+        """
+        Test that lookups for unknown ids return None or an empty list.
+
+        Arrange: Catalog
+        Act: Look up unknown ids
+        Assert: None / [] returned
+        """
+        catalog = Catalog(sample_data)
+
+        assert catalog.get_medication("med_missing") is None
+        assert catalog.get_user("user_missing") is None
+        assert catalog.get_prescriptions_for_user("user_missing") == []
+
+
+class TestDatabaseManagerIndexes:
+    """Test suite for DatabaseManager index maintenance."""
+
+    def test_load_db_builds_catalog(self):
+        """
+        Test that load_db() builds the catalog.
+
+        Arrange: DatabaseManager instance
+        Act: Call load_db()
+        Assert: Catalog is built from the loaded data
+        """
+        db = DatabaseManager()
+        data = db.load_db()
+
+        assert db._catalog is not None, "load_db() should build the catalog"
+        assert db._catalog.data is data
+
+    def test_save_db_rebuilds_indexes(self, sample_data, tmp_path):
+        """
+        Test that save_db() keeps the indexes consistent with the saved data.
+
+        Arrange: DatabaseManager pointing at a temporary file
+        Act: Save data with a new medication, then look it up
+        Assert: New medication is found, removed one is gone
+        """
+        db = DatabaseManager(db_path=str(tmp_path / "database.json"))
+        new_med = dict(sample_data["medications"][0], medication_id="med_new")
+        sample_data["medications"] = [new_med] + sample_data["medications"][1:]
+
+        db.save_db(sample_data)
+
+        assert db.get_medication_by_id("med_new") is not None
+        assert db.get_medication_by_id("med_001") is None
+
+
+class TestCatalogModels:
+    """Test suite for the pre-validated models held by the Catalog."""
+
+    def test_lookups_share_frozen_models(self):
+        """
+        Test that repeated lookups return the same immutable model.
+
+        Arrange: Loaded manager
+        Act: Look up a medication, user and prescriptions twice, search the user
+        Assert: Same instances, assignment rejected
+        """
+        db = DatabaseManager(use_snapshot=False)
+        db.load_db()
+
+        medication = db.get_medication_by_id("med_001")
+        assert db.get_medication_by_id("med_001") is medication
+        assert db.search_medications_by_name(medication.name_en)[0] is medication
+        assert db.get_user_by_id("user_001") is db.get_user_by_id("user_001")
+        assert db.search_users_by_name_or_email(db.get_user_by_id("user_001").email)[0] is db.get_user_by_id("user_001")
+        assert db.get_prescriptions_by_user("user_001")[0] is db.get_prescriptions_by_user("user_001")[0]
+        with pytest.raises(ValidationError):
+            medication.stock.quantity_in_stock = 0
+
+    def test_changes_replace_cached_models(self, database_json_path, tmp_path):
+        """
+        Test that stock and refill changes publish new models.
+
+        Arrange: Manager over a database copy
+        Act: decrement_stock() and record_prescription_refill()
+        Assert: Lookups return new models with the new values (the refill
+                returns the cached one), old models unchanged
+        """
+        target = tmp_path / "database.json"
+        target.write_bytes(database_json_path.read_bytes())
+        db = DatabaseManager(db_path=str(target), use_snapshot=False)
+        medication = db.get_medication_by_id("med_001")
+        prescription = db.get_prescriptions_by_user("user_001")[0]
+
+        db.decrement_stock("med_001", 1)
+        refilled = db.record_prescription_refill(prescription.prescription_id)
+
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == medication.stock.quantity_in_stock - 1
+        assert db.get_prescriptions_by_user("user_001")[0].refills_remaining == prescription.refills_remaining - 1
+        assert db.get_prescriptions_by_user("user_001")[0] is refilled
+        assert db.get_medication_by_id("med_001") is not medication
+
+    def test_invalid_record_raises_on_lookup(self, sample_data):
+        """
+        Test that an invalid record is skipped at build time and fails on lookup.
+
+        Arrange: Medication record without required fields
+        Act: Build Catalog, look up the record
+        Assert: No cached model, ValidationError on lookup
+        """
+        sample_data["medications"].append({"medication_id": "med_broken"})
+
+        catalog = Catalog(sample_data)
+
+        assert "med_broken" not in catalog.medication_models
+        with pytest.raises(ValidationError):
+            catalog.get_medication_model("med_broken")
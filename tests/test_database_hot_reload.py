@@ -0,0 +1,224 @@
+"""
+Tests for hot reload of the JSON database.
+
+Purpose (Why):
+Validates that external edits of database.json become visible without a
+restart, that the edited file wins over uncompacted journal entries, that
+in-flight readers keep a consistent catalog, and that broken or own writes do
+not trigger reloads.
+
+Implementation (What):
+Uses a copy of the project database in a temporary directory, edits it the way
+an external process would (atomic rename with a new mtime) and calls
+reload_if_changed() directly or through the auto reload thread.
+"""
+
+import json
+import os
+import time
+from app.database.db import DatabaseManager
+
+
+def _edit_stock(path, medication_id, quantity):
+    """
+    Change a medication's stock in the JSON file like an external editor would.
+
+    Args:
+        path: Path to database.json
+        medication_id: Medication to change
+        quantity: New quantity_in_stock
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for med in data["medications"]:
+        if med["medication_id"] == medication_id:
+            med["stock"]["quantity_in_stock"] = quantity
+    tmp = path.with_name("external.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Make sure the signature changes even on coarse-grained file systems
+    stat = path.stat()
+    os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    os.replace(tmp, path)
+
+
+class TestHotReload:
+    """Test suite for reload_if_changed() and auto reload."""
+
+    def test_external_change_is_picked_up(self, db_copy):
+        """
+        Test that an external edit is visible after reload_if_changed().
+
+        Arrange: Loaded manager, then external stock edit
+        Act: reload_if_changed()
+        Assert: Reload happened, new stock visible, data_version increased
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+        version = db.data_version
+
+        _edit_stock(db_copy, "med_001", 7)
+
+        assert db.reload_if_changed() is True
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == 7
+        assert db.data_version > version
+
+    def test_unchanged_file_is_not_reloaded(self, db_copy):
+        """
+        Test that nothing happens when the file did not change.
+
+        Arrange: Loaded manager
+        Act: reload_if_changed()
+        Assert: False, same catalog object
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+        catalog = db._catalog
+
+        assert db.reload_if_changed() is False
+        assert db._catalog is catalog
+
+    def test_in_flight_reader_keeps_old_catalog(self, db_copy):
+        """
+        Test that a reader holding the old catalog is not affected by the swap.
+
+        Arrange: Reference to the current catalog (as an in-flight call holds it)
+        Act: External edit and reload
+        Assert: Old catalog unchanged, manager serves the new one
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+        old_catalog = db._catalog
+        old_quantity = old_catalog.get_medication("med_001")["stock"]["quantity_in_stock"]
+
+        _edit_stock(db_copy, "med_001", old_quantity + 100)
+        db.reload_if_changed()
+
+        assert old_catalog.get_medication("med_001")["stock"]["quantity_in_stock"] == old_quantity
+        assert db._catalog is not old_catalog
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == old_quantity + 100
+
+    def test_external_edit_wins_over_journal(self, db_copy):
+        """
+        Test that an external edit is not overridden by outstanding journal entries.
+
+        Arrange: Journaled decrement of med_001, then external restock to 500
+        Act: reload_if_changed(), compact(), reopen the database
+        Assert: 500 served after the reload, written by the compaction and
+                seen on restart; the journal is empty
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.decrement_stock("med_001", 1)
+
+        _edit_stock(db_copy, "med_001", 500)
+
+        assert db.reload_if_changed() is True
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == 500
+        assert db._journal.read_entries() == []
+
+        db.compact()
+        with open(db_copy, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        stock = next(med["stock"] for med in data["medications"] if med["medication_id"] == "med_001")
+        assert stock["quantity_in_stock"] == 500
+        assert DatabaseManager(db_path=str(db_copy)).get_medication_by_id("med_001").stock.quantity_in_stock == 500
+
+    def test_changes_after_reload_are_journaled(self, db_copy):
+        """
+        Test that changes made after a reload apply to the edited data.
+
+        Arrange: External restock of med_001 to 500, reload
+        Act: decrement_stock(), reopen the database
+        Assert: 499 served and replayed on restart
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+        _edit_stock(db_copy, "med_001", 500)
+        db.reload_if_changed()
+
+        db.decrement_stock("med_001", 1)
+
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == 499
+        assert DatabaseManager(db_path=str(db_copy)).get_medication_by_id("med_001").stock.quantity_in_stock == 499
+
+    def test_broken_file_keeps_current_data(self, db_copy):
+        """
+        Test that a half-written file does not replace the current data.
+
+        Arrange: Loaded manager, file overwritten with invalid JSON
+        Act: reload_if_changed()
+        Assert: False, data still served
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        db.load_db()
+
+        db_copy.write_text('{"users": [', encoding="utf-8")
+
+        assert db.reload_if_changed() is False
+        assert db.get_medication_by_id("med_001") is not None
+
+    def test_own_writes_do_not_trigger_reload(self, db_copy):
+        """
+        Test that save_db() and compact() are not mistaken for external edits.
+
+        Arrange: Loaded manager
+        Act: save_db(), then decrement + compact()
+        Assert: reload_if_changed() returns False after each
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+
+        db.save_db()
+        assert db.reload_if_changed() is False
+
+        db.decrement_stock("med_001", 1)
+        db.compact()
+        assert db.reload_if_changed() is False
+
+    def test_compaction_does_not_overwrite_unseen_edit(self, db_copy):
+        """
+        Test that compact() picks up an external edit instead of writing over it.
+
+        Arrange: Journaled decrement, then an external rename of med_001 not yet polled
+        Act: compact()
+        Assert: Edit kept on disk and served; nothing left to reload
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.decrement_stock("med_002", 1)
+        with open(db_copy, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data["medications"][0]["name_en"] = "Renamed"
+        tmp = db_copy.with_name("external.tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        stat = db_copy.stat()
+        os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        os.replace(tmp, db_copy)
+
+        db.compact()
+
+        with open(db_copy, "r", encoding="utf-8") as f:
+            assert json.load(f)["medications"][0]["name_en"] == "Renamed"
+        assert db.get_medication_by_id(data["medications"][0]["medication_id"]).name_en == "Renamed"
+        assert db.reload_if_changed() is False
+
+    def test_auto_reload_thread(self, db_copy):
+        """
+        Test that the auto reload thread picks up external edits.
+
+        Arrange: Manager with auto reload every 50ms
+        Act: External edit, wait
+        Assert: New stock visible without calling reload_if_changed()
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+        db.start_auto_reload(interval=0.05)
+        try:
+            _edit_stock(db_copy, "med_001", 3)
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                if db.get_medication_by_id("med_001").stock.quantity_in_stock == 3:
+                    break
+                time.sleep(0.05)
+            assert db.get_medication_by_id("med_001").stock.quantity_in_stock == 3
+        finally:
+            db.stop_auto_reload()
@@ -0,0 +1,205 @@
+"""
+Tests for atomic saves and the database change journal.
+
+Purpose (Why):
+Validates that small changes are journaled instead of rewriting the database,
+that journaled changes survive a restart, that compaction folds them into the
+JSON file, and that save_db() never leaves a partially written file.
+
+Implementation (What):
+Uses a copy of the project database in a temporary directory and fresh
+DatabaseManager instances to simulate process restarts.
+"""
+
+import json
+import os
+import threading
+import pytest
+from unittest.mock import patch
+from app.database.db import DatabaseManager
+from app.database.journal import ChangeJournal, journal_path_for
+
+
+class TestChangeJournal:
+    """Test suite for stock and refill changes through the journal."""
+
+    def test_decrement_stock_is_journaled_not_saved(self, db_copy):
+        """
+        Test that a stock decrement appends to the journal and leaves the JSON file untouched.
+
+        Arrange: Manager over a database copy
+        Act: decrement_stock("med_001", 5)
+        Assert: Stock updated in memory, JSON unchanged, one journal entry
+        """
+        original = db_copy.read_bytes()
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        before = db.get_medication_by_id("med_001").stock.quantity_in_stock
+
+        updated = db.decrement_stock("med_001", 5)
+
+        assert updated.stock.quantity_in_stock == before - 5
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == before - 5
+        assert db_copy.read_bytes() == original
+        assert len(journal_path_for(db_copy).read_text(encoding="utf-8").splitlines()) == 1
+
+    def test_changes_survive_restart(self, db_copy):
+        """
+        Test that journaled changes are replayed by a new manager.
+
+        Arrange: Stock decrement and prescription refill on one manager
+        Act: Load a new manager for the same file
+        Assert: Both changes are visible
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        stock_before = db.get_medication_by_id("med_001").stock.quantity_in_stock
+        refills_before = db.get_prescriptions_by_user("user_001")[0].refills_remaining
+        prescription_id = db.get_prescriptions_by_user("user_001")[0].prescription_id
+
+        db.decrement_stock("med_001", 3)
+        db.record_prescription_refill(prescription_id)
+
+        restarted = DatabaseManager(db_path=str(db_copy))
+        assert restarted.get_medication_by_id("med_001").stock.quantity_in_stock == stock_before - 3
+        assert restarted.get_prescriptions_by_user("user_001")[0].refills_remaining == refills_before - 1
+
+    def test_compaction_folds_journal_into_file(self, db_copy):
+        """
+        Test that compact() writes changes to the JSON file and removes the journal.
+
+        Arrange: Journaled stock decrement
+        Act: compact()
+        Assert: JSON contains the new stock, no journal files remain
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        updated = db.decrement_stock("med_001", 1)
+
+        db.compact()
+
+        with open(db_copy, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        assert saved["medications"][0]["stock"]["quantity_in_stock"] == updated.stock.quantity_in_stock
+        assert not journal_path_for(db_copy).exists()
+        assert not ChangeJournal(journal_path_for(db_copy)).rotated_path.exists()
+
+    def test_background_compaction_triggered_by_threshold(self, db_copy):
+        """
+        Test that reaching the threshold compacts the journal in the background.
+
+        Arrange: Manager with compaction_threshold=3
+        Act: Three decrements, then wait for the compaction thread
+        Assert: JSON file contains all decrements
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False, compaction_threshold=3)
+        before = db.get_medication_by_id("med_001").stock.quantity_in_stock
+
+        for _ in range(3):
+            db.decrement_stock("med_001", 1)
+        db._compaction_thread.join(timeout=5)
+
+        with open(db_copy, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        assert saved["medications"][0]["stock"]["quantity_in_stock"] == before - 3
+
+    def test_concurrent_decrements_are_not_lost(self, db_copy):
+        """
+        Test that concurrent stock decrements are all applied and replayed.
+
+        Arrange: Manager over a database copy
+        Act: Decrement from 10 threads, 5 units each, then restart
+        Assert: Stock reduced by 50 in memory and after restart
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False, compaction_threshold=7)
+        before = db.get_medication_by_id("med_001").stock.quantity_in_stock
+
+        def worker():
+            for _ in range(5):
+                db.decrement_stock("med_001", 1)
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if db._compaction_thread is not None:
+            db._compaction_thread.join(timeout=5)
+
+        assert db.get_medication_by_id("med_001").stock.quantity_in_stock == before - 50
+        restarted = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        assert restarted.get_medication_by_id("med_001").stock.quantity_in_stock == before - 50
+
+    def test_invalid_changes_raise(self, db_copy):
+        """
+        Test that invalid changes are rejected and not journaled.
+
+        Arrange: Manager over a database copy
+        Act: Over-decrement stock, non-positive quantity, unknown medication
+        Assert: ValueError / None, no journal written
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        in_stock = db.get_medication_by_id("med_001").stock.quantity_in_stock
+
+        with pytest.raises(ValueError):
+            db.decrement_stock("med_001", in_stock + 1)
+        with pytest.raises(ValueError):
+            db.decrement_stock("med_001", 0)
+        assert db.decrement_stock("med_missing", 1) is None
+        assert not journal_path_for(db_copy).exists()
+
+    def test_torn_journal_line_is_ignored(self, db_copy):
+        """
+        Test that a partially written last journal line does not break loading.
+
+        Arrange: One valid entry followed by a truncated line
+        Act: Load a new manager
+        Assert: Valid entry applied, database loads
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        updated = db.decrement_stock("med_001", 2)
+        with open(journal_path_for(db_copy), "a", encoding="utf-8") as f:
+            f.write('{"op": "stock", "medication_id": "med_0')
+
+        restarted = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+
+        assert restarted.get_medication_by_id("med_001").stock.quantity_in_stock == updated.stock.quantity_in_stock
+
+
+class TestAtomicSave:
+    """Test suite for atomic save_db()."""
+
+    def test_failed_save_keeps_previous_file(self, db_copy):
+        """
+        Test that a failure during save leaves the previous file intact.
+
+        Arrange: os.replace patched to fail
+        Act: save_db() with modified data
+        Assert: Error raised, original file unchanged, no temp files left
+        """
+        original = db_copy.read_bytes()
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        data = db.load_db()
+        data["medications"] = []
+
+        with patch("app.database.journal.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                db.save_db(data)
+
+        assert db_copy.read_bytes() == original
+        assert sorted(os.listdir(db_copy.parent)) == ["database.json"]
+
+    def test_save_clears_journal(self, db_copy):
+        """
+        Test that a full save supersedes the journal.
+
+        Arrange: Journaled stock decrement
+        Act: save_db()
+        Assert: Journal removed, saved file contains the change
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        updated = db.decrement_stock("med_001", 1)
+
+        db.save_db()
+
+        assert not journal_path_for(db_copy).exists()
+        with open(db_copy, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        assert saved["medications"][0]["stock"]["quantity_in_stock"] == updated.stock.quantity_in_stock
@@ -0,0 +1,211 @@
+"""
+Tests for the compiled database snapshot.
+
+Purpose (Why):
+Validates that DatabaseManager starts from the compiled snapshot when it is
+up to date, recompiles it when the JSON source changes (or the layout it
+depends on changes), never fails because of a missing, stale or corrupt
+snapshot, and that a restored Catalog decodes records lazily yet answers
+exactly like one built from the JSON.
+
+Implementation (What):
+Uses a copy of the project database in a temporary directory and inspects
+the snapshot file written next to it.
+"""
+
+import json
+import os
+from unittest.mock import patch
+from app.database import search_index
+from app.database import snapshot as snapshot_module
+from app.database.db import DatabaseManager
+from app.database.snapshot import snapshot_path_for, snapshot_fingerprint, load_snapshot, write_snapshot
+from app.database.catalog import Catalog
+from app.models.medication import Medication
+
+
+class TestDatabaseSnapshot:
+    """Test suite for snapshot compilation and loading."""
+
+    def test_first_load_writes_snapshot(self, db_copy):
+        """
+        Test that loading from JSON compiles a snapshot next to the source.
+
+        Arrange: Database copy without snapshot
+        Act: load_db()
+        Assert: Snapshot file exists and restores an equivalent Catalog
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        data = db.load_db()
+
+        assert snapshot_path_for(db_copy).exists()
+        restored = load_snapshot(db_copy)
+        assert isinstance(restored, Catalog)
+        assert restored.data == data
+        assert restored.get_medication("med_001") is restored.data["medications"][0]
+
+    def test_second_load_skips_json_parsing(self, db_copy):
+        """
+        Test that an up-to-date snapshot is used instead of parsing JSON.
+
+        Arrange: Database copy with a compiled snapshot
+        Act: load_db() on a new manager with json.load patched to fail
+        Assert: Data and indexes are available
+        """
+        DatabaseManager(db_path=str(db_copy)).load_db()
+
+        db = DatabaseManager(db_path=str(db_copy))
+        with patch("app.database.db.json.load", side_effect=AssertionError("JSON should not be parsed")):
+            db.load_db()
+
+        assert db.get_medication_by_id("med_001") is not None
+        assert db.search_medications_by_name("Acamol")
+
+    def test_stale_snapshot_is_recompiled(self, db_copy):
+        """
+        Test that a change to the JSON source invalidates the snapshot.
+
+        Arrange: Snapshot compiled, then JSON modified
+        Act: load_db() on a new manager
+        Assert: Modified data is visible
+        """
+        DatabaseManager(db_path=str(db_copy)).load_db()
+        with open(db_copy, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data["medications"][0]["name_en"] = "Changed Name"
+        with open(db_copy, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+
+        assert db.get_medication_by_id("med_001").name_en == "Changed Name"
+        assert load_snapshot(db_copy).get_medication("med_001")["name_en"] == "Changed Name"
+
+    def test_corrupt_snapshot_falls_back_to_json(self, db_copy):
+        """
+        Test that a corrupt snapshot is ignored.
+
+        Arrange: Snapshot file with garbage content and matching header size
+        Act: load_db()
+        Assert: Data loaded from JSON
+        """
+        snapshot_path_for(db_copy).write_bytes(b"not a snapshot" * 10)
+
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+
+        assert db.get_medication_by_id("med_001") is not None
+
+    def test_unwritable_snapshot_does_not_fail(self, db_copy):
+        """
+        Test that failure to write the snapshot is not an error.
+
+        Arrange: os.replace patched to raise
+        Act: write_snapshot()
+        Assert: Returns False, no temporary files left behind
+        """
+        with patch("app.database.snapshot.os.replace", side_effect=OSError("read-only")):
+            assert write_snapshot(db_copy, Catalog({"medications": []})) is False
+
+        assert sorted(os.listdir(db_copy.parent)) == ["database.json"]
+
+    def test_snapshot_disabled(self, db_copy):
+        """
+        Test that use_snapshot=False neither reads nor writes snapshots.
+
+        Arrange: Manager with use_snapshot=False
+        Act: load_db()
+        Assert: No snapshot file created
+        """
+        DatabaseManager(db_path=str(db_copy), use_snapshot=False).load_db()
+
+        assert not snapshot_path_for(db_copy).exists()
+
+    def test_restored_catalog_is_lazy(self, db_copy):
+        """
+        Test that restoring a snapshot decodes no record up front.
+
+        Arrange: Compiled snapshot, json.loads counted in the snapshot module
+        Act: load_snapshot(), then one medication lookup
+        Assert: Only the table of contents parsed at load; one record decoded per lookup
+        """
+        DatabaseManager(db_path=str(db_copy)).load_db()
+
+        with patch.object(snapshot_module.json, "loads", side_effect=json.loads) as loads:
+            catalog = load_snapshot(db_copy)
+            assert loads.call_count == 1
+            catalog.get_medication("med_003")
+            assert loads.call_count == 2
+            assert catalog.medication_models == {}
+
+    def test_restored_catalog_matches_json_catalog(self, db_copy):
+        """
+        Test that every lookup of a restored Catalog matches a Catalog built from JSON.
+
+        Arrange: Catalog built from the JSON and one restored from its snapshot
+        Act: Look up every id, user view, search and fuzzy query
+        Assert: Identical records, models, rows and results
+        """
+        data = DatabaseManager(db_path=str(db_copy), use_snapshot=False).load_db()
+        built = Catalog(data)
+        write_snapshot(db_copy, built)
+        restored = load_snapshot(db_copy)
+
+        for medication_id in built.medications_by_id:
+            assert restored.get_medication(medication_id) == built.get_medication(medication_id)
+            assert restored.get_medication_model(medication_id) == built.get_medication_model(medication_id)
+        for user_id in built.users_by_id:
+            assert restored.get_user_model(user_id) == built.get_user_model(user_id)
+            assert restored.get_prescription_models_for_user(user_id) == built.get_prescription_models_for_user(user_id)
+            assert restored.get_prescription_view(user_id) == built.get_prescription_view(user_id)
+        for prescription_id in built.prescriptions_by_id:
+            assert restored.get_prescription(prescription_id) == built.get_prescription(prescription_id)
+        for query in ("a", "ac", "acamol", "ibuprofen", "אקמול", "missing"):
+            assert restored.medication_search.search(query, ranked=True) == built.medication_search.search(query, ranked=True)
+        for query in ("Acamoll", "Ibuprofn", "Nurofen", "xyz"):
+            assert restored.medication_fuzzy.lookup(query) == built.medication_fuzzy.lookup(query)
+        assert restored.get_medication("missing") is None and restored.get_prescription_view("missing") == []
+        assert restored.data == data
+
+    def test_fingerprint_follows_models_and_index_parameters(self, db_copy):
+        """
+        Test that the format fingerprint changes with the layout it depends on.
+
+        Arrange: Current fingerprint
+        Act: Recompute with a changed model schema, then a changed n-gram size
+        Assert: Both differ; a snapshot with another fingerprint is ignored
+        """
+        current = snapshot_fingerprint.__wrapped__()
+
+        with patch.object(Medication, "model_json_schema", return_value={"changed": True}):
+            assert snapshot_fingerprint.__wrapped__() != current
+        with patch.object(search_index, "NGRAM_SIZE", search_index.NGRAM_SIZE + 1):
+            assert snapshot_fingerprint.__wrapped__() != current
+
+        DatabaseManager(db_path=str(db_copy)).load_db()
+        with patch.object(snapshot_module, "snapshot_fingerprint", return_value=b"\0" * 16):
+            assert load_snapshot(db_copy) is None
+
+    def test_snapshot_current_after_compaction(self, db_copy):
+        """
+        Test that compact() rewrites the snapshot together with the JSON file.
+
+        Arrange: Loaded database with a journaled stock change
+        Act: compact(), then load on a new manager with json.load patched to fail
+        Assert: Snapshot is current and contains the folded change
+        """
+        db = DatabaseManager(db_path=str(db_copy))
+        db.load_db()
+        before = db.get_medication_by_id("med_001").stock.quantity_in_stock
+        db.decrement_stock("med_001", 1)
+
+        db.compact()
+
+        restored = load_snapshot(db_copy)
+        assert restored is not None
+        assert restored.get_medication("med_001")["stock"]["quantity_in_stock"] == before - 1
+        restarted = DatabaseManager(db_path=str(db_copy))
+        with patch("app.database.db.json.load", side_effect=AssertionError("JSON should not be parsed")):
+            restarted.load_db()
+        assert restarted.get_medication_by_id("med_001").stock.quantity_in_stock == before - 1
@@ -0,0 +1,222 @@
+"""
+Tests for the deterministic fast path.
+
+Purpose (Why):
+Validates that unambiguous single-medication lookups are recognized in
+English and Hebrew, that everything else (advice, several medications,
+unknown words) goes to the model, and that the agent answers matches with
+one tool call and no model call.
+
+Implementation (What):
+Router tests run against the sample database. Agent tests use mocked OpenAI
+clients and assert that they are never called on the fast path.
+"""
+
+import os
+import json
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.agent.fast_path import FastPathRouter, INTENT_STOCK, INTENT_PRESCRIPTION, INTENT_INFO
+from app.agent.streaming import StreamingAgent
+
+
+@pytest.fixture
+def router():
+    """
+    Fixture providing a router.
+
+    Returns:
+        FastPathRouter
+    """
+    return FastPathRouter()
+
+
+def _agent(fast_path=True):
+    """
+    Create an agent with mocked clients.
+
+    Args:
+        fast_path: Whether the fast path is enabled
+
+    Returns:
+        StreamingAgent
+    """
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+        agent = StreamingAgent(fast_path=fast_path)
+    agent.client = Mock()
+    agent.async_client = Mock()
+    return agent
+
+
+class TestFastPathRouter:
+    """Test suite for FastPathRouter.match and render."""
+
+    @pytest.mark.parametrize("message, intent, medication_id, quantity, language", [
+        ("Is Acamol in stock?", INTENT_STOCK, "med_001", None, "en"),
+        ("Do you have 20 acetaminophen?", INTENT_STOCK, "med_001", 20, "en"),
+        ("Does Amoxicillin require a prescription?", INTENT_PRESCRIPTION, "med_003", None, "en"),
+        ("What is ibuprofen?", INTENT_INFO, "med_004", None, "en"),
+        ("יש לכם אקמול במלאי?", INTENT_STOCK, "med_001", None, "he"),
+        ("האם אמוקסיצילין דורש מרשם?", INTENT_PRESCRIPTION, "med_003", None, "he"),
+        ("מה זה האקמול?", INTENT_INFO, "med_001", None, "he"),
+    ])
+    def test_recognizes_simple_lookups(self, router, message, intent, medication_id, quantity, language):
+        """
+        Test that simple lookups are matched.
+
+        Arrange: Stock, prescription and info questions in English and Hebrew
+        Act: match()
+        Assert: Expected intent, medication, quantity and language
+        """
+        match = router.match(message)
+
+        assert match is not None
+        assert (match.intent, match.medication.medication_id, match.quantity, match.language) == (
+            intent, medication_id, quantity, language
+        )
+
+    @pytest.mark.parametrize("message", [
+        "Should I take Acamol for a headache?",
+        "Is Metformin safe with alcohol?",
+        "Are Acamol and Aspirin in stock?",
+        "Does Acamol need a prescription and is it in stock?",
+        "Is it in stock?",
+        "Acamol",
+        "Does Aspirin need 2 prescriptions?",
+        "",
+    ])
+    def test_falls_back_for_anything_else(self, router, message):
+        """
+        Test that ambiguous or advice questions are not matched.
+
+        Arrange: Advice, several medications, several intents, no medication, no intent
+        Act: match()
+        Assert: None
+        """
+        assert router.match(message) is None
+
+    def test_renders_in_user_language_with_brand(self, router):
+        """
+        Test that answers use the user's language and the brand name they used.
+
+        Arrange: Stock match via brand name, tool result
+        Act: render()
+        Assert: English answer mentions brand and quantity; Hebrew answer uses Hebrew name
+        """
+        result = {"medication_id": "med_001", "available": True, "quantity_in_stock": 150, "last_restocked": "2024-01-01"}
+
+        english = router.render(router.match("Is Acamol in stock?"), result)
+        hebrew = router.render(router.match("יש אקמול במלאי?"), result)
+
+        assert english.startswith("Acamol (Acetaminophen) is in stock: 150 units")
+        assert hebrew.startswith("אקמול זמין במלאי: 150")
+
+    def test_info_answer_has_disclaimer(self, router):
+        """
+        Test that information answers say they are not medical advice.
+
+        Arrange: Info match, get_medication_by_name result
+        Act: render()
+        Assert: Label data and disclaimer present
+        """
+        result = {
+            "medication_id": "med_004", "name_en": "Ibuprofen", "name_he": "איבופרופן",
+            "active_ingredients": ["Ibuprofen"], "dosage_forms": ["Tablets"], "description": "NSAID",
+        }
+
+        answer = router.render(router.match("What is ibuprofen?"), result)
+
+        assert "Active ingredients: Ibuprofen" in answer
+        assert "not medical advice" in answer
+
+    def test_error_or_other_medication_is_not_rendered(self, router):
+        """
+        Test that unusable tool results return None.
+
+        Arrange: Stock match
+        Act: render() with an error and with another medication's result
+        Assert: None for both
+        """
+        match = router.match("Is Acamol in stock?")
+
+        assert router.render(match, {"error": "Medication not found"}) is None
+        assert router.render(match, {"medication_id": "med_002", "available": True}) is None
+
+
+class TestStreamingAgentFastPath:
+    """Test suite for the fast path in stream_response and astream_response."""
+
+    def test_disabled_by_default(self):
+        """
+        Test that the fast path is opt-in.
+
+        Arrange: No FAST_PATH_ENABLED, then set to true
+        Act: Create agents
+        Assert: Disabled, then enabled
+        """
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+            os.environ.pop("FAST_PATH_ENABLED", None)
+            assert StreamingAgent().fast_path is False
+            with patch.dict(os.environ, {"FAST_PATH_ENABLED": "true"}):
+                assert StreamingAgent().fast_path is True
+
+    def test_answers_without_model_call(self):
+        """
+        Test that a simple lookup is answered with one tool call and no model call.
+
+        Arrange: Fast path agent, execute_tool patched
+        Act: stream_response() with tool call markers
+        Assert: Model not called, markers and templated answer yielded
+        """
+        agent = _agent()
+        result = {"medication_id": "med_003", "requires_prescription": True}
+
+        with patch("app.agent.streaming.execute_tool", return_value=result) as execute:
+            chunks = list(agent.stream_response("Does Amoxicillin need a prescription?", include_tool_calls=True))
+
+        agent.client.chat.completions.create.assert_not_called()
+        execute.assert_called_once()
+        assert execute.call_args.kwargs["tool_name"] == "check_prescription_requirement"
+        assert "[TOOL_CALL_START]" in chunks[0] and "[TOOL_CALL_RESULT]" in chunks[1]
+        assert json.loads(chunks[1].split("[TOOL_CALL_RESULT]")[1].split("[/TOOL_CALL_RESULT]")[0])["result"] == result
+        assert chunks[2] == "Amoxicillin requires a doctor's prescription."
+
+    def test_async_answers_without_model_call(self):
+        """
+        Test that astream_response also uses the fast path.
+
+        Arrange: Fast path agent, execute_tool patched
+        Act: astream_response()
+        Assert: Async model not called, templated answer yielded
+        """
+        agent = _agent()
+        agent.async_client.chat.completions.create = AsyncMock()
+
+        async def drain():
+            return [c async for c in agent.astream_response("Is Aspirin in stock?")]
+
+        with patch("app.agent.streaming.execute_tool", return_value={"medication_id": "med_002", "available": False}):
+            chunks = asyncio.run(drain())
+
+        agent.async_client.chat.completions.create.assert_not_called()
+        assert chunks == ["Aspirin is currently out of stock."]
+
+    def test_tool_error_falls_back_to_model(self):
+        """
+        Test that a failing fast path tool hands the message to the model.
+
+        Arrange: Fast path agent, tool returns an error, model streams a reply
+        Act: stream_response()
+        Assert: Model called, its reply yielded
+        """
+        agent = _agent()
+        chunk = Mock()
+        chunk.choices = [Mock(delta=Mock(content="From the model.", tool_calls=None), finish_reason="stop")]
+        agent.client.chat.completions.create = Mock(return_value=iter([chunk]))
+
+        with patch("app.agent.streaming.execute_tool", return_value={"error": "Rate limit exceeded", "success": False}):
+            chunks = list(agent.stream_response("Is Aspirin in stock?"))
+
+        agent.client.chat.completions.create.assert_called_once()
+        assert chunks == ["From the model."]
@@ -0,0 +1,172 @@
+"""
+Tests for the fuzzy medication matcher and ranked medication search.
+
+Purpose (Why):
+Validates that misspelled medication names produce relevant suggestions from
+a single fuzzy index probe, and that get_medication_by_name returns the best
+ranked match instead of the first catalog hit.
+
+Implementation (What):
+Tests edit_distance(), FuzzyMatcher lookups over the project database and a
+synthetic catalog, DatabaseManager.suggest_medications, ranked search, and the
+medication tool's suggestions for typos.
+"""
+
+import json
+import pytest
+from app.database.db import DatabaseManager
+from app.database.fuzzy_matcher import FuzzyMatcher, edit_distance
+from app.database.search_index import MedicationSearchIndex
+from app.tools.medication_tools import get_medication_by_name
+
+
+@pytest.fixture
+def medications(database_json_path):
+    """
+    Fixture providing the medication records of the project database.
+
+    Returns:
+        List of medication dictionaries
+    """
+    with open(database_json_path, "r", encoding="utf-8") as f:
+        return json.load(f)["medications"]
+
+
+class TestEditDistance:
+    """Test suite for edit_distance()."""
+
+    @pytest.mark.parametrize("a, b, expected", [
+        ("acamol", "acamol", 0),
+        ("acamoll", "acamol", 1),
+        ("ibuprofn", "ibuprofen", 1),
+        ("acamlo", "acamol", 1),
+        ("asprin", "aspirin", 1),
+        ("metfromin", "metformin", 1),
+    ])
+    def test_distance_within_budget(self, a, b, expected):
+        """
+        Test distances for common typo types (insert, delete, transpose).
+
+        Arrange: Pairs of strings
+        Act: Compute edit_distance with budget 2
+        Assert: Expected distance
+        """
+        assert edit_distance(a, b, 2) == expected
+
+    def test_distance_above_budget_returns_none(self):
+        """
+        Test that distances above the budget are reported as None.
+
+        Arrange: Unrelated strings
+        Act: Compute edit_distance with budget 2
+        Assert: None
+        """
+        assert edit_distance("aspirin", "metformin", 2) is None
+
+
+class TestFuzzyMatcher:
+    """Test suite for FuzzyMatcher."""
+
+    @pytest.mark.parametrize("query, expected_id", [
+        ("Acamoll", "med_001"),
+        ("אקמולל", "med_001"),
+        ("Ibuprofn", "med_004"),
+        ("paracetmol", "med_001"),
+        ("amoxicilin", "med_003"),
+        ("metfromin", "med_005"),
+    ])
+    def test_typos_find_intended_medication(self, medications, query, expected_id):
+        """
+        Test that typos in names, brands and ingredients find the intended medication.
+
+        Arrange: Matcher over the project medications
+        Act: Look up a misspelled name
+        Assert: Intended medication is the best match
+        """
+        matcher = FuzzyMatcher(medications)
+
+        results = matcher.lookup(query)
+
+        assert results, f"No suggestions for {query!r}"
+        assert results[0][0]["medication_id"] == expected_id
+
+    def test_unrelated_query_returns_nothing(self, medications):
+        """
+        Test that unrelated queries produce no suggestions.
+
+        Arrange: Matcher over the project medications
+        Act: Look up random text
+        Assert: Empty list
+        """
+        matcher = FuzzyMatcher(medications)
+
+        assert matcher.lookup("XYZ123ABC") == []
+
+    def test_results_ranked_by_distance(self):
+        """
+        Test that closer terms are ranked first and limit is respected.
+
+        Arrange: Synthetic catalog with names at distance 2 and 1 from the query
+        Act: Look up the query
+        Assert: Distance 1 first, distance 2 second
+        """
+        medications = [
+            {"medication_id": "far", "name_he": "", "name_en": "Cardiolxx"},
+            {"medication_id": "near", "name_he": "", "name_en": "Cardiol"},
+        ]
+        matcher = FuzzyMatcher(medications)
+
+        results = matcher.lookup("cardiox")
+
+        assert [(r["medication_id"], d) for r, d in results] == [("near", 1), ("far", 2)]
+        assert len(matcher.lookup("cardiox", limit=1)) == 1
+
+
+class TestRankedSearch:
+    """Test suite for ranked medication search and suggestions."""
+
+    def test_exact_match_ranked_before_substring(self):
+        """
+        Test that an exact name match beats an earlier substring match.
+
+        Arrange: Catalog where a substring match precedes the exact match
+        Act: Search ranked and unranked
+        Assert: Unranked keeps catalog order, ranked puts the exact match first
+        """
+        medications = [
+            {"medication_id": "combo", "name_he": "", "name_en": "Acamol Plus Cold"},
+            {"medication_id": "exact", "name_he": "", "name_en": "Acamol"},
+        ]
+        index = MedicationSearchIndex(medications)
+
+        assert [m["medication_id"] for m in index.search("acamol")] == ["combo", "exact"]
+        assert [m["medication_id"] for m in index.search("acamol", ranked=True)] == ["exact", "combo"]
+
+    def test_suggest_medications_returns_models(self):
+        """
+        Test that DatabaseManager.suggest_medications returns Medication models.
+
+        Arrange: Loaded DatabaseManager
+        Act: Suggest for 'Ibuprofn'
+        Assert: Ibuprofen suggested first
+        """
+        db = DatabaseManager()
+        db.load_db()
+
+        results = db.suggest_medications("Ibuprofn")
+
+        assert results and results[0].medication_id == "med_004"
+
+    def test_tool_suggests_correct_name_for_typo(self):
+        """
+        Test that get_medication_by_name suggests the intended name for a typo.
+
+        Arrange: Misspelled brand name
+        Act: Call get_medication_by_name("Acamoll")
+        Assert: Error result with the Acamol names as suggestions
+        """
+        result = get_medication_by_name("Acamoll")
+
+        assert "error" in result
+        assert "אקמול" in result["suggestions"]
+        assert "Acetaminophen" in result["suggestions"]
@@ -0,0 +1,165 @@
+"""
+Tests for tokenizer-based history budgeting.
+
+Purpose (Why):
+Validates that tokens are counted with the tokenizer (once per message),
+that the fallback estimate does not undercount Hebrew, and that history is
+filled newest-first within the token and message budgets.
+
+Implementation (What):
+Uses a fake tiktoken encoding (one token per character) so the tests do not
+depend on downloading encoding files.
+"""
+
+import os
+import pytest
+from unittest.mock import Mock, patch
+from app.agent.history_budget import (
+    TokenCounter,
+    budget_history,
+    estimate_tokens_fallback,
+    MESSAGE_OVERHEAD_TOKENS,
+    get_token_counter,
+)
+from app.agent.streaming import StreamingAgent
+
+
+@pytest.fixture
+def counter():
+    """
+    Fixture providing a counter with a one-token-per-character encoding.
+
+    Returns:
+        TokenCounter whose encoding is a Mock
+    """
+    encoding = Mock()
+    encoding.encode.side_effect = lambda text, **kwargs: list(text)
+    encoding.decode.side_effect = lambda tokens: "".join(tokens)
+    with patch("app.agent.history_budget.tiktoken.get_encoding", return_value=encoding):
+        return TokenCounter(encoding_name="test")
+
+
+def _message(role, length):
+    """Build a message whose content is `length` characters (tokens) long."""
+    return {"role": role, "content": role[0] * length}
+
+
+class TestTokenCounter:
+    """Test suite for TokenCounter."""
+
+    def test_counts_with_encoding_once_per_text(self, counter):
+        """
+        Test that counts come from the encoding and are memoized.
+
+        Arrange: Counter with fake encoding
+        Act: count() the same text twice
+        Assert: Exact count, one encode call
+        """
+        assert counter.exact is True
+        assert counter.count("hello") == counter.count("hello") == 5
+        assert counter._encoding.encode.call_count == 1
+
+    def test_falls_back_when_encoding_unavailable(self):
+        """
+        Test that a failing encoding load falls back to estimates.
+
+        Arrange: get_encoding raises (no network)
+        Act: TokenCounter(), count()
+        Assert: Not exact, estimate used
+        """
+        with patch("app.agent.history_budget.tiktoken.get_encoding", side_effect=OSError("offline")):
+            counter = TokenCounter(encoding_name="test")
+
+        assert counter.exact is False
+        assert counter.count("abcdefgh") == estimate_tokens_fallback("abcdefgh") == 2
+
+    def test_fallback_counts_hebrew_higher_than_chars_over_four(self):
+        """
+        Test that the fallback does not undercount Hebrew like len // 4.
+
+        Arrange: Hebrew sentence
+        Act: estimate_tokens_fallback()
+        Assert: At least twice len // 4
+        """
+        text = "האם יש לכם אקמול במלאי היום"
+
+        assert estimate_tokens_fallback(text) >= 2 * (len(text) // 4)
+
+    def test_truncate(self, counter):
+        """
+        Test that truncate() keeps the first max_tokens tokens.
+
+        Arrange: Counter with fake encoding
+        Act: truncate()
+        Assert: Prefix of the requested length
+        """
+        assert counter.truncate("abcdef", 3) == "abc"
+        assert counter.truncate("abc", 10) == "abc"
+
+
+class TestBudgetHistory:
+    """Test suite for budget_history."""
+
+    def test_fills_budget_newest_first(self, counter):
+        """
+        Test that the newest messages that fit are kept.
+
+        Arrange: Four messages of 10 content tokens each
+        Act: budget_history() with room for two messages
+        Assert: Last two kept, two dropped
+        """
+        history = [_message("user", 10), _message("assistant", 10), _message("user", 10), _message("assistant", 10)]
+        budget = 2 * (10 + MESSAGE_OVERHEAD_TOKENS)
+
+        selected, dropped = budget_history(history, budget, 20, counter=counter)
+
+        assert selected == history[2:]
+        assert dropped == 2
+
+    def test_message_limit_and_duplicates(self, counter):
+        """
+        Test the message limit and removal of consecutive duplicates.
+
+        Arrange: Duplicate consecutive message
+        Act: budget_history() with a large token budget and limit 2
+        Assert: Duplicate skipped, two distinct messages kept
+        """
+        history = [{"role": "user", "content": "a"}, {"role": "user", "content": "b"}, {"role": "user", "content": "b"}]
+
+        selected, dropped = budget_history(history, 1000, 2, counter=counter)
+
+        assert [m["content"] for m in selected] == ["a", "b"]
+        assert dropped == 0
+
+    def test_oversized_newest_message_is_truncated(self, counter):
+        """
+        Test that the newest message is truncated rather than dropped.
+
+        Arrange: Newest message larger than the budget
+        Act: budget_history()
+        Assert: Truncated newest message only
+        """
+        history = [_message("user", 5), _message("assistant", 100)]
+
+        selected, dropped = budget_history(history, 20 + MESSAGE_OVERHEAD_TOKENS, 20, counter=counter)
+
+        assert selected == [{"role": "assistant", "content": "a" * 20}]
+        assert dropped == 1
+
+    def test_agent_keeps_recent_history_and_notes_omission(self):
+        """
+        Test that the agent's history stays within the configured budget.
+
+        Arrange: HISTORY_TOKEN_BUDGET set, long history
+        Act: _optimize_history()
+        Assert: Omission note first, newest message last, budget respected
+        """
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123", "HISTORY_TOKEN_BUDGET": "200"}):
+            agent = StreamingAgent()
+        history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 20} for i in range(30)]
+
+        optimized = agent._optimize_history(history)
+
+        assert optimized[0]["role"] == "system" and "omitted" in optimized[0]["content"]
+        assert optimized[-1] == history[-1]
+        assert 0 < sum(get_token_counter().count_message(m) for m in optimized[1:]) <= 200
@@ -0,0 +1,177 @@
+"""
+Tests for the n-gram medication search index.
+
+Purpose (Why):
+Validates that the MedicationSearchIndex returns exactly the same results, in
+the same order, as the original linear substring search, for Hebrew and
+English queries of every length.
+
+Implementation (What):
+Compares index results against a brute-force reference implementation over
+the project database and a synthetic catalog, and tests search through
+DatabaseManager.
+"""
+
+import json
+import time
+import pytest
+from app.database.db import DatabaseManager
+from app.database.search_index import MedicationSearchIndex
+
+
+def _reference_search(medications, query, language=None):
+    """
+    Brute-force reference implementation of the original linear search.
+
+    Args:
+        medications: Raw medication records
+        query: Lowercased, stripped query
+        language: Optional language filter
+
+    Returns:
+        List of medication IDs in catalog order
+    """
+    results = []
+    for med in medications:
+        if med["medication_id"] in results:
+            continue
+        fields = list(med.get("brand_names", [])) + list(med.get("active_ingredients", []))
+        if language in (None, "he"):
+            fields.append(med.get("name_he", ""))
+        if language in (None, "en"):
+            fields.append(med.get("name_en", ""))
+        if any(query in field.lower() for field in fields):
+            results.append(med["medication_id"])
+    return results
+
+
+@pytest.fixture
+def medications(database_json_path):
+    """
+    Fixture providing the medication records of the project database.
+
+    Returns:
+        List of medication dictionaries
+    """
+    with open(database_json_path, "r", encoding="utf-8") as f:
+        return json.load(f)["medications"]
+
+
+class TestMedicationSearchIndex:
+    """Test suite for MedicationSearchIndex."""
+
+    def test_matches_reference_for_all_substrings(self, medications):
+        """
+        Test that every substring of every searchable field gives reference results.
+
+        Arrange: Index over the project medications
+        Act: Search every substring (length 1-6) of every field, for each language filter
+        Assert: Same IDs in the same order as the linear search
+        """
+        index = MedicationSearchIndex(medications)
+        queries = set()
+        for med in medications:
+            texts = [med["name_he"], med["name_en"]] + med.get("brand_names", []) + med.get("active_ingredients", [])
+            for text in texts:
+                lowered = text.lower()
+                for size in range(1, 7):
+                    for i in range(len(lowered) - size + 1):
+                        queries.add(lowered[i:i + size])
+
+        for query in queries:
+            for language in (None, "he", "en"):
+                expected = _reference_search(medications, query, language)
+                actual = [m["medication_id"] for m in index.search(query, language)]
+                assert actual == expected, f"Mismatch for {query!r} (lang={language})"
+
+    def test_no_match_returns_empty(self, medications):
+        """
+        Test that unknown queries return no results.
+
+        Arrange: Index over the project medications
+        Act: Search for a nonexistent name
+        Assert: Empty list
+        """
+        index = MedicationSearchIndex(medications)
+
+        assert index.search("nonexistentmedication") == []
+
+    def test_language_filter_excludes_other_name(self, medications):
+        """
+        Test that the language filter restricts name matching.
+
+        Arrange: Index over the project medications
+        Act: Search a Hebrew name with language='en'
+        Assert: Not found via the Hebrew name
+        """
+        index = MedicationSearchIndex(medications)
+        med = medications[0]
+        query = med["name_he"].lower()
+
+        assert med in index.search(query, "he")
+        assert med not in index.search(query, "en")
+
+    def test_duplicate_ids_returned_once(self, medications):
+        """
+        Test that duplicate medication IDs appear once, first record wins.
+
+        Arrange: Catalog with a duplicated medication record
+        Act: Search its English name
+        Assert: Only the first record is returned
+        """
+        duplicate = dict(medications[0])
+        index = MedicationSearchIndex([medications[0], duplicate])
+
+        results = index.search(medications[0]["name_en"].lower())
+
+        assert len(results) == 1
+        assert results[0] is medications[0]
+
+    def test_large_catalog_search_is_fast(self):
+        """
+        Test that search on a 50k item catalog stays interactive.
+
+        Arrange: Synthetic catalog of 50,000 medications
+        Act: Search a selective query many times
+        Assert: Correct result and well below a millisecond per query on average
+        """
+        medications = [
+            {
+                "medication_id": f"med_{i:06d}",
+                "name_he": f"תרופה {i}",
+                "name_en": f"Medication{i:06d}",
+                "brand_names": [f"Brand{i}"],
+                "active_ingredients": [f"Ingredient{i % 500} 10mg"],
+            }
+            for i in range(50000)
+        ]
+        index = MedicationSearchIndex(medications)
+
+        start = time.perf_counter()
+        for _ in range(100):
+            results = index.search("medication012345")
+        elapsed = (time.perf_counter() - start) / 100
+
+        assert [m["medication_id"] for m in results] == ["med_012345"]
+        assert elapsed < 0.005, f"Search took {elapsed * 1000:.2f}ms on average"
+
+
+class TestDatabaseManagerSearch:
+    """Test suite for DatabaseManager.search_medications_by_name via the index."""
+
+    def test_search_uses_catalog_index(self):
+        """
+        Test that DatabaseManager search returns validated models from the index.
+
+        Arrange: Loaded DatabaseManager
+        Act: Search for 'acamol' (brand name)
+        Assert: Medication models returned, matching the index result
+        """
+        db = DatabaseManager()
+        db.load_db()
+
+        results = db.search_medications_by_name("Acamol")
+        indexed = db._catalog.medication_search.search("acamol")
+
+        assert [m.medication_id for m in results] == [m["medication_id"] for m in indexed]
+        assert results, "Acamol should be found through its brand name"
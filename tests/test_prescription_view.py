@@ -0,0 +1,196 @@
+"""
+Tests for the denormalized per-user prescription view.
+
+Purpose (Why):
+Validates that the materialized prescription rows are identical to joining
+prescriptions with medications per call, that they follow prescription and
+medication changes, and that both storage backends serve the same rows.
+
+Implementation (What):
+Compares DatabaseManager.get_prescription_view() with PrescriptionInfo models
+built the previous way, using temporary database copies for changes.
+"""
+
+import pytest
+from app.database.catalog import Catalog
+from app.database.db import DatabaseManager
+from app.database.sqlite_backend import SQLiteDatabaseManager
+from app.database.migrate_to_sqlite import main as migrate_main
+from app.tools.user_tools import PrescriptionInfo
+
+
+@pytest.fixture
+def sample_catalog_data(database_json_path):
+    """
+    Fixture providing a fresh copy of the project database dictionary.
+
+    Returns:
+        Dictionary loaded from data/database.json
+    """
+    return DatabaseManager(db_path=str(database_json_path), use_snapshot=False).load_db()
+
+
+def _joined_per_call(db, user_id):
+    """
+    Join a user's prescriptions with medications the way the tools used to.
+
+    Args:
+        db: DatabaseManager to query
+        user_id: User whose prescriptions are joined
+
+    Returns:
+        List of PrescriptionInfo dictionaries
+    """
+    rows = []
+    for prescription in db.get_prescriptions_by_user(user_id):
+        medication = db.get_medication_by_id(prescription.medication_id)
+        rows.append(PrescriptionInfo(
+            prescription_id=prescription.prescription_id,
+            medication_id=prescription.medication_id,
+            medication_name_he=medication.name_he if medication else "Unknown",
+            medication_name_en=medication.name_en if medication else "Unknown",
+            active_ingredients=medication.active_ingredients if medication else [],
+            dosage_forms=medication.dosage_forms if medication else [],
+            dosage_instructions=medication.dosage_instructions if medication else None,
+            usage_instructions=medication.usage_instructions if medication else None,
+            description=medication.description if medication else None,
+            prescribed_by=prescription.prescribed_by,
+            prescription_date=prescription.prescription_date,
+            expiry_date=prescription.expiry_date,
+            quantity=prescription.quantity,
+            refills_remaining=prescription.refills_remaining,
+            status=prescription.status
+        ).model_dump())
+    return rows
+
+
+class TestPrescriptionView:
+    """Test suite for the materialized prescription view."""
+
+    def test_rows_match_per_call_join(self, db_copy):
+        """
+        Test that every user's rows equal the per-call join, in the same order.
+
+        Arrange: Loaded manager
+        Act: get_prescription_view() for every user and an unknown user
+        Assert: Identical rows and key order, empty list for the unknown user
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        data = db.load_db()
+
+        for user in data["users"]:
+            expected = _joined_per_call(db, user["user_id"])
+            rows = db.get_prescription_view(user["user_id"])
+            assert rows == expected
+            assert [list(row) for row in rows] == [list(row) for row in expected]
+        assert db.get_prescription_view("user_missing") == []
+
+    def test_rows_are_copies(self, db_copy):
+        """
+        Test that callers cannot modify the materialized view.
+
+        Arrange: Loaded manager
+        Act: Modify a returned row and its ingredient list
+        Assert: Next call returns the original values
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        row = db.get_prescription_view("user_001")[0]
+        original = dict(row, active_ingredients=list(row["active_ingredients"]))
+
+        row["status"] = "cancelled"
+        row["active_ingredients"].append("Sugar")
+
+        assert db.get_prescription_view("user_001")[0] == original
+
+    def test_refill_updates_row(self, db_copy):
+        """
+        Test that a refill is reflected in the view.
+
+        Arrange: Active prescription of user_001
+        Act: record_prescription_refill()
+        Assert: Row shows one refill less and still matches the per-call join
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        row = db.get_prescription_view("user_001")[0]
+
+        db.record_prescription_refill(row["prescription_id"])
+
+        assert db.get_prescription_view("user_001")[0]["refills_remaining"] == row["refills_remaining"] - 1
+        assert db.get_prescription_view("user_001") == _joined_per_call(db, "user_001")
+
+    def test_stock_change_does_not_rebuild_rows(self, db_copy):
+        """
+        Test that stock changes leave the (stock-free) rows untouched.
+
+        Arrange: Loaded manager, medication of user_001's first prescription
+        Act: decrement_stock()
+        Assert: Same materialized list object
+        """
+        db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        db.load_db()
+        rows = db._catalog.prescription_view_by_user["user_001"]
+
+        db.decrement_stock(rows[0]["medication_id"], 1)
+
+        assert db._catalog.prescription_view_by_user["user_001"] is rows
+
+    def test_medication_change_updates_dependent_rows(self, sample_catalog_data):
+        """
+        Test that changing a joined medication field rebuilds the dependent rows.
+
+        Arrange: Catalog, medication renamed in place
+        Act: refresh_medication()
+        Assert: Rows of every user with that medication show the new name
+        """
+        catalog = Catalog(sample_catalog_data)
+        medication_id = sample_catalog_data["prescriptions"][0]["medication_id"]
+        users = {p["user_id"] for p in sample_catalog_data["prescriptions"] if p["medication_id"] == medication_id}
+
+        catalog.get_medication(medication_id)["name_en"] = "Renamed"
+        catalog.refresh_medication(medication_id)
+
+        for user_id in users:
+            names = [
+                row["medication_name_en"]
+                for row in catalog.get_prescription_view(user_id)
+                if row["medication_id"] == medication_id
+            ]
+            assert names and all(name == "Renamed" for name in names)
+
+    def test_missing_medication_gives_unknown_row(self, sample_catalog_data):
+        """
+        Test that prescriptions of unknown medications are still listed.
+
+        Arrange: Prescription pointing at a nonexistent medication
+        Act: Build Catalog
+        Assert: Row with "Unknown" names and empty lists
+        """
+        prescription = sample_catalog_data["prescriptions"][0]
+        prescription["medication_id"] = "med_missing"
+
+        catalog = Catalog(sample_catalog_data)
+        rows = catalog.get_prescription_view(prescription["user_id"])
+        row = next(r for r in rows if r["prescription_id"] == prescription["prescription_id"])
+
+        assert row["medication_name_en"] == "Unknown"
+        assert row["active_ingredients"] == []
+        assert row["dosage_instructions"] is None
+
+    def test_sqlite_backend_matches_json_backend(self, db_copy, tmp_path):
+        """
+        Test that the SQLite JOIN returns the same rows as the JSON view.
+
+        Arrange: JSON manager and migrated SQLite manager
+        Act: get_prescription_view() for every user
+        Assert: Identical rows
+        """
+        target = tmp_path / "database.sqlite3"
+        assert migrate_main(["--source", str(db_copy), "--target", str(target)]) == 0
+        json_db = DatabaseManager(db_path=str(db_copy), use_snapshot=False)
+        sqlite_db = SQLiteDatabaseManager(db_path=str(target))
+        try:
+            for user in json_db.load_db()["users"]:
+                assert sqlite_db.get_prescription_view(user["user_id"]) == json_db.get_prescription_view(user["user_id"])
+        finally:
+            sqlite_db.close()
+
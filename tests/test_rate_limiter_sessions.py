@@ -0,0 +1,180 @@
+"""
+Tests for per-session rate limit keys and idle-key eviction.
+
+Purpose (Why):
+Validates that the chat UI rate limits each user or session separately
+instead of sharing the "default" agent ID, and that limiter state of idle
+callers and finished requests is evicted, so memory stays bounded over long
+uptimes without weakening any limit.
+
+Implementation (What):
+Drives RateLimiter with explicit times and a patched clock, execute_tool
+with the registry limiter replaced by a low-limit one, and achat_fn /
+chat_fn with a mocked agent.
+"""
+
+import asyncio
+import gc
+import time
+from unittest.mock import Mock, patch
+from app import main
+from app.agent import ConversationState
+from app.agent.events import StreamEvent, DONE, text_event
+from app.security import rate_limiter as rate_limiter_module
+from app.security.rate_limiter import RateLimiter
+from app.tools import registry
+
+
+class TestIdleEviction:
+    """Test suite for RateLimiter.evict_idle() and the eviction thread."""
+
+    def test_window_keys_evicted_only_when_day_window_empty(self):
+        """
+        Test that (tool, agent) keys are dropped once they have no calls left in the day window.
+
+        Arrange: Two agents, one active again an hour later
+        Act: evict_idle() after one hour, then after a day and a quarter hour
+        Assert: Nothing dropped while calls count; idle agent dropped, active one kept
+        """
+        rate_limiter = RateLimiter(eviction_interval=0)
+        start = 1_000_000.0
+        with patch.object(rate_limiter_module.time, "time", return_value=start):
+            rate_limiter.record_call("tool", "idle_session")
+            rate_limiter.record_call("tool", "busy_session")
+        with patch.object(rate_limiter_module.time, "time", return_value=start + 3600):
+            rate_limiter.record_call("tool", "busy_session")
+
+        assert rate_limiter.evict_idle(now=start + 3600) == 0
+        rate_limiter.evict_idle(now=start + 86400 + 900)
+
+        assert set(rate_limiter._day_calls) == {("tool", "busy_session")}
+        assert set(rate_limiter._minute_calls) == {("tool", "busy_session")}
+        assert len(rate_limiter._day_calls[("tool", "busy_session")]) == 1
+
+    def test_consecutive_state_evicted_after_idle_seconds(self):
+        """
+        Test that consecutive-call state of finished requests is dropped.
+
+        Arrange: idle_seconds=60, two requests checked 100 s apart
+        Act: evict_idle() just after the second request
+        Assert: Only the second request's state remains
+        """
+        rate_limiter = RateLimiter(idle_seconds=60, eviction_interval=0)
+        with patch.object(rate_limiter_module.time, "time", return_value=1000.0):
+            rate_limiter.check_rate_limit("tool", "session", "corr_old")
+            rate_limiter.check_rate_limit("other_tool", "session", "corr_old")
+        with patch.object(rate_limiter_module.time, "time", return_value=1100.0):
+            rate_limiter.check_rate_limit("tool", "session", "corr_new")
+
+        evicted = rate_limiter.evict_idle(now=1101.0)
+
+        assert evicted == 1
+        assert set(rate_limiter._last_tool) == {"corr_new"}
+        assert {key[0] for key in rate_limiter._consecutive_calls} == {"corr_new"}
+        assert rate_limiter.get_stats() == {"window_keys": 0, "correlation_keys": 1, "evicted_keys": 1}
+
+    def test_background_thread_evicts_and_stops(self):
+        """
+        Test that the eviction thread starts with the first call and sweeps periodically.
+
+        Arrange: Limiter with a 10 ms sweep interval and no idle grace
+        Act: Check and record a call, wait for a sweep, stop_eviction()
+        Assert: Consecutive state evicted in the background; thread stopped
+        """
+        rate_limiter = RateLimiter(idle_seconds=0, eviction_interval=0.01)
+        rate_limiter.check_rate_limit("tool", "session", "corr_1")
+        rate_limiter.record_call("tool", "session", "corr_1")
+        thread = rate_limiter._evictor
+
+        deadline = time.monotonic() + 5
+        while rate_limiter._last_seen and time.monotonic() < deadline:
+            time.sleep(0.01)
+        rate_limiter.stop_eviction(timeout=5)
+
+        assert thread is not None and not thread.is_alive()
+        assert rate_limiter._last_seen == {}
+        assert rate_limiter.evicted_keys >= 1
+
+    def test_thread_ends_with_unused_limiter(self):
+        """
+        Test that the eviction thread does not keep its limiter alive.
+
+        Arrange: Limiter with a running eviction thread
+        Act: Drop the last reference, collect garbage
+        Assert: Thread ends
+        """
+        rate_limiter = RateLimiter(eviction_interval=0.01)
+        rate_limiter.record_call("tool", "session")
+        thread = rate_limiter._evictor
+
+        del rate_limiter
+        gc.collect()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+
+
+class TestSessionKeys:
+    """Test suite for per-user and per-session rate limit keys."""
+
+    def test_sessions_have_separate_limits(self):
+        """
+        Test that one session reaching its limit does not throttle another.
+
+        Arrange: Registry limiter with a per-minute limit of 2
+        Act: Three stock checks from session A, one from session B
+        Assert: A's third call rejected, B's call allowed
+        """
+        limiter = RateLimiter(per_minute_limit=2, per_day_limit=100, consecutive_limit=100, eviction_interval=0)
+        arguments = {"medication_id": "med_001"}
+
+        with patch.object(registry, "_rate_limiter", limiter):
+            session_a = [registry.execute_tool("check_stock_availability", arguments, agent_id="session_a") for _ in range(3)]
+            session_b = registry.execute_tool("check_stock_availability", arguments, agent_id="session_b")
+
+        assert [result.get("rate_limit_exceeded", False) for result in session_a] == [False, False, True]
+        assert session_b.get("rate_limit_exceeded", False) is False
+
+    def test_session_id_kept_across_reset(self):
+        """
+        Test that each ConversationState has its own session_id, kept by reset().
+
+        Arrange: Two states
+        Act: reset() one of them
+        Assert: IDs differ between states and survive the reset
+        """
+        first, second = ConversationState(), ConversationState()
+        session_id = first.session_id
+
+        first.reset()
+
+        assert first.session_id == session_id != second.session_id
+        assert session_id.startswith("session_")
+
+    def test_chat_entry_points_pass_user_or_session_key(self):
+        """
+        Test that achat_fn and chat_fn scope rate limits by user, else by session.
+
+        Arrange: Mocked agent, a session state
+        Act: achat_fn anonymous and logged in; chat_fn anonymous
+        Assert: agent_id is the session_id, the user ID, and the session_id
+        """
+        async def fake_events(**kwargs):
+            yield text_event("Hi")
+            yield StreamEvent(DONE, data={"correlation_id": "c"})
+
+        async def drain(*args):
+            return [output async for output in main.achat_fn(*args)]
+
+        fake_agent = Mock()
+        fake_agent.astream_events = Mock(side_effect=fake_events)
+        fake_agent.stream_response = Mock(side_effect=lambda **kwargs: iter(["Hi"]))
+        state = ConversationState()
+
+        with patch.object(main, "agent", fake_agent):
+            asyncio.run(drain("Hello", [], None, None, None, None, state))
+            asyncio.run(drain("Hello", [], "user_001", "john", None, None, state))
+            list(main.chat_fn("Hello", [], None, None, None, None, state))
+
+        assert [call.kwargs["agent_id"] for call in fake_agent.astream_events.call_args_list] == [state.session_id, "user_001"]
+        assert fake_agent.stream_response.call_args.kwargs["agent_id"] == state.session_id
@@ -0,0 +1,167 @@
+"""
+Tests for the sliding window counters of RateLimiter.
+
+Purpose (Why):
+Validates that rate windows are counted in fixed memory and O(1) time:
+calls leave a window no earlier than its length (and at most one bucket
+later), the minute window is not polluted by the day window, and per-key
+state stays the same size however many calls are recorded.
+
+Implementation (What):
+Drives SlidingWindowCounter with explicit times, and RateLimiter with
+time.time patched in the rate_limiter module.
+"""
+
+from unittest.mock import patch
+from app.security import rate_limiter as rate_limiter_module
+from app.security.rate_limiter import RateLimiter, SlidingWindowCounter
+
+
+class _Clock:
+    """Manually advanced replacement for time.time."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestSlidingWindowCounter:
+    """Test suite for SlidingWindowCounter."""
+
+    def test_calls_expire_after_window_within_one_bucket(self):
+        """
+        Test that a call is counted for the whole window and at most one bucket more.
+
+        Arrange: 60-second window of 60 buckets, call at t=100.5
+        Act: count() at increasing times
+        Assert: Counted until t=160.5, gone by t=161
+        """
+        counter = SlidingWindowCounter(60, 60)
+        counter.add(100.5)
+
+        assert counter.count(100.5) == 1
+        assert counter.count(160.4) == 1
+        assert counter.count(160.9) == 1
+        assert counter.count(161.0) == 0
+
+    def test_running_total_across_buckets_and_long_gaps(self):
+        """
+        Test the running total as buckets expire one by one and after a long idle gap.
+
+        Arrange: 10-second window of 10 buckets
+        Act: Add calls over several seconds, then count much later
+        Assert: Totals drop as buckets leave; empty after the gap
+        """
+        counter = SlidingWindowCounter(10, 10)
+        for second in range(5):
+            counter.add(second, calls=2)
+
+        assert counter.count(4) == 10
+        assert counter.count(11) == 8
+        assert counter.count(14) == 2
+        assert counter.count(10_000) == 0
+        counter.add(10_000)
+        assert len(counter) == 1
+
+    def test_memory_independent_of_calls(self):
+        """
+        Test that recording many calls does not grow the counter.
+
+        Arrange: Day-window counter
+        Act: Add 100000 calls
+        Assert: Same number of buckets, exact total
+        """
+        counter = SlidingWindowCounter(86400, 96)
+        buckets = len(counter._counts)
+
+        for index in range(100_000):
+            counter.add(index * 0.5)
+
+        assert len(counter._counts) == buckets == 97
+        assert counter.total == 100_000
+
+
+class TestRateLimiterWindows:
+    """Test suite for RateLimiter window accounting."""
+
+    def test_minute_limit_recovers_while_day_window_keeps_counting(self):
+        """
+        Test that calls older than a minute stop counting toward the minute limit only.
+
+        Arrange: Minute limit 3, day limit 5, clock patched
+        Act: Record 3 calls, check; advance 61 s, check; record 2 more, check
+        Assert: Blocked, then allowed, then blocked by the day limit
+        """
+        clock = _Clock()
+        rate_limiter = RateLimiter(per_minute_limit=3, per_day_limit=5, consecutive_limit=100)
+
+        with patch.object(rate_limiter_module.time, "time", clock):
+            for _ in range(3):
+                rate_limiter.record_call("tool", "agent")
+            blocked, minute_error = rate_limiter.check_rate_limit("tool", "agent")
+            clock.now += 61
+            allowed, _ = rate_limiter.check_rate_limit("tool", "agent")
+            for _ in range(2):
+                rate_limiter.record_call("tool", "agent")
+            clock.now += 61
+            day_blocked, day_error = rate_limiter.check_rate_limit("tool", "agent")
+
+        assert (blocked, allowed, day_blocked) == (False, True, False)
+        assert "last minute" in minute_error and "24 hours" in day_error
+
+    def test_calls_spread_over_a_day_do_not_fill_minute_window(self):
+        """
+        Test that day-window cleanup does not leak into the minute window.
+
+        Arrange: Minute limit 5, one call every 2 minutes for an hour
+        Act: check_rate_limit() before each call
+        Assert: Every call allowed; day window counts all of them
+        """
+        clock = _Clock()
+        rate_limiter = RateLimiter(per_minute_limit=5, per_day_limit=1000, consecutive_limit=1000)
+
+        with patch.object(rate_limiter_module.time, "time", clock):
+            results = []
+            for _ in range(30):
+                results.append(rate_limiter.check_rate_limit("tool", "agent")[0])
+                rate_limiter.record_call("tool", "agent")
+                clock.now += 120
+
+        assert all(results)
+        assert len(rate_limiter._day_calls[("tool", "agent")]) == 30
+
+    def test_day_window_expires(self):
+        """
+        Test that the day limit is lifted once the calls are a day old.
+
+        Arrange: Day limit 2 reached
+        Act: Check now and after 24 hours and 15 minutes
+        Assert: Blocked, then allowed
+        """
+        clock = _Clock()
+        rate_limiter = RateLimiter(per_minute_limit=100, per_day_limit=2, consecutive_limit=100)
+
+        with patch.object(rate_limiter_module.time, "time", clock):
+            rate_limiter.record_call("tool", "agent")
+            rate_limiter.record_call("tool", "agent")
+            blocked, _ = rate_limiter.check_rate_limit("tool", "agent")
+            clock.now += 86400 + 900
+            allowed, _ = rate_limiter.check_rate_limit("tool", "agent")
+
+        assert (blocked, allowed) == (False, True)
+
+    def test_keys_use_separate_striped_locks(self):
+        """
+        Test that state of different keys is guarded by a fixed set of locks.
+
+        Arrange: RateLimiter
+        Act: Look up the locks of many keys
+        Assert: At most LOCK_STRIPES distinct locks, more than one used
+        """
+        rate_limiter = RateLimiter()
+
+        locks = {id(rate_limiter._lock_for(("tool", f"agent_{index}"))) for index in range(1000)}
+
+        assert 1 < len(locks) <= rate_limiter_module.LOCK_STRIPES
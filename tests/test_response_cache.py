@@ -0,0 +1,220 @@
+"""
+Tests for the response cache in front of the streaming agent.
+
+Purpose (Why):
+Validates that repeated first questions about catalog medications are
+replayed without calling the model, that the replay yields the same chunks,
+and that answers depending on the user, the conversation, user-specific
+tools or an older catalog version are never served from the cache.
+
+Implementation (What):
+Unit tests drive ResponseCache directly. Agent tests inject an enabled cache
+and count calls to a mocked OpenAI client.
+"""
+
+import os
+import json
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from app.agent.response_cache import ResponseCache, normalize_message, get_response_cache
+from app.agent.streaming import StreamingAgent
+from tests.stream_helpers import make_chunk
+
+
+def _tool_turn(name, arguments):
+    """Build a streamed turn requesting one tool call."""
+    delta = SimpleNamespace(index=0, id="call_1", function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+    return iter([make_chunk(tool_calls=[delta]), make_chunk(finish_reason="tool_calls")])
+
+
+@pytest.fixture
+def agent():
+    """
+    Fixture providing an agent with an enabled, private response cache.
+
+    Returns:
+        StreamingAgent whose sync client answers "Acamol is in stock." in two chunks
+    """
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+        agent = StreamingAgent(fast_path=False, response_cache=ResponseCache(max_entries=10, ttl_seconds=60, enabled=True))
+    agent.client = Mock()
+    agent.client.chat.completions.create = Mock(
+        side_effect=lambda **kwargs: iter([make_chunk("Acamol is "), make_chunk("in stock.", finish_reason="stop")])
+    )
+    return agent
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+
+    def test_normalize_message(self):
+        """
+        Test that case, whitespace and trailing punctuation are ignored.
+
+        Arrange: Two spellings of one question
+        Act: normalize_message()
+        Assert: Equal
+        """
+        assert normalize_message("  Is ACAMOL   in stock?") == normalize_message("is acamol in stock")
+
+    def test_key_requires_medication(self):
+        """
+        Test that messages naming no medication are not cached.
+
+        Arrange: Enabled cache
+        Act: make_key() without and with medication IDs
+        Assert: None, then a key including the data version
+        """
+        cache = ResponseCache(max_entries=10, ttl_seconds=60, enabled=True)
+
+        assert cache.make_key("hello", [], 1) is None
+        assert cache.make_key("Is Acamol in stock?", ["med_001"], 1)[-1] == 1
+
+    def test_new_data_version_drops_old_entries(self):
+        """
+        Test that entries of an older catalog version are unreachable and dropped.
+
+        Arrange: Entry stored at version 1
+        Act: Look up with the version 2 key, store a version 2 entry
+        Assert: Miss, only the new entry left
+        """
+        cache = ResponseCache(max_entries=10, ttl_seconds=60, enabled=True)
+        old_key = cache.make_key("acamol stock", ["med_001"], 1)
+        cache.put(old_key, ["old"], 1)
+        new_key = cache.make_key("acamol stock", ["med_001"], 2)
+
+        assert cache.get(new_key) is None
+        cache.put(new_key, ["new"], 2)
+        assert cache.get(old_key) is None
+        assert cache.get_stats()["entries"] == 1
+
+    def test_response_generated_during_catalog_change_is_dropped(self):
+        """
+        Test that a response is not stored if the version moved while generating.
+
+        Arrange: Key at version 1
+        Act: put() with current version 2
+        Assert: Not stored
+        """
+        cache = ResponseCache(max_entries=10, ttl_seconds=60, enabled=True)
+        key = cache.make_key("acamol stock", ["med_001"], 1)
+
+        cache.put(key, ["answer"], 2)
+
+        assert cache.get(key) is None
+
+    def test_disabled_by_default(self):
+        """
+        Test that the shared cache is opt-in.
+
+        Arrange: No RESPONSE_CACHE_ENABLED
+        Act: ResponseCache()
+        Assert: Disabled; shared accessor returns one instance
+        """
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("RESPONSE_CACHE_ENABLED", None)
+            assert ResponseCache().enabled is False
+        assert get_response_cache() is get_response_cache()
+
+
+class TestStreamingAgentResponseCache:
+    """Test suite for the response cache in stream_response and astream_response."""
+
+    def test_repeated_question_is_replayed(self, agent):
+        """
+        Test that a repeated question is answered from the cache.
+
+        Arrange: Agent with enabled cache
+        Act: Ask the same question twice with different formatting
+        Assert: One model call, identical chunks
+        """
+        first = list(agent.stream_response("Is Acamol in stock?"))
+        second = list(agent.stream_response("is acamol in stock"))
+
+        assert first == second == ["Acamol is ", "in stock."]
+        assert agent.client.chat.completions.create.call_count == 1
+
+    def test_async_stream_uses_same_cache(self, agent):
+        """
+        Test that astream_response replays a response cached by stream_response.
+
+        Arrange: Response cached by stream_response()
+        Act: astream_response() with the same question
+        Assert: Async client not called, same chunks
+        """
+        list(agent.stream_response("Is Acamol in stock?"))
+        agent.async_client = Mock()
+        agent.async_client.chat.completions.create = AsyncMock()
+
+        async def drain():
+            return [c async for c in agent.astream_response("Is Acamol in stock?")]
+
+        assert asyncio.run(drain()) == ["Acamol is ", "in stock."]
+        agent.async_client.chat.completions.create.assert_not_called()
+
+    @pytest.mark.parametrize("history, context", [
+        ([{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}], None),
+        (None, {"authenticated_user_id": "user_001"}),
+    ])
+    def test_session_specific_requests_are_not_cached(self, agent, history, context):
+        """
+        Test that follow-up and authenticated requests bypass the cache.
+
+        Arrange: Conversation history or authenticated context
+        Act: Ask the same question twice
+        Assert: Model called both times
+        """
+        for _ in range(2):
+            list(agent.stream_response("Is Acamol in stock?", conversation_history=history, context=dict(context or {})))
+
+        assert agent.client.chat.completions.create.call_count == 2
+
+    def test_catalog_change_invalidates(self, agent):
+        """
+        Test that a new data_version forces a fresh answer.
+
+        Arrange: Cached response at data_version 1
+        Act: Same question at data_version 2
+        Assert: Model called again
+        """
+        with patch("app.agent.streaming.get_db_manager") as get_db:
+            get_db.return_value.data_version = 1
+            list(agent.stream_response("Is Acamol in stock?"))
+            get_db.return_value.data_version = 2
+            list(agent.stream_response("Is Acamol in stock?"))
+
+        assert agent.client.chat.completions.create.call_count == 2
+
+    def test_user_specific_tool_answers_are_not_cached(self, agent):
+        """
+        Test that an answer built on a user-specific tool is not stored.
+
+        Arrange: Model calls get_user_prescriptions before answering
+        Act: stream_response()
+        Assert: Nothing cached
+        """
+        agent.client.chat.completions.create = Mock(side_effect=[
+            _tool_turn("get_user_prescriptions", {"user_id": "user_001"}),
+            iter([make_chunk("You have Acamol.", finish_reason="stop")]),
+        ])
+
+        with patch("app.agent.streaming.execute_tool", return_value={"prescriptions": []}):
+            list(agent.stream_response("Do I have Acamol?"))
+
+        assert agent.response_cache.get_stats()["entries"] == 0
+
+    def test_failed_response_is_not_cached(self, agent):
+        """
+        Test that an error reply is not stored.
+
+        Arrange: Model call raises
+        Act: stream_response()
+        Assert: Nothing cached
+        """
+        agent.client.chat.completions.create = Mock(side_effect=RuntimeError("down"))
+
+        list(agent.stream_response("Is Acamol in stock?"))
+
+        assert agent.response_cache.get_stats()["entries"] == 0
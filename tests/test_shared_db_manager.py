@@ -0,0 +1,81 @@
+"""
+Tests for the process-wide shared DatabaseManager.
+
+Purpose (Why):
+Validates that all tools and the login path share one lazily-loaded
+DatabaseManager, so the database is parsed once per process.
+
+Implementation (What):
+Tests get_db_manager() identity, thread-safety of first initialization, and
+that tool modules no longer keep their own DatabaseManager instances.
+"""
+
+import threading
+from unittest.mock import patch
+import app.database.db as db_module
+from app.database import get_db_manager, DatabaseManager
+
+
+class TestSharedDatabaseManager:
+    """Test suite for get_db_manager()."""
+
+    def test_returns_same_loaded_instance(self):
+        """
+        Test that get_db_manager() always returns the same loaded instance.
+
+        Arrange: Shared manager accessor
+        Act: Call get_db_manager() twice
+        Assert: Same object, data already loaded
+        """
+        first = get_db_manager()
+        second = get_db_manager()
+
+        assert first is second, "get_db_manager() should return a single shared instance"
+        assert isinstance(first, DatabaseManager)
+        assert first._data is not None, "Shared instance should be loaded before it is returned"
+
+    def test_concurrent_first_access_loads_once(self):
+        """
+        Test that concurrent first access creates and loads only one instance.
+
+        Arrange: Reset shared instance, count catalog loads
+        Act: Call get_db_manager() from many threads at once
+        Assert: One instance, loaded exactly once
+        """
+        original_load = DatabaseManager._load_catalog
+        load_calls = []
+
+        def counting_load(self):
+            load_calls.append(self)
+            return original_load(self)
+
+        results = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            results.append(get_db_manager())
+
+        with patch.object(db_module, "_shared_db_manager", None), \
+                patch.object(DatabaseManager, "_load_catalog", counting_load):
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(load_calls) == 1, f"Expected a single load, got {len(load_calls)}"
+        assert all(r is results[0] for r in results), "All threads should receive the same instance"
+
+    def test_tool_modules_have_no_private_instances(self):
+        """
+        Test that tool modules do not keep their own DatabaseManager globals.
+
+        Arrange: Import tool modules
+        Act: Inspect module attributes
+        Assert: No per-module _db_manager singletons remain
+        """
+        from app.tools import medication_tools, inventory_tools, prescription_tools, user_tools
+
+        for module in (medication_tools, inventory_tools, prescription_tools, user_tools):
+            assert not hasattr(module, "_db_manager"), f"{module.__name__} still keeps its own DatabaseManager"
@@ -0,0 +1,293 @@
+"""
+Tests for the SQLite storage backend.
+
+Purpose (Why):
+Validates that SQLiteDatabaseManager is a drop-in replacement for the JSON
+DatabaseManager: same query results, same ordering, same update semantics,
+plus the migration command and backend selection.
+
+Implementation (What):
+Migrates the project database into a temporary SQLite file and compares
+every query method against the JSON backend.
+"""
+
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch
+import app.database.db as db_module
+from app.database.db import DatabaseManager, create_db_manager
+from app.database.sqlite_backend import SQLiteDatabaseManager
+from app.database.migrate_to_sqlite import main as migrate_main
+
+
+@pytest.fixture
+def json_db():
+    """
+    Fixture providing the JSON-backed manager over the project database.
+
+    Returns:
+        Loaded DatabaseManager
+    """
+    db = DatabaseManager(use_snapshot=False)
+    db.load_db()
+    return db
+
+
+@pytest.fixture
+def sqlite_db(database_json_path, tmp_path):
+    """
+    Fixture providing an SQLite manager migrated from the project database.
+
+    Returns:
+        SQLiteDatabaseManager over a temporary file
+    """
+    target = tmp_path / "database.sqlite3"
+    assert migrate_main(["--source", str(database_json_path), "--target", str(target)]) == 0
+    db = SQLiteDatabaseManager(db_path=str(target))
+    yield db
+    db.close()
+
+
+class TestSQLiteQueries:
+    """Test suite comparing SQLite queries with the JSON backend."""
+
+    def test_id_lookups_match_json_backend(self, json_db, sqlite_db):
+        """
+        Test that id lookups return identical models.
+
+        Arrange: JSON and SQLite managers over the same data
+        Act: Look up every medication, user and user's prescriptions
+        Assert: Identical results
+        """
+        data = json_db.load_db()
+        for med in data["medications"]:
+            assert sqlite_db.get_medication_by_id(med["medication_id"]) == json_db.get_medication_by_id(med["medication_id"])
+        for user in data["users"]:
+            assert sqlite_db.get_user_by_id(user["user_id"]) == json_db.get_user_by_id(user["user_id"])
+            assert sqlite_db.get_prescriptions_by_user(user["user_id"]) == json_db.get_prescriptions_by_user(user["user_id"])
+        assert sqlite_db.get_medication_by_id("med_missing") is None
+        assert sqlite_db.get_user_by_id("user_missing") is None
+
+    @pytest.mark.parametrize("query", ["Acamol", "אקמול", "ac", "a", "in", "Paracetamol", "500mg", "xyz", "ASPIRIN"])
+    @pytest.mark.parametrize("language", [None, "he", "en"])
+    def test_medication_search_matches_json_backend(self, json_db, sqlite_db, query, language):
+        """
+        Test that medication search returns the same results in the same order.
+
+        Arrange: JSON and SQLite managers over the same data
+        Act: Search short and long, Hebrew and English queries
+        Assert: Identical ranked and unranked results
+        """
+        for ranked in (False, True):
+            expected = json_db.search_medications_by_name(query, language, ranked)
+            assert sqlite_db.search_medications_by_name(query, language, ranked) == expected
+
+    @pytest.mark.parametrize("query", ["John", "john.doe", "example.com", "mi", "@", "nobody"])
+    def test_user_search_matches_json_backend(self, json_db, sqlite_db, query):
+        """
+        Test that user search returns the same results in the same order.
+
+        Arrange: JSON and SQLite managers over the same data
+        Act: Search names and emails
+        Assert: Identical results
+        """
+        assert sqlite_db.search_users_by_name_or_email(query) == json_db.search_users_by_name_or_email(query)
+
+    def test_suggestions_match_json_backend(self, json_db, sqlite_db):
+        """
+        Test that typo suggestions are served by the SQLite backend.
+
+        Arrange: Both managers
+        Act: suggest_medications("Ibuprofn")
+        Assert: Identical results
+        """
+        assert sqlite_db.suggest_medications("Ibuprofn") == json_db.suggest_medications("Ibuprofn")
+
+    def test_uses_wal_and_indexes(self, sqlite_db):
+        """
+        Test that the database runs in WAL mode and per-user lookups use an index.
+
+        Arrange: Migrated SQLite database
+        Act: Inspect journal mode and query plan
+        Assert: WAL enabled, prescriptions index used
+        """
+        conn = sqlite3.connect(str(sqlite_db.db_path))
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            plan = " ".join(
+                str(row) for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT record FROM prescriptions WHERE user_id = ? ORDER BY position",
+                    ("user_001",)
+                )
+            )
+            assert "idx_prescriptions_user" in plan
+        finally:
+            conn.close()
+
+
+class TestSQLiteUpdates:
+    """Test suite for SQLite updates and concurrency."""
+
+    def test_decrement_stock_persists(self, sqlite_db):
+        """
+        Test that stock decrements are persisted transactionally.
+
+        Arrange: Migrated SQLite database
+        Act: Decrement stock, reopen the database
+        Assert: New stock visible after reopening, invalid decrements rejected
+        """
+        before = sqlite_db.get_medication_by_id("med_001").stock.quantity_in_stock
+
+        sqlite_db.decrement_stock("med_001", 4)
+        reopened = SQLiteDatabaseManager(db_path=str(sqlite_db.db_path))
+
+        assert reopened.get_medication_by_id("med_001").stock.quantity_in_stock == before - 4
+        with pytest.raises(ValueError):
+            reopened.decrement_stock("med_001", before)
+        assert reopened.decrement_stock("med_missing") is None
+        reopened.close()
+
+    def test_refill_persists(self, sqlite_db):
+        """
+        Test that prescription refills are persisted.
+
+        Arrange: Migrated SQLite database
+        Act: Refill the first prescription of user_001
+        Assert: refills_remaining decreased by one
+        """
+        prescription = sqlite_db.get_prescriptions_by_user("user_001")[0]
+
+        updated = sqlite_db.record_prescription_refill(prescription.prescription_id)
+
+        assert updated.refills_remaining == prescription.refills_remaining - 1
+        assert sqlite_db.get_prescriptions_by_user("user_001")[0].refills_remaining == updated.refills_remaining
+
+    def test_concurrent_reads_and_writes(self, sqlite_db):
+        """
+        Test that pooled readers and the writer can run concurrently.
+
+        Arrange: Migrated SQLite database
+        Act: 8 reader threads and 2 writer threads
+        Assert: No errors, all decrements applied
+        """
+        before = sqlite_db.get_medication_by_id("med_001").stock.quantity_in_stock
+        errors = []
+
+        def reader():
+            try:
+                for _ in range(20):
+                    assert sqlite_db.search_medications_by_name("acamol")
+            except Exception as e:
+                errors.append(e)
+
+        def writer():
+            try:
+                for _ in range(10):
+                    sqlite_db.decrement_stock("med_001", 1)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(8)] + [threading.Thread(target=writer) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        assert sqlite_db.get_medication_by_id("med_001").stock.quantity_in_stock == before - 20
+
+    def test_data_version_shared_between_managers(self, sqlite_db):
+        """
+        Test that writes through one manager move the data_version seen by another.
+
+        Arrange: Second manager (standing in for another process) on the same file
+        Act: Decrement stock, refill and re-import through the second manager
+        Assert: First manager's data_version increases every time, and its
+                suggestions follow the re-imported medications
+        """
+        other = SQLiteDatabaseManager(db_path=str(sqlite_db.db_path))
+        versions = [sqlite_db.data_version]
+        assert sqlite_db.suggest_medications("Acamoll")
+
+        other.decrement_stock("med_001", 1)
+        versions.append(sqlite_db.data_version)
+        other.record_prescription_refill(other.get_prescriptions_by_user("user_001")[0].prescription_id)
+        versions.append(sqlite_db.data_version)
+        other.save_db({"medications": [], "users": [], "prescriptions": []})
+        versions.append(sqlite_db.data_version)
+
+        assert versions == sorted(set(versions)), versions
+        assert other.data_version == sqlite_db.data_version
+        assert sqlite_db.suggest_medications("Acamoll") == []
+        other.close()
+
+
+class TestBackendSelection:
+    """Test suite for backend selection and migration errors."""
+
+    def test_default_backend_is_json(self, monkeypatch):
+        """
+        Test that the JSON backend is used by default.
+
+        Arrange: DATABASE_BACKEND unset
+        Act: create_db_manager()
+        Assert: Plain DatabaseManager
+        """
+        monkeypatch.delenv("DATABASE_BACKEND", raising=False)
+
+        assert type(create_db_manager()) is DatabaseManager
+
+    def test_sqlite_backend_selected_by_env(self, monkeypatch, sqlite_db):
+        """
+        Test that DATABASE_BACKEND=sqlite makes the shared manager use SQLite.
+
+        Arrange: DATABASE_BACKEND=sqlite, SQLITE_DB_PATH pointing at a migrated file
+        Act: get_db_manager() with a reset shared instance
+        Assert: SQLite manager that answers queries
+        """
+        monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+        monkeypatch.setenv("SQLITE_DB_PATH", str(sqlite_db.db_path))
+
+        with patch.object(db_module, "_shared_db_manager", None):
+            manager = db_module.get_db_manager()
+            assert isinstance(manager, SQLiteDatabaseManager)
+            assert manager.get_medication_by_id("med_001") is not None
+            manager.close()
+
+    def test_unknown_backend_raises(self, monkeypatch):
+        """
+        Test that an unknown backend name is rejected.
+
+        Arrange: DATABASE_BACKEND=mongo
+        Act: create_db_manager()
+        Assert: ValueError
+        """
+        monkeypatch.setenv("DATABASE_BACKEND", "mongo")
+
+        with pytest.raises(ValueError):
+            create_db_manager()
+
+    def test_missing_sqlite_file_raises(self, tmp_path):
+        """
+        Test that querying a missing SQLite file raises FileNotFoundError.
+
+        Arrange: Manager for a nonexistent file
+        Act: get_medication_by_id()
+        Assert: FileNotFoundError, no file created
+        """
+        db = SQLiteDatabaseManager(db_path=str(tmp_path / "missing.sqlite3"))
+
+        with pytest.raises(FileNotFoundError):
+            db.get_medication_by_id("med_001")
+        assert not (tmp_path / "missing.sqlite3").exists()
+
+    def test_migration_of_missing_source_fails(self, tmp_path):
+        """
+        Test that the migration command reports a missing source file.
+
+        Arrange: Nonexistent source path
+        Act: Run the migration command
+        Assert: Exit code 1
+        """
+        assert migrate_main(["--source", str(tmp_path / "none.json"), "--target", str(tmp_path / "db.sqlite3")]) == 1
@@ -0,0 +1,152 @@
+"""
+Tests for coalescing streamed deltas into UI frames.
+
+Purpose (Why):
+Validates that the Gradio handler no longer yields (and rebuilds the
+history) once per token: deltas are batched by time and size, tool call
+updates and the first delta are shown at once, and nothing is lost at the
+end of the stream.
+
+Implementation (What):
+Drives StreamCoalescer with a fake clock, and the respond handler through
+the submit_wrapper registered on the Blocks interface with achat_fn patched.
+"""
+
+import os
+import json
+import asyncio
+from unittest.mock import patch
+from app import main
+from app.main import StreamCoalescer
+
+
+class _Clock:
+    """Manually advanced clock in seconds."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStreamCoalescer:
+    """Test suite for StreamCoalescer."""
+
+    def test_first_delta_then_interval(self):
+        """
+        Test that the first delta is shown at once and later ones per interval.
+
+        Arrange: 40 ms interval, fake clock
+        Act: add() deltas 10 ms apart
+        Assert: Frames at 0 ms and 40 ms only
+        """
+        clock = _Clock()
+        coalescer = StreamCoalescer(interval_ms=40, max_chars=1000, clock=clock)
+
+        shown = []
+        for step in range(5):
+            clock.now = step * 0.010
+            shown.append(coalescer.add("ab"))
+
+        assert shown == [True, False, False, False, True]
+        assert coalescer.pending is False
+
+    def test_size_threshold_and_force(self):
+        """
+        Test that enough pending text or a forced update starts a frame.
+
+        Arrange: Long interval, 5-character threshold
+        Act: add() small deltas, then a forced empty update
+        Assert: Frame when 5 characters are pending, and when forced
+        """
+        coalescer = StreamCoalescer(interval_ms=10_000, max_chars=5, clock=_Clock())
+        coalescer.add("x")
+
+        assert [coalescer.add("ab"), coalescer.add("abc")] == [False, True]
+        coalescer.add("a")
+        assert coalescer.pending is True
+        assert coalescer.add("", force=True) is True
+
+    def test_zero_interval_disables_coalescing(self):
+        """
+        Test that UI_STREAM_INTERVAL_MS=0 shows every delta.
+
+        Arrange: Environment interval 0
+        Act: add() several deltas at the same time
+        Assert: All shown
+        """
+        with patch.dict(os.environ, {"UI_STREAM_INTERVAL_MS": "0"}):
+            coalescer = StreamCoalescer(clock=_Clock())
+
+        assert all(coalescer.add("a") for _ in range(5))
+
+
+def _submit_wrapper():
+    """Get the submit handler registered on the chat interface."""
+    interface = main.create_chat_interface()
+    fns = interface.fns.values() if isinstance(interface.fns, dict) else interface.fns
+    return next(block_fn.fn for block_fn in fns if block_fn.fn is not None and block_fn.fn.__name__ == "submit_wrapper")
+
+
+class TestRespondCoalescing:
+    """Test suite for frame coalescing in the respond handler."""
+
+    def test_long_answer_streams_in_few_frames(self):
+        """
+        Test that a many-token answer is yielded in far fewer frames.
+
+        Arrange: achat_fn yielding 500 one-word deltas instantly, history of 4 messages
+        Act: Drain the submit handler
+        Assert: Few frames, final frame complete, history prefix objects shared
+        """
+        submit = _submit_wrapper()
+        history = [
+            {"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"},
+            {"role": "user", "content": "Acamol?"}, {"role": "assistant", "content": "In stock."},
+        ]
+
+        async def fake_achat_fn(*args, **kwargs):
+            for _ in range(500):
+                yield ("word ", "")
+
+        async def drain():
+            return [output async for output in submit("More?", history, None, None, None, None, None)]
+
+        with patch.object(main, "achat_fn", fake_achat_fn), \
+                patch.dict(os.environ, {"UI_STREAM_INTERVAL_MS": "10000", "UI_STREAM_MAX_CHARS": "1000"}):
+            outputs = asyncio.run(drain())
+
+        assert len(outputs) < 10
+        final_history = outputs[-1][0]
+        assert final_history[-1] == {"role": "assistant", "content": "word " * 500}
+        assert final_history[:-1] == history + [{"role": "user", "content": "More?"}]
+        assert all(output[0][0] is outputs[0][0][0] for output in outputs)
+
+    def test_tool_call_updates_are_not_delayed(self):
+        """
+        Test that each tool call update is shown in its own frame.
+
+        Arrange: achat_fn yielding two tool updates between text deltas
+        Act: Drain the submit handler with a long interval
+        Assert: Frames for both tool updates, final frame with all text
+        """
+        submit = _submit_wrapper()
+        first_json = json.dumps([{"tool_name": "check_stock_availability", "tool_id": "call_1"}])
+        second_json = json.dumps([{"tool_name": "check_stock_availability", "tool_id": "call_1", "success": True}])
+
+        async def fake_achat_fn(*args, **kwargs):
+            yield ("Checking ", "")
+            yield ("", first_json)
+            yield ("", second_json)
+            yield ("in stock.", second_json)
+
+        async def drain():
+            return [output async for output in submit("Stock?", [], None, None, None, None, None)]
+
+        with patch.object(main, "achat_fn", fake_achat_fn), \
+                patch.dict(os.environ, {"UI_STREAM_INTERVAL_MS": "10000", "UI_STREAM_MAX_CHARS": "1000"}):
+            outputs = asyncio.run(drain())
+
+        assert [output[1] for output in outputs[1:3]] == [json.loads(first_json), json.loads(second_json)]
+        assert outputs[-1][0][-1]["content"] == "Checking in stock."
@@ -0,0 +1,196 @@
+"""
+Tests for the typed event stream of the streaming agent.
+
+Purpose (Why):
+Validates that stream_events() / astream_events() deliver text deltas, tool
+starts, tool results and a final done event without in-band markers, that
+stream_response() still renders the exact legacy markers from those events,
+and that the async UI entry point never searches text for markers.
+
+Implementation (What):
+Mocks the OpenAI clients with streamed chunks requesting one tool call and
+patches execute_tool, as in the other streaming tests.
+"""
+
+import os
+import json
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from app.agent.streaming import StreamingAgent
+from app.agent.events import (
+    StreamEvent,
+    TEXT,
+    TOOL_START,
+    TOOL_RESULT,
+    DONE,
+    tool_start_event,
+    render_marker,
+)
+from app import main
+from tests.stream_helpers import make_chunk
+
+
+def _turns():
+    """Build two streamed turns: one check_stock_availability call, then the answer."""
+    tool_delta = SimpleNamespace(
+        index=0, id="call_1",
+        function=SimpleNamespace(name="check_stock_availability", arguments='{"medication_id": "med_001"}')
+    )
+    return [
+        [make_chunk(tool_calls=[tool_delta]), make_chunk(finish_reason="tool_calls")],
+        [make_chunk("In "), make_chunk("stock.", finish_reason="stop")],
+    ]
+
+
+def _agent():
+    """
+    Build an agent whose clients stream the turns of _turns().
+
+    Returns:
+        StreamingAgent with mocked sync and async clients
+    """
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+        agent = StreamingAgent(speculative_tools=False, fast_path=False)
+    turns = _turns()
+    agent.client = Mock()
+    agent.client.chat.completions.create = Mock(side_effect=[iter(turn) for turn in turns])
+
+    async def _stream(turn):
+        for chunk in turn:
+            yield chunk
+
+    agent.async_client = Mock()
+    agent.async_client.chat.completions.create = AsyncMock(side_effect=[_stream(turn) for turn in _turns()])
+    return agent
+
+
+STOCK = {"medication_id": "med_001", "available": True, "success": True}
+
+
+class TestStreamEvents:
+    """Test suite for StreamingAgent.stream_events and astream_events."""
+
+    def test_event_sequence(self):
+        """
+        Test the order and payloads of the events of a tool-using answer.
+
+        Arrange: Model requests one tool call, then answers
+        Act: stream_events()
+        Assert: tool start, tool result, text deltas, done
+        """
+        agent = _agent()
+
+        with patch("app.agent.streaming.execute_tool", return_value=STOCK):
+            events = list(agent.stream_events("Is med_001 in stock?"))
+
+        assert [event.type for event in events] == [TOOL_START, TOOL_RESULT, TEXT, TEXT, DONE]
+        assert events[0].data == {"tool_name": "check_stock_availability", "tool_id": "call_1", "arguments": {"medication_id": "med_001"}}
+        assert events[1].data["result"] == STOCK and events[1].data["success"] is True
+        assert "".join(event.text for event in events) == "In stock."
+        assert events[-1].data["correlation_id"]
+
+    def test_async_events_match_sync(self):
+        """
+        Test that astream_events() yields the same events as stream_events().
+
+        Arrange: Same mocked turns for both clients
+        Act: Drain both
+        Assert: Equal except for the correlation ID
+        """
+        agent = _agent()
+
+        async def drain():
+            return [event async for event in agent.astream_events("Is med_001 in stock?")]
+
+        with patch("app.agent.streaming.execute_tool", return_value=STOCK):
+            sync_events = list(agent.stream_events("Is med_001 in stock?"))
+            async_events = asyncio.run(drain())
+
+        assert sync_events[:-1] == async_events[:-1]
+        assert async_events[-1].type == DONE
+
+    def test_empty_message_ends_with_done(self):
+        """
+        Test that an immediate reply is still followed by a done event.
+
+        Arrange: Agent
+        Act: stream_events() with a blank message
+        Assert: One text event, then done; model not called
+        """
+        agent = _agent()
+
+        events = list(agent.stream_events("   "))
+
+        assert [event.type for event in events] == [TEXT, DONE]
+        agent.client.chat.completions.create.assert_not_called()
+
+
+class TestLegacyMarkers:
+    """Test suite for stream_response() rendering of tool events."""
+
+    def test_render_marker_format(self):
+        """
+        Test that render_marker() produces the legacy marker string.
+
+        Arrange: Tool start event with non-ASCII arguments
+        Act: render_marker()
+        Assert: Same string as the markers formerly built inline
+        """
+        event = tool_start_event("get_medication_by_name", "call_1", {"name": "אקמול"})
+        legacy = {"type": "tool_call_start", "tool_name": "get_medication_by_name", "tool_id": "call_1", "arguments": {"name": "אקמול"}}
+
+        assert render_marker(event) == f"\n\n[TOOL_CALL_START]{json.dumps(legacy, ensure_ascii=False)}[/TOOL_CALL_START]\n\n"
+
+    def test_stream_response_renders_markers_only_when_requested(self):
+        """
+        Test that stream_response() keeps its string protocol.
+
+        Arrange: Two agents with the same mocked turns
+        Act: stream_response() without and with include_tool_calls
+        Assert: Plain text only; markers before the text when requested
+        """
+        with patch("app.agent.streaming.execute_tool", return_value=STOCK):
+            plain = list(_agent().stream_response("Is med_001 in stock?"))
+            with_tools = list(_agent().stream_response("Is med_001 in stock?", include_tool_calls=True))
+
+        assert plain == ["In ", "stock."]
+        assert with_tools[0].startswith("\n\n[TOOL_CALL_START]")
+        assert with_tools[1].startswith("\n\n[TOOL_CALL_RESULT]")
+        assert with_tools[2:] == ["In ", "stock."]
+
+
+class TestAchatFnEvents:
+    """Test suite for achat_fn consuming typed events."""
+
+    def test_tool_calls_serialized_once_per_change(self):
+        """
+        Test that text deltas reuse the last serialized tool calls.
+
+        Arrange: Tool start, tool result, then many text deltas
+        Act: Drain achat_fn() counting serializations and marker searches
+        Assert: Two serializations, no marker extraction, same string reused
+        """
+        async def fake_events(**kwargs):
+            yield tool_start_event("check_stock_availability", "call_1", {"medication_id": "med_001"})
+            yield StreamEvent(TOOL_RESULT, data={"tool_name": "check_stock_availability", "tool_id": "call_1", "result": STOCK, "success": True})
+            for _ in range(50):
+                yield StreamEvent(TEXT, "token ")
+            yield StreamEvent(DONE, data={"correlation_id": "c"})
+
+        fake_agent = Mock()
+        fake_agent.astream_events = Mock(side_effect=fake_events)
+
+        async def drain():
+            return [output async for output in main.achat_fn("Stock?", [])]
+
+        with patch.object(main, "agent", fake_agent), \
+                patch.object(main, "_serialize_tool_calls", wraps=main._serialize_tool_calls) as serialize, \
+                patch.object(main, "_extract_tool_call_markers") as extract:
+            outputs = asyncio.run(drain())
+
+        assert serialize.call_count == 2
+        extract.assert_not_called()
+        assert len({id(tool_calls_json) for _, tool_calls_json in outputs[2:]}) == 1
+        assert json.loads(outputs[-1][1])[0]["result"] == STOCK
+        assert "".join(text for text, _ in outputs) == "token " * 50
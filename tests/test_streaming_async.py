@@ -0,0 +1,399 @@
+"""
+Tests for the asyncio-native streaming path of StreamingAgent.
+
+Purpose (Why):
+Validates that astream_response() follows the same protocol as stream_response()
+(text chunks, tool call markers, error replies) while awaiting the AsyncOpenAI
+client, runs tool calls concurrently, and that the async Gradio entry point
+achat_fn() streams its typed events.
+
+Implementation (What):
+Replaces agent.async_client with a mock whose create() coroutine returns async
+iterators of mocked chunks. Tests are synchronous and drive the coroutines with
+asyncio.run(), so no async pytest plugin is required.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from app.agent.streaming import StreamingAgent, MAX_TOOL_ITERATIONS
+from app.agent.events import StreamEvent, DONE, text_event, tool_start_event, tool_result_event
+from tests.stream_helpers import make_chunk
+
+
+def _tool_call_delta(index, call_id, name, arguments):
+    """
+    Build a complete tool call delta.
+
+    Returns:
+        Object shaped like a ChoiceDeltaToolCall
+    """
+    return SimpleNamespace(
+        index=index,
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments))
+    )
+
+
+async def _astream(chunks):
+    """
+    Async iterator over chunks, like an AsyncStream.
+
+    Args:
+        chunks: Chunks to yield
+    """
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+def _collect(agen):
+    """
+    Drain an async generator.
+
+    Args:
+        agen: Async generator
+
+    Returns:
+        List of yielded values
+    """
+    async def drain():
+        return [item async for item in agen]
+    return asyncio.run(drain())
+
+
+@pytest.fixture
+def agent():
+    """
+    Fixture providing a StreamingAgent with mocked clients.
+
+    Returns:
+        StreamingAgent whose async_client.chat.completions.create is an AsyncMock
+    """
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+        agent = StreamingAgent()
+    agent.client = Mock()
+    agent.async_client = Mock()
+    agent.async_client.chat.completions.create = AsyncMock()
+    return agent
+
+
+class TestAstreamResponse:
+    """Test suite for StreamingAgent.astream_response."""
+
+    def test_is_async_generator(self, agent):
+        """
+        Test that astream_response is an async generator function.
+
+        Arrange: Agent
+        Act: Inspect astream_response
+        Assert: Async generator function
+        """
+        assert inspect.isasyncgenfunction(agent.astream_response)
+
+    def test_async_client_pool_per_event_loop(self, agent):
+        """
+        Test that agents share one async HTTP client per event loop, never across loops.
+
+        Arrange: Two agents
+        Act: Read their async clients inside two successive asyncio.run() calls
+        Assert: Same httpx.AsyncClient within a loop, a new one for the next loop
+        """
+        from openai import AsyncOpenAI
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+            first = StreamingAgent()
+            second = StreamingAgent()
+
+        async def clients():
+            return first.async_client, second.async_client, first.async_client
+
+        first_loop = asyncio.run(clients())
+        second_loop = asyncio.run(clients())
+
+        assert isinstance(first_loop[0], AsyncOpenAI)
+        assert first_loop[0] is first_loop[2]
+        assert first_loop[0]._client is first_loop[1]._client
+        assert second_loop[0] is not first_loop[0]
+        assert second_loop[0]._client is not first_loop[0]._client
+
+    def test_empty_message(self, agent):
+        """
+        Test that an empty message gets the greeting without calling OpenAI.
+
+        Arrange: Agent
+        Act: astream_response("   ")
+        Assert: Single greeting chunk, no API call
+        """
+        chunks = _collect(agent.astream_response("   "))
+
+        assert len(chunks) == 1
+        assert "help" in chunks[0].lower()
+        agent.async_client.chat.completions.create.assert_not_called()
+
+    def test_text_chunks_are_streamed(self, agent):
+        """
+        Test that text deltas are yielded in order.
+
+        Arrange: Stream of three text chunks ending with stop
+        Act: astream_response()
+        Assert: Same chunks yielded, one streaming API call
+        """
+        agent.async_client.chat.completions.create.return_value = _astream([
+            make_chunk("Acamol "), make_chunk("is "), make_chunk("paracetamol.", finish_reason="stop")
+        ])
+
+        chunks = _collect(agent.astream_response("Tell me about Acamol"))
+
+        assert chunks == ["Acamol ", "is ", "paracetamol."]
+        kwargs = agent.async_client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream"] is True
+        assert kwargs["messages"][-1] == {"role": "user", "content": "Tell me about Acamol"}
+
+    def test_matches_sync_stream_response(self, agent):
+        """
+        Test that both entry points yield the same chunks for the same stream.
+
+        Arrange: Tool call turn then text turn, execute_tool patched
+        Act: stream_response() and astream_response() with include_tool_calls=True
+        Assert: Identical output
+        """
+        def turns():
+            return [
+                [make_chunk(tool_calls=[_tool_call_delta(0, "call_1", "check_stock_availability", {"medication_id": "med_001"})], finish_reason="tool_calls")],
+                [make_chunk("In stock."), make_chunk(finish_reason="stop")],
+            ]
+
+        agent.client.chat.completions.create = Mock(side_effect=turns())
+        agent.async_client.chat.completions.create.side_effect = [_astream(t) for t in turns()]
+
+        with patch("app.agent.streaming.execute_tool", return_value={"in_stock": True}):
+            sync_chunks = list(agent.stream_response("Is med_001 in stock?", include_tool_calls=True))
+            async_chunks = _collect(agent.astream_response("Is med_001 in stock?", include_tool_calls=True))
+
+        assert async_chunks == sync_chunks
+        assert "[TOOL_CALL_START]" in async_chunks[0]
+        assert "[TOOL_CALL_RESULT]" in async_chunks[1]
+        assert async_chunks[-1] == "In stock."
+
+    def test_tool_results_are_sent_back_in_order(self, agent):
+        """
+        Test that tool messages follow the order of the tool calls.
+
+        Arrange: Two tool calls, the first one slower
+        Act: astream_response()
+        Assert: Second API call ends with tool messages for call_1 then call_2
+        """
+        agent.async_client.chat.completions.create.side_effect = [
+            _astream([make_chunk(tool_calls=[
+                _tool_call_delta(0, "call_1", "get_medication_by_name", {"name": "Acamol"}),
+                _tool_call_delta(1, "call_2", "check_stock_availability", {"medication_id": "med_001"}),
+            ], finish_reason="tool_calls")]),
+            _astream([make_chunk("Done.", finish_reason="stop")]),
+        ]
+
+        def slow_first(tool_name, arguments, **kwargs):
+            if tool_name == "get_medication_by_name":
+                time.sleep(0.05)
+            return {"tool": tool_name}
+
+        with patch("app.agent.streaming.execute_tool", side_effect=slow_first):
+            chunks = _collect(agent.astream_response("Acamol stock?"))
+
+        assert chunks == ["Done."]
+        messages = agent.async_client.chat.completions.create.call_args_list[1].kwargs["messages"]
+        assert [m["tool_call_id"] for m in messages[-2:]] == ["call_1", "call_2"]
+        assert [json.loads(m["content"])["tool"] for m in messages[-2:]] == ["get_medication_by_name", "check_stock_availability"]
+
+    def test_tools_run_concurrently(self, agent):
+        """
+        Test that tool calls of one turn overlap in time.
+
+        Arrange: Three tool calls that each wait until all three have started
+        Act: astream_response()
+        Assert: All three started while the others were still running
+        """
+        tool_names = ["get_medication_by_name", "check_stock_availability", "check_prescription_requirement"]
+        agent.async_client.chat.completions.create.side_effect = [
+            _astream([make_chunk(tool_calls=[
+                _tool_call_delta(i, f"call_{i}", name, {"medication_id": "med_001"})
+                for i, name in enumerate(tool_names)
+            ], finish_reason="tool_calls")]),
+            _astream([make_chunk("Done.", finish_reason="stop")]),
+        ]
+        barrier = threading.Barrier(len(tool_names), timeout=5)
+
+        def wait_for_all(tool_name, arguments, **kwargs):
+            barrier.wait()
+            return {"tool": tool_name}
+
+        with patch("app.agent.streaming.execute_tool", side_effect=wait_for_all):
+            chunks = _collect(agent.astream_response("Tell me everything about med_001"))
+
+        assert chunks == ["Done."]
+        messages = agent.async_client.chat.completions.create.call_args_list[1].kwargs["messages"]
+        assert all("error" not in json.loads(m["content"]) for m in messages[-3:])
+
+    def test_event_loop_is_not_blocked_by_tools(self, agent):
+        """
+        Test that other coroutines keep running while tools execute.
+
+        Arrange: Slow tool, concurrent ticker coroutine
+        Act: Run astream_response() and the ticker together
+        Assert: Ticker advanced while the tool was running
+        """
+        agent.async_client.chat.completions.create.side_effect = [
+            _astream([make_chunk(tool_calls=[_tool_call_delta(0, "call_1", "check_stock_availability", {"medication_id": "med_001"})], finish_reason="tool_calls")]),
+            _astream([make_chunk("Done.", finish_reason="stop")]),
+        ]
+
+        def slow_tool(tool_name, arguments, **kwargs):
+            time.sleep(0.2)
+            return {"in_stock": True}
+
+        async def scenario():
+            ticks = 0
+            finished = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not finished.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            async def consume():
+                chunks = [chunk async for chunk in agent.astream_response("Stock?")]
+                finished.set()
+                return chunks
+
+            chunks, _ = await asyncio.gather(consume(), ticker())
+            return chunks, ticks
+
+        with patch("app.agent.streaming.execute_tool", side_effect=slow_tool):
+            chunks, ticks = asyncio.run(scenario())
+
+        assert chunks == ["Done."]
+        assert ticks >= 5
+
+    def test_request_setup_runs_off_the_event_loop(self, agent):
+        """
+        Test that request setup and the response cache lookup do not run on the loop thread.
+
+        Arrange: Wrapped _start_request and _lookup_response recording their thread
+        Act: astream_response()
+        Assert: Both ran in a thread other than the event loop's
+        """
+        agent.async_client.chat.completions.create.return_value = _astream([make_chunk("Hi.", finish_reason="stop")])
+        threads = {}
+        start_request, lookup_response = agent._start_request, agent._lookup_response
+
+        def record(name, method):
+            def wrapper(*args):
+                threads[name] = threading.get_ident()
+                return method(*args)
+            return wrapper
+
+        agent._start_request = record("start", start_request)
+        agent._lookup_response = record("lookup", lookup_response)
+
+        async def scenario():
+            loop_thread = threading.get_ident()
+            chunks = [chunk async for chunk in agent.astream_response("Hello there")]
+            return chunks, loop_thread
+
+        chunks, loop_thread = asyncio.run(scenario())
+
+        assert chunks == ["Hi."]
+        assert set(threads) == {"start", "lookup"}
+        assert loop_thread not in threads.values()
+
+    def test_api_error_yields_error_message(self, agent):
+        """
+        Test that an API failure becomes an error reply.
+
+        Arrange: create() raises
+        Act: astream_response()
+        Assert: Single apology chunk mentioning the error
+        """
+        agent.async_client.chat.completions.create.side_effect = Exception("API Error")
+
+        chunks = _collect(agent.astream_response("Hello"))
+
+        assert len(chunks) == 1
+        assert "API Error" in chunks[0]
+
+    def test_repeated_tool_calls_stop_at_max_iterations(self, agent):
+        """
+        Test that an endless tool loop is cut off.
+
+        Arrange: Every turn requests a tool call
+        Act: astream_response()
+        Assert: MAX_TOOL_ITERATIONS API calls, then an apology
+        """
+        agent.async_client.chat.completions.create.side_effect = lambda **kwargs: _astream([
+            make_chunk(tool_calls=[_tool_call_delta(0, "call_1", "check_stock_availability", {"medication_id": "med_001"})], finish_reason="tool_calls")
+        ])
+
+        with patch("app.agent.streaming.execute_tool", return_value={"in_stock": True}):
+            chunks = _collect(agent.astream_response("Loop"))
+
+        assert agent.async_client.chat.completions.create.call_count == MAX_TOOL_ITERATIONS
+        assert "apologize" in chunks[-1].lower()
+
+    def test_authentication_error_answers_immediately(self, agent):
+        """
+        Test that an authentication error in the first turn ends the request.
+
+        Arrange: Tool returns an authentication error
+        Act: astream_response()
+        Assert: Login message, no second API call
+        """
+        agent.async_client.chat.completions.create.side_effect = [
+            _astream([make_chunk(tool_calls=[_tool_call_delta(0, "call_1", "get_user_prescriptions", {"user_id": "user_001"})], finish_reason="tool_calls")]),
+        ]
+
+        with patch("app.agent.streaming.execute_tool", return_value={"error": "Authentication required", "success": False}):
+            chunks = _collect(agent.astream_response("My prescriptions"))
+
+        assert "log in" in chunks[-1].lower()
+        assert agent.async_client.chat.completions.create.call_count == 1
+
+
+class TestAchatFn:
+    """Test suite for the async Gradio chat entry point."""
+
+    def test_achat_fn_streams_from_astream_events(self):
+        """
+        Test that achat_fn yields text and tool calls from typed events.
+
+        Arrange: Agent whose astream_events yields tool events, text and done
+        Act: Drain achat_fn()
+        Assert: Text passed through, tool call JSON contains the call and result
+        """
+        from app import main
+
+        async def fake_events(**kwargs):
+            yield tool_start_event("check_stock_availability", "call_1", {})
+            yield tool_result_event("check_stock_availability", "call_1", {"in_stock": True})
+            yield text_event("In stock.")
+            yield StreamEvent(DONE, data={"correlation_id": "c"})
+
+        fake_agent = Mock()
+        fake_agent.astream_events = Mock(side_effect=fake_events)
+
+        with patch.object(main, "agent", fake_agent):
+            outputs = _collect(main.achat_fn("Is med_001 in stock?", [], "user_001"))
+
+        assert inspect.isasyncgenfunction(main.achat_fn)
+        assert outputs[-1][0] == "In stock."
+        tool_calls = json.loads(outputs[-1][1])
+        assert tool_calls[0]["tool_name"] == "check_stock_availability"
+        assert tool_calls[0]["result"] == {"in_stock": True}
+        assert fake_agent.astream_events.call_args.kwargs["context"] == {"authenticated_user_id": "user_001"}
+        fake_agent.astream_response.assert_not_called()
@@ -3,7 +3,7 @@ Tests for StreamingAgent parallel tool execution.
 
 Purpose (Why):
 Validates that StreamingAgent correctly executes multiple tool calls in parallel
-using ThreadPoolExecutor, improving performance while maintaining correctness.
+on the shared ToolExecutor, improving performance while maintaining correctness.
 Tests verify that parallel execution works correctly, preserves order, handles
 errors properly, and maintains all existing functionality.
 
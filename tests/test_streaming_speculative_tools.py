@@ -0,0 +1,313 @@
+"""
+Tests for speculative tool prefetch during streaming.
+
+Purpose (Why):
+Validates that, when enabled, a tool call is dispatched as soon as its
+arguments are complete JSON while the model is still streaming, that its
+result is joined (not executed twice) when the stream ends, and that the
+default mode still executes tools only after the stream has finished.
+
+Implementation (What):
+Streams are Python generators that record what has been executed before each
+chunk is produced, so the tests observe the ordering of tool execution and
+token generation deterministically.
+"""
+
+import os
+import json
+import asyncio
+import threading
+import concurrent.futures
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from app.agent.streaming import StreamingAgent, _StreamTurn
+from app.agent.response_cache import CATALOG_TOOLS
+from tests.stream_helpers import make_chunk
+
+
+def _delta(index, call_id=None, name=None, arguments=None):
+    """Build an object shaped like a ChoiceDeltaToolCall."""
+    return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def _agent(speculative_tools):
+    """
+    Create an agent with mocked clients.
+
+    Args:
+        speculative_tools: Whether speculative prefetch is enabled
+
+    Returns:
+        StreamingAgent
+    """
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+        agent = StreamingAgent(speculative_tools=speculative_tools)
+    agent.client = Mock()
+    agent.async_client = Mock()
+    return agent
+
+
+class _ToolRecorder:
+    """execute_tool replacement recording which calls have started."""
+
+    def __init__(self):
+        self.calls = []
+        self.started = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, tool_name, arguments, **kwargs):
+        with self._lock:
+            self.calls.append((tool_name, arguments))
+            self.started.setdefault(arguments["medication_id"], threading.Event()).set()
+        return {"medication_id": arguments["medication_id"]}
+
+    def wait_started(self, medication_id, timeout):
+        with self._lock:
+            event = self.started.setdefault(medication_id, threading.Event())
+        return event.wait(timeout)
+
+
+def _two_tool_turn(recorder, observed):
+    """
+    Stream a turn with two tool calls, split over several deltas.
+
+    Before streaming the second call, records whether the first call had
+    already started executing (waiting briefly to give a prefetch time to run).
+
+    Args:
+        recorder: _ToolRecorder used as execute_tool
+        observed: Dictionary receiving "first_started_during_stream"
+    """
+    yield make_chunk(tool_calls=[_delta(0, "call_1", "check_stock_availability", '{"medication_id": ')])
+    yield make_chunk(tool_calls=[_delta(0, arguments='"med_001"}')])
+    observed["first_started_during_stream"] = recorder.wait_started("med_001", timeout=0.5)
+    yield make_chunk(tool_calls=[_delta(1, "call_2", "check_stock_availability", '{"medication_id": "med_002"}')])
+    yield make_chunk(finish_reason="tool_calls")
+
+
+class TestReadyToolCalls:
+    """Test suite for _StreamTurn.ready_tool_calls."""
+
+    def test_only_complete_calls_are_ready(self):
+        """
+        Test that only calls with ID, name and complete JSON arguments are ready.
+
+        Arrange: Turn with a complete and an incomplete call
+        Act: ready_tool_calls(), then mark the first as prefetched
+        Assert: Only the complete call, once
+        """
+        turn = _StreamTurn()
+        turn.add_chunk(make_chunk(tool_calls=[
+            _delta(0, "call_1", "get_medication_by_name", '{"name": "Acamol"}'),
+            _delta(1, "call_2", "check_stock_availability", '{"medication_id": "med'),
+        ]))
+
+        ready = turn.ready_tool_calls()
+
+        assert [index for index, _ in ready] == [0]
+        assert ready[0][1] == turn.tool_calls[0]
+        assert ready[0][1] is not turn.tool_calls[0]
+        turn.prefetched[0] = (None, ready[0][1])
+        assert turn.ready_tool_calls() == []
+
+    def test_only_listed_tools_are_ready(self):
+        """
+        Test that ready_tool_calls() can be restricted to a set of tools.
+
+        Arrange: Turn with a complete catalog call and a complete user call
+        Act: ready_tool_calls(CATALOG_TOOLS)
+        Assert: Only the catalog call
+        """
+        turn = _StreamTurn()
+        turn.add_chunk(make_chunk(tool_calls=[
+            _delta(0, "call_1", "get_user_prescriptions", '{"user_id": "user_001"}'),
+            _delta(1, "call_2", "check_stock_availability", '{"medication_id": "med_001"}'),
+        ]))
+
+        assert [index for index, _ in turn.ready_tool_calls(CATALOG_TOOLS)] == [1]
+
+    @pytest.mark.parametrize("arguments", ['{"a": 1', '"text}"', '[{}]'])
+    def test_non_object_or_partial_arguments_are_not_ready(self, arguments):
+        """
+        Test that partial JSON and non-object JSON are not dispatched.
+
+        Arrange: Tool call with the given arguments
+        Act: ready_tool_calls()
+        Assert: Nothing ready
+        """
+        turn = _StreamTurn()
+        turn.add_chunk(make_chunk(tool_calls=[_delta(0, "call_1", "tool", arguments)]))
+
+        assert turn.ready_tool_calls() == []
+
+
+class TestSpeculativeToolPrefetch:
+    """Test suite for speculative dispatch in stream_response and astream_response."""
+
+    def test_disabled_by_default(self):
+        """
+        Test that speculative prefetch is opt-in.
+
+        Arrange: No SPECULATIVE_TOOL_PREFETCH, then set to true
+        Act: Create agents
+        Assert: Disabled, then enabled
+        """
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+            os.environ.pop("SPECULATIVE_TOOL_PREFETCH", None)
+            assert StreamingAgent().speculative_tools is False
+            with patch.dict(os.environ, {"SPECULATIVE_TOOL_PREFETCH": "true"}):
+                assert StreamingAgent().speculative_tools is True
+
+    def test_first_tool_runs_while_streaming(self):
+        """
+        Test that a completed tool call starts before the stream ends.
+
+        Arrange: Speculative agent, two-tool turn
+        Act: stream_response()
+        Assert: First tool started mid-stream, each tool executed once, results in order
+        """
+        agent = _agent(speculative_tools=True)
+        recorder = _ToolRecorder()
+        observed = {}
+        agent.client.chat.completions.create = Mock(side_effect=[
+            _two_tool_turn(recorder, observed),
+            iter([make_chunk("Both in stock.", finish_reason="stop")]),
+        ])
+
+        with patch("app.agent.streaming.execute_tool", side_effect=recorder):
+            chunks = list(agent.stream_response("Stock of med_001 and med_002?"))
+
+        assert chunks == ["Both in stock."]
+        assert observed["first_started_during_stream"] is True
+        assert sorted(args["medication_id"] for _, args in recorder.calls) == ["med_001", "med_002"]
+        messages = agent.client.chat.completions.create.call_args_list[1].kwargs["messages"]
+        assert [m["tool_call_id"] for m in messages[-2:]] == ["call_1", "call_2"]
+        assert [json.loads(m["content"])["medication_id"] for m in messages[-2:]] == ["med_001", "med_002"]
+
+    def test_default_mode_waits_for_stream_end(self):
+        """
+        Test that without speculation no tool runs before the stream ends.
+
+        Arrange: Default agent, two-tool turn
+        Act: stream_response()
+        Assert: First tool had not started mid-stream; both executed once
+        """
+        agent = _agent(speculative_tools=False)
+        recorder = _ToolRecorder()
+        observed = {}
+        agent.client.chat.completions.create = Mock(side_effect=[
+            _two_tool_turn(recorder, observed),
+            iter([make_chunk("Both in stock.", finish_reason="stop")]),
+        ])
+
+        with patch("app.agent.streaming.execute_tool", side_effect=recorder):
+            chunks = list(agent.stream_response("Stock of med_001 and med_002?"))
+
+        assert chunks == ["Both in stock."]
+        assert observed["first_started_during_stream"] is False
+        assert len(recorder.calls) == 2
+
+    def test_async_stream_joins_prefetched_results(self):
+        """
+        Test that astream_response also joins speculative results.
+
+        Arrange: Speculative agent, async two-tool turn
+        Act: astream_response()
+        Assert: Each tool executed once, tool messages in order
+        """
+        agent = _agent(speculative_tools=True)
+        recorder = _ToolRecorder()
+
+        async def turn():
+            yield make_chunk(tool_calls=[_delta(0, "call_1", "check_stock_availability", '{"medication_id": "med_001"}')])
+            await asyncio.sleep(0.05)
+            yield make_chunk(tool_calls=[_delta(1, "call_2", "check_stock_availability", '{"medication_id": "med_002"}')])
+            yield make_chunk(finish_reason="tool_calls")
+
+        async def final():
+            yield make_chunk("Done.", finish_reason="stop")
+
+        agent.async_client.chat.completions.create = AsyncMock(side_effect=[turn(), final()])
+
+        async def drain():
+            return [c async for c in agent.astream_response("Stock?")]
+
+        with patch("app.agent.streaming.execute_tool", side_effect=recorder):
+            chunks = asyncio.run(drain())
+
+        assert chunks == ["Done."]
+        assert len(recorder.calls) == 2
+        messages = agent.async_client.chat.completions.create.call_args_list[1].kwargs["messages"]
+        assert [m["tool_call_id"] for m in messages[-2:]] == ["call_1", "call_2"]
+
+    def test_changed_tool_call_is_executed_again(self):
+        """
+        Test that a prefetched result is discarded if the final call differs.
+
+        Arrange: Prefetched future for different arguments
+        Act: _process_tool_calls() with the final call
+        Assert: Final call executed, its result used
+        """
+        agent = _agent(speculative_tools=True)
+        final_call = {"id": "call_1", "type": "function", "function": {"name": "check_stock_availability", "arguments": '{"medication_id": "med_002"}'}}
+        stale_call = dict(final_call, function={"name": "check_stock_availability", "arguments": '{"medication_id": "med_001"}'})
+        stale_future = Mock()
+        recorder = _ToolRecorder()
+
+        with patch("app.agent.streaming.execute_tool", side_effect=recorder):
+            messages = agent._process_tool_calls([final_call], "corr-1", prefetched={0: (stale_future, stale_call)})
+
+        assert json.loads(messages[0]["content"])["medication_id"] == "med_002"
+        stale_future.result.assert_not_called()
+        stale_future.cancel.assert_called_once_with()
+
+    def test_prefetched_calls_cancelled_after_stream_error(self):
+        """
+        Test that a prefetched call still waiting to run is cancelled when the stream fails.
+
+        Arrange: Executor whose submit() returns a pending future, stream failing after one complete call
+        Act: stream_response()
+        Assert: Error reply, the prefetched future cancelled
+        """
+        agent = _agent(speculative_tools=True)
+        pending = concurrent.futures.Future()
+        executor = Mock()
+        executor.submit.return_value = pending
+
+        def failing_turn():
+            yield make_chunk(tool_calls=[_delta(0, "call_1", "check_stock_availability", '{"medication_id": "med_001"}')])
+            raise ConnectionError("stream dropped")
+
+        agent.client.chat.completions.create = Mock(return_value=failing_turn())
+
+        with patch("app.agent.streaming.get_tool_executor", return_value=executor):
+            chunks = list(agent.stream_response("Stock of med_001?"))
+
+        assert executor.submit.call_count == 1
+        assert "stream dropped" in chunks[0]
+        assert pending.cancelled()
+
+    def test_user_tools_are_not_prefetched(self):
+        """
+        Test that only catalog lookups are dispatched while streaming.
+
+        Arrange: Speculative agent, turn with a complete get_user_prescriptions call
+        Act: Stream the turn with a recording executor
+        Assert: Nothing submitted before the stream ended
+        """
+        agent = _agent(speculative_tools=True)
+        executor = Mock()
+        observed = {}
+
+        def user_turn():
+            yield make_chunk(tool_calls=[_delta(0, "call_1", "get_user_prescriptions", '{"user_id": "user_001"}')])
+            observed["submitted_during_stream"] = executor.submit.call_count
+            raise ConnectionError("stop after the turn")
+
+        agent.client.chat.completions.create = Mock(return_value=user_turn())
+
+        with patch("app.agent.streaming.get_tool_executor", return_value=executor):
+            list(agent.stream_response("My prescriptions?"))
+
+        assert observed["submitted_during_stream"] == 0
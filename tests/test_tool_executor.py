@@ -0,0 +1,264 @@
+"""
+Tests for the process-wide tool executor.
+
+Purpose (Why):
+Validates that tool calls share one bounded pool of long-lived threads, that
+per-tool concurrency limits are enforced without blocking other tools, and
+that queue depth and wait times are reported.
+
+Implementation (What):
+Uses dedicated ToolExecutor instances with small limits and threading.Event
+gates to hold calls in flight deterministically.
+"""
+
+import os
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.agent.tool_executor import (
+    ToolExecutor,
+    ToolQueueFullError,
+    UNREGISTERED_TOOL,
+    get_tool_executor,
+    parse_concurrency_limits,
+)
+from app.agent.streaming import StreamingAgent
+
+
+@pytest.fixture
+def executor():
+    """
+    Fixture providing a small executor that is shut down after the test.
+
+    Returns:
+        ToolExecutor with 4 workers, per-tool default 4 and slow_tool limited to 1
+    """
+    executor = ToolExecutor(max_workers=4, default_limit=4, tool_limits={"slow_tool": 1})
+    yield executor
+    executor.shutdown()
+
+
+class TestParseConcurrencyLimits:
+    """Test suite for parse_concurrency_limits."""
+
+    def test_parses_pairs(self):
+        """
+        Test parsing of a configuration string.
+
+        Arrange: String with spaces and an empty entry
+        Act: parse_concurrency_limits()
+        Assert: Mapping of tool name to limit
+        """
+        assert parse_concurrency_limits(" a=2, b=8,,") == {"a": 2, "b": 8}
+        assert parse_concurrency_limits(None) == {}
+
+    @pytest.mark.parametrize("value", ["a", "=2", "a=x", "a=0"])
+    def test_rejects_invalid_entries(self, value):
+        """
+        Test that malformed entries raise ValueError.
+
+        Arrange: Invalid configuration string
+        Act: parse_concurrency_limits()
+        Assert: ValueError
+        """
+        with pytest.raises(ValueError):
+            parse_concurrency_limits(value)
+
+
+class TestToolExecutor:
+    """Test suite for ToolExecutor."""
+
+    def test_returns_results_and_exceptions(self, executor):
+        """
+        Test that futures carry return values and exceptions.
+
+        Arrange: Executor
+        Act: Submit a succeeding and a failing call
+        Assert: Result and original exception
+        """
+        ok = executor.submit("tool", lambda x: x * 2, 21)
+        failed = executor.submit("tool", lambda: 1 / 0)
+
+        assert ok.result(timeout=5) == 42
+        with pytest.raises(ZeroDivisionError):
+            failed.result(timeout=5)
+
+    def test_threads_are_reused(self, executor):
+        """
+        Test that many calls run on at most max_workers threads.
+
+        Arrange: Executor with 4 workers
+        Act: 50 calls recording their thread
+        Assert: At most 4 distinct threads
+        """
+        futures = [executor.submit("tool", threading.get_ident) for _ in range(50)]
+
+        assert len({f.result(timeout=5) for f in futures}) <= executor.max_workers
+
+    def test_per_tool_limit_queues_excess_calls(self, executor):
+        """
+        Test that a limited tool runs one call at a time while others proceed.
+
+        Arrange: slow_tool limited to 1, first call held by an event
+        Act: Submit a second slow_tool call and a fast_tool call
+        Assert: Second slow call waits (queue depth 1), fast call completes
+        """
+        gate = threading.Event()
+        first = executor.submit("slow_tool", gate.wait, 5)
+        second = executor.submit("slow_tool", lambda: "second")
+        other = executor.submit("fast_tool", lambda: "fast")
+
+        assert other.result(timeout=5) == "fast"
+        metrics = executor.get_metrics()
+        assert metrics["tools"]["slow_tool"] == {"limit": 1, "active": 1, "waiting": 1}
+        assert metrics["queue_depth"] == 1
+        assert not second.done()
+
+        gate.set()
+        assert first.result(timeout=5) is True
+        assert second.result(timeout=5) == "second"
+        assert executor.get_metrics()["tools"]["slow_tool"] == {"limit": 1, "active": 0, "waiting": 0}
+
+    def test_metrics_report_wait_time(self, executor):
+        """
+        Test that waiting for a slot is reflected in the wait time metrics.
+
+        Arrange: slow_tool limited to 1, first call held for a while
+        Act: Submit a second call, release the first after a delay
+        Assert: Max wait time covers the delay; counters and peak depth updated
+        """
+        gate = threading.Event()
+        executor.submit("slow_tool", gate.wait, 5)
+        second = executor.submit("slow_tool", lambda: None)
+        threading.Timer(0.1, gate.set).start()
+
+        second.result(timeout=5)
+        metrics = executor.get_metrics()
+
+        assert metrics["wait_time_max_ms"] >= 90
+        assert metrics["submitted"] == metrics["completed"] == 2
+        assert metrics["peak_queue_depth"] >= 1
+        assert metrics["queue_depth"] == 0 and metrics["running"] == 0
+
+    def test_submit_after_shutdown_fails_future(self):
+        """
+        Test that calls submitted after shutdown fail instead of hanging.
+
+        Arrange: Shut down executor
+        Act: submit()
+        Assert: Future raises RuntimeError
+        """
+        executor = ToolExecutor(max_workers=1)
+        executor.shutdown()
+
+        with pytest.raises(RuntimeError):
+            executor.submit("tool", lambda: None).result(timeout=5)
+
+    def test_full_queue_fails_fast(self):
+        """
+        Test that calls beyond the maximum queue depth are rejected immediately.
+
+        Arrange: One worker, queue depth 2, worker held by an event
+        Act: Submit three more calls
+        Assert: Two wait, the third fails with ToolQueueFullError; waiting calls still run
+        """
+        executor = ToolExecutor(max_workers=1, default_limit=1, max_queue_depth=2)
+        try:
+            gate = threading.Event()
+            running = executor.submit("tool", gate.wait, 5)
+            deadline = time.monotonic() + 5
+            while executor.get_metrics()["running"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            waiting = [executor.submit("tool", lambda: "done") for _ in range(2)]
+            rejected = executor.submit("tool", lambda: "done")
+
+            with pytest.raises(ToolQueueFullError):
+                rejected.result(timeout=0)
+            metrics = executor.get_metrics()
+            assert metrics["rejected"] == 1 and metrics["queue_depth"] == 2
+
+            gate.set()
+            assert running.result(timeout=5) is True
+            assert [future.result(timeout=5) for future in waiting] == ["done", "done"]
+        finally:
+            executor.shutdown()
+
+    def test_only_registered_tools_get_slots(self):
+        """
+        Test that unknown tool names share one slot instead of creating their own.
+
+        Arrange: Executor that knows one tool
+        Act: Submit the known tool and several invented names
+        Assert: Slots for the known tool and UNREGISTERED_TOOL only
+        """
+        executor = ToolExecutor(max_workers=2, tool_names=["known_tool"])
+        try:
+            futures = [executor.submit(name, lambda: None) for name in ["known_tool", "made_up_1", "made_up_2"]]
+            for future in futures:
+                future.result(timeout=5)
+
+            assert set(executor.get_metrics()["tools"]) == {"known_tool", UNREGISTERED_TOOL}
+        finally:
+            executor.shutdown()
+
+    def test_configuration_from_environment(self):
+        """
+        Test that limits are read from environment variables.
+
+        Arrange: TOOL_EXECUTOR_* and TOOL_CONCURRENCY_* variables
+        Act: ToolExecutor()
+        Assert: Configured workers and limits
+        """
+        env = {
+            "TOOL_EXECUTOR_MAX_WORKERS": "3",
+            "TOOL_CONCURRENCY_DEFAULT": "2",
+            "TOOL_CONCURRENCY_LIMITS": "get_user_prescriptions=1",
+            "TOOL_EXECUTOR_MAX_QUEUE_DEPTH": "5",
+        }
+        with patch.dict(os.environ, env):
+            executor = ToolExecutor()
+        try:
+            assert executor.max_workers == 3
+            assert executor.default_limit == 2
+            assert executor.tool_limits == {"get_user_prescriptions": 1}
+            assert executor.max_queue_depth == 5
+        finally:
+            executor.shutdown()
+
+
+class TestSharedToolExecutor:
+    """Test suite for the shared executor used by StreamingAgent."""
+
+    def test_get_tool_executor_is_singleton(self):
+        """
+        Test that the accessor returns one instance.
+
+        Arrange: None
+        Act: get_tool_executor() twice
+        Assert: Same instance
+        """
+        assert get_tool_executor() is get_tool_executor()
+
+    def test_agent_tool_calls_use_shared_executor(self):
+        """
+        Test that StreamingAgent runs tool calls on the shared executor.
+
+        Arrange: Agent, execute_tool patched
+        Act: _process_tool_calls() with two calls
+        Assert: Shared executor counted both calls, results in order
+        """
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key-123"}):
+            agent = StreamingAgent()
+        tool_calls = [
+            {"id": f"call_{i}", "type": "function", "function": {"name": "check_stock_availability", "arguments": json.dumps({"medication_id": f"med_00{i}"})}}
+            for i in (1, 2)
+        ]
+        before = get_tool_executor().get_metrics()["submitted"]
+
+        with patch("app.agent.streaming.execute_tool", side_effect=lambda tool_name, arguments, **kwargs: arguments):
+            messages = agent._process_tool_calls(tool_calls, "corr-1")
+
+        assert get_tool_executor().get_metrics()["submitted"] - before == 2
+        assert [json.loads(m["content"])["medication_id"] for m in messages] == ["med_001", "med_002"]
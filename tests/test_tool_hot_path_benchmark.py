@@ -0,0 +1,158 @@
+"""
+Micro-benchmarks for the tool hot paths.
+
+Purpose (Why):
+Validates that serving pre-validated Medication models and precomputed result
+dictionaries makes check_stock_availability, check_prescription_requirement
+and get_medication_by_name cheaper per call than validating a new Medication
+and building a new result model on every call.
+
+Implementation (What):
+Runs each tool against the shared DatabaseManager twice: as is, and with the
+database methods patched to construct a fresh Medication(**record) per call
+(the previous behavior, which also defeats the result cache). Compares the
+transient memory of one call (tracemalloc peak) and the best-of-N latency.
+"""
+
+import timeit
+import tracemalloc
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from app.database import get_db_manager
+from app.models.medication import Medication
+from app.tools.inventory_tools import check_stock_availability
+from app.tools.prescription_tools import check_prescription_requirement
+from app.tools.medication_tools import get_medication_by_name
+
+CALLS_PER_RUN = 200
+RUNS = 5
+
+
+def _per_call_peak_bytes(func) -> int:
+    """
+    Measure the transient memory allocated by one call.
+
+    Args:
+        func: Zero-argument callable to measure
+
+    Returns:
+        Peak traced memory during the call, in bytes
+    """
+    func()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def _per_call_seconds(func) -> float:
+    """
+    Measure the best-of-N average latency of a call.
+
+    Args:
+        func: Zero-argument callable to measure
+
+    Returns:
+        Seconds per call
+    """
+    return min(timeit.repeat(func, number=CALLS_PER_RUN, repeat=RUNS)) / CALLS_PER_RUN
+
+
+@contextmanager
+def _unvalidated_lookups(db):
+    """
+    Patch the database to validate a new Medication on every lookup.
+
+    Args:
+        db: Shared DatabaseManager
+
+    Yields:
+        None; the original methods are restored on exit
+    """
+    catalog = db._catalog
+
+    def by_id(medication_id):
+        record = catalog.get_medication(medication_id)
+        return Medication(**record) if record is not None else None
+
+    def by_name(name, language=None, ranked=False):
+        return [
+            Medication(**record)
+            for record in catalog.medication_search.search(name.lower().strip(), language, ranked)
+        ]
+
+    with patch.object(db, "get_medication_by_id", side_effect=by_id), \
+            patch.object(db, "search_medications_by_name", side_effect=by_name):
+        yield
+
+
+TOOL_CALLS = {
+    "check_stock_availability": lambda: check_stock_availability("med_001", 10),
+    "check_prescription_requirement": lambda: check_prescription_requirement("med_003"),
+    "get_medication_by_name": lambda: get_medication_by_name("Acamol"),
+}
+
+
+class TestToolHotPathBenchmark:
+    """Micro-benchmarks comparing cached and per-call model construction."""
+
+    @pytest.mark.parametrize("tool_name", sorted(TOOL_CALLS))
+    def test_results_are_identical(self, tool_name):
+        """
+        Test that cached and per-call results are identical.
+
+        Arrange: Shared DatabaseManager
+        Act: Call the tool as is and with per-call validation
+        Assert: Equal result dictionaries
+        """
+        db = get_db_manager()
+        call = TOOL_CALLS[tool_name]
+
+        cached = call()
+        with _unvalidated_lookups(db):
+            uncached = call()
+
+        assert "error" not in cached
+        assert cached == uncached
+
+    @pytest.mark.parametrize("tool_name", sorted(TOOL_CALLS))
+    def test_per_call_allocation_drops(self, tool_name):
+        """
+        Test that a cached call allocates less transient memory.
+
+        Arrange: Shared DatabaseManager
+        Act: Measure tracemalloc peak of one call, cached and per-call
+        Assert: Cached call allocates less
+        """
+        db = get_db_manager()
+        call = TOOL_CALLS[tool_name]
+
+        cached = _per_call_peak_bytes(call)
+        with _unvalidated_lookups(db):
+            uncached = _per_call_peak_bytes(call)
+
+        assert cached < uncached, f"{tool_name}: {cached} bytes cached vs {uncached} bytes per-call"
+
+    @pytest.mark.parametrize("tool_name", sorted(TOOL_CALLS))
+    def test_per_call_latency_drops(self, tool_name):
+        """
+        Test that a cached call is faster.
+
+        Arrange: Shared DatabaseManager
+        Act: Best-of-N timing of the tool, cached and per-call
+        Assert: Cached call is faster
+        """
+        db = get_db_manager()
+        call = TOOL_CALLS[tool_name]
+
+        cached = _per_call_seconds(call)
+        with _unvalidated_lookups(db):
+            uncached = _per_call_seconds(call)
+
+        assert cached < uncached, f"{tool_name}: {cached * 1e6:.1f}us cached vs {uncached * 1e6:.1f}us per-call"
@@ -0,0 +1,290 @@
+"""
+Tests for the cross-request tool result cache.
+
+Purpose (Why):
+Validates that repeated read-only tool calls are served from memory across
+requests, that entries expire per tool and by LRU, that a database change or
+reload invalidates everything, and that user-scoped and credential-checking
+tools cannot leak results between users.
+
+Implementation (What):
+Unit tests drive ToolResultCache directly with a patched clock. Integration
+tests call execute_tool() with a fresh cache and a counting tool function,
+and simulate database changes through a stub data_version.
+"""
+
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from app.tools.result_cache import ToolResultCache, parse_ttls, get_tool_result_cache
+from app.tools import registry
+
+
+@pytest.fixture
+def cache():
+    """
+    Fixture providing a small cache with known TTLs.
+
+    Returns:
+        ToolResultCache with 3 entries and TTLs for catalog and user tools
+    """
+    return ToolResultCache(
+        max_entries=3,
+        ttls={"get_medication_by_name": 100.0, "check_stock_availability": 1.0, "get_user_prescriptions": 10.0},
+        enabled=True
+    )
+
+
+class TestParseTtls:
+    """Test suite for parse_ttls."""
+
+    def test_parses_pairs(self):
+        """
+        Test parsing of a TTL configuration string.
+
+        Arrange: String with float and zero TTLs
+        Act: parse_ttls()
+        Assert: Mapping of tool name to seconds
+        """
+        assert parse_ttls("a=1.5, b=0") == {"a": 1.5, "b": 0.0}
+        assert parse_ttls("") == {}
+
+    @pytest.mark.parametrize("value", ["a", "a=x", "a=-1"])
+    def test_rejects_invalid_entries(self, value):
+        """
+        Test that malformed TTLs raise ValueError.
+
+        Arrange: Invalid configuration string
+        Act: parse_ttls()
+        Assert: ValueError
+        """
+        with pytest.raises(ValueError):
+            parse_ttls(value)
+
+
+class TestToolResultCache:
+    """Test suite for ToolResultCache."""
+
+    def test_key_is_canonical(self, cache):
+        """
+        Test that argument order does not change the key.
+
+        Arrange: Same arguments in different order
+        Act: make_key()
+        Assert: Equal keys
+        """
+        first = cache.make_key("get_medication_by_name", {"name": "Acamol", "language": "en"})
+        second = cache.make_key("get_medication_by_name", {"language": "en", "name": "Acamol"})
+
+        assert first is not None
+        assert first == second
+
+    def test_hit_returns_copy(self, cache):
+        """
+        Test that a cached result is returned as an independent copy.
+
+        Arrange: Stored result with a list value
+        Act: get() and modify the returned result
+        Assert: Next get() returns the original result
+        """
+        key = cache.make_key("get_medication_by_name", {"name": "Acamol"})
+        cache.get(key, 1)
+        cache.put(key, 1, {"name_en": "Acamol", "active_ingredients": ["Paracetamol"]})
+
+        hit = cache.get(key, 1)
+        hit["active_ingredients"].append("Sugar")
+
+        assert cache.get(key, 1) == {"name_en": "Acamol", "active_ingredients": ["Paracetamol"]}
+        assert cache.get_stats()["hits"] == 2
+
+    def test_per_tool_ttl(self, cache):
+        """
+        Test that entries expire after their tool's TTL.
+
+        Arrange: Stock (1s) and medication (100s) results stored at t=0
+        Act: get() at t=5
+        Assert: Stock expired, medication still cached
+        """
+        stock_key = cache.make_key("check_stock_availability", {"medication_id": "med_001"})
+        med_key = cache.make_key("get_medication_by_name", {"name": "Acamol"})
+        with patch("app.tools.result_cache.time.monotonic", return_value=0.0):
+            cache.get(stock_key, 1)
+            cache.put(stock_key, 1, {"in_stock": True})
+            cache.put(med_key, 1, {"name_en": "Acamol"})
+
+        with patch("app.tools.result_cache.time.monotonic", return_value=5.0):
+            assert cache.get(stock_key, 1) is None
+            assert cache.get(med_key, 1) == {"name_en": "Acamol"}
+
+    def test_lru_eviction(self, cache):
+        """
+        Test that the least recently used entry is evicted when full.
+
+        Arrange: Three entries, the first one read again
+        Act: Store a fourth entry
+        Assert: Second entry evicted, first kept
+        """
+        keys = [cache.make_key("get_medication_by_name", {"name": name}) for name in ("a", "b", "c", "d")]
+        cache.get(keys[0], 1)
+        for key in keys[:3]:
+            cache.put(key, 1, {"name": key[2]})
+        cache.get(keys[0], 1)
+
+        cache.put(keys[3], 1, {"name": "d"})
+
+        assert cache.get(keys[1], 1) is None
+        assert cache.get(keys[0], 1) is not None
+        assert cache.get_stats()["entries"] == 3
+
+    def test_data_version_change_clears_cache(self, cache):
+        """
+        Test that a new data version invalidates all entries.
+
+        Arrange: Entry stored at version 1
+        Act: get() with version 2
+        Assert: Miss, cache empty
+        """
+        key = cache.make_key("get_medication_by_name", {"name": "Acamol"})
+        cache.get(key, 1)
+        cache.put(key, 1, {"name_en": "Acamol"})
+
+        assert cache.get(key, 2) is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_result_computed_before_change_is_dropped(self, cache):
+        """
+        Test that a result is not stored if the data changed while computing it.
+
+        Arrange: get() at version 1, another caller moves the cache to version 2
+        Act: put() the version 1 result
+        Assert: Not stored
+        """
+        key = cache.make_key("get_medication_by_name", {"name": "Acamol"})
+        cache.get(key, 1)
+        cache.get(key, 2)
+
+        cache.put(key, 1, {"name_en": "Acamol"})
+
+        assert cache.get(key, 2) is None
+
+    def test_error_results_are_not_cached(self, cache):
+        """
+        Test that error results are never cached.
+
+        Arrange: Error result
+        Act: put() then get()
+        Assert: Miss
+        """
+        key = cache.make_key("get_medication_by_name", {"name": "Nope"})
+        cache.get(key, 1)
+        cache.put(key, 1, {"error": "Medication not found"})
+
+        assert cache.get(key, 1) is None
+
+    def test_user_scoped_tools_require_authenticated_user(self, cache):
+        """
+        Test that user-scoped tools are keyed per authenticated user.
+
+        Arrange: Same arguments, different or missing authenticated users
+        Act: make_key()
+        Assert: No key without user, different keys per user
+        """
+        arguments = {"user_id": "user_001"}
+
+        assert cache.make_key("get_user_prescriptions", arguments) is None
+        alice = cache.make_key("get_user_prescriptions", arguments, {"authenticated_user_id": "user_001"})
+        bob = cache.make_key("get_user_prescriptions", arguments, {"authenticated_user_id": "user_002"})
+        assert alice is not None and bob is not None and alice != bob
+
+    def test_credential_tool_is_never_cached(self):
+        """
+        Test that get_authenticated_user_info is never cached, even if configured.
+
+        Arrange: Cache configured with a TTL for get_authenticated_user_info
+        Act: make_key()
+        Assert: None
+        """
+        cache = ToolResultCache(max_entries=10, ttls={"get_authenticated_user_info": 60.0}, enabled=True)
+
+        assert cache.make_key("get_authenticated_user_info", {"username": "a"}, {"authenticated_user_id": "user_001"}) is None
+
+    def test_disabled_by_environment(self):
+        """
+        Test that TOOL_CACHE_ENABLED=false disables caching.
+
+        Arrange: Environment variable set
+        Act: make_key()
+        Assert: None
+        """
+        with patch.dict(os.environ, {"TOOL_CACHE_ENABLED": "false"}):
+            cache = ToolResultCache()
+
+        assert cache.make_key("get_medication_by_name", {"name": "Acamol"}) is None
+
+    def test_shared_instance(self):
+        """
+        Test that the accessor returns one instance.
+
+        Arrange: None
+        Act: get_tool_result_cache() twice
+        Assert: Same instance
+        """
+        assert get_tool_result_cache() is get_tool_result_cache()
+
+
+class TestExecuteToolCaching:
+    """Test suite for the cache in execute_tool()."""
+
+    @pytest.fixture
+    def counting_tool(self):
+        """
+        Fixture replacing get_medication_by_name with a counting function.
+
+        Yields:
+            List of names the tool was called with
+        """
+        calls = []
+
+        def get_medication_by_name(name: str):
+            calls.append(name)
+            return {"name_en": name, "active_ingredients": ["Paracetamol"]}
+
+        fresh_cache = ToolResultCache(max_entries=10, ttls={"get_medication_by_name": 60.0}, enabled=True)
+        db_stub = SimpleNamespace(data_version=1)
+        with patch.dict(registry._TOOL_FUNCTIONS, {"get_medication_by_name": get_medication_by_name}), \
+                patch.object(registry, "get_tool_result_cache", return_value=fresh_cache), \
+                patch.object(registry, "get_db_manager", return_value=db_stub):
+            yield calls, db_stub
+
+    def test_repeated_call_across_requests_is_cached(self, counting_tool):
+        """
+        Test that identical calls from different requests execute the tool once.
+
+        Arrange: Counting tool, fresh cache
+        Act: execute_tool() twice with different correlation IDs
+        Assert: One execution, equal results
+        """
+        calls, _ = counting_tool
+
+        first = registry.execute_tool("get_medication_by_name", {"name": "Acamol"}, correlation_id="req-1")
+        second = registry.execute_tool("get_medication_by_name", {"name": "Acamol"}, correlation_id="req-2")
+
+        assert calls == ["Acamol"]
+        assert first == second
+
+    def test_database_reload_invalidates(self, counting_tool):
+        """
+        Test that a database change forces re-execution.
+
+        Arrange: Cached result at data_version 1
+        Act: Bump data_version, execute_tool() again
+        Assert: Tool executed twice
+        """
+        calls, db_stub = counting_tool
+        registry.execute_tool("get_medication_by_name", {"name": "Acamol"}, correlation_id="req-1")
+
+        db_stub.data_version = 2
+        registry.execute_tool("get_medication_by_name", {"name": "Acamol"}, correlation_id="req-2")
+
+        assert calls == ["Acamol", "Acamol"]